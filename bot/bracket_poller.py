@@ -5,7 +5,9 @@ Polls every POLL_INTERVAL seconds and for each active tournament:
  - Creates/updates PROJECTED matchups for the next round
  - Auto-advances the round when the FastBreak finishes
 
-Also auto-generates brackets for SIGNUP tournaments whose deadline has passed.
+Also auto-generates brackets for SIGNUP tournaments whose deadline has passed,
+and freezes final standings of CLOSED prediction contests once their
+FastBreak has finished.
 """
 
 import threading
@@ -22,11 +24,42 @@ from utils.helpers import (
     extract_fastbreak_runs,
     get_rank_and_lineup_for_user,
 )
+from utils.contest_standings import freeze_contest_standings
+from db import statements
+from utils.metrics import timed_job, job_error
 
 logger = logging.getLogger(__name__)
 
 POLL_INTERVAL = 600  # 10 minutes
 
+# Per-matchup writes, run for every matchup on every tick
+_UPDATE_LIVE_SCORES = statements.register("bracket_update_live_scores", (
+    "UPDATE bracket_matchups "
+    "SET player1_score = ?, player2_score = ?, "
+    "    player1_rank  = ?, player2_rank  = ?, "
+    "    player1_lineup = ?, player2_lineup = ?, "
+    "    fastbreak_id = ? "
+    "WHERE id = ?"
+))
+_UPDATE_BYE_SCORE = statements.register("bracket_update_bye_score", (
+    "UPDATE bracket_matchups "
+    "SET player1_score = ?, player1_rank = ?, player1_lineup = ?, "
+    "    fastbreak_id = ? "
+    "WHERE id = ?"
+))
+_SET_BYE_WINNER = statements.register(
+    "bracket_set_bye_winner",
+    "UPDATE bracket_matchups SET winner_wallet = ?, status = 'BYE' WHERE id = ?",
+)
+_SET_WINNER = statements.register(
+    "bracket_set_winner",
+    "UPDATE bracket_matchups SET winner_wallet = ?, status = 'COMPLETE' WHERE id = ?",
+)
+_ELIMINATE = statements.register("bracket_eliminate", (
+    "UPDATE bracket_participants SET eliminated_in_round = ? "
+    "WHERE tournament_id = ? AND wallet_address = ?"
+))
+
 
 # ── Helpers ──────────────────────────────────────────────────────────
 
@@ -201,14 +234,7 @@ def _update_live_scores(conn, db_type, tid, current_round, fastbreak_id):
         ln1 = json.dumps(d1["players"]) if d1.get("players") else None
         ln2 = json.dumps(d2["players"]) if d2.get("players") else None
 
-        cursor.execute(prepare_query(
-            "UPDATE bracket_matchups "
-            "SET player1_score = ?, player2_score = ?, "
-            "    player1_rank  = ?, player2_rank  = ?, "
-            "    player1_lineup = ?, player2_lineup = ?, "
-            "    fastbreak_id = ? "
-            "WHERE id = ?"
-        ), (
+        statements.execute(cursor, _UPDATE_LIVE_SCORES, (
             d1.get("points"), d2.get("points"),
             d1.get("rank"),   d2.get("rank"),
             ln1, ln2,
@@ -227,12 +253,8 @@ def _update_live_scores(conn, db_type, tid, current_round, fastbreak_id):
         d1 = _fb_data_for_user(wallet_to_username.get(p1), fastbreak_id) if p1 else {}
         ln1 = json.dumps(d1["players"]) if d1.get("players") else None
 
-        cursor.execute(prepare_query(
-            "UPDATE bracket_matchups "
-            "SET player1_score = ?, player1_rank = ?, player1_lineup = ?, "
-            "    fastbreak_id = ? "
-            "WHERE id = ?"
-        ), (d1.get("points"), d1.get("rank"), ln1, fastbreak_id, matchup_id))
+        statements.execute(cursor, _UPDATE_BYE_SCORE,
+                           (d1.get("points"), d1.get("rank"), ln1, fastbreak_id, matchup_id))
         updated += 1
 
     conn.commit()
@@ -326,22 +348,14 @@ def _finalize_round(conn, db_type, tid, current_round, fastbreak_id):
     winners = []
     for mid, p1, p2, s1, s2 in pending:
         if p2 == 'BYE' or not p2:
-            cursor.execute(prepare_query(
-                "UPDATE bracket_matchups SET winner_wallet = ?, status = 'BYE' WHERE id = ?"
-            ), (p1, mid))
+            statements.execute(cursor, _SET_BYE_WINNER, (p1, mid))
             winners.append(p1)
             continue
 
         winner, loser = _resolve_winner(cursor, tid, p1, p2, s1, s2)
 
-        cursor.execute(prepare_query(
-            "UPDATE bracket_matchups SET winner_wallet = ?, status = 'COMPLETE' WHERE id = ?"
-        ), (winner, mid))
-
-        cursor.execute(prepare_query(
-            "UPDATE bracket_participants SET eliminated_in_round = ? "
-            "WHERE tournament_id = ? AND wallet_address = ?"
-        ), (current_round, tid, loser))
+        statements.execute(cursor, _SET_WINNER, (winner, mid))
+        statements.execute(cursor, _ELIMINATE, (current_round, tid, loser))
 
         winners.append(winner)
 
@@ -442,6 +456,29 @@ def _poll_active_tournament(conn, db_type, tid, current_round, fb_status_map):
         )
 
 
+def _freeze_finished_contests(conn, fb_status_map):
+    """Snapshot standings for CLOSED contests whose FastBreak has finished."""
+    cursor = conn.cursor()
+    cursor.execute(prepare_query('''
+        SELECT c.id, c.fastbreak_id
+        FROM fastbreakContests c
+        WHERE c.status = 'CLOSED'
+          AND NOT EXISTS (
+              SELECT 1 FROM fastbreak_contest_standings s WHERE s.contest_id = c.id
+          )
+    '''))
+    for contest_id, fastbreak_id in cursor.fetchall():
+        if fb_status_map.get(fastbreak_id) != "FAST_BREAK_FINISHED":
+            continue
+        try:
+            count = freeze_contest_standings(conn, contest_id, fastbreak_finished=True)
+            logger.info("[Bracket] Froze standings for contest %d (%d entries)", contest_id, count)
+        except Exception as e:
+            logger.warning("[Bracket] Freeze standings for contest %d failed: %s", contest_id, e)
+            conn.rollback()
+
+
+@timed_job("bracket_poller")
 def bracket_poll_tick():
     """Single poll iteration — called every POLL_INTERVAL seconds."""
     conn = None
@@ -478,8 +515,12 @@ def bracket_poll_tick():
             except Exception as e:
                 logger.warning("[Bracket] Poll tournament %d failed: %s", tid, e)
 
+        # ─ 3. Freeze final standings of closed prediction contests ─
+        _freeze_finished_contests(conn, fb_status_map)
+
     except Exception as e:
         logger.error("[Bracket] Poll tick error: %s", e)
+        job_error("bracket_poller")
     finally:
         if conn:
             try:
@@ -5,6 +5,7 @@ from bot.petting_commands import register_petting_commands
 from bot.fastbreak_commands import register_fastbreak_commands
 from bot.swapfest_commands import register_swapfest_commands
 from bot.tdwatch_commands import register_tdwatch_commands
+from bot.disbursement_commands import register_disbursement_commands
 
 
 def register_commands(bot, conn, cursor, db_type):
@@ -14,4 +15,5 @@ def register_commands(bot, conn, cursor, db_type):
     register_fastbreak_commands(bot, conn, cursor, db_type)
     register_swapfest_commands(bot, conn, cursor, db_type)
     register_tdwatch_commands(bot, conn, cursor, db_type)
+    register_disbursement_commands(bot, conn, cursor, db_type)
 
@@ -11,7 +11,41 @@ from utils.helpers import (
     get_user_predictions_for_contest, get_predictions_for_contest,
     create_predictions_csv, count_total_predictions
 )
-from db.init import get_bot_db
+from db.bot_db import run_db
+from bot.usernames import resolve_usernames
+
+
+def _contest_for_channel(conn, cursor, channel_id, columns):
+    cursor.execute(prepare_query(f'SELECT {columns} FROM contests WHERE channel_id = ?'), (channel_id,))
+    return cursor.fetchone()
+
+
+def _start_contest(conn, cursor, channel_id, name, start_time, creator_id):
+    """Start a contest unless one is active; returns the active contest's name if so."""
+    existing_contest = _contest_for_channel(conn, cursor, channel_id, 'contest_name')
+    if existing_contest:
+        return existing_contest[0]
+    start_contest(channel_id, name, start_time, creator_id, cur=cursor)
+    return None
+
+
+def _remove_prediction(conn, cursor, user_id, channel_id, stats, outcome):
+    """Delete a prediction; returns None on success, else the user's remaining predictions."""
+    cursor.execute(prepare_query('''
+        DELETE FROM predictions
+        WHERE user_id = ? AND contest_name = (SELECT contest_name FROM contests WHERE channel_id = ?)
+        AND stats = ? AND outcome = ?
+    '''), (user_id, channel_id, stats, outcome))
+    if cursor.rowcount > 0:
+        return None
+    return get_user_predictions_for_contest(user_id, channel_id, cur=cursor)
+
+
+def _predictions_with_contest(conn, cursor, channel_id):
+    contest = _contest_for_channel(conn, cursor, channel_id, 'start_time, creator_id')
+    if not contest:
+        return None, []
+    return contest, get_predictions_for_contest(channel_id, cur=cursor)
 
 
 def register_contest_commands(bot, conn, cursor, db_type):
@@ -20,22 +54,18 @@ def register_contest_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name='start', description='Start a contest (Admin only)')
     @commands.has_permissions(administrator=True)
     async def start(interaction: discord.Interaction, name: str, start_time: int):
-        conn, cursor = get_bot_db(bot)
         channel = interaction.channel
         user = interaction.user
 
-        cursor.execute(prepare_query('SELECT contest_name FROM contests WHERE channel_id = ?'), (channel.id,))
-        existing_contest = cursor.fetchone()
+        existing_contest = await run_db(_start_contest, channel.id, name, start_time, user.id)
 
         if existing_contest:
             await interaction.response.send_message(
-                f"A contest '{existing_contest[0]}' is already active in this channel. Please finish it before starting a new one.",
+                f"A contest '{existing_contest}' is already active in this channel. Please finish it before starting a new one.",
                 ephemeral=True
             )
             return
 
-        start_contest(channel.id, name, start_time, user.id)
-
         await interaction.response.send_message(
             f"Contest '{name}' started in this channel! Game starts at <t:{start_time}:F>.", ephemeral=True)
 
@@ -45,12 +75,10 @@ def register_contest_commands(bot, conn, cursor, db_type):
         outcome="Player's team wins or loses the game?",
     )
     async def predict(interaction: discord.Interaction, stats: str, outcome: Literal['Win', 'Loss']):
-        conn, cursor = get_bot_db(bot)
         user = interaction.user
         channel = interaction.channel
 
-        cursor.execute(prepare_query('SELECT contest_name, start_time FROM contests WHERE channel_id = ?'), (channel.id,))
-        contest = cursor.fetchone()
+        contest = await run_db(_contest_for_channel, channel.id, 'contest_name, start_time')
 
         if contest:
             contest_name, start_time = contest
@@ -67,7 +95,9 @@ def register_contest_commands(bot, conn, cursor, db_type):
                 await interaction.response.send_message("Invalid outcome. Please use 'Win' or 'Loss'.", ephemeral=True)
                 return
 
-            save_prediction(user.id, contest_name, stats, outcome_enum, current_time)
+            await run_db(
+                lambda conn, cursor: save_prediction(user.id, contest_name, stats, outcome_enum, current_time, cur=cursor)
+            )
 
             await interaction.response.send_message(
                 f"Prediction saved for {user.name} in contest '{contest_name}'.", ephemeral=True
@@ -78,7 +108,6 @@ def register_contest_commands(bot, conn, cursor, db_type):
 
     @bot.tree.command(name='remove_prediction', description='Remove a prediction')
     async def remove_prediction(interaction: discord.Interaction, stats: str, outcome: str):
-        conn, cursor = get_bot_db(bot)
         user = interaction.user
         channel = interaction.channel
 
@@ -88,17 +117,11 @@ def register_contest_commands(bot, conn, cursor, db_type):
             await interaction.response.send_message("Invalid outcome. Please use 'Win' or 'Loss'.", ephemeral=True)
             return
 
-        cursor.execute(prepare_query('''
-            DELETE FROM predictions
-            WHERE user_id = ? AND contest_name = (SELECT contest_name FROM contests WHERE channel_id = ?)
-            AND stats = ? AND outcome = ?
-        '''), (user.id, channel.id, stats, outcome_enum.value))
-        conn.commit()
+        predictions = await run_db(_remove_prediction, user.id, channel.id, stats, outcome_enum.value)
 
-        if cursor.rowcount > 0:
+        if predictions is None:
             await interaction.response.send_message("Prediction removed successfully.", ephemeral=True)
         else:
-            predictions = get_user_predictions_for_contest(user.id, channel.id)
             if predictions:
                 response = "No such entry. Here are your current predictions:\n"
                 for contest_name, stats, outcome, timestamp in predictions:
@@ -110,14 +133,10 @@ def register_contest_commands(bot, conn, cursor, db_type):
 
     @bot.tree.command(name='predictions', description="List all predictions")
     async def predictions(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         user = interaction.user
         channel = interaction.channel
 
-        query = 'SELECT start_time, creator_id FROM contests WHERE channel_id = ?'
-        query = prepare_query(query)
-        cursor.execute(query, (channel.id,))
-        contest = cursor.fetchone()
+        contest, predictions = await run_db(_predictions_with_contest, channel.id)
 
         if contest:
             start_time, creator_id = contest
@@ -126,44 +145,25 @@ def register_contest_commands(bot, conn, cursor, db_type):
                 await interaction.response.send_message("Predictions are hidden until the game starts.", ephemeral=True)
                 return
 
-            predictions = get_predictions_for_contest(channel.id)
-
             if predictions:
-                response = ""
-                for user_id, stats, outcome, timestamp in predictions:
-                    query = 'SELECT username FROM user_mapping WHERE user_id = ?'
-                    query = prepare_query(query)
-                    cursor.execute(query, (user_id,))
-                    result = cursor.fetchone()
-
-                    if result:
-                        username = result[0]
-                    else:
-                        try:
-                            user_obj = await bot.fetch_user(user_id)
-                            username = user_obj.name
-                            if db_type == 'postgresql':
-                                query = '''INSERT INTO user_mapping (user_id, username) 
-                                           VALUES (%s, %s) 
-                                           ON CONFLICT (user_id) DO UPDATE SET username = EXCLUDED.username'''
-                            else:
-                                query = 'INSERT OR REPLACE INTO user_mapping (user_id, username) VALUES (?, ?)'
-
-                            query = prepare_query(query)
-                            cursor.execute(query, (user_id, username))
-                            conn.commit()
-                        except Exception as e:
-                            username = f"User {user_id}"
-
-                    response += f"{username}: Stats: {stats}, Outcome: {outcome}\n"
+                usernames = await resolve_usernames(
+                    bot, [p[0] for p in predictions], db_type, guild=interaction.guild
+                )
+                response = "".join(
+                    f"{usernames[int(user_id)]}: Stats: {stats}, Outcome: {outcome}\n"
+                    for user_id, stats, outcome, timestamp in predictions
+                )
 
                 if len(response) > 2000:
-                    csv_output = await create_predictions_csv(predictions)
+                    csv_output = await create_predictions_csv(predictions, usernames=usernames)
                     csv_filename = f"predictions_{channel.id}.csv"
                     discord_file = discord.File(fp=csv_output, filename=csv_filename)
-                    await interaction.response.send_message(
-                        content="The predictions list is too large. Here is the CSV file.", file=discord_file,
-                        ephemeral=True)
+                    try:
+                        await interaction.response.send_message(
+                            content="The predictions list is too large. Here is the CSV file.", file=discord_file,
+                            ephemeral=True)
+                    finally:
+                        csv_output.close()
                 else:
                     await interaction.response.send_message(response, ephemeral=True)
             else:
@@ -176,7 +176,9 @@ def register_contest_commands(bot, conn, cursor, db_type):
         user = interaction.user
         channel = interaction.channel
 
-        predictions = get_user_predictions_for_contest(user.id, channel.id)
+        predictions = await run_db(
+            lambda conn, cursor: get_user_predictions_for_contest(user.id, channel.id, cur=cursor)
+        )
 
         if predictions:
             embed = discord.Embed(title=f"{user.name}'s Predictions in Current Contest", color=discord.Color.blue())
@@ -192,12 +194,11 @@ def register_contest_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name='total_predictions', description='Show number of predictions')
     async def total_predictions(interaction: discord.Interaction):
         channel = interaction.channel
-        total = count_total_predictions(channel.id)
+        total = await run_db(lambda conn, cursor: count_total_predictions(channel.id, cur=cursor))
         await interaction.response.send_message(f"Total predictions made: {total}", ephemeral=True)
 
     @bot.tree.command(name='winner', description='Declare winner (Admin only)')
     async def winner(interaction: discord.Interaction, stats: int, outcome: str):
-        conn, cursor = get_bot_db(bot)
         channel = interaction.channel
         user = interaction.user
 
@@ -205,10 +206,7 @@ def register_contest_commands(bot, conn, cursor, db_type):
             await interaction.response.send_message("Invalid outcome. Outcome must be 'Win' or 'Loss'.", ephemeral=True)
             return
 
-        query = 'SELECT start_time, creator_id FROM contests WHERE channel_id = ?'
-        query = prepare_query(query)
-        cursor.execute(query, (channel.id,))
-        contest = cursor.fetchone()
+        contest, predictions = await run_db(_predictions_with_contest, channel.id)
 
         if not contest:
             await interaction.response.send_message("No active contest found for this channel.", ephemeral=True)
@@ -220,8 +218,6 @@ def register_contest_commands(bot, conn, cursor, db_type):
             await interaction.response.send_message("Only the contest creator can declare the winner.", ephemeral=True)
             return
 
-        predictions = get_predictions_for_contest(channel.id)
-
         if not predictions:
             await interaction.response.send_message("No predictions found for this contest.", ephemeral=True)
             return
@@ -247,32 +243,12 @@ def register_contest_commands(bot, conn, cursor, db_type):
             response = f"🎉 **We have a winner** for the contest in **{channel.name}**! 🎉\n"
             response += f"🏆 Congratulations to the following amazing predictor(s):\n\n"
 
+            usernames = await resolve_usernames(
+                bot, [w[0] for w in winners], db_type, guild=interaction.guild
+            )
             for winner in winners:
                 user_id, winner_stats, winner_outcome = winner
-
-                query = 'SELECT username FROM user_mapping WHERE user_id = ?'
-                query = prepare_query(query)
-                cursor.execute(query, (user_id,))
-                result = cursor.fetchone()
-
-                if result:
-                    username = result[0]
-                else:
-                    try:
-                        user_obj = await bot.fetch_user(user_id)
-                        username = user_obj.name
-                        if db_type == 'postgresql':
-                            query = '''INSERT INTO user_mapping (user_id, username) 
-                                       VALUES (%s, %s) 
-                                       ON CONFLICT (user_id) DO UPDATE SET username = EXCLUDED.username'''
-                        else:
-                            query = 'INSERT OR REPLACE INTO user_mapping (user_id, username) VALUES (?, ?)'
-
-                        query = prepare_query(query)
-                        cursor.execute(query, (user_id, username))
-                        conn.commit()
-                    except Exception as e:
-                        username = f"User {user_id}"
+                username = usernames[int(user_id)]
 
                 response += f"**{username}** 🏅 - Predicted Stats: `{winner_stats}`, Outcome: `{winner_outcome}`\n"
 
@@ -0,0 +1,97 @@
+"""Treasury disbursement commands for Discord bot."""
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.helpers import is_admin
+from db.bot_db import run_db, run_blocking
+from db.init import get_db_connection
+from bot.disbursements import disburse_pending, payout_summary, retry_failed_payouts
+
+
+def _disburse(dry_run):
+    """Send (or plan) the queue on a dedicated connection.
+
+    disburse_pending commits per batch and waits on the access node, so it
+    runs via run_blocking instead of holding a pooled run_db transaction.
+    """
+    conn, db_type = get_db_connection()
+    try:
+        results = disburse_pending(conn, db_type, dry_run=dry_run)
+        return results, payout_summary(conn.cursor())
+    finally:
+        conn.close()
+
+
+def _retry_failed(conn, cursor):
+    return retry_failed_payouts(cursor)
+
+
+def _summary_lines(summary):
+    lines = []
+    for kind, statuses in sorted(summary.items()):
+        unit = "$MVP" if kind == "MVP" else "moments"
+        parts = [f"{status}: {count} ({total:g} {unit})" for status, (count, total) in sorted(statuses.items())]
+        lines.append(f"**{kind}** — " + " • ".join(parts))
+    return lines
+
+
+def register_disbursement_commands(bot, conn, cursor, db_type):
+    """Register treasury payout queue commands."""
+
+    @bot.tree.command(
+        name="disburse",
+        description="(Admin only) Send every queued treasury payout in batched transactions"
+    )
+    @app_commands.describe(dry_run="Only show the batches that would be sent")
+    @commands.has_permissions(administrator=True)
+    async def disburse(interaction: discord.Interaction, dry_run: bool = False):
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "You need admin permissions to run this command.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            results, summary = await run_blocking(_disburse, dry_run)
+        except Exception as e:
+            print(f"❌ Disbursement failed: {e}")
+            await interaction.followup.send(f"❌ Disbursement failed: {e}", ephemeral=True)
+            return
+
+        title = "🧾 **Disbursement plan (dry run)**" if dry_run else "💸 **Disbursement run**"
+        lines = [title]
+        if not results:
+            lines.append("Nothing pending.")
+        for r in results:
+            if dry_run:
+                lines.append(f"• {r['kind']}: {r['lines']} lines in one transaction")
+            elif r["tx_id"]:
+                lines.append(f"• Batch #{r['batch_id']} ({r['kind']}, {r['lines']} lines): `{r['tx_id']}`")
+            else:
+                lines.append(f"• Batch #{r['batch_id']} ({r['kind']}, {r['lines']} lines): ⚠️ send failed, will be re-queued")
+        lines.append("")
+        lines.extend(_summary_lines(summary) or ["Queue is empty."])
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+    @bot.tree.command(
+        name="disburse_retry",
+        description="(Admin only) Re-queue FAILED payout lines after checking treasury history"
+    )
+    @commands.has_permissions(administrator=True)
+    async def disburse_retry(interaction: discord.Interaction):
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "You need admin permissions to run this command.",
+                ephemeral=True
+            )
+            return
+
+        requeued = await run_db(_retry_failed)
+        await interaction.response.send_message(
+            f"🔁 Re-queued {requeued} failed payout line(s).", ephemeral=True
+        )
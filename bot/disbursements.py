@@ -0,0 +1,672 @@
+"""Batched multi-recipient treasury disbursements.
+
+Payouts are queued as lines in ``payouts`` — one recipient plus a $MVP
+amount, or one Dapper recipient plus up to ``DISBURSE_MAX_MOMENTS`` moment
+ids — under an idempotency key, so queueing the same prize twice is a
+no-op.  ``disburse_pending`` packs PENDING lines into multi-recipient
+Cadence transactions of at most ``DISBURSE_MAX_RECIPIENTS`` lines (and
+``DISBURSE_MAX_MOMENTS`` moments) and tracks every line:
+
+    PENDING → SUBMITTED (batch, tx) → SEALED
+    a line skipped by a sealed batch, or in a failed batch on its own, goes
+    back to PENDING (attempts + 1) and becomes FAILED after
+    ``MAX_PAYOUT_ATTEMPTS``; the lines of a failed multi-line batch are
+    marked ``solo`` and retried one per transaction without using an attempt
+
+A line is only SEALED when the sealed transaction carries its deposit
+event; recipients without a receiver are skipped on chain rather than
+failing the whole batch.  Each batch records its proposal key sequence
+number before it is sent, so a batch interrupted mid-send is re-queued
+only once that sequence number is provably unused — retries never pay
+twice.  That only holds if nothing else proposes with the key, so batches
+need their own ``DISBURSE_KEY_INDEX``, distinct from ``FLOW_SWAP_KEY_INDEX``.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import logging
+from decimal import Decimal, ROUND_DOWN
+
+from config import (
+    FLOW_ACCOUNT, FLOW_SWAP_ACCOUNT, FLOW_SWAP_PRIVATE_KEY, FLOW_SWAP_KEY_INDEX,
+    DISBURSE_INTERVAL, DISBURSE_MAX_RECIPIENTS, DISBURSE_MAX_MOMENTS, DISBURSE_KEY_INDEX,
+    FLOW_ACCESS_NODE_HOST, FLOW_ACCESS_NODE_PORT,
+)
+from db.init import get_db_connection
+from utils.cdc_events import FT_DEPOSITED, TOPSHOT_DEPOSIT, normalize_address
+from utils.helpers import prepare_query
+from utils.flow_rest import get_key_sequence
+from utils.metrics import grpc_client, timed_job, job_error
+
+logger = logging.getLogger(__name__)
+
+MVP = "MVP"
+MOMENTS = "MOMENTS"
+KINDS = (MVP, MOMENTS)
+
+# Line / batch statuses
+PENDING = "PENDING"
+BUILDING = "BUILDING"      # batch only: claimed, not yet acknowledged by the access node
+SUBMITTED = "SUBMITTED"
+SEALED = "SEALED"
+FAILED = "FAILED"
+
+MAX_PAYOUT_ATTEMPTS = 3
+STALE_BATCH_SECONDS = 15 * 60   # past Flow's ~600-block transaction expiry
+
+_MVP_VAULT = "PetJokicsHorses"
+_UFIX_STEP = Decimal("0.00000001")
+
+# Source-specific bookkeeping once a line is sealed: (tx_id, source_ref)
+_SEAL_UPDATES = {
+    "bracket": "UPDATE bracket_tournaments SET payout_tx_id = ? WHERE id = ? AND payout_tx_id IS NULL",
+}
+
+_LINE_COLUMNS = ("id, idempotency_key, kind, recipient, amount, moment_ids, source, source_ref, "
+                 "status, batch_id, attempts, error_message, solo")
+
+
+def format_amount(amount):
+    """$MVP amount → UFix64 decimal string (8 places, rounded down)."""
+    value = Decimal(str(amount)).quantize(_UFIX_STEP, rounding=ROUND_DOWN)
+    if value <= 0:
+        raise ValueError(f"Payout amount must be positive, got {amount}")
+    return f"{value:.8f}"
+
+
+def ufix64_units(amount):
+    """UFix64 decimal string → integer units of 1e-8."""
+    return int(Decimal(amount) / _UFIX_STEP)
+
+
+def disburse_key_index():
+    """The batches' proposal key; raises unless a dedicated key is configured.
+
+    Swaps propose with FLOW_SWAP_KEY_INDEX, and a shared key would make the
+    recorded sequence numbers useless for telling whether a batch executed.
+    """
+    if not str(DISBURSE_KEY_INDEX).strip():
+        raise RuntimeError("Disbursement key not configured (DISBURSE_KEY_INDEX)")
+    key_index = int(DISBURSE_KEY_INDEX)
+    if key_index == FLOW_SWAP_KEY_INDEX:
+        raise RuntimeError("DISBURSE_KEY_INDEX must differ from FLOW_SWAP_KEY_INDEX")
+    return key_index
+
+
+# ── Queue ───────────────────────────────────────────────────────────
+
+def _line_from_row(row):
+    return {
+        "id": row[0],
+        "idempotency_key": row[1],
+        "kind": row[2],
+        "recipient": row[3],
+        "amount": row[4],
+        "moment_ids": json.loads(row[5]) if row[5] else [],
+        "source": row[6],
+        "source_ref": row[7],
+        "status": row[8],
+        "batch_id": row[9],
+        "attempts": int(row[10] or 0),
+        "error_message": row[11],
+        "solo": bool(row[12]),
+    }
+
+
+def _load_lines(cursor, where, params=()):
+    cursor.execute(prepare_query(
+        f"SELECT {_LINE_COLUMNS} FROM payouts WHERE {where} ORDER BY id"
+    ), params)
+    return [_line_from_row(r) for r in cursor.fetchall()]
+
+
+def enqueue_payout(cursor, db_type, key, recipient, amount=None, moment_ids=None,
+                   source=None, source_ref=None, now=None):
+    """Queue one payout line (no commit); an existing ``key`` is left as is.
+
+    Pass ``amount`` for $MVP or ``moment_ids`` (at most DISBURSE_MAX_MOMENTS)
+    for moments.  Returns the stored line.
+    """
+    if (amount is None) == (not moment_ids):
+        raise ValueError("A payout needs either an amount or moment_ids")
+    if moment_ids and len(moment_ids) > DISBURSE_MAX_MOMENTS:
+        raise ValueError(f"At most {DISBURSE_MAX_MOMENTS} moments per payout line; use enqueue_moment_payouts")
+    now = int(now if now is not None else time.time())
+    kind = MVP if amount is not None else MOMENTS
+    row = (
+        key, kind, normalize_address(recipient),
+        format_amount(amount) if amount is not None else None,
+        json.dumps([int(m) for m in moment_ids]) if moment_ids else None,
+        source, str(source_ref) if source_ref is not None else None,
+        PENDING, now, now,
+    )
+    columns = ("idempotency_key, kind, recipient, amount, moment_ids, source, source_ref, "
+               "status, created_at, updated_at")
+    if db_type == 'postgresql':
+        cursor.execute(prepare_query(f'''
+            INSERT INTO payouts ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (idempotency_key) DO NOTHING
+        '''), row)
+    else:
+        cursor.execute(prepare_query(f'''
+            INSERT OR IGNORE INTO payouts ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''), row)
+    return _load_lines(cursor, "idempotency_key = ?", (key,))[0]
+
+
+def enqueue_moment_payouts(cursor, db_type, key, recipient, moment_ids,
+                           source=None, source_ref=None, now=None):
+    """Queue moments as lines of at most DISBURSE_MAX_MOMENTS (keys ``<key>:<n>``)."""
+    ids = [int(m) for m in moment_ids]
+    chunks = [ids[i:i + DISBURSE_MAX_MOMENTS] for i in range(0, len(ids), DISBURSE_MAX_MOMENTS)]
+    return [
+        enqueue_payout(cursor, db_type, f"{key}:{n}", recipient, moment_ids=chunk,
+                       source=source, source_ref=source_ref, now=now)
+        for n, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def payouts_for_source(cursor, source, source_ref, include_failed=False):
+    """Lines queued for one source record (e.g. ``'bracket', tid``); FAILED ones only on request."""
+    where, params = "source = ? AND source_ref = ?", [source, str(source_ref)]
+    if not include_failed:
+        where += " AND status <> ?"
+        params.append(FAILED)
+    return _load_lines(cursor, where, tuple(params))
+
+
+def retry_failed_payouts(cursor, ids=None, now=None):
+    """Re-queue FAILED lines (all, or just ``ids``) after a manual check.  Returns rows changed."""
+    now = int(now if now is not None else time.time())
+    where, params = "status = ?", [FAILED]
+    if ids:
+        where += f" AND id IN ({', '.join(['?'] * len(ids))})"
+        params.extend(ids)
+    cursor.execute(prepare_query(f'''
+        UPDATE payouts SET status = ?, attempts = 0, batch_id = NULL, updated_at = ?
+        WHERE {where}
+    '''), (PENDING, now, *params))
+    return cursor.rowcount
+
+
+def payout_summary(cursor):
+    """``{kind: {status: (lines, $MVP total or moment count)}}``."""
+    cursor.execute(prepare_query('''
+        SELECT kind, status, amount, moment_ids FROM payouts
+    '''))
+    summary = {}
+    for kind, status, amount, moment_ids in cursor.fetchall():
+        lines, total = summary.setdefault(kind, {}).get(status, (0, 0))
+        total += Decimal(amount) if amount else len(json.loads(moment_ids or "[]"))
+        summary[kind][status] = (lines + 1, total)
+    return summary
+
+
+# ── Batching ────────────────────────────────────────────────────────
+
+def plan_batches(lines, max_recipients=None, max_moments=None):
+    """Pack lines (one kind, queue order) into transaction-sized batches."""
+    max_recipients = max_recipients or DISBURSE_MAX_RECIPIENTS
+    max_moments = max_moments or DISBURSE_MAX_MOMENTS
+    batches, current, moments = [], [], 0
+    for line in lines:
+        size = len(line["moment_ids"])
+        if current and (len(current) >= max_recipients or moments + size > max_moments):
+            batches.append(current)
+            current, moments = [], 0
+        current.append(line)
+        moments += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _plan(pending):
+    """Isolated (``solo``) lines one per batch first, then the rest packed."""
+    solo = [[line] for line in pending if line["solo"]]
+    return solo + plan_batches([line for line in pending if not line["solo"]])
+
+
+def _insert_batch(cursor, db_type, kind, line_count, now):
+    cursor.execute(prepare_query('''
+        INSERT INTO payout_batches (kind, status, line_count, created_at)
+        VALUES (?, ?, ?, ?)
+    '''), (kind, BUILDING, line_count, now))
+    if db_type == 'postgresql':
+        cursor.execute("SELECT lastval()")
+    else:
+        cursor.execute("SELECT last_insert_rowid()")
+    return cursor.fetchone()[0]
+
+
+def claim_batch(conn, db_type, kind, now=None):
+    """Move the next batch of PENDING lines to SUBMITTED under a new batch row, commit.
+
+    Returns ``(batch_id, lines)`` or None when nothing is pending.
+    """
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+    pending = _load_lines(cur, "status = ? AND kind = ?", (PENDING, kind))
+    if not pending:
+        return None
+    lines = _plan(pending)[0]
+    batch_id = _insert_batch(cur, db_type, kind, len(lines), now)
+    ids = [line["id"] for line in lines]
+    cur.execute(prepare_query(f'''
+        UPDATE payouts SET status = ?, batch_id = ?, updated_at = ?
+        WHERE status = ? AND id IN ({', '.join(['?'] * len(ids))})
+    '''), (SUBMITTED, batch_id, now, PENDING, *ids))
+    if cur.rowcount != len(ids):
+        conn.rollback()     # another disburser claimed some of these lines
+        return None
+    conn.commit()
+    return batch_id, lines
+
+
+# ── Cadence ─────────────────────────────────────────────────────────
+
+MVP_BATCH_CADENCE = """
+import FungibleToken from 0xf233dcee88fe0abe
+import PetJokicsHorses from 0x6fd2465f3a22e34c
+
+transaction(recipients: [Address], amounts: [UFix64]) {
+  let vaultRef: auth(FungibleToken.Withdraw) &PetJokicsHorses.Vault
+
+  prepare(signer: auth(Storage, BorrowValue) &Account) {
+    pre {
+      recipients.length == amounts.length: "recipients and amounts differ in length"
+    }
+    self.vaultRef = signer.storage.borrow<auth(FungibleToken.Withdraw) &PetJokicsHorses.Vault>(
+      from: /storage/PetJokicsHorsesVault
+    ) ?? panic("Could not borrow reference to the owner's Vault!")
+  }
+
+  execute {
+    var i = 0
+    while i < recipients.length {
+      // Recipients without a receiver are skipped (their line is retried)
+      if let receiver = getAccount(recipients[i]).capabilities.borrow<&{FungibleToken.Receiver}>(
+        /public/PetJokicsHorsesReceiver
+      ) {
+        receiver.deposit(from: <-self.vaultRef.withdraw(amount: amounts[i]))
+      }
+      i = i + 1
+    }
+  }
+}
+"""
+
+MOMENTS_BATCH_CADENCE = """
+import HybridCustody from 0xd8a7e05a7ac670c0
+import NonFungibleToken from 0x1d7e57aa55817448
+import TopShot from 0x0b2a3299cc857e29
+
+transaction(recipients: [Address], momentIds: [[UInt64]]) {
+  let provider: auth(NonFungibleToken.Withdraw) &{NonFungibleToken.Provider, NonFungibleToken.CollectionPublic}
+
+  prepare(signer: auth(Storage, Capabilities) &Account) {
+    pre {
+      recipients.length == momentIds.length: "recipients and momentIds differ in length"
+    }
+
+    let mgr = signer.storage.borrow<auth(HybridCustody.Manage) &HybridCustody.Manager>(
+      from: HybridCustody.ManagerStoragePath
+    ) ?? panic("No HybridCustody manager")
+
+    let childAcct = mgr.borrowAccount(addr: CHILD_ADDRESS)
+      ?? panic("Child account not found")
+
+    let capType = Type<
+      auth(NonFungibleToken.Withdraw)
+      &{NonFungibleToken.Provider, NonFungibleToken.CollectionPublic}>()
+
+    let controllerID = childAcct.getControllerIDForType(
+      type: capType,
+      forPath: /storage/MomentCollection
+    ) ?? panic("Controller ID not found for TopShot collection on child")
+
+    let cap = childAcct.getCapability(
+      controllerID: controllerID,
+      type: capType
+    ) as! Capability<
+      auth(NonFungibleToken.Withdraw)
+      &{NonFungibleToken.Provider, NonFungibleToken.CollectionPublic}>
+
+    assert(cap.check(), message: "Invalid provider capability")
+    self.provider = cap.borrow()!
+  }
+
+  execute {
+    var i = 0
+    while i < recipients.length {
+      // Recipients without a TopShot collection are skipped (their line is retried)
+      if let receiver = getAccount(recipients[i]).capabilities
+        .borrow<&{NonFungibleToken.Receiver}>(/public/MomentCollection) {
+        for id in momentIds[i] {
+          receiver.deposit(token: <- self.provider.withdraw(withdrawID: id))
+        }
+      }
+      i = i + 1
+    }
+  }
+}
+"""
+
+
+def build_batch_transaction(kind, lines):
+    """Return ``(cadence, arguments)`` for one batch."""
+    from flow_py_sdk.cadence import Address, Array, UFix64, UInt64
+
+    recipients = Array([Address.from_hex(line["recipient"].removeprefix("0x")) for line in lines])
+    if kind == MVP:
+        amounts = Array([UFix64(ufix64_units(line["amount"])) for line in lines])
+        return MVP_BATCH_CADENCE, (recipients, amounts)
+    moment_ids = Array([Array([UInt64(m) for m in line["moment_ids"]]) for line in lines])
+    cadence = MOMENTS_BATCH_CADENCE.replace("CHILD_ADDRESS", normalize_address(FLOW_ACCOUNT))
+    return cadence, (recipients, moment_ids)
+
+
+async def _send_transaction(cadence, arguments, on_sequence):
+    """Sign and send as the treasury; ``on_sequence(seq)`` runs just before sending."""
+    from flow_py_sdk import flow_client, Tx, ProposalKey, InMemorySigner, SignAlgo
+    from flow_py_sdk.signer import HashAlgo
+    from flow_py_sdk.cadence import Address
+
+    key_index = disburse_key_index()
+    treasury_addr = Address.from_hex(FLOW_SWAP_ACCOUNT.removeprefix('0x'))
+    signer = InMemorySigner(
+        hash_algo=HashAlgo.SHA3_256,
+        sign_algo=SignAlgo.ECDSA_P256,
+        private_key_hex=FLOW_SWAP_PRIVATE_KEY,
+    )
+    async with flow_client(host=FLOW_ACCESS_NODE_HOST, port=FLOW_ACCESS_NODE_PORT) as client:
+        client = grpc_client(client)
+        block = await client.get_latest_block()
+        account = await client.get_account(address=treasury_addr.bytes)
+        seq_number = account.keys[key_index].sequence_number
+
+        tx = (
+            Tx(
+                code=cadence,
+                reference_block_id=block.id,
+                payer=treasury_addr,
+                proposal_key=ProposalKey(
+                    key_address=treasury_addr,
+                    key_id=key_index,
+                    key_sequence_number=seq_number,
+                ),
+            )
+            .add_arguments(*arguments)
+            .add_authorizers(treasury_addr)
+            .with_gas_limit(9999)
+            .with_envelope_signature(treasury_addr, key_index, signer)
+        )
+        on_sequence(seq_number)
+        response = await client.send_transaction(transaction=tx.to_signed_grpc())
+        return response.id.hex()
+
+
+def submit_batch(conn, batch_id, kind, lines, now=None):
+    """Send one claimed batch; returns the tx id (None if the send failed)."""
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+
+    def _record_sequence(seq):
+        cur.execute(prepare_query(
+            "UPDATE payout_batches SET proposal_seq = ? WHERE id = ?"
+        ), (seq, batch_id))
+        conn.commit()
+
+    try:
+        cadence, arguments = build_batch_transaction(kind, lines)
+        tx_id = asyncio.run(_send_transaction(cadence, arguments, _record_sequence))
+    except Exception as e:
+        # Left BUILDING: reconcile re-queues the lines once the sequence
+        # number is known to be unused (or right away if it was never taken)
+        logger.error("[Disburse] Batch %s send failed: %s", batch_id, e)
+        cur.execute(prepare_query(
+            "UPDATE payout_batches SET error_message = ? WHERE id = ?"
+        ), (str(e)[:500], batch_id))
+        conn.commit()
+        return None
+
+    cur.execute(prepare_query('''
+        UPDATE payout_batches SET status = ?, tx_id = ?, submitted_at = ?
+        WHERE id = ?
+    '''), (SUBMITTED, tx_id, now, batch_id))
+    conn.commit()
+    logger.info("[Disburse] Batch %s (%s, %d lines) submitted as %s", batch_id, kind, len(lines), tx_id)
+    return tx_id
+
+
+# ── Reconciliation ──────────────────────────────────────────────────
+
+def _release_lines(cur, lines, error, now):
+    """Lines that failed on their own: back to PENDING, or FAILED after MAX_PAYOUT_ATTEMPTS."""
+    for line in lines:
+        attempts = line["attempts"] + 1
+        status = FAILED if attempts >= MAX_PAYOUT_ATTEMPTS else PENDING
+        cur.execute(prepare_query('''
+            UPDATE payouts SET status = ?, attempts = ?, batch_id = NULL,
+                               error_message = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+        '''), (status, attempts, error, now, line["id"], SUBMITTED))
+
+
+def _isolate_lines(cur, lines, error, now):
+    """Back to PENDING as ``solo`` lines, retried one per transaction; no attempt is used."""
+    for line in lines:
+        cur.execute(prepare_query('''
+            UPDATE payouts SET status = ?, solo = 1, batch_id = NULL,
+                               error_message = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+        '''), (PENDING, error, now, line["id"], SUBMITTED))
+
+
+def _release_failed_batch(cur, lines, error, now):
+    """A whole batch failed: isolate its lines, or count it against a lone line."""
+    if len(lines) > 1:
+        _isolate_lines(cur, lines, error, now)
+    else:
+        _release_lines(cur, lines, error, now)
+
+
+def _fail_lines(cur, lines, error, now):
+    """FAILED without retry — needs a manual check (see ``retry_failed_payouts``)."""
+    for line in lines:
+        cur.execute(prepare_query('''
+            UPDATE payouts SET status = ?, error_message = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+        '''), (FAILED, error, now, line["id"], SUBMITTED))
+
+
+def _seal_lines(cur, lines, tx_id, now):
+    for line in lines:
+        cur.execute(prepare_query('''
+            UPDATE payouts SET status = ?, error_message = NULL, updated_at = ?
+            WHERE id = ? AND status = ?
+        '''), (SEALED, now, line["id"], SUBMITTED))
+        update = _SEAL_UPDATES.get(line["source"])
+        if update and line["source_ref"] is not None:
+            cur.execute(prepare_query(update), (tx_id, line["source_ref"]))
+
+
+def delivered_lines(kind, lines, verification):
+    """Split a sealed batch's lines into ``(paid, skipped)`` from its deposit events."""
+    from bot.tx_verifier import verified_deposits
+
+    paid, skipped = [], []
+    by_recipient = {}
+    for line in lines:
+        by_recipient.setdefault(line["recipient"], []).append(line)
+
+    for recipient, recipient_lines in by_recipient.items():
+        if kind == MVP:
+            received = sum(
+                (Decimal(str(f.get("amount") or 0)).quantize(_UFIX_STEP)
+                 for f in verified_deposits(verification, FT_DEPOSITED, recipient)
+                 if _MVP_VAULT in str(f.get("type") or "")),
+                Decimal(0),
+            )
+            owed = sum((Decimal(line["amount"]) for line in recipient_lines), Decimal(0))
+            (paid if received >= owed else skipped).extend(recipient_lines)
+        else:
+            received = {f.get("id") for f in verified_deposits(verification, TOPSHOT_DEPOSIT, recipient)}
+            for line in recipient_lines:
+                (paid if set(line["moment_ids"]) <= received else skipped).append(line)
+    return paid, skipped
+
+
+def _sequence_unused(batch):
+    """True once the batch's proposal sequence number is known not to have executed."""
+    current = get_key_sequence(FLOW_SWAP_ACCOUNT, disburse_key_index())
+    return current <= int(batch["proposal_seq"])
+
+
+def _load_open_batches(cursor):
+    cursor.execute(prepare_query('''
+        SELECT id, kind, status, tx_id, proposal_seq, created_at, submitted_at
+        FROM payout_batches
+        WHERE status IN (?, ?)
+        ORDER BY id
+    '''), (BUILDING, SUBMITTED))
+    return [
+        {"id": r[0], "kind": r[1], "status": r[2], "tx_id": r[3], "proposal_seq": r[4],
+         "created_at": int(r[5]), "submitted_at": int(r[6]) if r[6] is not None else None}
+        for r in cursor.fetchall()
+    ]
+
+
+def _finish_batch(cur, batch_id, status, now, error=None):
+    cur.execute(prepare_query('''
+        UPDATE payout_batches SET status = ?, sealed_at = ?, error_message = COALESCE(?, error_message)
+        WHERE id = ?
+    '''), (status, now, error, batch_id))
+
+
+def reconcile_batch(conn, batch, now=None):
+    """Settle one open batch against the chain, commit.  Returns its new status."""
+    from bot.tx_verifier import fetch_verification, SEALED as TX_SEALED
+
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+    lines = _load_lines(cur, "batch_id = ? AND status = ?", (batch["id"], SUBMITTED))
+    stale = now - (batch["submitted_at"] or batch["created_at"]) >= STALE_BATCH_SECONDS
+
+    if batch["tx_id"]:
+        verification, _ = fetch_verification(batch["tx_id"], now)
+        if verification is None:
+            if not stale or batch["proposal_seq"] is None or not _sequence_unused(batch):
+                return batch["status"]
+            verification = {"status": FAILED, "error_message": "Transaction never executed"}
+        if verification["status"] == TX_SEALED:
+            paid, skipped = delivered_lines(batch["kind"], lines, verification)
+            _seal_lines(cur, paid, batch["tx_id"], now)
+            _release_lines(cur, skipped, "No deposit to recipient in sealed transaction", now)
+            _finish_batch(cur, batch["id"], SEALED, now)
+            status = SEALED
+        else:
+            _release_failed_batch(cur, lines, verification["error_message"], now)
+            _finish_batch(cur, batch["id"], FAILED, now, verification["error_message"])
+            status = FAILED
+    else:
+        # Interrupted before the access node acknowledged the transaction
+        if batch["proposal_seq"] is None:
+            _release_failed_batch(cur, lines, "Send failed before signing", now)
+        elif not stale:
+            return batch["status"]
+        elif _sequence_unused(batch):
+            _release_failed_batch(cur, lines, "Send failed; sequence number unused", now)
+        else:
+            _fail_lines(cur, lines, f"Send interrupted and key sequence {batch['proposal_seq']} "
+                                    f"was used — check treasury history before retrying", now)
+        _finish_batch(cur, batch["id"], FAILED, now)
+        status = FAILED
+
+    conn.commit()
+    logger.info("[Disburse] Batch %s → %s", batch["id"], status)
+    return status
+
+
+def reconcile_open_batches(conn, now=None):
+    """Settle every BUILDING / SUBMITTED batch that can be settled."""
+    results = {}
+    for batch in _load_open_batches(conn.cursor()):
+        try:
+            results[batch["id"]] = reconcile_batch(conn, batch, now)
+        except Exception as e:
+            conn.rollback()
+            logger.error("[Disburse] Reconcile of batch %s failed: %s", batch["id"], e)
+    return results
+
+
+def disburse_pending(conn, db_type, kinds=KINDS, dry_run=False):
+    """Settle open batches, then batch and send every PENDING line.
+
+    With ``dry_run`` nothing is claimed or sent; the planned batches are
+    returned instead.  Returns ``[{"kind", "lines", "batch_id", "tx_id"}]``.
+    """
+    if not dry_run:
+        if not FLOW_SWAP_PRIVATE_KEY:
+            raise RuntimeError("Treasury key not configured (FLOW_SWAP_PRIVATE_KEY)")
+        disburse_key_index()
+        reconcile_open_batches(conn)
+
+    results = []
+    for kind in kinds:
+        if dry_run:
+            pending = _load_lines(conn.cursor(), "status = ? AND kind = ?", (PENDING, kind))
+            results.extend({"kind": kind, "lines": len(b), "batch_id": None, "tx_id": None}
+                           for b in _plan(pending))
+            continue
+        while True:
+            claimed = claim_batch(conn, db_type, kind)
+            if claimed is None:
+                break
+            batch_id, lines = claimed
+            tx_id = submit_batch(conn, batch_id, kind, lines)
+            results.append({"kind": kind, "lines": len(lines), "batch_id": batch_id, "tx_id": tx_id})
+            if tx_id is None:
+                break       # access node trouble: stop rather than spin on new batches
+    return results
+
+
+# ── Worker ──────────────────────────────────────────────────────────
+
+@timed_job("disbursements")
+def disbursement_tick():
+    """Single reconcile iteration — called every DISBURSE_INTERVAL seconds."""
+    conn = None
+    try:
+        conn, _ = get_db_connection()
+        reconcile_open_batches(conn)
+    except Exception as e:
+        logger.error("[Disburse] Tick error: %s", e)
+        job_error("disbursements")
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_worker_thread = None
+
+
+def start_disbursement_worker(interval=DISBURSE_INTERVAL):
+    """Start the background reconcile thread (daemon).  Sending stays admin-triggered."""
+    global _worker_thread
+
+    def _loop():
+        logger.info("[Disburse] Started (interval=%ds)", interval)
+        while True:
+            disbursement_tick()
+            time.sleep(interval)
+
+    _worker_thread = threading.Thread(target=_loop, daemon=True, name="disbursements")
+    _worker_thread.start()
+    logger.info("[Disburse] Thread launched")
+    return _worker_thread
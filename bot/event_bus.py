@@ -0,0 +1,303 @@
+"""Single chain-event ingestion bus.
+
+One background poller tails sealed Flow blocks for every event type a
+registered consumer subscribes to, decodes each event once and appends the
+relevant ones to the compact ``chain_events`` log.  Each consumer is then
+fed the slice of the log past its own checkpoint, so adding a feature adds
+a consumer, not another chain poller:
+ - ``accept(event)`` decides which events are relevant to a consumer; the
+   bus keeps those plus every other subscribed event from the same
+   transaction (e.g. the Withdraw that pairs with a Deposit)
+ - ``handler(conn, db_type, events, start_height, end_height)`` applies
+   events in chain order; the bus advances the consumer's checkpoint and
+   commits afterwards, or rolls back and retries next tick on error
+
+The log only holds a consumer's events for the blocks ingested while it was
+registered (``event_bus_ingested:<name>``).  A consumer whose checkpoint is
+older than that, e.g. one re-enabled after a while, is backfilled straight
+from the chain instead of being handed an incomplete slice.  Indexers that
+also move their checkpoint from a full reconcile do so under
+``dispatch_lock``.
+"""
+
+import json
+import threading
+import time
+import logging
+
+from config import EVENT_BUS_INTERVAL
+from db.init import get_db_connection
+from utils.helpers import prepare_query, get_state_value, set_state_value
+from utils.flow_rest import get_events, get_sealed_height
+from utils.metrics import timed_job, job_error
+
+logger = logging.getLogger(__name__)
+
+MAX_BLOCKS_PER_TICK = 2000    # ingest at most this many blocks per tick
+MAX_CATCHUP_BLOCKS = 5000     # never start further back than this
+
+_STATE_BLOCK_KEY = "event_bus_block"
+_COVERAGE_PREFIX = "event_bus_ingested:"
+
+_consumers = {}
+_lock = threading.Lock()
+
+# Held while consumer checkpoints are read and advanced (dispatch, reconciles)
+dispatch_lock = threading.Lock()
+
+
+def register_consumer(name, event_types, handler, accept=None, checkpoint_key=None):
+    """Subscribe ``handler`` to ``event_types``.
+
+    ``checkpoint_key`` lets an existing indexer keep its ``scraper_state``
+    key; it defaults to ``event_bus:<name>``.
+    """
+    with _lock:
+        _consumers[name] = {
+            "event_types": tuple(event_types),
+            "handler": handler,
+            "accept": accept,
+            "checkpoint_key": checkpoint_key or f"event_bus:{name}",
+        }
+
+
+def unregister_consumer(name):
+    with _lock:
+        _consumers.pop(name, None)
+
+
+def _snapshot():
+    with _lock:
+        return dict(_consumers)
+
+
+def subscribed_event_types(consumers=None):
+    consumers = _snapshot() if consumers is None else consumers
+    return sorted({t for c in consumers.values() for t in c["event_types"]})
+
+
+# ── Event log ───────────────────────────────────────────────────────
+
+def _relevant(event, consumers):
+    for c in consumers.values():
+        if event["type"] in c["event_types"] and (c["accept"] is None or c["accept"](event)):
+            return True
+    return False
+
+
+def store_events(conn, db_type, events):
+    """Append events to ``chain_events``; replays are ignored (no commit)."""
+    if not events:
+        return 0
+    rows = [(
+        ev["block_height"], ev.get("block_timestamp"), ev["transaction_id"],
+        ev["transaction_index"], ev["event_index"], ev["type"],
+        json.dumps(ev["fields"], separators=(",", ":")),
+    ) for ev in events]
+    columns = ("block_height, block_timestamp, transaction_id, transaction_index, "
+               "event_index, event_type, fields")
+    if db_type == 'postgresql':
+        conn.cursor().executemany(prepare_query(f'''
+            INSERT INTO chain_events ({columns})
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (transaction_id, event_index) DO NOTHING
+        '''), rows)
+    else:
+        conn.cursor().executemany(prepare_query(f'''
+            INSERT OR IGNORE INTO chain_events ({columns})
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        '''), rows)
+    return len(rows)
+
+
+def _event_from_row(row):
+    return {
+        "block_height": int(row[0]),
+        "block_timestamp": row[1],
+        "transaction_id": row[2],
+        "transaction_index": int(row[3]),
+        "event_index": int(row[4]),
+        "type": row[5],
+        "fields": json.loads(row[6]),
+    }
+
+
+def load_events(cursor, event_types, start_height, end_height):
+    """Logged events of ``event_types`` in ``[start_height, end_height]``, in chain order."""
+    if not event_types:
+        return []
+    placeholders = ", ".join(["?"] * len(event_types))
+    cursor.execute(prepare_query(f'''
+        SELECT block_height, block_timestamp, transaction_id, transaction_index,
+               event_index, event_type, fields
+        FROM chain_events
+        WHERE event_type IN ({placeholders})
+          AND block_height BETWEEN ? AND ?
+        ORDER BY block_height, transaction_index, event_index
+    '''), (*event_types, start_height, end_height))
+    return [_event_from_row(r) for r in cursor.fetchall()]
+
+
+def load_transaction_events(cursor, transaction_id):
+    """Every logged event of one transaction, in order (empty if not logged)."""
+    cursor.execute(prepare_query('''
+        SELECT block_height, block_timestamp, transaction_id, transaction_index,
+               event_index, event_type, fields
+        FROM chain_events
+        WHERE transaction_id = ?
+        ORDER BY event_index
+    '''), (transaction_id,))
+    return [_event_from_row(r) for r in cursor.fetchall()]
+
+
+# ── Ingest + dispatch ───────────────────────────────────────────────
+
+def _fetch_relevant(start_height, end_height, consumers):
+    """Subscribed events in the range, keeping whole transactions that are relevant."""
+    events = []
+    for event_type in subscribed_event_types(consumers):
+        events.extend(get_events(event_type, start_height, end_height))
+    relevant_txs = {ev["transaction_id"] for ev in events if _relevant(ev, consumers)}
+    return events, [ev for ev in events if ev["transaction_id"] in relevant_txs]
+
+
+def _record_coverage(cur, db_type, consumers, start_height, end_height):
+    """Extend each consumer's ingested ``[since, through]`` range (restart it after a gap)."""
+    for name in consumers:
+        key = _COVERAGE_PREFIX + name
+        coverage = get_state_value(cur, key)
+        since, through = json.loads(coverage) if coverage else (start_height, start_height - 1)
+        if through < start_height - 1:
+            since = start_height
+        set_state_value(cur, db_type, key, json.dumps([since, max(through, end_height)]))
+
+
+def ingest_range(conn, db_type, start_height, end_height, consumers=None):
+    """Fetch and decode subscribed events once, log the relevant ones, commit."""
+    consumers = _snapshot() if consumers is None else consumers
+    events, kept = _fetch_relevant(start_height, end_height, consumers)
+    store_events(conn, db_type, kept)
+    cur = conn.cursor()
+    _record_coverage(cur, db_type, consumers, start_height, end_height)
+    set_state_value(cur, db_type, _STATE_BLOCK_KEY, end_height)
+    conn.commit()
+    if kept:
+        logger.info("[EventBus] Blocks %d-%d: logged %d of %d events",
+                    start_height, end_height, len(kept), len(events))
+    return len(kept)
+
+
+def _delivery_window(cur, name, start, head):
+    """``(end, backfill)`` for delivering to ``name`` from ``start``.
+
+    Blocks ingested while the consumer was registered are read from the log;
+    anything else must be fetched from the chain again (``backfill``), at
+    most MAX_BLOCKS_PER_TICK blocks per tick.
+    """
+    coverage = get_state_value(cur, _COVERAGE_PREFIX + name)
+    since, through = json.loads(coverage) if coverage else (head + 1, head)
+    if since <= start <= through:
+        return min(head, through), False
+    limit = since - 1 if start < since else head
+    return min(head, limit, start + MAX_BLOCKS_PER_TICK - 1), True
+
+
+def dispatch(conn, db_type, head, consumers=None):
+    """Feed each consumer the logged events past its checkpoint, up to ``head``.
+
+    Callers hold ``dispatch_lock``.
+    """
+    consumers = _snapshot() if consumers is None else consumers
+    delivered = {}
+    for name, c in consumers.items():
+        cur = conn.cursor()
+        checkpoint = get_state_value(cur, c["checkpoint_key"])
+        if checkpoint is None:
+            # New consumer: start from now rather than replaying history
+            set_state_value(cur, db_type, c["checkpoint_key"], head)
+            conn.commit()
+            continue
+        start = int(checkpoint) + 1
+        if start > head:
+            continue
+        end = head
+        try:
+            end, backfill = _delivery_window(cur, name, start, head)
+            if backfill:
+                _, kept = _fetch_relevant(start, end, {name: c})
+                store_events(conn, db_type, kept)
+                logger.info("[EventBus] Consumer %s is behind the log; backfilled blocks %d-%d",
+                            name, start, end)
+            events = load_events(cur, c["event_types"], start, end)
+            c["handler"](conn, db_type, events, start, end)
+            set_state_value(conn.cursor(), db_type, c["checkpoint_key"], end)
+            conn.commit()
+            delivered[name] = len(events)
+        except Exception as e:
+            conn.rollback()
+            logger.error("[EventBus] Consumer %s failed on blocks %d-%d: %s", name, start, end, e)
+    return delivered
+
+
+def _initial_height(cur, sealed, consumers):
+    """Where a fresh bus starts: the oldest consumer checkpoint, within reason."""
+    checkpoints = [get_state_value(cur, c["checkpoint_key"]) for c in consumers.values()]
+    checkpoints = [int(cp) for cp in checkpoints if cp is not None]
+    if not checkpoints:
+        return sealed
+    return max(min(checkpoints), sealed - MAX_CATCHUP_BLOCKS)
+
+
+@timed_job("event_bus")
+def event_bus_tick():
+    """Single ingest + dispatch iteration — called every EVENT_BUS_INTERVAL seconds."""
+    conn = None
+    try:
+        consumers = _snapshot()
+        if not consumers:
+            return
+        conn, db_type = get_db_connection()
+        cur = conn.cursor()
+        sealed = get_sealed_height()
+        head = get_state_value(cur, _STATE_BLOCK_KEY)
+        head = _initial_height(cur, sealed, consumers) if head is None else int(head)
+
+        if sealed > head:
+            end = min(sealed, head + MAX_BLOCKS_PER_TICK)
+            ingest_range(conn, db_type, head + 1, end, consumers)
+            head = end
+        else:
+            set_state_value(cur, db_type, _STATE_BLOCK_KEY, head)
+            conn.commit()
+        with dispatch_lock:
+            dispatch(conn, db_type, head, consumers)
+
+    except Exception as e:
+        logger.error("[EventBus] Tick error: %s", e)
+        job_error("event_bus")
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_bus_thread = None
+
+
+def start_event_bus(interval=EVENT_BUS_INTERVAL):
+    """Start the background ingestion thread (daemon)."""
+    global _bus_thread
+
+    def _loop():
+        logger.info("[EventBus] Started (interval=%ds, consumers=%s)", interval, sorted(_snapshot()))
+        time.sleep(5)
+        while True:
+            event_bus_tick()
+            time.sleep(interval)
+
+    _bus_thread = threading.Thread(target=_loop, daemon=True, name="event-bus")
+    _bus_thread.start()
+    logger.info("[EventBus] Thread launched")
+    return _bus_thread
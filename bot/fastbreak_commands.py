@@ -10,7 +10,41 @@ from utils.helpers import (
     prepare_query, is_admin, extract_fastbreak_runs,
     pull_rankings_for_fb
 )
-from db.init import get_bot_db
+from db.bot_db import run_db, run_blocking
+from utils.contest_standings import freeze_contest_standings
+
+
+def _create_contest(conn, cursor, fastbreak_id, display_name, lock_timestamp, buy_in_currency, buy_in_amount):
+    cursor.execute(prepare_query('''
+        INSERT INTO fastbreakContests (
+            fastbreak_id, display_name, lock_timestamp, buy_in_currency, buy_in_amount
+        ) VALUES (?, ?, ?, ?, ?)
+    '''), (
+        fastbreak_id,
+        display_name,
+        lock_timestamp,
+        buy_in_currency,
+        buy_in_amount
+    ))
+
+
+def _close_contest(conn, cursor, contest_id):
+    cursor.execute(prepare_query('''
+        UPDATE fastbreakContests
+        SET status = 'CLOSED'
+        WHERE id = ?
+    '''), (contest_id,))
+
+
+def _store_fastbreak(conn, cursor, fb_id, game_date, run_name, status):
+    cursor.execute(prepare_query('''
+        INSERT INTO fastbreaks (id, game_date, run_name, status)
+        VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING
+    '''), (fb_id, game_date, run_name, status))
+
+
+def _refresh_rankings_summary(conn, cursor):
+    cursor.execute("REFRESH MATERIALIZED VIEW user_rankings_summary")
 
 
 def register_fastbreak_commands(bot, conn, cursor, db_type):
@@ -28,7 +62,7 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
             )
             return
         try:
-            runs = extract_fastbreak_runs()
+            runs = await run_blocking(extract_fastbreak_runs)
             json_data = json.dumps(runs, indent=2)
             buffer = io.BytesIO(json_data.encode('utf-8'))
             buffer.seek(0)
@@ -56,7 +90,6 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
         buy_in_currency: str = 'MVP',
         buy_in_amount: float = 5.0
     ):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message(
                 "You need admin permissions to run this command.",
@@ -65,18 +98,9 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
             return
 
         try:
-            cursor.execute(prepare_query('''
-                INSERT INTO fastbreakContests (
-                    fastbreak_id, display_name, lock_timestamp, buy_in_currency, buy_in_amount
-                ) VALUES (?, ?, ?, ?, ?)
-            '''), (
-                fastbreak_id,
-                display_name,
-                lock_timestamp,
-                buy_in_currency,
-                buy_in_amount
-            ))
-            conn.commit()
+            await run_db(
+                _create_contest, fastbreak_id, display_name, lock_timestamp, buy_in_currency, buy_in_amount
+            )
 
             await interaction.response.send_message(
                 f"✅ Contest created!\n"
@@ -103,7 +127,6 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
             interaction: discord.Interaction,
             contest_id: int
     ):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message(
                 "You need admin permissions to run this command.",
@@ -112,12 +135,7 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
             return
 
         try:
-            cursor.execute(prepare_query('''
-                UPDATE fastbreakContests
-                SET status = 'CLOSED'
-                WHERE id = ?
-            '''), (contest_id,))
-            conn.commit()
+            await run_db(_close_contest, contest_id)
 
             await interaction.response.send_message(
                 f"✅ Contest {contest_id} has been closed.",
@@ -130,11 +148,37 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
                 ephemeral=True
             )
 
+    @bot.tree.command(
+        name="rebuild_contest_standings",
+        description="Admin only: Recompute the frozen final standings of a closed FastBreak contest."
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def rebuild_contest_standings(interaction: discord.Interaction, contest_id: int):
+        await interaction.response.defer(ephemeral=True)
+
+        if not is_admin(interaction):
+            await interaction.followup.send("You need admin permissions to run this command.", ephemeral=True)
+            return
+
+        try:
+            count = await run_db(lambda conn, cursor: freeze_contest_standings(conn, contest_id))
+            await interaction.followup.send(
+                f"✅ Rebuilt final standings for contest {contest_id} ({count} entries).",
+                ephemeral=True
+            )
+        except ValueError as e:
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+        except Exception as e:
+            print(f"Error rebuilding standings: {e}")
+            await interaction.followup.send(
+                "❌ Failed to rebuild standings. Please try again.",
+                ephemeral=True
+            )
+
     @bot.tree.command(name="pull_fastbreak_horse_stats", description="Admin only: Pull and store new FastBreaks and their rankings.")
     @app_commands.checks.has_permissions(administrator=True)
     async def pull_fastbreak_horse_stats(interaction: discord.Interaction, fb_id: str):
         await interaction.response.defer(ephemeral=True)
-        conn, cursor = get_bot_db(bot)
 
         if not is_admin(interaction):
             await interaction.followup.send("You need admin permissions to run this command.", ephemeral=True)
@@ -143,7 +187,7 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
         new_fastbreaks = []
         new_rankings_count = 0
 
-        runs = extract_fastbreak_runs()
+        runs = await run_blocking(extract_fastbreak_runs)
 
         for run in runs[:7]:
             if not run['fastBreaks'] or run['runName'].endswith('Pro'):
@@ -157,24 +201,17 @@ def register_fastbreak_commands(bot, conn, cursor, db_type):
                     game_date = fb.get('gameDate')
                     status = fb.get('status')
 
-                    cursor.execute(prepare_query('SELECT 1 FROM fastbreaks WHERE id = ?'), (fb_id,))
-
-                    cursor.execute(prepare_query('''
-                        INSERT INTO fastbreaks (id, game_date, run_name, status)
-                        VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING
-                    '''), (fb_id, game_date, run_name, status))
-                    conn.commit()
+                    await run_db(_store_fastbreak, fb_id, game_date, run_name, status)
                     new_fastbreaks.append({
                         'id': fb_id,
                         'game_date': game_date,
                         'run_name': run_name
                     })
 
-                    new_rankings_count += len(pull_rankings_for_fb(fb_id))
+                    new_rankings_count += len(await run_blocking(pull_rankings_for_fb, fb_id))
                     print(f"✅ FastBreak {fb_id} stored with {new_rankings_count} rankings.")
 
-        cursor.execute("REFRESH MATERIALIZED VIEW user_rankings_summary")
-        conn.commit()
+        await run_db(_refresh_rankings_summary)
 
         await interaction.followup.send(
             f"✅ Pulled {len(new_fastbreaks)} new finished FastBreaks and {new_rankings_count} total rankings.",
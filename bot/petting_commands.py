@@ -2,22 +2,290 @@
 
 import discord
 from discord.ext import commands
+from discord import app_commands
 import datetime
 import random
+import re
+import uuid
 
 from utils.helpers import (
     prepare_query, is_admin, custom_reward, get_basic_pet_response
 )
-from db.init import get_bot_db
+from db.bot_db import run_db
+from bot.disbursements import enqueue_payout, format_amount
 from config import PETTING_ALLOWED_CHANNEL_ID, DEFAULT_FREE_DAILY_PETS
 
 
+FLOW_ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{16}$")
+
+# Every write below is a single conditional UPDATE, so concurrent pets and
+# claims on separate pooled connections can't lose updates or oversell stock.
+_CAS_RETRIES = 5
+
+BUSY_MESSAGE = "The stables are busy right now. Please try again in a moment."
+
+
+class PettingBusy(Exception):
+    """A conditional update lost its race ``_CAS_RETRIES`` times in a row.
+
+    Raised out of the ``run_db`` call so the whole transaction rolls back and
+    the user is asked to retry, rather than told they have nothing left.
+    """
+
+
+def _ensure_user_row(cursor, user_id):
+    cursor.execute(prepare_query('''
+        INSERT INTO user_rewards (user_id, balance, daily_pets_remaining, last_pet_date)
+        VALUES (?, 0, 0, NULL)
+        ON CONFLICT (user_id) DO NOTHING
+    '''), (user_id,))
+
+
+def _refill_daily_pets(cursor, user_id, today):
+    """Grant today's free pets once; the date guard makes repeats a no-op."""
+    cursor.execute(prepare_query('''
+        UPDATE user_rewards
+        SET daily_pets_remaining = daily_pets_remaining + ?, last_pet_date = ?
+        WHERE user_id = ? AND (last_pet_date IS NULL OR last_pet_date <> ?)
+    '''), (DEFAULT_FREE_DAILY_PETS, today, user_id, today))
+
+
+def _take_one_pet(cursor, user_id, today):
+    """Spend one pet; False if none are left."""
+    _ensure_user_row(cursor, user_id)
+    _refill_daily_pets(cursor, user_id, today)
+    cursor.execute(prepare_query('''
+        UPDATE user_rewards
+        SET daily_pets_remaining = daily_pets_remaining - 1, last_pet_date = ?
+        WHERE user_id = ? AND daily_pets_remaining > 0
+    '''), (today, user_id))
+    return cursor.rowcount > 0
+
+
+def _take_all_pets(cursor, user_id, today):
+    """Spend every remaining pet and return how many were taken (0 if none)."""
+    _ensure_user_row(cursor, user_id)
+    _refill_daily_pets(cursor, user_id, today)
+    for _ in range(_CAS_RETRIES):
+        cursor.execute(prepare_query(
+            "SELECT daily_pets_remaining FROM user_rewards WHERE user_id = ?"
+        ), (user_id,))
+        pets = cursor.fetchone()[0]
+        if pets <= 0:
+            return 0
+        # Only succeeds if nobody spent or granted pets since the read
+        cursor.execute(prepare_query('''
+            UPDATE user_rewards
+            SET daily_pets_remaining = 0, last_pet_date = ?
+            WHERE user_id = ? AND daily_pets_remaining = ?
+        '''), (today, user_id, pets))
+        if cursor.rowcount > 0:
+            return pets
+    raise PettingBusy("daily_pets_remaining")
+
+
+def _credit_balance(cursor, user_id, amount):
+    """Add ``amount`` to the balance; returns ``(balance, pets_remaining)``."""
+    cursor.execute(prepare_query(
+        "UPDATE user_rewards SET balance = balance + ? WHERE user_id = ?"
+    ), (amount, user_id))
+    cursor.execute(prepare_query(
+        "SELECT balance, daily_pets_remaining FROM user_rewards WHERE user_id = ?"
+    ), (user_id,))
+    return cursor.fetchone()
+
+
+def _load_special_rewards(cursor):
+    cursor.execute(prepare_query("SELECT id, name, probability, amount FROM special_rewards"))
+    return cursor.fetchall()
+
+
+def draw_pet_outcomes(pets, rewards):
+    """Draw ``pets`` pets against the ``special_rewards`` rows in one pass.
+
+    Each pet rolls the rewards in table order and takes the first hit that
+    still has stock; pets without a hit earn ``custom_reward()`` $MVP.
+    Stock is tracked in memory so a reward is never won more times than it
+    has left.  Returns ``(total_mvp, special_names_won, used_by_reward_id)``.
+    """
+    stock = {reward_id: amount or 0 for reward_id, _, _, amount in rewards}
+    total_mvp = 0
+    won = []
+    used = {}
+
+    for _ in range(pets):
+        for reward_id, name, probability, _ in rewards:
+            if random.random() <= probability and stock[reward_id] > 0:
+                stock[reward_id] -= 1
+                used[reward_id] = used.get(reward_id, 0) + 1
+                won.append(name)
+                break
+        else:
+            total_mvp += custom_reward()
+
+    return round(total_mvp, 2), won, used
+
+
+def _claim_stock(cursor, reward_id, wanted):
+    """Take up to ``wanted`` units of a special reward; returns units granted.
+
+    The decrement is guarded by ``amount >= ?`` so stock can never go
+    negative however many pets race for the last unit.
+    """
+    for _ in range(_CAS_RETRIES):
+        cursor.execute(prepare_query("SELECT amount FROM special_rewards WHERE id = ?"), (reward_id,))
+        row = cursor.fetchone()
+        available = (row[0] or 0) if row else 0
+        take = min(wanted, available)
+        if take <= 0:
+            return 0
+        cursor.execute(prepare_query(
+            "UPDATE special_rewards SET amount = amount - ? WHERE id = ? AND amount >= ?"
+        ), (take, reward_id, take))
+        if cursor.rowcount > 0:
+            if take == available:
+                cursor.execute(prepare_query(
+                    "DELETE FROM special_rewards WHERE id = ? AND amount <= 0"
+                ), (reward_id,))
+            return take
+    raise PettingBusy(f"special_rewards {reward_id}")
+
+
+def _settle_special_rewards(cursor, rewards, total_mvp, won, used):
+    """Claim stock for a draw's wins; wins that lost the race pay $MVP instead."""
+    if not used:
+        return total_mvp, won
+    # Claim in id order so concurrent draws lock reward rows in the same order
+    granted = {reward_id: _claim_stock(cursor, reward_id, count) for reward_id, count in sorted(used.items())}
+    lost = sum(used.values()) - sum(granted.values())
+    if not lost:
+        return total_mvp, won
+    won = [name for reward_id, name, _, _ in rewards for _ in range(granted.get(reward_id, 0))]
+    total_mvp += sum(custom_reward() for _ in range(lost))
+    return round(total_mvp, 2), won
+
+
+def _pet_once(conn, cursor, user_id, today):
+    if not _take_one_pet(cursor, user_id, today):
+        return None
+
+    rewards = _load_special_rewards(cursor)
+    reward, won, used = draw_pet_outcomes(1, rewards)
+    reward, won = _settle_special_rewards(cursor, rewards, reward, won, used)
+    special_reward = won[0] if won else None
+    new_balance, new_daily_pets_remaining = _credit_balance(cursor, user_id, reward)
+    return reward, special_reward, new_balance, new_daily_pets_remaining
+
+
+def _pet_all(conn, cursor, user_id, today):
+    """Spend every available pet: one reward-table read, one draw, one transaction."""
+    pets_used = _take_all_pets(cursor, user_id, today)
+    if pets_used <= 0:
+        return None
+
+    rewards = _load_special_rewards(cursor)
+    total_mvp_reward, special_rewards_won, used = draw_pet_outcomes(pets_used, rewards)
+    total_mvp_reward, special_rewards_won = _settle_special_rewards(
+        cursor, rewards, total_mvp_reward, special_rewards_won, used
+    )
+    new_balance, _ = _credit_balance(cursor, user_id, total_mvp_reward)
+    return pets_used, total_mvp_reward, special_rewards_won, new_balance
+
+
+def _fetch_balance(conn, cursor, user_id):
+    cursor.execute(prepare_query("SELECT balance FROM user_rewards WHERE user_id = ?"), (user_id,))
+    user_data = cursor.fetchone()
+    return user_data[0] if user_data else None
+
+
+def _claim_balance(conn, cursor, user_id):
+    """Zero a balance of at least 1 $MVP and return it (None if too small).
+
+    The reset only applies if the balance is still what was read, so a pet
+    credited in between is never wiped out.
+    """
+    for _ in range(_CAS_RETRIES):
+        balance = _fetch_balance(conn, cursor, user_id)
+        if balance is None or balance < 1:
+            return None
+        cursor.execute(prepare_query(
+            "UPDATE user_rewards SET balance = 0 WHERE user_id = ? AND balance = ?"
+        ), (user_id, balance))
+        if cursor.rowcount > 0:
+            return balance
+    raise PettingBusy("balance")
+
+
+def _claim_to_wallet(conn, cursor, db_type, user_id, wallet, now):
+    """Zero the balance and queue it as a treasury payout to ``wallet`` (same transaction).
+
+    Every claim gets its own payout key, so two claims in the same second
+    both get paid out.  A stored line that isn't this claim's raises
+    ``PettingBusy`` so the balance reset rolls back with it.
+    """
+    balance = _claim_balance(conn, cursor, user_id)
+    if balance is None:
+        return None
+    line = enqueue_payout(cursor, db_type, f"petting:{user_id}:{uuid.uuid4().hex}", wallet,
+                          amount=balance, source="petting", source_ref=user_id, now=now)
+    if line["amount"] != format_amount(balance):
+        raise PettingBusy("payout")
+    return balance
+
+
+def _add_pets(conn, cursor, user_id, pets):
+    cursor.execute(prepare_query(
+        "UPDATE user_rewards SET daily_pets_remaining = daily_pets_remaining + ? WHERE user_id = ?"
+    ), (pets, user_id))
+    if cursor.rowcount > 0:
+        cursor.execute(prepare_query(
+            "SELECT daily_pets_remaining FROM user_rewards WHERE user_id = ?"
+        ), (user_id,))
+        return cursor.fetchone()[0]
+
+    cursor.execute(prepare_query('''
+        INSERT INTO user_rewards (user_id, balance, daily_pets_remaining, last_pet_date)
+        VALUES (?, 0, ?, NULL)
+        ON CONFLICT (user_id) DO UPDATE
+        SET daily_pets_remaining = user_rewards.daily_pets_remaining + EXCLUDED.daily_pets_remaining
+    '''), (user_id, pets))
+    # New users also get today's free pet on their first /pet
+    return pets + DEFAULT_FREE_DAILY_PETS
+
+
+def _petting_stats(conn, cursor, today):
+    cursor.execute(prepare_query(
+        "SELECT COUNT(DISTINCT user_id) FROM user_rewards WHERE last_pet_date = ?"
+    ), (today,))
+    daily_active_users = cursor.fetchone()[0]
+
+    cursor.execute(prepare_query(
+        "SELECT SUM(balance) FROM user_rewards"
+    ))
+    total_unclaimed_rewards = cursor.fetchone()[0] or 0
+
+    cursor.execute(prepare_query(
+        "SELECT user_id, balance FROM user_rewards ORDER BY balance DESC LIMIT 10"
+    ))
+    return daily_active_users, total_unclaimed_rewards, cursor.fetchall()
+
+
+def _add_special_reward(conn, cursor, name, probability, amount):
+    cursor.execute(prepare_query(
+        "INSERT INTO special_rewards (name, probability, amount) VALUES (?, ?, ?)"
+    ), (name, probability, amount))
+
+
+def _list_special_rewards(conn, cursor):
+    cursor.execute(prepare_query("SELECT name, probability, amount FROM special_rewards"))
+    return cursor.fetchall()
+
+
 def register_petting_commands(bot, conn, cursor, db_type):
     """Register petting and reward commands."""
 
     @bot.tree.command(name="pet", description="Perform a daily pet and earn random $MVP rewards!")
     async def pet(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         if interaction.channel_id != PETTING_ALLOWED_CHANNEL_ID:
             return await interaction.response.send_message(
                 "You can only pet your horse in the petting zoo.", ephemeral=True
@@ -26,55 +294,20 @@ def register_petting_commands(bot, conn, cursor, db_type):
         user_id = interaction.user.id
         today = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%d")
 
-        def check_special_reward():
-            cursor.execute(prepare_query("SELECT id, name, probability, amount FROM special_rewards"))
-            rewards = cursor.fetchall()
-
-            for reward_id, name, probability, amount in rewards:
-                if random.random() <= probability:
-                    if amount > 0:
-                        cursor.execute(prepare_query(
-                            f"UPDATE special_rewards SET amount = {amount - 1} WHERE id = ?"
-                        ), (reward_id,))
-                        conn.commit()
-                        if amount - 1 == 0:
-                            cursor.execute(prepare_query(
-                                "DELETE FROM special_rewards WHERE name = ?"
-                            ), (name,))
-                            conn.commit()
-                        return name
-            return None
-
-        cursor.execute(prepare_query(
-            "SELECT balance, daily_pets_remaining, last_pet_date FROM user_rewards WHERE user_id = ?"
-        ), (user_id,))
-        user_data = cursor.fetchone()
-
-        if not user_data:
-            cursor.execute(prepare_query(
-                "INSERT INTO user_rewards (user_id, balance, daily_pets_remaining, last_pet_date) VALUES (?, ?, ?, ?)"
-            ), (user_id, 0, 0, None))
-            conn.commit()
-            user_data = (0, 0, None)
-
-        balance, daily_pets_remaining, last_pet_date = user_data
-
-        if last_pet_date != today:
-            daily_pets_remaining += DEFAULT_FREE_DAILY_PETS
-
-        if daily_pets_remaining <= 0:
+        try:
+            result = await run_db(_pet_once, user_id, today)
+        except PettingBusy:
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+        if result is None:
             await interaction.response.send_message(
                 "Hold your horses! You've used all your pets for today! Try again tomorrow.", ephemeral=True
             )
             return
 
-        reward = custom_reward()
-        special_reward = check_special_reward()
+        reward, special_reward, new_balance, new_daily_pets_remaining = result
         special_reward_message = ""
-        new_daily_pets_remaining = daily_pets_remaining - 1
-        
+
         if special_reward:
-            new_balance = balance
             special_reward_message = f"🎉 Congratulations <@{interaction.user.id}>! You won a special reward **{special_reward}**! 🎉"
             await interaction.response.send_message(
                 f"{special_reward_message}\n"
@@ -83,7 +316,6 @@ def register_petting_commands(bot, conn, cursor, db_type):
                 ephemeral=False
             )
         else:
-            new_balance = balance + reward
             await interaction.response.send_message(
                 get_basic_pet_response(reward) +
                 f"\nYour new balance is **{new_balance} $MVP**.\n"
@@ -92,14 +324,8 @@ def register_petting_commands(bot, conn, cursor, db_type):
                 ephemeral=True
             )
 
-        cursor.execute(prepare_query(
-            "UPDATE user_rewards SET balance = ?, daily_pets_remaining = ?, last_pet_date = ? WHERE user_id = ?"
-        ), (new_balance, new_daily_pets_remaining, today, user_id))
-        conn.commit()
-
     @bot.tree.command(name="pet_all", description="Use all available pets at once and earn rewards!")
     async def pet_all(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         if interaction.channel_id != PETTING_ALLOWED_CHANNEL_ID:
             return await interaction.response.send_message(
                 "You can only pet your horse in the petting zoo.", ephemeral=True
@@ -108,68 +334,19 @@ def register_petting_commands(bot, conn, cursor, db_type):
         user_id = interaction.user.id
         today = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%d")
 
-        def check_special_reward():
-            cursor.execute(prepare_query("SELECT id, name, probability, amount FROM special_rewards"))
-            rewards = cursor.fetchall()
-
-            for reward_id, name, probability, amount in rewards:
-                if random.random() <= probability:
-                    if amount > 0:
-                        cursor.execute(prepare_query(
-                            f"UPDATE special_rewards SET amount = {amount - 1} WHERE id = ?"
-                        ), (reward_id,))
-                        conn.commit()
-                        if amount - 1 == 0:
-                            cursor.execute(prepare_query(
-                                "DELETE FROM special_rewards WHERE name = ?"
-                            ), (name,))
-                            conn.commit()
-                        return name
-            return None
-
-        cursor.execute(prepare_query(
-            "SELECT balance, daily_pets_remaining, last_pet_date FROM user_rewards WHERE user_id = ?"
-        ), (user_id,))
-        user_data = cursor.fetchone()
-
-        if not user_data:
-            cursor.execute(prepare_query(
-                "INSERT INTO user_rewards (user_id, balance, daily_pets_remaining, last_pet_date) VALUES (?, ?, ?, ?)"
-            ), (user_id, 0, 0, None))
-            conn.commit()
-            user_data = (0, 0, None)
-
-        balance, daily_pets_remaining, last_pet_date = user_data
-
-        if last_pet_date != today:
-            daily_pets_remaining += DEFAULT_FREE_DAILY_PETS
-
-        if daily_pets_remaining <= 0:
+        try:
+            result = await run_db(_pet_all, user_id, today)
+        except PettingBusy:
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+        if result is None:
             await interaction.response.send_message(
                 "Hold your horses! You've used all your pets for today! Try again tomorrow.", ephemeral=True
             )
             return
 
-        total_mvp_reward = 0
-        special_rewards_won = []
-        pets_used = daily_pets_remaining
-
-        for _ in range(daily_pets_remaining):
-            special_reward = check_special_reward()
-            if special_reward:
-                special_rewards_won.append(special_reward)
-            else:
-                reward = custom_reward()
-                total_mvp_reward += reward
-
-        new_balance = balance + total_mvp_reward
+        pets_used, total_mvp_reward, special_rewards_won, new_balance = result
         new_daily_pets_remaining = 0
 
-        cursor.execute(prepare_query(
-            "UPDATE user_rewards SET balance = ?, daily_pets_remaining = ?, last_pet_date = ? WHERE user_id = ?"
-        ), (new_balance, new_daily_pets_remaining, today, user_id))
-        conn.commit()
-
         response_parts = [f"🐴 You used **{pets_used}** pets! 🐴\n"]
 
         if special_rewards_won:
@@ -193,48 +370,55 @@ def register_petting_commands(bot, conn, cursor, db_type):
 
     @bot.tree.command(name="my_rewards", description="View your unclaimed $MVP rewards.")
     async def my_rewards(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         if interaction.channel_id != PETTING_ALLOWED_CHANNEL_ID:
             return await interaction.response.send_message(
                 "You can check your rewards in the petting zoo.", ephemeral=True
             )
 
-        user_id = interaction.user.id
-
-        cursor.execute(prepare_query("SELECT balance FROM user_rewards WHERE user_id = ?"), (user_id,))
-        user_data = cursor.fetchone()
+        balance = await run_db(_fetch_balance, interaction.user.id)
 
-        if not user_data or user_data[0] == 0:
+        if not balance:
             await interaction.response.send_message(
                 "You have no unclaimed rewards. Start petting to earn rewards!", ephemeral=True
             )
         else:
             await interaction.response.send_message(
-                f"Your unclaimed rewards: **{user_data[0]:.2f} $MVP**", ephemeral=True
+                f"Your unclaimed rewards: **{balance:.2f} $MVP**", ephemeral=True
             )
 
     @bot.tree.command(name="claim", description="Claim your accumulated $MVP rewards.")
-    async def claim(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
+    @app_commands.describe(wallet="Flow wallet to receive the $MVP (queued for the next treasury payout)")
+    async def claim(interaction: discord.Interaction, wallet: str | None = None):
         if interaction.channel_id != PETTING_ALLOWED_CHANNEL_ID:
             return await interaction.response.send_message(
                 "You can claim your rewards in the petting zoo in the petting zoo.", ephemeral=True
             )
+        if wallet is not None and not FLOW_ADDRESS_RE.match(wallet):
+            return await interaction.response.send_message(
+                "Please provide a valid Flow wallet address (0x followed by 16 hex characters).", ephemeral=True
+            )
 
-        user_id = interaction.user.id
-
-        cursor.execute(prepare_query("SELECT balance FROM user_rewards WHERE user_id = ?"), (user_id,))
-        user_data = cursor.fetchone()
+        try:
+            if wallet:
+                now = int(datetime.datetime.now(datetime.UTC).timestamp())
+                balance = await run_db(_claim_to_wallet, db_type, interaction.user.id, wallet, now)
+            else:
+                balance = await run_db(_claim_balance, interaction.user.id)
+        except PettingBusy:
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
 
-        if not user_data or user_data[0] < 1:
+        if balance is None:
             await interaction.response.send_message(
                 "You need at least 1 $MVP to claim.", ephemeral=True
             )
             return
 
-        balance = user_data[0]
-        cursor.execute(prepare_query("UPDATE user_rewards SET balance = 0 WHERE user_id = ?"), (user_id,))
-        conn.commit()
+        if wallet:
+            await interaction.response.send_message(
+                f"{interaction.user.mention} has claimed **{balance:.2f} $MVP**! 🐴\n"
+                f"It is queued for the next treasury payout to `{wallet.lower()}`."
+            )
+            return
 
         await interaction.response.send_message(
             f"{interaction.user.mention} has claimed **{balance:.2f} $MVP**! 🐴\n<@1261935277753241653>, please process the claim."
@@ -243,7 +427,6 @@ def register_petting_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name="add_pets", description="Admin command to grant extra pets to a user.")
     @commands.has_permissions(administrator=True)
     async def add_pets(interaction: discord.Interaction, user: discord.Member, pets: int):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message("You need admin permissions to run this command.", ephemeral=True)
             return
@@ -251,25 +434,7 @@ def register_petting_commands(bot, conn, cursor, db_type):
             await interaction.response.send_message("Number of pets must be greater than 0.", ephemeral=True)
             return
 
-        user_id = user.id
-
-        cursor.execute(prepare_query(
-            "SELECT daily_pets_remaining FROM user_rewards WHERE user_id = ?"
-        ), (user_id,))
-        user_data = cursor.fetchone()
-
-        if user_data:
-            new_pets_remaining = user_data[0] + pets
-            cursor.execute(prepare_query(
-                "UPDATE user_rewards SET daily_pets_remaining = ? WHERE user_id = ?"
-            ), (new_pets_remaining, user_id))
-        else:
-            new_pets_remaining = pets + 1
-            cursor.execute(prepare_query(
-                "INSERT INTO user_rewards (user_id, balance, daily_pets_remaining, last_pet_date) VALUES (?, ?, ?, ?)"
-            ), (user_id, 0, pets, None))
-
-        conn.commit()
+        new_pets_remaining = await run_db(_add_pets, user.id, pets)
 
         await interaction.response.send_message(
             f"Added {pets} extra pets for {user.mention}. They now have {new_pets_remaining} pets remaining.",
@@ -279,27 +444,13 @@ def register_petting_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name="petting_stats", description="View petting statistics (Admin only)")
     @commands.has_permissions(administrator=True)
     async def petting_stats(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message("You need admin permissions to run this command.", ephemeral=True)
             return
         
         today = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%d")
 
-        cursor.execute(prepare_query(
-            "SELECT COUNT(DISTINCT user_id) FROM user_rewards WHERE last_pet_date = ?"
-        ), (today,))
-        daily_active_users = cursor.fetchone()[0]
-
-        cursor.execute(prepare_query(
-            "SELECT SUM(balance) FROM user_rewards"
-        ))
-        total_unclaimed_rewards = cursor.fetchone()[0] or 0
-
-        cursor.execute(prepare_query(
-            "SELECT user_id, balance FROM user_rewards ORDER BY balance DESC LIMIT 10"
-        ))
-        top_users = cursor.fetchall()
+        daily_active_users, total_unclaimed_rewards, top_users = await run_db(_petting_stats, today)
 
         top_users_text = "\n".join([f"<@{user_id}> : {balance} $MVP" for user_id, balance in top_users])
 
@@ -315,7 +466,6 @@ def register_petting_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name="add_petting_reward", description="(Admin) Add a special petting reward.")
     @commands.has_permissions(administrator=True)
     async def add_petting_reward(interaction: discord.Interaction, name: str, probability: float, amount: int):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message("You need admin permissions to run this command.", ephemeral=True)
             return
@@ -326,10 +476,7 @@ def register_petting_commands(bot, conn, cursor, db_type):
             await interaction.response.send_message("Amount must be greater than 0.", ephemeral=True)
             return
 
-        cursor.execute(prepare_query(
-            "INSERT INTO special_rewards (name, probability, amount) VALUES (?, ?, ?)"
-        ), (name, probability, amount))
-        conn.commit()
+        await run_db(_add_special_reward, name, probability, amount)
 
         await interaction.response.send_message(
             f"✅ Added special reward **{name}** with {amount} available and {probability * 100}% hit chance per pet.",
@@ -339,13 +486,11 @@ def register_petting_commands(bot, conn, cursor, db_type):
     @bot.tree.command(name="list_petting_rewards", description="(Admin) List all active special petting rewards.")
     @commands.has_permissions(administrator=True)
     async def list_petting_rewards(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         if not is_admin(interaction):
             await interaction.response.send_message("You need admin permissions to run this command.", ephemeral=True)
             return
         
-        cursor.execute(prepare_query("SELECT name, probability, amount FROM special_rewards"))
-        rewards = cursor.fetchall()
+        rewards = await run_db(_list_special_rewards)
 
         if not rewards:
             await interaction.response.send_message("There are no active special petting rewards.", ephemeral=True)
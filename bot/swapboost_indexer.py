@@ -0,0 +1,361 @@
+"""Background indexer for Swapboost30MVP NFT ownership.
+
+Keeps ``swapboost_holders`` (one row per NFT) current so ``/api/nft/holders``
+reads a small table instead of probing every NFT ID on every holder:
+ - As an event-bus consumer, applies ``NonFungibleToken.Deposited`` /
+   ``Withdrawn`` events whose ``type`` is ``Swapboost30MVP.NFT``
+ - Every RECONCILE_INTERVAL seconds (or when too far behind), re-runs the
+   full HybridCustody scan and replaces the table contents
+"""
+
+import threading
+import time
+import logging
+
+from config import FLOW_SWAP_ACCOUNT
+from db.init import get_db_connection
+from utils.helpers import (
+    prepare_query, get_state_value, set_state_value, DAPPER_WALLET_USERNAME_MAP,
+)
+from utils.flow_access import get_linked_accounts_bulk
+from utils.flow_rest import encode_arg, execute_script, get_events, get_sealed_height
+from utils.metrics import timed_job, job_error
+from bot.event_bus import register_consumer, dispatch_lock
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 120           # 2 minutes (reconcile check; events arrive via the bus)
+RECONCILE_INTERVAL = 21600    # full scan every 6 hours
+MAX_CATCHUP_BLOCKS = 5000
+
+NFT_DEPOSITED = "A.1d7e57aa55817448.NonFungibleToken.Deposited"
+NFT_WITHDRAWN = "A.1d7e57aa55817448.NonFungibleToken.Withdrawn"
+SWAPBOOST_NFT_TYPE = "A.aad9f8fa31ecbaf9.Swapboost30MVP.NFT"
+
+_STATE_BLOCK_KEY = "swapboost_index_block"
+_STATE_RECONCILED_KEY = "swapboost_index_reconciled_at"
+
+# Full scan: direct addresses (treasury) plus HybridCustody parents of every
+# known Dapper child, probing IDs 1..totalSupply on each collection.
+# Returns [id, name, thumbnail, owner, dapper].
+HOLDERS_SCAN_SCRIPT = r"""
+import NonFungibleToken from 0x1d7e57aa55817448
+import MetadataViews from 0x1d7e57aa55817448
+import Swapboost30MVP from 0xaad9f8fa31ecbaf9
+import HybridCustody from 0xd8a7e05a7ac670c0
+
+access(all) fun main(dapperChildren: [Address], directAddresses: [Address]): [[String]] {
+  let totalSupply = Swapboost30MVP.totalSupply
+  var result: [[String]] = []
+  var checked: {Address: Bool} = {}
+
+  // Check direct addresses first (e.g. treasury wallets)
+  for addr in directAddresses {
+    if checked[addr] != nil { continue }
+    checked[addr] = true
+
+    let acct = getAccount(addr)
+    let col = acct.capabilities
+      .borrow<&{NonFungibleToken.Collection}>(
+        /public/Swapboost30MVP_aad9f8fa31ecbaf9
+      )
+    if col == nil { continue }
+
+    var id: UInt64 = 1
+    while id <= totalSupply {
+      let nft = col!.borrowNFT(id)
+      if nft != nil {
+        var name = ""
+        var thumb = ""
+        if let display = nft!.resolveView(Type<MetadataViews.Display>()) {
+          let d = display as! MetadataViews.Display
+          name = d.name
+          thumb = d.thumbnail.uri()
+        }
+        result.append([
+          id.toString(), name, thumb,
+          addr.toString(), addr.toString()
+        ])
+      }
+      id = id + 1
+    }
+  }
+
+  // Then discover via HybridCustody parents of Dapper children
+  for child in dapperChildren {
+    let childAcct = getAuthAccount<auth(Storage) &Account>(child)
+    let ownedAcct = childAcct.storage
+      .borrow<auth(HybridCustody.Owner) &HybridCustody.OwnedAccount>(
+        from: HybridCustody.OwnedAccountStoragePath
+      )
+    if ownedAcct == nil { continue }
+    let parents = ownedAcct!.getParentAddresses()
+
+    for parent in parents {
+      if checked[parent] != nil { continue }
+      checked[parent] = true
+
+      let acct = getAccount(parent)
+      let col = acct.capabilities
+        .borrow<&{NonFungibleToken.Collection}>(
+          /public/Swapboost30MVP_aad9f8fa31ecbaf9
+        )
+      if col == nil { continue }
+
+      var id: UInt64 = 1
+      while id <= totalSupply {
+        let nft = col!.borrowNFT(id)
+        if nft != nil {
+          var name = ""
+          var thumb = ""
+          if let display = nft!.resolveView(Type<MetadataViews.Display>()) {
+            let d = display as! MetadataViews.Display
+            name = d.name
+            thumb = d.thumbnail.uri()
+          }
+          result.append([
+            id.toString(), name, thumb,
+            parent.toString(), child.toString()
+          ])
+        }
+        id = id + 1
+      }
+    }
+  }
+  return result
+}
+"""
+
+# Display data for specific (owner, id) pairs after a deposit.
+# Returns [id, name, thumbnail, owner].
+HOLDERS_DISPLAY_SCRIPT = r"""
+import NonFungibleToken from 0x1d7e57aa55817448
+import MetadataViews from 0x1d7e57aa55817448
+
+access(all) fun main(owners: [Address], ids: [UInt64]): [[String]] {
+  var result: [[String]] = []
+  var i = 0
+  while i < ids.length {
+    let owner = owners[i]
+    let id = ids[i]
+    i = i + 1
+
+    let col = getAccount(owner).capabilities
+      .borrow<&{NonFungibleToken.Collection}>(
+        /public/Swapboost30MVP_aad9f8fa31ecbaf9
+      )
+    if col == nil { continue }
+    if let nft = col!.borrowNFT(id) {
+      var name = ""
+      var thumb = ""
+      if let display = nft.resolveView(Type<MetadataViews.Display>()) {
+        let d = display as! MetadataViews.Display
+        name = d.name
+        thumb = d.thumbnail.uri()
+      }
+      result.append([id.toString(), name, thumb, owner.toString()])
+    }
+  }
+  return result
+}
+"""
+
+
+def _rows_from_result(result_json):
+    return [[v["value"] for v in entry["value"]] for entry in result_json.get("value", [])]
+
+
+def _address_array(addresses):
+    return encode_arg("Array", [{"type": "Address", "value": a} for a in addresses])
+
+
+# ── DB writes ───────────────────────────────────────────────────────
+
+def upsert_holders(conn, db_type, holders):
+    """Upsert ``(nft_id, name, thumbnail, owner, dapper)`` tuples (no commit)."""
+    if not holders:
+        return 0
+    cur = conn.cursor()
+    now = int(time.time())
+    rows = [(int(h[0]), h[1], h[2], h[3], h[4], now) for h in holders]
+    if db_type == 'postgresql':
+        cur.executemany(prepare_query('''
+            INSERT INTO swapboost_holders (nft_id, name, thumbnail, owner, dapper, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (nft_id) DO UPDATE SET
+                name = EXCLUDED.name, thumbnail = EXCLUDED.thumbnail,
+                owner = EXCLUDED.owner, dapper = EXCLUDED.dapper,
+                updated_at = EXCLUDED.updated_at
+        '''), rows)
+    else:
+        cur.executemany(prepare_query('''
+            INSERT OR REPLACE INTO swapboost_holders (nft_id, name, thumbnail, owner, dapper, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''), rows)
+    return len(rows)
+
+
+def remove_holders(conn, nft_ids):
+    """Drop NFTs with no known holder (no commit)."""
+    if not nft_ids:
+        return
+    conn.cursor().executemany(
+        prepare_query("DELETE FROM swapboost_holders WHERE nft_id = ?"),
+        [(int(n),) for n in nft_ids],
+    )
+
+
+# ── Sync strategies ─────────────────────────────────────────────────
+
+def reconcile_swapboost_holders(conn, db_type, sealed_height=None):
+    """Full HybridCustody scan; replaces the whole table."""
+    swap_account = f"0x{FLOW_SWAP_ACCOUNT.removeprefix('0x')}"
+    result_json = execute_script(
+        HOLDERS_SCAN_SCRIPT,
+        [_address_array(DAPPER_WALLET_USERNAME_MAP.keys()), _address_array([swap_account])],
+    )
+    holders = _rows_from_result(result_json)
+
+    cur = conn.cursor()
+    cur.execute(prepare_query("SELECT nft_id FROM swapboost_holders"))
+    existing = {int(r[0]) for r in cur.fetchall()}
+    present = {int(h[0]) for h in holders}
+
+    upsert_holders(conn, db_type, holders)
+    remove_holders(conn, existing - present)
+    if sealed_height is not None:
+        set_state_value(cur, db_type, _STATE_BLOCK_KEY, sealed_height)
+    set_state_value(cur, db_type, _STATE_RECONCILED_KEY, int(time.time()))
+    conn.commit()
+    logger.info("[Swapboost] Reconciled %d NFTs (%d removed)",
+                len(present), len(existing - present))
+    return len(present)
+
+
+def _resolve_dappers(owners):
+    """Map owner addresses to the Dapper child used for username lookup."""
+    swap_account = f"0x{FLOW_SWAP_ACCOUNT.removeprefix('0x')}".lower()
+    lookup = [o for o in owners if o.lower() != swap_account]
+    links = get_linked_accounts_bulk(lookup) if lookup else {}
+    return {o: (links.get(o.lower(), {}).get("child") or o) for o in owners}
+
+
+def is_swapboost_event(event):
+    """Event-bus filter: a Deposited/Withdrawn of a Swapboost30MVP NFT."""
+    return event["fields"].get("type") == SWAPBOOST_NFT_TYPE
+
+
+def apply_swapboost_events(conn, db_type, start_height, end_height, events=None):
+    """Apply Swapboost Deposited/Withdrawn events in ``[start_height, end_height]``.
+
+    ``events`` come from the event bus; when omitted they are fetched here.
+    """
+    if events is None:
+        events = get_events(NFT_DEPOSITED, start_height, end_height) + \
+            get_events(NFT_WITHDRAWN, start_height, end_height)
+    events = sorted(events, key=lambda e: (e["block_height"], e["transaction_index"], e["event_index"]))
+
+    # Last event per NFT wins: owner address, or None once withdrawn
+    owners = {}
+    for ev in events:
+        fields = ev["fields"]
+        if fields.get("type") != SWAPBOOST_NFT_TYPE:
+            continue
+        try:
+            nft_id = int(fields.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if "to" in fields:
+            owners[nft_id] = fields.get("to") or None
+        elif "from" in fields:
+            owners[nft_id] = None
+
+    moved = {nid: owner for nid, owner in owners.items() if owner}
+    gone = [nid for nid, owner in owners.items() if not owner]
+
+    if moved:
+        ids = list(moved)
+        result_json = execute_script(
+            HOLDERS_DISPLAY_SCRIPT,
+            [_address_array([moved[i] for i in ids]),
+             encode_arg("Array", [{"type": "UInt64", "value": str(i)} for i in ids])],
+        )
+        displays = _rows_from_result(result_json)
+        dappers = _resolve_dappers({d[3] for d in displays})
+        upsert_holders(conn, db_type, [
+            (d[0], d[1], d[2], d[3], dappers.get(d[3], d[3])) for d in displays
+        ])
+        # Deposited into a collection we cannot read → owner unknown
+        found = {int(d[0]) for d in displays}
+        gone.extend(nid for nid in ids if nid not in found)
+
+    remove_holders(conn, gone)
+    set_state_value(conn.cursor(), db_type, _STATE_BLOCK_KEY, end_height)
+    conn.commit()
+    if moved or gone:
+        logger.info("[Swapboost] Blocks %d-%d: %d moved / %d removed",
+                    start_height, end_height, len(moved), len(gone))
+    return len(moved), len(gone)
+
+
+# ── Main loop ───────────────────────────────────────────────────────
+
+@timed_job("swapboost_indexer")
+def swapboost_index_tick():
+    """Reconcile when due — called every POLL_INTERVAL seconds.
+
+    Incremental updates arrive through the event bus consumer.
+    """
+    conn = None
+    try:
+        conn, db_type = get_db_connection()
+        cur = conn.cursor()
+        # _STATE_BLOCK_KEY is also the event-bus checkpoint
+        with dispatch_lock:
+            sealed = get_sealed_height()
+            last_block = get_state_value(cur, _STATE_BLOCK_KEY)
+            last_reconcile = int(get_state_value(cur, _STATE_RECONCILED_KEY, 0) or 0)
+
+            if (last_block is None
+                    or sealed - int(last_block) > MAX_CATCHUP_BLOCKS
+                    or time.time() - last_reconcile >= RECONCILE_INTERVAL):
+                reconcile_swapboost_holders(conn, db_type, sealed_height=sealed)
+
+    except Exception as e:
+        logger.error("[Swapboost] Index tick error: %s", e)
+        job_error("swapboost_indexer")
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_indexer_thread = None
+
+
+def _apply_bus_events(conn, db_type, events, start_height, end_height):
+    apply_swapboost_events(conn, db_type, start_height, end_height, events)
+
+
+def start_swapboost_indexer(interval=POLL_INTERVAL):
+    """Register the event-bus consumer and start the reconcile thread (daemon)."""
+    global _indexer_thread
+
+    register_consumer(
+        "swapboost_holders", (NFT_DEPOSITED, NFT_WITHDRAWN), _apply_bus_events,
+        accept=is_swapboost_event, checkpoint_key=_STATE_BLOCK_KEY,
+    )
+
+    def _loop():
+        logger.info("[Swapboost] Indexer started (interval=%ds)", interval)
+        time.sleep(10)
+        while True:
+            swapboost_index_tick()
+            time.sleep(interval)
+
+    _indexer_thread = threading.Thread(target=_loop, daemon=True, name="swapboost-indexer")
+    _indexer_thread.start()
+    logger.info("[Swapboost] Indexer thread launched")
+    return _indexer_thread
@@ -5,12 +5,83 @@ from discord.ext import commands
 from discord import app_commands
 import io
 import csv
+import time
 from datetime import datetime
+from typing import Literal
 
 from utils.helpers import prepare_query, is_admin, map_wallet_to_username, get_last_processed_block, save_gift
-from db.init import get_bot_db
+from db.bot_db import run_db
+from utils.csv_export import gifts_export_query, iter_rows, spool_csv, gift_csv_row, GIFTS_CSV_HEADER
+from utils.sweepstakes import resolve_window, load_entries, run_draw, record_draw
+from bot.disbursements import enqueue_payout
 from config import SWAPFEST_START_TIME, SWAPFEST_END_TIME, SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF
 
+PROGRESS_EDIT_INTERVAL = 2.0  # seconds between status-message edits during re-scoring
+MAX_DRAW_WINNERS = 25         # keeps the winners list within one Discord message
+
+
+def _fetch_leaderboard(conn, cursor, boost1_cutoff, boost2_cutoff, start_time, end_time):
+    # Query with date-based multipliers:
+    # - < Sept 04 => 1.4x
+    # - < Sept 15 => 1.2x
+    # - otherwise 1.0x
+    cursor.execute(prepare_query('''
+        SELECT
+            from_address,
+            SUM(points * CASE
+                WHEN timestamp < ? THEN 1.4
+                WHEN timestamp < ? THEN 1.2
+                ELSE 1.0
+            END) AS total_points
+        FROM gifts
+        WHERE timestamp BETWEEN ? AND ?
+        GROUP BY from_address
+        ORDER BY total_points DESC
+        LIMIT 20
+    '''), (boost1_cutoff, boost2_cutoff, start_time, end_time))
+    return cursor.fetchall()
+
+
+def _fetch_latest_gifts(conn, cursor, from_address=None):
+    if from_address:
+        query = prepare_query('''
+            SELECT txn_id, moment_id, from_address, points, timestamp
+            FROM gifts
+            WHERE from_address = ?
+            ORDER BY timestamp DESC
+            LIMIT 10
+        ''')
+        cursor.execute(query, (from_address,))
+    else:
+        query = prepare_query('''
+            SELECT txn_id, moment_id, from_address, points, timestamp
+            FROM gifts
+            ORDER BY timestamp DESC
+            LIMIT 10
+        ''')
+        cursor.execute(query)
+    return cursor.fetchall()
+
+
+def _draw_sweepstakes(conn, cursor, db_type, source, num_winners, seed, with_replacement, created_by,
+                      prize_mvp=None):
+    since, until = resolve_window(source)
+    entries = load_entries(cursor, source, since, until)
+    draw = run_draw(entries, num_winners, seed, with_replacement)
+    if draw["winners"]:
+        draw["id"] = record_draw(cursor, db_type, source, since, until, draw, created_by)
+        if prize_mvp:
+            # One queued line per winning pick; the key makes re-queueing a no-op
+            for i, wallet in enumerate(draw["winners"], start=1):
+                enqueue_payout(cursor, db_type, f"sweepstakes:{draw['id']}:{i}", wallet,
+                               amount=prize_mvp, source="sweepstakes", source_ref=draw["id"])
+    return draw
+
+
+def _spool_gifts_csv(conn, cursor, db_type, from_address, compress):
+    query, params = gifts_export_query(from_address)
+    return spool_csv(iter_rows(conn, db_type, query, params), GIFTS_CSV_HEADER, gift_csv_row, compress=compress)
+
 
 def register_swapfest_commands(bot, conn, cursor, db_type):
     """Register Swapfest gift tracking and leaderboard commands."""
@@ -20,7 +91,6 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
         description="Show Swapfest leaderboard by total gifted points in event period"
     )
     async def gift_leaderboard(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         # Define the event window in UTC
         start_time = SWAPFEST_START_TIME
         end_time   = SWAPFEST_END_TIME
@@ -29,25 +99,7 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
         boost1_cutoff = SWAPFEST_BOOST1_CUTOFF
         boost2_cutoff = SWAPFEST_BOOST2_CUTOFF
 
-        # Query with date-based multipliers:
-        # - < Sept 04 => 1.4x
-        # - < Sept 15 => 1.2x
-        # - otherwise 1.0x
-        cursor.execute(prepare_query('''
-            SELECT
-                from_address,
-                SUM(points * CASE
-                    WHEN timestamp < ? THEN 1.4
-                    WHEN timestamp < ? THEN 1.2
-                    ELSE 1.0
-                END) AS total_points
-            FROM gifts
-            WHERE timestamp BETWEEN ? AND ?
-            GROUP BY from_address
-            ORDER BY total_points DESC
-            LIMIT 20
-        '''), (boost1_cutoff, boost2_cutoff, start_time, end_time))
-        rows = cursor.fetchall()
+        rows = await run_db(_fetch_leaderboard, boost1_cutoff, boost2_cutoff, start_time, end_time)
 
         if not rows:
             await interaction.response.send_message(
@@ -82,7 +134,7 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
             return
 
         # Call your helper function
-        last_block = get_last_processed_block()
+        last_block = await run_db(lambda conn, cursor: get_last_processed_block(cur=cursor))
 
         if last_block is None:
             await interaction.response.send_message(
@@ -120,7 +172,9 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
 
         try:
             # ✅ Call your helpers.py function
-            save_gift(txn_id, moment_id, from_address, points, timestamp)
+            await run_db(
+                lambda conn, cursor: save_gift(txn_id, moment_id, from_address, points, timestamp, cur=cursor)
+            )
 
             # ✅ Respond with success
             await interaction.response.send_message(
@@ -144,7 +198,6 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
         interaction: discord.Interaction,
         from_address: str | None = None
     ):
-        conn, cursor = get_bot_db(bot)
         # ✅ Check admin
         if not is_admin(interaction):
             await interaction.response.send_message(
@@ -153,26 +206,7 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
             )
             return
 
-        # ✅ Build query dynamically
-        if from_address:
-            query = prepare_query('''
-                SELECT txn_id, moment_id, from_address, points, timestamp
-                FROM gifts
-                WHERE from_address = ?
-                ORDER BY timestamp DESC
-                LIMIT 10
-            ''')
-            cursor.execute(query, (from_address,))
-        else:
-            query = prepare_query('''
-                SELECT txn_id, moment_id, from_address, points, timestamp
-                FROM gifts
-                ORDER BY timestamp DESC
-                LIMIT 10
-            ''')
-            cursor.execute(query)
-
-        rows = cursor.fetchall()
+        rows = await run_db(_fetch_latest_gifts, from_address)
 
         if not rows:
             await interaction.response.send_message(
@@ -194,13 +228,43 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
 
         await interaction.response.send_message(message_content, ephemeral=True)
 
+    @bot.tree.command(
+        name="export_gifts_csv",
+        description="(Admin only) Export all swapfest gifts as a CSV file (optionally gzipped)"
+    )
+    @commands.has_permissions(administrator=True)
+    async def export_gifts_csv(
+        interaction: discord.Interaction,
+        from_address: str | None = None,
+        compress: bool = False
+    ):
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "You need admin permissions to run this command.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        # Rows are streamed into a spooled temp file on the DB executor
+        spool = await run_db(_spool_gifts_csv, db_type, from_address, compress)
+        filename = "swapfest_gifts.csv.gz" if compress else "swapfest_gifts.csv"
+        try:
+            await interaction.followup.send(
+                content="📄 Swapfest gifts export",
+                file=discord.File(fp=spool, filename=filename),
+                ephemeral=True
+            )
+        finally:
+            spool.close()
+
     @bot.tree.command(
         name="swapfest_refresh_points",
         description="(Admin only) Re-scan gifts with 0 points and refresh their scoring"
     )
     @commands.has_permissions(administrator=True)
     async def swapfest_refresh_points(interaction: discord.Interaction):
-        conn, cursor = get_bot_db(bot)
         # Admin check
         if not is_admin(interaction):
             await interaction.response.send_message(
@@ -210,54 +274,109 @@ def register_swapfest_commands(bot, conn, cursor, db_type):
             return
 
         await interaction.response.send_message(
-            "🔄 Refreshing points for gifts with 0 points. This may take a while...", 
+            "🔄 Refreshing points for gifts with 0 points. This may take a while...",
             ephemeral=True
         )
-        
+
         # Import at function level to avoid circular dependencies
         import swapfest
-        from config import FLOW_ACCOUNT
 
-        # 1️⃣ Find all gifts with 0 points
-        cursor.execute(prepare_query('''
-            SELECT txn_id, moment_id, from_address
-            FROM gifts
-            WHERE COALESCE(points, 0) = 0
-        '''))
-        rows = cursor.fetchall()
+        # One status message, edited at most every few seconds as batches land
+        last_edit = [0.0]
 
-        if not rows:
-            await interaction.followup.send(
-                "✅ No gifts with 0 points found.",
-                ephemeral=True
+        async def _report(done, total):
+            now = time.monotonic()
+            if done < total and now - last_edit[0] < PROGRESS_EDIT_INTERVAL:
+                return
+            last_edit[0] = now
+            await interaction.edit_original_response(
+                content=f"🔄 Resolving moment metadata: {done}/{total} moments..."
             )
-            return
 
-        updated_count = 0
+        scanned, updated_count = await swapfest.rescore_zero_point_gifts(_report)
 
-        # 2️⃣ Process each gift
-        for txn_id, moment_id, from_address in rows:
-            await interaction.followup.send(
-                f"✅ Refreshing points for {moment_id}.",
+        if not scanned:
+            await interaction.edit_original_response(content="✅ No gifts with 0 points found.")
+            return
+        await interaction.edit_original_response(
+            content=f"✅ Refreshed points for {updated_count} of {scanned} gifts with 0 points."
+        )
+
+    @bot.tree.command(
+        name="swapfest_apply_rules",
+        description="(Admin only) Re-score this Swapfest's gifts from the scoring rules table"
+    )
+    @commands.has_permissions(administrator=True)
+    async def swapfest_apply_rules(interaction: discord.Interaction):
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "You need admin permissions to run this command.",
                 ephemeral=True
             )
-            new_points = await swapfest.get_moment_points(FLOW_ACCOUNT, int(moment_id))
-            if new_points > 0:
-                await interaction.followup.send(
-                    f"✅ Refreshing points for {moment_id}: {new_points}.",
-                    ephemeral=True
-                )
-                # Update the points in DB
-                cursor.execute(prepare_query('''
-                    UPDATE gifts
-                    SET points = ?
-                    WHERE txn_id = ?
-                '''), (new_points, txn_id))
-                updated_count += 1
-                conn.commit()
-
-        # 3️⃣ Report result
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        import swapfest
+        updated = await swapfest.apply_scoring_rules(SWAPFEST_START_TIME, SWAPFEST_END_TIME)
         await interaction.followup.send(
-            f"✅ Refreshed points for {updated_count} gifts.",
+            f"✅ Re-scored {updated} gifts from the scoring rules table.",
             ephemeral=True
         )
+
+    @bot.tree.command(
+        name="swapfest_draw",
+        description="(Admin only) Draw weighted sweepstakes winners and record the draw"
+    )
+    @app_commands.describe(
+        winners="Number of winners to draw",
+        source="swapfest: boosted gift points this Swapfest • swaps: completed swap points",
+        with_replacement="Allow the same wallet to win more than once",
+        seed="Reuse a seed to reproduce a draw (random if empty)",
+        prize_mvp="$MVP per winning pick, queued for the next /disburse (none if empty)",
+    )
+    @commands.has_permissions(administrator=True)
+    async def swapfest_draw(
+        interaction: discord.Interaction,
+        winners: int,
+        source: Literal['swapfest', 'swaps'] = 'swapfest',
+        with_replacement: bool = False,
+        seed: str | None = None,
+        prize_mvp: float | None = None
+    ):
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "You need admin permissions to run this command.",
+                ephemeral=True
+            )
+            return
+        if winners < 1 or winners > MAX_DRAW_WINNERS:
+            await interaction.response.send_message(
+                f"Winners must be between 1 and {MAX_DRAW_WINNERS}.", ephemeral=True
+            )
+            return
+        if prize_mvp is not None and prize_mvp <= 0:
+            await interaction.response.send_message("Prize must be greater than 0.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        draw = await run_db(
+            _draw_sweepstakes, db_type, source, winners, seed, with_replacement, str(interaction.user),
+            prize_mvp
+        )
+        if not draw["winners"]:
+            await interaction.followup.send("No sweepstake entries found for this draw.", ephemeral=True)
+            return
+
+        lines = [
+            f"🎟️ **Sweepstakes draw #{draw['id']}** ({source})",
+            f"_{draw['total_entries']:,} entries from {draw['num_wallets']:,} wallets"
+            f"{' • with replacement' if with_replacement else ''}_",
+        ]
+        for i, wallet in enumerate(draw["winners"], start=1):
+            lines.append(f"{i}. `{map_wallet_to_username(wallet)}` ({wallet})")
+        lines.append(f"\nSeed: `{draw['seed']}`\nEntries digest: `{draw['entries_digest'][:16]}…`")
+        if prize_mvp:
+            lines.append(f"💸 Queued **{prize_mvp:g} $MVP** per pick — run /disburse to pay out.")
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
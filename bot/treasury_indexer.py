@@ -0,0 +1,320 @@
+"""Background indexer for the treasury Dapper wallet's TopShot inventory.
+
+Keeps ``treasury_inventory`` in sync with ``FLOW_ACCOUNT`` so the buy page
+reads from an indexed table instead of scanning the whole collection:
+ - As an event-bus consumer, applies ``TopShot.Deposit`` / ``TopShot.Withdraw``
+   events to/from the treasury past the checkpointed block
+ - Every RECONCILE_INTERVAL seconds (or when too far behind), runs a full
+   collection scan and replaces the table contents
+"""
+
+import threading
+import time
+import logging
+
+from config import FLOW_ACCOUNT
+from db.init import get_db_connection
+from utils.helpers import prepare_query, get_state_value, set_state_value
+from utils.flow_rest import encode_arg, execute_script, get_events, get_sealed_height
+from utils.metrics import timed_job, job_error
+from bot.event_bus import register_consumer, dispatch_lock
+from db import statements
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 60            # 1 minute (reconcile check; events arrive via the bus)
+RECONCILE_INTERVAL = 1800     # full scan every 30 minutes
+MAX_CATCHUP_BLOCKS = 5000     # further behind than this → full scan is cheaper
+
+TOPSHOT_DEPOSIT = "A.0b2a3299cc857e29.TopShot.Deposit"
+TOPSHOT_WITHDRAW = "A.0b2a3299cc857e29.TopShot.Withdraw"
+
+_STATE_BLOCK_KEY = "treasury_index_block"
+_STATE_RECONCILED_KEY = "treasury_index_reconciled_at"
+
+# Returns [id, playID, setName, serial, locked, subedition] for the given IDs,
+# or for the whole collection when ``ids`` is empty.
+TREASURY_MOMENTS_SCRIPT = """
+import TopShot from 0x0b2a3299cc857e29
+import TopShotLocking from 0x0b2a3299cc857e29
+
+access(all) fun main(account: Address, ids: [UInt64]): [[String]] {
+  let acct = getAccount(account)
+  let ref = acct.capabilities
+    .borrow<&TopShot.Collection>(/public/MomentCollection)!
+  let wanted = ids.length > 0 ? ids : ref.getIDs()
+  var setNames: {UInt32: String} = {}
+  var result: [[String]] = []
+  for id in wanted {
+    if let nft = ref.borrowMoment(id: id) {
+      let sid = nft.data.setID
+      if setNames[sid] == nil {
+        setNames[sid] = TopShot.getSetName(setID: sid) ?? ""
+      }
+      let locked = TopShotLocking.isLocked(nftRef: nft)
+      let subedition = TopShot.getMomentsSubedition(nftID: id) ?? 0
+      result.append([
+        id.toString(),
+        nft.data.playID.toString(),
+        setNames[sid]!,
+        nft.data.serialNumber.toString(),
+        locked ? "1" : "0",
+        subedition.toString()
+      ])
+    }
+  }
+  return result
+}
+"""
+
+
+# ── Chain reads ─────────────────────────────────────────────────────
+
+def fetch_treasury_moments(ids=None):
+    """Read treasury moments on-chain (all of them when ``ids`` is empty)."""
+    id_args = [{"type": "UInt64", "value": str(int(i))} for i in (ids or [])]
+    result_json = execute_script(
+        TREASURY_MOMENTS_SCRIPT,
+        [encode_arg("Address", FLOW_ACCOUNT), encode_arg("Array", id_args)],
+    )
+
+    raw_moments = []
+    for item in result_json.get('value', []):
+        arr = [f['value'] for f in item.get('value', [])]
+        if len(arr) >= 6:
+            raw_moments.append({
+                'id': int(arr[0]),
+                'playID': int(arr[1]),
+                'setName': arr[2],
+                'serial': int(arr[3]),
+                'isLocked': arr[4] == '1',
+                'subedition': int(arr[5]),
+            })
+    return raw_moments
+
+
+# ── DB writes ───────────────────────────────────────────────────────
+
+_EDITION_BY_PLAY_AND_SET = statements.register("jokic_edition_by_play_and_set", (
+    "SELECT edition_id, tier, set_name, series_number, play_headline, team, image_url "
+    "FROM jokic_editions WHERE play_flow_id = ? AND set_name = ? "
+    "ORDER BY CASE WHEN edition_id LIKE ? THEN 0 ELSE 1 END "
+    "LIMIT 1"
+))
+_EDITION_BY_PLAY = statements.register("jokic_edition_by_play", (
+    "SELECT edition_id, tier, set_name, series_number, play_headline, team, image_url "
+    "FROM jokic_editions WHERE play_flow_id = ? "
+    "ORDER BY CASE WHEN edition_id LIKE ? THEN 0 ELSE 1 END "
+    "LIMIT 1"
+))
+
+
+def _lookup_edition(cur, play_id, set_name, subedition):
+    """Match an on-chain moment to a jokic_editions row (None for non-Jokic)."""
+    edition_suffix = '+' + str(subedition)
+    statements.execute(cur, _EDITION_BY_PLAY_AND_SET, (int(play_id), set_name, '%' + edition_suffix))
+    row = cur.fetchone()
+
+    # Fallback: match by play_flow_id only
+    if not row:
+        statements.execute(cur, _EDITION_BY_PLAY, (int(play_id), '%' + edition_suffix))
+        row = cur.fetchone()
+    return row
+
+
+def upsert_treasury_moments(conn, db_type, raw_moments):
+    """Enrich raw on-chain moments from jokic_editions and upsert them (no commit)."""
+    cur = conn.cursor()
+    now = int(time.time())
+    edition_cache = {}
+    rows = []
+    for m in raw_moments:
+        key = (m['playID'], m.get('setName', ''), m.get('subedition', 0))
+        if key not in edition_cache:
+            edition_cache[key] = _lookup_edition(cur, *key)
+        ed = edition_cache[key]
+        rows.append((
+            m['id'], m['playID'], m.get('setName', ''), m['serial'],
+            m.get('subedition', 0), 1 if m.get('isLocked') else 0,
+            ed[0] if ed else None,
+            (ed[1] or 'COMMON') if ed else None,
+            (ed[2] or m.get('setName', '')) if ed else m.get('setName', ''),
+            ed[3] if ed else None,
+            ed[4] if ed else None,
+            ed[5] if ed else None,
+            ed[6] if ed else None,
+            now,
+        ))
+
+    if not rows:
+        return 0
+
+    columns = ("moment_id, play_id, set_name, serial_number, subedition, is_locked, "
+               "edition_id, tier, edition_set_name, series_number, play_headline, "
+               "team, image_url, updated_at")
+    placeholders = ", ".join(["?"] * 14)
+    if db_type == 'postgresql':
+        cur.executemany(prepare_query(f'''
+            INSERT INTO treasury_inventory ({columns})
+            VALUES ({placeholders})
+            ON CONFLICT (moment_id) DO UPDATE SET
+                play_id = EXCLUDED.play_id, set_name = EXCLUDED.set_name,
+                serial_number = EXCLUDED.serial_number, subedition = EXCLUDED.subedition,
+                is_locked = EXCLUDED.is_locked, edition_id = EXCLUDED.edition_id,
+                tier = EXCLUDED.tier, edition_set_name = EXCLUDED.edition_set_name,
+                series_number = EXCLUDED.series_number, play_headline = EXCLUDED.play_headline,
+                team = EXCLUDED.team, image_url = EXCLUDED.image_url,
+                updated_at = EXCLUDED.updated_at
+        '''), rows)
+    else:
+        cur.executemany(prepare_query(f'''
+            INSERT OR REPLACE INTO treasury_inventory ({columns})
+            VALUES ({placeholders})
+        '''), rows)
+    return len(rows)
+
+
+def remove_treasury_moments(conn, moment_ids):
+    """Drop moments that left the treasury (no commit)."""
+    if not moment_ids:
+        return
+    cur = conn.cursor()
+    cur.executemany(
+        prepare_query("DELETE FROM treasury_inventory WHERE moment_id = ?"),
+        [(int(mid),) for mid in moment_ids],
+    )
+
+
+# ── Sync strategies ─────────────────────────────────────────────────
+
+def reconcile_treasury_inventory(conn, db_type, sealed_height=None):
+    """Full collection scan: upsert everything present, delete everything gone.
+
+    ``sealed_height`` should be read *before* the scan so events that land
+    during it are re-applied by the next incremental tick (upserts are
+    idempotent).
+    """
+    raw_moments = fetch_treasury_moments()
+    cur = conn.cursor()
+    cur.execute(prepare_query("SELECT moment_id FROM treasury_inventory"))
+    existing = {int(r[0]) for r in cur.fetchall()}
+    present = {m['id'] for m in raw_moments}
+
+    upsert_treasury_moments(conn, db_type, raw_moments)
+    remove_treasury_moments(conn, existing - present)
+    if sealed_height is not None:
+        set_state_value(cur, db_type, _STATE_BLOCK_KEY, sealed_height)
+    set_state_value(cur, db_type, _STATE_RECONCILED_KEY, int(time.time()))
+    conn.commit()
+    logger.info("[Treasury] Reconciled %d moments (%d removed)",
+                len(present), len(existing - present))
+    return len(present)
+
+
+def is_treasury_event(event):
+    """Event-bus filter: a Deposit to or Withdraw from the treasury."""
+    fields = event["fields"]
+    treasury = FLOW_ACCOUNT.lower()
+    return (str(fields.get("to") or "").lower() == treasury
+            or str(fields.get("from") or "").lower() == treasury)
+
+
+def apply_treasury_events(conn, db_type, start_height, end_height, events=None):
+    """Apply treasury Deposit/Withdraw events in ``[start_height, end_height]``.
+
+    ``events`` come from the event bus; when omitted they are fetched here.
+    """
+    treasury = FLOW_ACCOUNT.lower()
+    if events is None:
+        events = get_events(TOPSHOT_DEPOSIT, start_height, end_height) + \
+            get_events(TOPSHOT_WITHDRAW, start_height, end_height)
+    events = sorted(events, key=lambda e: (e["block_height"], e["transaction_index"], e["event_index"]))
+
+    # Last event per moment wins: True = now in treasury, False = left it
+    state = {}
+    for ev in events:
+        fields = ev["fields"]
+        try:
+            mid = int(fields.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if "to" in fields and str(fields.get("to") or "").lower() == treasury:
+            state[mid] = True
+        elif "from" in fields and str(fields.get("from") or "").lower() == treasury:
+            state[mid] = False
+
+    arrived = [mid for mid, inside in state.items() if inside]
+    left = [mid for mid, inside in state.items() if not inside]
+
+    if arrived:
+        upsert_treasury_moments(conn, db_type, fetch_treasury_moments(arrived))
+    remove_treasury_moments(conn, left)
+    set_state_value(conn.cursor(), db_type, _STATE_BLOCK_KEY, end_height)
+    conn.commit()
+    if arrived or left:
+        logger.info("[Treasury] Blocks %d-%d: +%d / -%d moments",
+                    start_height, end_height, len(arrived), len(left))
+    return len(arrived), len(left)
+
+
+# ── Main loop ───────────────────────────────────────────────────────
+
+@timed_job("treasury_indexer")
+def treasury_index_tick():
+    """Reconcile when due — called every POLL_INTERVAL seconds.
+
+    Incremental updates arrive through the event bus consumer.
+    """
+    conn = None
+    try:
+        conn, db_type = get_db_connection()
+        cur = conn.cursor()
+        # _STATE_BLOCK_KEY is also the event-bus checkpoint
+        with dispatch_lock:
+            sealed = get_sealed_height()
+            last_block = get_state_value(cur, _STATE_BLOCK_KEY)
+            last_reconcile = int(get_state_value(cur, _STATE_RECONCILED_KEY, 0) or 0)
+
+            if (last_block is None
+                    or sealed - int(last_block) > MAX_CATCHUP_BLOCKS
+                    or time.time() - last_reconcile >= RECONCILE_INTERVAL):
+                reconcile_treasury_inventory(conn, db_type, sealed_height=sealed)
+
+    except Exception as e:
+        logger.error("[Treasury] Index tick error: %s", e)
+        job_error("treasury_indexer")
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_indexer_thread = None
+
+
+def _apply_bus_events(conn, db_type, events, start_height, end_height):
+    apply_treasury_events(conn, db_type, start_height, end_height, events)
+
+
+def start_treasury_indexer(interval=POLL_INTERVAL):
+    """Register the event-bus consumer and start the reconcile thread (daemon)."""
+    global _indexer_thread
+
+    register_consumer(
+        "treasury_inventory", (TOPSHOT_DEPOSIT, TOPSHOT_WITHDRAW), _apply_bus_events,
+        accept=is_treasury_event, checkpoint_key=_STATE_BLOCK_KEY,
+    )
+
+    def _loop():
+        logger.info("[Treasury] Indexer started (interval=%ds)", interval)
+        time.sleep(5)
+        while True:
+            treasury_index_tick()
+            time.sleep(interval)
+
+    _indexer_thread = threading.Thread(target=_loop, daemon=True, name="treasury-indexer")
+    _indexer_thread.start()
+    logger.info("[Treasury] Indexer thread launched")
+    return _indexer_thread
@@ -0,0 +1,347 @@
+"""Background verification of user-submitted Flow transactions.
+
+Swap and bracket endpoints need a user's transaction to be sealed and its
+deposits decoded before they can pay out.  Instead of every request (and
+every client retry) fetching ``transaction_results`` and ``transactions``
+from the Flow REST API, a txId is registered once in ``tx_verifications``:
+ - a background worker polls each PENDING row with exponential backoff
+   until Flow reports it sealed, failed or expired, or until it has been
+   pending for ``VERIFY_MAX_AGE`` seconds (EXPIRED)
+ - the sealed result — proposer, error message and the decoded events — is
+   written once and never updated again (``WHERE status = 'PENDING'``)
+ - endpoints call ``get_verified_transaction`` and complete from that row
+   in one local read; only an unknown or due txId triggers a chain fetch
+ - at most ``VERIFY_MAX_PENDING`` rows are PENDING at once, and EXPIRED rows
+   are deleted ``EXPIRED_RETENTION`` seconds after they were registered
+"""
+
+import json
+import threading
+import time
+import logging
+
+from config import TX_VERIFY_INTERVAL
+from db.init import get_db_connection
+from utils.cdc_events import decode_fields, normalize_address
+from utils.helpers import prepare_query
+from utils.flow_rest import get_transaction_result, get_transaction
+from utils.metrics import timed_job, job_error
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+SEALED = "SEALED"
+FAILED = "FAILED"
+EXPIRED = "EXPIRED"
+
+# chain_status recorded when Flow could not be reached
+UNAVAILABLE = "UNAVAILABLE"
+
+VERIFY_BASE_DELAY = 2       # seconds before the first re-check
+VERIFY_MAX_DELAY = 60       # backoff ceiling
+VERIFY_MAX_AGE = 15 * 60    # give up on transactions pending this long
+VERIFY_BATCH = 20           # due rows checked per worker tick
+VERIFY_MAX_PENDING = 500    # new registrations are refused beyond this many PENDING rows
+EXPIRED_RETENTION = 24 * 3600   # EXPIRED rows are pruned this long after registration
+PRUNE_INTERVAL = 600        # seconds between prune passes
+
+_COLUMNS = ("tx_id, status, chain_status, proposer, error_message, events, "
+            "attempts, registered_at, next_check_at, sealed_at")
+
+_wake = threading.Event()
+_last_prune = 0
+
+
+class VerificationQueueFull(Exception):
+    """Too many transactions are already pending verification."""
+
+
+def normalize_tx_id(tx_id):
+    """Canonical txId: lowercase hex without ``0x``."""
+    return (tx_id or "").strip().lower().removeprefix("0x")
+
+
+def backoff_delay(attempts):
+    """Seconds to wait after ``attempts`` unsuccessful checks."""
+    return min(VERIFY_BASE_DELAY * 2 ** attempts, VERIFY_MAX_DELAY)
+
+
+def decode_transaction_events(events):
+    """Flow REST events → ``[{"type", "event_index", "fields"}]`` (undecodable skipped)."""
+    out = []
+    for ev in events or []:
+        payload = ev.get("payload")
+        if not payload:
+            continue
+        try:
+            fields = decode_fields(payload)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        out.append({
+            "type": ev.get("type"),
+            "event_index": int(ev.get("event_index", len(out))),
+            "fields": fields,
+        })
+    return out
+
+
+def build_verification(tx_id, tx_result, proposer=None, now=None):
+    """Verification dict for a ``transaction_results`` response.
+
+    Returns None while the transaction is not final yet.
+    """
+    chain_status = (tx_result.get("status") or "").upper()
+    error_message = tx_result.get("error_message") or None
+    if chain_status == "EXPIRED":
+        error_message = error_message or "Transaction expired before it was sealed"
+    elif chain_status != "SEALED":
+        return None
+    return {
+        "tx_id": tx_id,
+        "status": FAILED if error_message else SEALED,
+        "chain_status": chain_status,
+        "proposer": normalize_address(proposer),
+        "error_message": error_message,
+        "events": decode_transaction_events(tx_result.get("events")),
+        "attempts": 0,
+        "sealed_at": int(now if now is not None else time.time()),
+    }
+
+
+def verified_deposits(verification, event_type, to_address):
+    """Decoded fields of ``event_type`` events deposited to ``to_address``."""
+    target = normalize_address(to_address)
+    return [
+        ev["fields"] for ev in verification.get("events") or []
+        if ev["type"] == event_type and ev["fields"].get("to") == target
+    ]
+
+
+# ── Storage ─────────────────────────────────────────────────────────
+
+def _verification_from_row(row):
+    return {
+        "tx_id": row[0],
+        "status": row[1],
+        "chain_status": row[2],
+        "proposer": row[3],
+        "error_message": row[4],
+        "events": json.loads(row[5]) if row[5] else [],
+        "attempts": int(row[6] or 0),
+        "registered_at": int(row[7]),
+        "next_check_at": int(row[8]),
+        "sealed_at": int(row[9]) if row[9] is not None else None,
+    }
+
+
+def load_verification(cursor, tx_id):
+    """The stored verification for ``tx_id``, or None if never registered."""
+    cursor.execute(prepare_query(
+        f"SELECT {_COLUMNS} FROM tx_verifications WHERE tx_id = ?"
+    ), (tx_id,))
+    row = cursor.fetchone()
+    return _verification_from_row(row) if row else None
+
+
+def pending_count(cursor):
+    """Number of transactions still awaiting a final result."""
+    cursor.execute(prepare_query(
+        "SELECT COUNT(*) FROM tx_verifications WHERE status = ?"
+    ), (PENDING,))
+    return int(cursor.fetchone()[0])
+
+
+def register_transaction(cursor, db_type, tx_id, now=None):
+    """Queue ``tx_id`` for verification (no commit); an EXPIRED row is re-queued.
+
+    Raises VerificationQueueFull when a new (or EXPIRED) txId would exceed
+    ``VERIFY_MAX_PENDING``; already queued or final txIds are left alone.
+    """
+    now = int(now if now is not None else time.time())
+    tx_id = normalize_tx_id(tx_id)
+    row = load_verification(cursor, tx_id)
+    if row is not None and row["status"] != EXPIRED:
+        return
+    if pending_count(cursor) >= VERIFY_MAX_PENDING:
+        raise VerificationQueueFull("Too many transactions awaiting verification; retry shortly")
+    if db_type == 'postgresql':
+        cursor.execute(prepare_query('''
+            INSERT INTO tx_verifications (tx_id, status, attempts, registered_at, next_check_at)
+            VALUES (?, ?, 0, ?, ?)
+            ON CONFLICT (tx_id) DO NOTHING
+        '''), (tx_id, PENDING, now, now))
+    else:
+        cursor.execute(prepare_query('''
+            INSERT OR IGNORE INTO tx_verifications (tx_id, status, attempts, registered_at, next_check_at)
+            VALUES (?, ?, 0, ?, ?)
+        '''), (tx_id, PENDING, now, now))
+    cursor.execute(prepare_query('''
+        UPDATE tx_verifications
+        SET status = ?, attempts = 0, registered_at = ?, next_check_at = ?
+        WHERE tx_id = ? AND status = ?
+    '''), (PENDING, now, now, tx_id, EXPIRED))
+    _wake.set()
+
+
+def _seal(cursor, verification):
+    """Write a final result once; rows that are no longer PENDING are untouched."""
+    cursor.execute(prepare_query('''
+        UPDATE tx_verifications
+        SET status = ?, chain_status = ?, proposer = ?, error_message = ?,
+            events = ?, sealed_at = ?
+        WHERE tx_id = ? AND status = ?
+    '''), (
+        verification["status"], verification["chain_status"], verification["proposer"],
+        verification["error_message"],
+        json.dumps(verification["events"], separators=(",", ":")),
+        verification["sealed_at"], verification["tx_id"], PENDING,
+    ))
+
+
+def _reschedule(cursor, row, chain_status, now):
+    attempts = row["attempts"] + 1
+    status = EXPIRED if now - row["registered_at"] >= VERIFY_MAX_AGE else PENDING
+    cursor.execute(prepare_query('''
+        UPDATE tx_verifications
+        SET status = ?, chain_status = ?, attempts = ?, next_check_at = ?
+        WHERE tx_id = ? AND status = ?
+    '''), (status, chain_status, attempts, now + backoff_delay(attempts), row["tx_id"], PENDING))
+
+
+# ── Chain checks ────────────────────────────────────────────────────
+
+def fetch_verification(tx_id, now=None):
+    """One chain round trip: ``(verification or None, chain_status)``.
+
+    The proposer is looked up only once the transaction is final; failing
+    to fetch it is not fatal (the deposit events are the primary guard).
+    """
+    try:
+        tx_result = get_transaction_result(tx_id)
+    except Exception as e:
+        logger.warning("[TxVerifier] Could not fetch %s: %s", tx_id, e)
+        return None, UNAVAILABLE
+    chain_status = (tx_result.get("status") or "").upper() or UNAVAILABLE
+
+    proposer = None
+    if chain_status in ("SEALED", "EXPIRED"):
+        try:
+            proposer = get_transaction(tx_id).get("proposer")
+        except Exception as e:
+            logger.warning("[TxVerifier] Could not fetch proposer of %s: %s", tx_id, e)
+    return build_verification(tx_id, tx_result, proposer, now), chain_status
+
+
+def check_transaction(conn, tx_id, now=None):
+    """Check one PENDING transaction against the chain, store the outcome, commit."""
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+    row = load_verification(cur, tx_id)
+    if row is None or row["status"] != PENDING:
+        return row
+
+    verification, chain_status = fetch_verification(tx_id, now)
+    if verification is not None:
+        _seal(cur, verification)
+    else:
+        _reschedule(cur, row, chain_status, now)
+    conn.commit()
+    return load_verification(cur, tx_id)
+
+
+def get_verified_transaction(conn, db_type, tx_id, now=None):
+    """Verification for an endpoint, from the local cache where possible.
+
+    Final rows are returned as stored.  An unknown (or EXPIRED) txId is
+    registered and checked once inline; a PENDING row is only re-checked
+    when its backoff is due, so retrying clients never add chain calls.
+    """
+    now = int(now if now is not None else time.time())
+    tx_id = normalize_tx_id(tx_id)
+    cur = conn.cursor()
+    row = load_verification(cur, tx_id)
+    if row is not None and row["status"] in (SEALED, FAILED):
+        return row
+    if row is None or row["status"] == EXPIRED:
+        register_transaction(cur, db_type, tx_id, now)
+        conn.commit()
+    elif row["next_check_at"] > now:
+        return row
+    return check_transaction(conn, tx_id, now)
+
+
+def verify_due(conn, now=None, limit=VERIFY_BATCH):
+    """Check every PENDING transaction whose backoff has elapsed."""
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+    cur.execute(prepare_query('''
+        SELECT tx_id FROM tx_verifications
+        WHERE status = ? AND next_check_at <= ?
+        ORDER BY next_check_at
+        LIMIT ?
+    '''), (PENDING, now, limit))
+    tx_ids = [r[0] for r in cur.fetchall()]
+    finished = 0
+    for tx_id in tx_ids:
+        row = check_transaction(conn, tx_id, now)
+        if row and row["status"] != PENDING:
+            finished += 1
+            logger.info("[TxVerifier] %s → %s", tx_id, row["status"])
+    return finished
+
+
+def prune_expired(conn, now=None, retention=EXPIRED_RETENTION):
+    """Delete EXPIRED rows registered more than ``retention`` seconds ago, commit."""
+    now = int(now if now is not None else time.time())
+    cur = conn.cursor()
+    cur.execute(prepare_query(
+        "DELETE FROM tx_verifications WHERE status = ? AND registered_at <= ?"
+    ), (EXPIRED, now - retention))
+    conn.commit()
+    return cur.rowcount
+
+
+# ── Worker ──────────────────────────────────────────────────────────
+
+@timed_job("tx_verifier")
+def tx_verifier_tick():
+    """Single worker iteration — runs every TX_VERIFY_INTERVAL seconds or on register."""
+    global _last_prune
+    conn = None
+    try:
+        conn, _ = get_db_connection()
+        verify_due(conn)
+        if time.time() - _last_prune >= PRUNE_INTERVAL:
+            _last_prune = time.time()
+            pruned = prune_expired(conn)
+            if pruned:
+                logger.info("[TxVerifier] Pruned %d expired transactions", pruned)
+    except Exception as e:
+        logger.error("[TxVerifier] Tick error: %s", e)
+        job_error("tx_verifier")
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_verifier_thread = None
+
+
+def start_tx_verifier(interval=TX_VERIFY_INTERVAL):
+    """Start the background verification thread (daemon)."""
+    global _verifier_thread
+
+    def _loop():
+        logger.info("[TxVerifier] Started (interval=%ds)", interval)
+        while True:
+            tx_verifier_tick()
+            _wake.wait(interval)
+            _wake.clear()
+
+    _verifier_thread = threading.Thread(target=_loop, daemon=True, name="tx-verifier")
+    _verifier_thread.start()
+    logger.info("[TxVerifier] Thread launched")
+    return _verifier_thread
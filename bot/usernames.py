@@ -0,0 +1,91 @@
+"""Batched Discord username resolution for contest listings.
+
+Resolves many user IDs at once: one ``user_mapping`` query, then the
+guild/client member caches, then a bounded number of concurrent
+``fetch_user`` REST calls for whatever is left, and finally one bulk
+upsert of the newly learned names.
+"""
+
+import asyncio
+
+from utils.helpers import prepare_query
+from db.bot_db import run_db
+
+FETCH_CONCURRENCY = 5    # simultaneous fetch_user calls (Discord rate limits)
+_LOOKUP_CHUNK = 500      # IDs per IN (...) query
+
+
+def _load_mapped_usernames(conn, cursor, user_ids):
+    names = {}
+    for i in range(0, len(user_ids), _LOOKUP_CHUNK):
+        chunk = user_ids[i:i + _LOOKUP_CHUNK]
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor.execute(prepare_query(
+            f"SELECT user_id, username FROM user_mapping WHERE user_id IN ({placeholders})"
+        ), tuple(chunk))
+        for user_id, username in cursor.fetchall():
+            names[int(user_id)] = username
+    return names
+
+
+def _save_usernames(conn, cursor, db_type, names):
+    if db_type == 'postgresql':
+        query = '''INSERT INTO user_mapping (user_id, username)
+                   VALUES (?, ?)
+                   ON CONFLICT (user_id) DO UPDATE SET username = EXCLUDED.username'''
+    else:
+        query = 'INSERT OR REPLACE INTO user_mapping (user_id, username) VALUES (?, ?)'
+    cursor.executemany(prepare_query(query), list(names.items()))
+
+
+def _cached_name(bot, guild, user_id):
+    member = guild.get_member(user_id) if guild is not None else None
+    if member is None:
+        member = bot.get_user(user_id)
+    return member.name if member is not None else None
+
+
+async def resolve_usernames(bot, user_ids, db_type, guild=None):
+    """Return ``{user_id: username}`` for every ID in ``user_ids``.
+
+    IDs that can't be resolved map to ``"User <id>"`` and are not stored.
+    """
+    wanted = list(dict.fromkeys(int(uid) for uid in user_ids))
+    if not wanted:
+        return {}
+
+    names = await run_db(_load_mapped_usernames, wanted)
+    learned = {}
+
+    to_fetch = []
+    for user_id in wanted:
+        if user_id in names:
+            continue
+        cached = _cached_name(bot, guild, user_id)
+        if cached:
+            learned[user_id] = cached
+        else:
+            to_fetch.append(user_id)
+
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def _fetch(user_id):
+        async with semaphore:
+            try:
+                user_obj = await bot.fetch_user(user_id)
+                return user_id, user_obj.name
+            except Exception:
+                return user_id, None
+
+    for user_id, username in await asyncio.gather(*(_fetch(uid) for uid in to_fetch)):
+        if username:
+            learned[user_id] = username
+
+    if learned:
+        try:
+            await run_db(_save_usernames, db_type, learned)
+        except Exception as e:
+            print(f"⚠️  Failed to store {len(learned)} usernames: {e}")
+        names.update(learned)
+
+    return {uid: names.get(uid, f"User {uid}") for uid in wanted}
@@ -29,8 +29,43 @@ FLOW_SWAP_PRIVATE_KEY = os.getenv('FLOW_SWAP_PRIVATE_KEY', '')  # Hex private ke
 FLOW_SWAP_KEY_INDEX = int(os.getenv('FLOW_SWAP_KEY_INDEX', '1'))  # Key index on the swap account
 FLOW_SCAN_API_URL = os.getenv('FLOW_SCAN_API_URL', '')
 
+# Upstream HTTP APIs – point these at loadtest/upstream_sim.py to run offline
+TOPSHOT_GRAPHQL_URL = os.getenv('TOPSHOT_GRAPHQL_URL', 'https://public-api.nbatopshot.com/graphql')
+FLOW_REST_URL = os.getenv('FLOW_REST_URL', 'https://rest-mainnet.onflow.org/v1')
+DAPPER_PROFILE_URL = os.getenv('DAPPER_PROFILE_URL', 'https://open.meetdapper.com/profile')
+
+# Chain event bus – one poller feeding treasury/Swapboost/gift consumers
+EVENT_BUS_INTERVAL = int(os.getenv('EVENT_BUS_INTERVAL', '30'))  # seconds between ingest ticks
+SWAPFEST_GIFT_CONSUMER = os.getenv('SWAPFEST_GIFT_CONSUMER', '0') == '1'  # record gifts from the bus
+
+# Transaction verifier – polls registered txIds until sealed (bot/tx_verifier.py)
+TX_VERIFY_INTERVAL = int(os.getenv('TX_VERIFY_INTERVAL', '2'))  # seconds between worker ticks
+
+# Batched treasury disbursements (bot/disbursements.py)
+DISBURSE_INTERVAL = int(os.getenv('DISBURSE_INTERVAL', '60'))  # seconds between reconcile ticks
+DISBURSE_MAX_RECIPIENTS = int(os.getenv('DISBURSE_MAX_RECIPIENTS', '100'))  # payout lines per transaction
+DISBURSE_MAX_MOMENTS = int(os.getenv('DISBURSE_MAX_MOMENTS', '120'))  # moments withdrawn per transaction
+DISBURSE_KEY_INDEX = os.getenv('DISBURSE_KEY_INDEX', '')  # dedicated proposal key for batches (required; never FLOW_SWAP_KEY_INDEX)
+
+# Flow access node (gRPC) – one long-lived channel is shared by all Cadence scripts
+FLOW_ACCESS_NODE_HOST = os.getenv('FLOW_ACCESS_NODE_HOST', 'access.mainnet.nodes.onflow.org')
+FLOW_ACCESS_NODE_PORT = int(os.getenv('FLOW_ACCESS_NODE_PORT', '9000'))
+FLOW_ACCESS_MAX_CONCURRENCY = int(os.getenv('FLOW_ACCESS_MAX_CONCURRENCY', '4'))  # in-flight scripts
+
+# Admin HTTP endpoints (gift export, /api/admin/*) require "Authorization: Bearer <token>"; unset = disabled
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN', '')
+
+# Observability – latency histograms served on /metrics (utils/metrics.py)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # /metrics requires "Authorization: Bearer <token>"; unset = 404
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '0'))  # log statements at least this slow, with their EXPLAIN (0 = off)
+
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL')  # PostgreSQL URL
+BOT_DB_POOL_SIZE = int(os.getenv('BOT_DB_POOL_SIZE', '4'))  # worker threads / pooled connections for bot commands
+BOT_BLOCKING_WORKERS = int(os.getenv('BOT_BLOCKING_WORKERS', '8'))  # threads for blocking HTTP/job helpers
+POSTGRES_PREPARE_THRESHOLD = int(os.getenv('POSTGRES_PREPARE_THRESHOLD', '2'))  # runs per connection before a registered statement is PREPAREd (0 = never)
+SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', '512'))  # compiled statements kept per SQLite connection
 
 # Discord bot configuration
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
@@ -0,0 +1,179 @@
+"""Non-blocking database access for Discord slash commands.
+
+Command handlers run on the discord.py event loop, so a synchronous
+``cursor.execute`` inside them stalls heartbeats and every other
+interaction.  ``run_db`` moves the work onto a small dedicated thread pool
+where each call borrows its own connection from a pool, runs inside one
+transaction and is committed (or rolled back) before the connection goes
+back.  Dead connections are detected from the error they raise rather than
+probed with ``SELECT 1`` before every command.  ``run_blocking`` (HTTP
+calls, jobs that manage their own connection) has a separate pool so slow
+jobs never hold up ``run_db``.
+
+``monitor_event_loop_lag`` samples how late the event loop wakes up so
+stalls show up in the logs and in ``loop_lag_stats``.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from config import BOT_DB_POOL_SIZE, BOT_BLOCKING_WORKERS
+from db.init import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+LAG_SAMPLE_INTERVAL = 1.0   # seconds between event-loop lag samples
+LAG_WARN_THRESHOLD = 0.25   # lag (seconds) counted and logged as a stall
+
+# Errors that mean the connection itself is unusable
+_DISCONNECT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+db_stats = {"calls": 0, "errors": 0, "reconnects": 0, "max_ms": 0.0}
+loop_lag_stats = {"samples": 0, "last_ms": 0.0, "max_ms": 0.0, "stalls": 0}
+_stats_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Idle connections shared by the bot's DB worker threads.
+
+    The executor never runs more than ``size`` calls at once, so the pool
+    never holds more than ``size`` connections.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.LifoQueue()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn, _ = get_db_connection()
+            return conn
+
+    def release(self, conn, discard=False):
+        if discard or self._idle.qsize() >= self.size:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_pool = ConnectionPool(BOT_DB_POOL_SIZE)
+_executor = ThreadPoolExecutor(max_workers=BOT_DB_POOL_SIZE, thread_name_prefix="bot-db")
+_blocking_executor = ThreadPoolExecutor(max_workers=BOT_BLOCKING_WORKERS, thread_name_prefix="bot-blocking")
+
+
+def _is_disconnect(conn, exc):
+    return isinstance(exc, _DISCONNECT_ERRORS) or bool(getattr(conn, "closed", 0))
+
+
+def _record_call(elapsed_ms, error=False, reconnect=False):
+    with _stats_lock:
+        db_stats["calls"] += 1
+        if error:
+            db_stats["errors"] += 1
+        if reconnect:
+            db_stats["reconnects"] += 1
+        db_stats["max_ms"] = max(db_stats["max_ms"], elapsed_ms)
+
+
+def call_db(fn, *args):
+    """Run ``fn(conn, cursor, *args)`` in one transaction on a pooled connection.
+
+    Commits on success and rolls back on error.  If the connection turns out
+    to be dead it is discarded and the call is retried once on a fresh one,
+    so ``fn`` must not commit part-way through.
+    """
+    started = time.perf_counter()
+    reconnected = False
+    for attempt in range(2):
+        conn = _pool.acquire()
+        try:
+            result = fn(conn, conn.cursor(), *args)
+            conn.commit()
+        except Exception as exc:
+            dead = _is_disconnect(conn, exc)
+            if not dead:
+                try:
+                    conn.rollback()
+                except Exception:
+                    dead = True
+            _pool.release(conn, discard=dead)
+            if dead and attempt == 0:
+                reconnected = True
+                continue
+            _record_call((time.perf_counter() - started) * 1000, error=True, reconnect=reconnected)
+            raise
+        _pool.release(conn)
+        _record_call((time.perf_counter() - started) * 1000, reconnect=reconnected)
+        return result
+
+
+async def run_db(fn, *args):
+    """Await ``call_db(fn, *args)`` on the bot DB executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, call_db, fn, *args)
+
+
+async def run_blocking(fn, *args):
+    """Await a blocking helper (HTTP, legacy DB helpers) off the event loop.
+
+    Runs on its own executor, not the DB one, and gets no pooled connection.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, fn, *args)
+
+
+# ── Event-loop lag ───────────────────────────────────────────────────
+
+def record_loop_lag(lag_seconds, threshold=LAG_WARN_THRESHOLD):
+    """Fold one lag sample into ``loop_lag_stats``; True if it was a stall."""
+    lag_ms = max(lag_seconds, 0.0) * 1000
+    loop_lag_stats["samples"] += 1
+    loop_lag_stats["last_ms"] = lag_ms
+    loop_lag_stats["max_ms"] = max(loop_lag_stats["max_ms"], lag_ms)
+    if lag_seconds >= threshold:
+        loop_lag_stats["stalls"] += 1
+        logger.warning("[Bot] Event loop stalled for %.0f ms", lag_ms)
+        return True
+    return False
+
+
+async def monitor_event_loop_lag(interval=LAG_SAMPLE_INTERVAL, threshold=LAG_WARN_THRESHOLD):
+    """Sleep ``interval`` repeatedly and record how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        record_loop_lag(loop.time() - start - interval, threshold)
+
+
+_lag_task = None
+
+
+def start_loop_lag_monitor():
+    """Start the lag monitor on the running loop (once; safe on reconnects)."""
+    global _lag_task
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.get_running_loop().create_task(monitor_event_loop_lag())
+    return _lag_task
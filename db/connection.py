@@ -3,15 +3,18 @@ import sqlite3
 import psycopg2
 from flask import g
 
+from db.instrumented import sqlite_connect_kwargs, postgres_connect_kwargs
+
 DATABASE_URL = os.getenv('DATABASE_URL')
 db_type = 'postgresql' if DATABASE_URL else 'sqlite'
 
 def get_db():
     if 'db' not in g:
         if db_type == 'postgresql':
-            g.db = psycopg2.connect(DATABASE_URL, sslmode='require')
+            g.db = psycopg2.connect(DATABASE_URL, sslmode='require', **postgres_connect_kwargs())
         else:
-            g.db = sqlite3.connect('local.db', detect_types=sqlite3.PARSE_DECLTYPES)
+            g.db = sqlite3.connect('local.db', detect_types=sqlite3.PARSE_DECLTYPES,
+                                   **sqlite_connect_kwargs())
             g.db.row_factory = sqlite3.Row
     return g.db
 
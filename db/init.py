@@ -4,41 +4,41 @@ import psycopg2
 import sqlite3
 from config import DATABASE_URL
 from utils.helpers import prepare_query
+from db.instrumented import sqlite_connect_kwargs, postgres_connect_kwargs
 
 
 def get_db_connection():
     """Create and return a database connection based on environment."""
     if DATABASE_URL:
         # On Heroku/Azure, use PostgreSQL
-        conn = psycopg2.connect(DATABASE_URL, sslmode='require')
+        conn = psycopg2.connect(DATABASE_URL, sslmode='require', **postgres_connect_kwargs())
         db_type = 'postgresql'
     else:
         # Locally, use SQLite
-        conn = sqlite3.connect('local.db', check_same_thread=False)
+        conn = sqlite3.connect('local.db', check_same_thread=False, **sqlite_connect_kwargs())
         db_type = 'sqlite'
     
     return conn, db_type
 
 
 def get_bot_db(bot):
-    """Get a working (conn, cursor) pair for bot commands.
+    """Get a (conn, cursor) pair on the bot's shared connection.
 
-    Creates a fresh cursor from the current connection.
-    If the connection is dead, reconnects automatically.
+    Slash commands use ``db.bot_db.run_db`` instead; this stays for legacy
+    callers.  No health probe is issued -- if the connection is already
+    closed a new one is opened.
     """
+    if getattr(bot.db_conn, 'closed', 0):
+        bot.db_conn, bot.db_type = get_db_connection()
     try:
-        cursor = bot.db_conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.fetchone()
-        return bot.db_conn, cursor
+        return bot.db_conn, bot.db_conn.cursor()
     except Exception:
         try:
             bot.db_conn.close()
         except Exception:
             pass
         bot.db_conn, bot.db_type = get_db_connection()
-        cursor = bot.db_conn.cursor()
-        return bot.db_conn, cursor
+        return bot.db_conn, bot.db_conn.cursor()
 
 
 def initialize_database(conn, db_type):
@@ -161,6 +161,23 @@ def initialize_database(conn, db_type):
     '''))
     conn.commit()
 
+    # Frozen final standings for CLOSED contests whose FastBreak finished
+    cursor.execute(prepare_query('''
+        CREATE TABLE IF NOT EXISTS fastbreak_contest_standings (
+            contest_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            wallet TEXT,
+            prediction TEXT,
+            rank INTEGER,
+            points INTEGER,
+            lineup TEXT,
+            created_at TEXT,
+            frozen_at BIGINT,
+            PRIMARY KEY (contest_id, position)
+        )
+    '''))
+    conn.commit()
+
     # Create fastbreaks table
     cursor.execute(prepare_query('''
         CREATE TABLE IF NOT EXISTS fastbreaks (
@@ -462,6 +479,187 @@ def initialize_database(conn, db_type):
     '''))
     conn.commit()
 
+    # Migration: set flowId drives gift scoring rules
+    try:
+        cursor.execute(prepare_query(
+            "ALTER TABLE moment_metadata ADD COLUMN set_flow_id INTEGER"
+        ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+    # ── Swapfest gift scoring rules (NULL column = matches anything) ──
+    cursor.execute(prepare_query(f'''
+        CREATE TABLE IF NOT EXISTS gift_scoring_rules (
+            id {serial_pk},
+            set_flow_id INTEGER,
+            tier TEXT,
+            player_name TEXT,
+            points INTEGER NOT NULL,
+            note TEXT
+        )
+    '''))
+    conn.commit()
+    try:
+        from utils.gift_scoring import seed_default_scoring_rules
+        seed_default_scoring_rules(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+    # ── Treasury inventory index (buy page) ──
+    cursor.execute(prepare_query('''
+        CREATE TABLE IF NOT EXISTS treasury_inventory (
+            moment_id BIGINT PRIMARY KEY,
+            play_id INTEGER,
+            set_name TEXT,
+            serial_number INTEGER,
+            subedition INTEGER DEFAULT 0,
+            is_locked INTEGER DEFAULT 0,
+            edition_id TEXT,
+            tier TEXT,
+            edition_set_name TEXT,
+            series_number INTEGER,
+            play_headline TEXT,
+            team TEXT,
+            image_url TEXT,
+            updated_at BIGINT
+        )
+    '''))
+    cursor.execute(prepare_query('''
+        CREATE INDEX IF NOT EXISTS idx_treasury_inventory_tier_set
+            ON treasury_inventory(tier, edition_set_name)
+    '''))
+    conn.commit()
+
+    # ── Chain event log (bot/event_bus.py) ──
+    cursor.execute(prepare_query('''
+        CREATE TABLE IF NOT EXISTS chain_events (
+            block_height BIGINT NOT NULL,
+            block_timestamp TEXT,
+            transaction_id TEXT NOT NULL,
+            transaction_index INTEGER NOT NULL,
+            event_index INTEGER NOT NULL,
+            event_type TEXT NOT NULL,
+            fields TEXT NOT NULL,
+            PRIMARY KEY (transaction_id, event_index)
+        )
+    '''))
+    cursor.execute(prepare_query('''
+        CREATE INDEX IF NOT EXISTS idx_chain_events_type_height
+            ON chain_events(event_type, block_height)
+    '''))
+    conn.commit()
+
+    # ── Recorded sweepstakes draws (utils/sweepstakes.py) ──
+    cursor.execute(prepare_query(f'''
+        CREATE TABLE IF NOT EXISTS sweepstakes_draws (
+            id {serial_pk},
+            source TEXT NOT NULL,
+            since TEXT,
+            until TEXT,
+            seed TEXT NOT NULL,
+            num_winners INTEGER NOT NULL,
+            with_replacement INTEGER NOT NULL DEFAULT 0,
+            num_wallets INTEGER NOT NULL,
+            total_entries BIGINT NOT NULL,
+            entries_digest TEXT NOT NULL,
+            winners TEXT NOT NULL,
+            created_by TEXT,
+            created_at BIGINT NOT NULL
+        )
+    '''))
+    conn.commit()
+
+    # ── Sealed transaction verifications (bot/tx_verifier.py) ──
+    cursor.execute(prepare_query('''
+        CREATE TABLE IF NOT EXISTS tx_verifications (
+            tx_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            chain_status TEXT,
+            proposer TEXT,
+            error_message TEXT,
+            events TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            registered_at BIGINT NOT NULL,
+            next_check_at BIGINT NOT NULL,
+            sealed_at BIGINT
+        )
+    '''))
+    cursor.execute(prepare_query('''
+        CREATE INDEX IF NOT EXISTS idx_tx_verifications_due
+            ON tx_verifications(status, next_check_at)
+    '''))
+    conn.commit()
+
+    # ── Batched treasury disbursements (bot/disbursements.py) ──
+    cursor.execute(prepare_query(f'''
+        CREATE TABLE IF NOT EXISTS payout_batches (
+            id {serial_pk},
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            tx_id TEXT,
+            proposal_seq BIGINT,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            created_at BIGINT NOT NULL,
+            submitted_at BIGINT,
+            sealed_at BIGINT
+        )
+    '''))
+    cursor.execute(prepare_query(f'''
+        CREATE TABLE IF NOT EXISTS payouts (
+            id {serial_pk},
+            idempotency_key TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            amount TEXT,
+            moment_ids TEXT,
+            source TEXT,
+            source_ref TEXT,
+            status TEXT NOT NULL,
+            batch_id INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            created_at BIGINT NOT NULL,
+            updated_at BIGINT NOT NULL,
+            solo INTEGER NOT NULL DEFAULT 0
+        )
+    '''))
+    conn.commit()
+
+    # Migration: add solo column to payouts (lines retried one per transaction)
+    try:
+        cursor.execute(prepare_query(
+            "ALTER TABLE payouts ADD COLUMN solo INTEGER NOT NULL DEFAULT 0"
+        ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+    cursor.execute(prepare_query('''
+        CREATE INDEX IF NOT EXISTS idx_payouts_status
+            ON payouts(status, kind, id)
+    '''))
+    cursor.execute(prepare_query('''
+        CREATE INDEX IF NOT EXISTS idx_payouts_batch
+            ON payouts(batch_id)
+    '''))
+    conn.commit()
+
+    # ── Swapboost NFT holders index (NFT page) ──
+    cursor.execute(prepare_query('''
+        CREATE TABLE IF NOT EXISTS swapboost_holders (
+            nft_id BIGINT PRIMARY KEY,
+            name TEXT,
+            thumbnail TEXT,
+            owner TEXT NOT NULL,
+            dapper TEXT,
+            updated_at BIGINT
+        )
+    '''))
+    conn.commit()
+
     # ── One-time seed: populate jokic_editions if empty ──
     try:
         cursor.execute(prepare_query("SELECT COUNT(*) FROM jokic_editions"))
@@ -0,0 +1,89 @@
+"""Connection/cursor classes that time every SQL statement.
+
+Passed as ``factory=`` to ``sqlite3.connect`` and ``cursor_factory=`` to
+``psycopg2.connect`` so existing ``conn.cursor()`` / ``cursor.execute``
+call sites are measured without changes.  Durations land in the
+``jokic_db_query_duration_seconds`` histogram (``utils.metrics``), and
+statements slower than ``SLOW_QUERY_MS`` go to the slow-query log
+(``db.slow_queries``).  With both off, plain connections are used.
+"""
+
+import sqlite3
+import time
+
+import psycopg2.extensions
+
+from config import SLOW_QUERY_MS, SQLITE_STATEMENT_CACHE
+from db import slow_queries
+from utils.metrics import METRICS_ENABLED, observe_query
+
+_SLOW_SECONDS = SLOW_QUERY_MS / 1000 if SLOW_QUERY_MS > 0 else float("inf")
+
+
+def _timed(cursor, db_type, run, sql, params):
+    start = time.perf_counter()
+    try:
+        result = run(sql, params)
+    except Exception:
+        if METRICS_ENABLED:
+            observe_query(sql, time.perf_counter() - start)
+        raise
+    elapsed = time.perf_counter() - start
+    if METRICS_ENABLED:
+        observe_query(sql, elapsed)
+    if elapsed >= _SLOW_SECONDS:
+        slow_queries.record(cursor.connection, db_type, sql, params, elapsed)
+    return result
+
+
+def _first_params(seq_of_parameters):
+    # executemany is explained with its first parameter set, when it has one
+    return seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else None
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=(), /):
+        return _timed(self, "sqlite", super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return _timed(self, "sqlite", lambda q, _: super(SQLiteCursor, self).executemany(q, seq_of_parameters),
+                      sql, _first_params(seq_of_parameters))
+
+
+class SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts below bypass Cursor.execute, so route them through ours
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class PostgresCursor(psycopg2.extensions.cursor):
+    def execute(self, query, vars=None):
+        return _timed(self, "postgresql", super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return _timed(self, "postgresql", lambda q, _: super(PostgresCursor, self).executemany(q, vars_list),
+                      query, _first_params(vars_list))
+
+
+def _enabled():
+    return METRICS_ENABLED or SLOW_QUERY_MS > 0
+
+
+def sqlite_connect_kwargs():
+    """Extra ``sqlite3.connect`` arguments: statement cache size and, when
+    metrics or the slow log are on, the timing connection class."""
+    kwargs = {"cached_statements": SQLITE_STATEMENT_CACHE}
+    if _enabled():
+        kwargs["factory"] = SQLiteConnection
+    return kwargs
+
+
+def postgres_connect_kwargs():
+    """Extra ``psycopg2.connect`` arguments (none when metrics and the slow log are off)."""
+    return {"cursor_factory": PostgresCursor} if _enabled() else {}
@@ -0,0 +1,148 @@
+"""Slow-query log with one captured ``EXPLAIN`` plan per statement shape.
+
+Enabled by ``SLOW_QUERY_MS``: the instrumented cursors (``db.instrumented``)
+hand every statement that ran at least that long to ``record``.  Statements
+are grouped by a normalized fingerprint (literals, placeholders and
+``IN``/``VALUES`` lists collapsed), so ``WHERE id = 3`` and ``WHERE id = 4``
+share one entry.  The first time a fingerprint turns up slow its plan is
+captured with ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite) on the same
+connection and parameters; later occurrences only update the counters.
+
+``top_slow_queries`` backs ``GET /api/admin/slow-queries``.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_FINGERPRINTS = 500       # distinct statement shapes kept in memory
+_SAMPLE_SQL_CHARS = 2000     # stored example statement, truncated
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "EXECUTE")
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s|\$\d+|\?")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS_RE = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE_RE = re.compile(r"\s+")
+
+_fingerprint_cache = {}
+_stats = {}      # fingerprint -> entry dict
+_lock = threading.Lock()
+
+
+def normalize(sql):
+    """Statement text with literals and parameter lists replaced by markers."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _LIST_RE.sub("(...)", text)
+    text = _ROWS_RE.sub("(...)", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint(sql):
+    """``(fingerprint id, normalized text)`` for a statement (cached per text)."""
+    cached = _fingerprint_cache.get(sql)
+    if cached is not None:
+        return cached
+    normalized = normalize(sql)
+    result = (hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized)
+    if isinstance(sql, str) and len(_fingerprint_cache) < MAX_FINGERPRINTS * 4:
+        _fingerprint_cache[sql] = result
+    return result
+
+
+def _explain(conn, db_type, sql, params):
+    """Plan lines for ``sql`` run on ``conn``; never raises."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    if sql.lstrip().split(None, 1)[0].upper() not in _EXPLAINABLE:
+        return None
+    try:
+        if db_type == "postgresql":
+            import psycopg2.extensions
+            # A plain cursor so the EXPLAIN itself is not timed or logged
+            cur = psycopg2.extensions.cursor(conn)
+            in_transaction = not conn.autocommit
+            if in_transaction:
+                cur.execute("SAVEPOINT slow_query_explain")
+            try:
+                cur.execute("EXPLAIN " + sql, params or None)
+                plan = [row[0] for row in cur.fetchall()]
+            except Exception:
+                if in_transaction:
+                    cur.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                raise
+            if in_transaction:
+                cur.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        cur = sqlite3.Cursor(conn)
+        cur.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+        return [row[-1] for row in cur.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+
+
+def record(conn, db_type, sql, params, seconds):
+    """Log one slow statement, capturing its plan the first time its shape is seen."""
+    fp, normalized = fingerprint(sql)
+    elapsed_ms = seconds * 1000
+    with _lock:
+        entry = _stats.get(fp)
+        if entry is None and len(_stats) >= MAX_FINGERPRINTS:
+            return
+        first = entry is None
+        if first:
+            entry = _stats[fp] = {
+                "fingerprint": fp,
+                "query": normalized,
+                "sample": (sql.decode("utf-8", "replace") if isinstance(sql, (bytes, bytearray))
+                           else sql)[:_SAMPLE_SQL_CHARS],
+                "db_type": db_type,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_seen": None,
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["last_seen"] = int(time.time())
+
+    if first:
+        plan = _explain(conn, db_type, sql, params)
+        with _lock:
+            entry["plan"] = plan
+        logger.warning("[SlowQuery] %.1f ms [%s] %s\n  plan: %s",
+                       elapsed_ms, fp, normalized, " | ".join(plan or ["n/a"]))
+    else:
+        logger.warning("[SlowQuery] %.1f ms [%s] %s", elapsed_ms, fp, normalized)
+
+
+def top_slow_queries(limit=20, order="total_ms"):
+    """Slow fingerprints, worst first by ``total_ms``, ``max_ms`` or ``count``."""
+    if order not in ("total_ms", "max_ms", "count"):
+        raise ValueError(f"Unknown order {order!r}")
+    with _lock:
+        entries = [dict(e) for e in _stats.values()]
+    for e in entries:
+        e["avg_ms"] = e["total_ms"] / e["count"] if e["count"] else 0.0
+    entries.sort(key=lambda e: e[order], reverse=True)
+    return entries[:limit]
+
+
+def reset():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,128 @@
+"""Registry of hot SQL statements, server-side prepared on PostgreSQL.
+
+Statements are written once in the SQLite ``?`` style and registered under
+a name next to the code that runs them::
+
+    _LEADERBOARD = register("swapfest_leaderboard", "SELECT ... WHERE ts < ?")
+    ...
+    execute(cursor, _LEADERBOARD, params)
+
+On SQLite ``execute`` is a plain ``cursor.execute`` (the connection's
+statement cache, sized by ``SQLITE_STATEMENT_CACHE``, keeps the compiled
+statement).  On PostgreSQL a connection that has run a statement
+``POSTGRES_PREPARE_THRESHOLD`` times ``PREPARE``s it, and later runs on that
+connection send ``EXECUTE name (...)`` so the server skips parsing and
+planning.  Preparing costs a round trip, which is why one-off statements on
+short-lived connections are left alone.  A statement the server refuses to
+prepare falls back to plain execution for the rest of the process.
+"""
+
+import logging
+import threading
+import weakref
+
+import psycopg2
+import psycopg2.extensions
+
+from config import POSTGRES_PREPARE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_unpreparable = set()
+_connections = weakref.WeakKeyDictionary()   # connection -> (run counts, prepared names)
+_lock = threading.Lock()
+
+
+class Statement:
+    """One registered statement and its precomputed PostgreSQL forms."""
+
+    __slots__ = ("name", "sql", "pg_sql", "param_count", "prepare_sql", "execute_sql")
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.pg_sql = sql.replace("?", "%s")
+        parts = sql.split("?")
+        self.param_count = len(parts) - 1
+        numbered = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], start=1))
+        server_name = f"jg_{name}"
+        self.prepare_sql = f"PREPARE {server_name} AS {numbered}"
+        args = ", ".join(["%s"] * self.param_count)
+        self.execute_sql = f"EXECUTE {server_name} ({args})" if args else f"EXECUTE {server_name}"
+
+    def __repr__(self):
+        return f"<Statement {self.name}>"
+
+
+def register(name, sql):
+    """Register a hot statement; ``name`` must be a unique identifier."""
+    if not name.isidentifier():
+        raise ValueError(f"Statement name {name!r} is not an identifier")
+    with _lock:
+        existing = _registry.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Statement {name!r} is already registered with different SQL")
+            return existing
+        statement = _registry[name] = Statement(name, sql)
+    return statement
+
+
+def registered():
+    """``{name: Statement}`` of every registered statement."""
+    with _lock:
+        return dict(_registry)
+
+
+def _prepare(cursor, statement):
+    conn = cursor.connection
+    # A failed PREPARE aborts the transaction, so fence it off
+    savepoint = not conn.autocommit
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT jg_prepare")
+        cursor.execute(statement.prepare_sql)
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT jg_prepare")
+        return True
+    except psycopg2.Error as e:
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT jg_prepare")
+        _unpreparable.add(statement.name)
+        logger.warning("[Statements] Could not prepare %s, executing it unprepared: %s",
+                       statement.name, e)
+        return False
+
+
+def execute(cursor, statement, params=()):
+    """Run a registered statement on ``cursor`` (SQLite or PostgreSQL)."""
+    if not isinstance(cursor, psycopg2.extensions.cursor):
+        cursor.execute(statement.sql, params)
+        return
+
+    if POSTGRES_PREPARE_THRESHOLD <= 0 or statement.name in _unpreparable:
+        cursor.execute(statement.pg_sql, params)
+        return
+
+    conn = cursor.connection
+    with _lock:
+        state = _connections.get(conn)
+        if state is None:
+            state = _connections[conn] = ({}, set())
+    counts, prepared = state
+
+    if statement.name not in prepared:
+        counts[statement.name] = counts.get(statement.name, 0) + 1
+        if counts[statement.name] < POSTGRES_PREPARE_THRESHOLD or not _prepare(cursor, statement):
+            cursor.execute(statement.pg_sql, params)
+            return
+        prepared.add(statement.name)
+    cursor.execute(statement.execute_sql, params)
+
+
+def prepared_on(conn):
+    """Names of the statements currently prepared on ``conn``."""
+    with _lock:
+        state = _connections.get(conn)
+    return set(state[1]) if state else set()
@@ -22,6 +22,12 @@ Usage:
   # Send all moments to the Dapper wallet (batch size 2)
   python evm_topshot_migrate.py --send --batch-size 2
 
+  # Resumable, pipelined migration over proposal keys 1-3 (checkpoint file)
+  python evm_topshot_migrate.py --migrate --keys 1,2,3 --max-batch-size 20
+
+  # Throughput estimate for the remaining tokens, nothing sent
+  python evm_topshot_migrate.py --migrate --estimate
+
 Requirements:
   pip install requests flow_py_sdk python-dotenv
 """
@@ -33,6 +39,7 @@ import math
 import os
 import sys
 import time
+from collections import deque
 
 import requests
 from dotenv import load_dotenv
@@ -62,9 +69,13 @@ FLOW_SIGNER_KEY_INDEX = int(os.getenv("FLOW_SWAP_KEY_INDEX", "1"))
 # Blockscout API for Flow EVM
 BLOCKSCOUT_API = "https://evm.flowscan.io/api/v2"
 
-# Flow Access Node (gRPC)
+# Flow Access Node (gRPC) and REST API
 FLOW_ACCESS_HOST = "access.mainnet.nodes.onflow.org"
 FLOW_ACCESS_PORT = 9000
+FLOW_REST_API = os.getenv("FLOW_REST_URL", "https://rest-mainnet.onflow.org/v1")
+
+# Computation limit of every bridge transaction
+BRIDGE_GAS_LIMIT = 9999
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -335,41 +346,67 @@ access(all) fun mustCall(
 """
 
 
-async def send_batch(token_ids: list[int], child_address: str) -> str:
-    """
-    Sign and send a Cadence transaction that:
-      1. Unwraps NFTs from wrapper (0x84c6a2) to NBAT (0x50AB3a) if needed
-      2. Bridges each NFT from EVM to Cadence via coa.withdrawNFT()
-      3. Deposits the TopShot.NFT resources into the child account's collection
-
-    Returns the sealed Flow transaction ID.
-    """
-    from flow_py_sdk import (
-        flow_client, Tx, ProposalKey, InMemorySigner, SignAlgo,
-    )
+def _signer():
+    from flow_py_sdk import InMemorySigner, SignAlgo
     from flow_py_sdk.signer import HashAlgo
-    from flow_py_sdk.cadence import Address, String, Array, UInt256
 
     if not FLOW_SIGNER_PRIVATE_KEY:
         raise RuntimeError(
             "FLOW_SWAP_PRIVATE_KEY env var is not set. "
             "Cannot sign transactions without the private key."
         )
-
-    signer_addr = Address.from_hex(FLOW_SIGNER_ADDRESS.removeprefix("0x"))
-    child_addr_value = Address.from_hex(child_address.removeprefix("0x"))
-
-    signer = InMemorySigner(
+    return InMemorySigner(
         hash_algo=HashAlgo.SHA3_256,
         sign_algo=SignAlgo.ECDSA_P256,
         private_key_hex=FLOW_SIGNER_PRIVATE_KEY,
     )
 
-    # Build arguments: nftIdentifier (String), child (Address), ids ([UInt256])
+
+def build_bridge_tx(token_ids: list[int], child_address: str, reference_block_id,
+                    key_index: int, seq_number: int):
+    """Signed bridge transaction for ``token_ids``, proposed by ``key_index``."""
+    from flow_py_sdk import Tx, ProposalKey
+    from flow_py_sdk.cadence import Address, String, Array, UInt256
+
+    signer_addr = Address.from_hex(FLOW_SIGNER_ADDRESS.removeprefix("0x"))
+
+    # Arguments: nftIdentifier (String), child (Address), ids ([UInt256])
     arg_identifier = String(NFT_IDENTIFIER)
-    arg_child = child_addr_value
+    arg_child = Address.from_hex(child_address.removeprefix("0x"))
     arg_ids = Array([UInt256(tid) for tid in token_ids])
 
+    return (
+        Tx(
+            code=CADENCE_BRIDGE_TX,
+            reference_block_id=reference_block_id,
+            payer=signer_addr,
+            proposal_key=ProposalKey(
+                key_address=signer_addr,
+                key_id=key_index,
+                key_sequence_number=seq_number,
+            ),
+        )
+        .add_arguments(arg_identifier, arg_child, arg_ids)
+        .add_authorizers(signer_addr)
+        .with_gas_limit(BRIDGE_GAS_LIMIT)
+        .with_envelope_signature(signer_addr, key_index, _signer())
+    )
+
+
+async def send_batch(token_ids: list[int], child_address: str) -> str:
+    """
+    Sign and send a Cadence transaction that:
+      1. Unwraps NFTs from wrapper (0x84c6a2) to NBAT (0x50AB3a) if needed
+      2. Bridges each NFT from EVM to Cadence via coa.withdrawNFT()
+      3. Deposits the TopShot.NFT resources into the child account's collection
+
+    Returns the sealed Flow transaction ID.
+    """
+    from flow_py_sdk import flow_client
+    from flow_py_sdk.cadence import Address
+
+    signer_addr = Address.from_hex(FLOW_SIGNER_ADDRESS.removeprefix("0x"))
+
     async with flow_client(
         host=FLOW_ACCESS_HOST,
         port=FLOW_ACCESS_PORT,
@@ -378,24 +415,8 @@ async def send_batch(token_ids: list[int], child_address: str) -> str:
         account = await client.get_account(address=signer_addr.bytes)
         seq_number = account.keys[FLOW_SIGNER_KEY_INDEX].sequence_number
 
-        tx = (
-            Tx(
-                code=CADENCE_BRIDGE_TX,
-                reference_block_id=block.id,
-                payer=signer_addr,
-                proposal_key=ProposalKey(
-                    key_address=signer_addr,
-                    key_id=FLOW_SIGNER_KEY_INDEX,
-                    key_sequence_number=seq_number,
-                ),
-            )
-            .add_arguments(arg_identifier, arg_child, arg_ids)
-            .add_authorizers(signer_addr)
-            .with_gas_limit(9999)
-            .with_envelope_signature(
-                signer_addr, FLOW_SIGNER_KEY_INDEX, signer
-            )
-        )
+        tx = build_bridge_tx(token_ids, child_address, block.id,
+                             FLOW_SIGNER_KEY_INDEX, seq_number)
 
         response = await client.send_transaction(transaction=tx.to_signed_grpc())
         tx_id = response.id.hex()
@@ -461,6 +482,328 @@ def run_send(nfts: list[dict], child_address: str, batch_size: int):
     print("\U0001f389  All transfers complete!")
 
 
+# ═══════════════════════════════════════════════════════════════════
+#  STEP 3: Pipelined, resumable migration (--migrate)
+# ═══════════════════════════════════════════════════════════════════
+#
+# One lane per proposal key keeps a batch in flight on every key at once
+# (a key's sequence number only allows one pending transaction at a time).
+# Every submitted and sealed batch is checkpointed in a local JSON state
+# file, so a re-run skips bridged tokens, resolves the transactions that
+# were in flight when it stopped and reuses the cached token listing.
+# Batch sizes follow the computation reported for sealed batches.
+
+DEFAULT_STATE_FILE = "evm_migrate_state.json"
+MIGRATE_KEY_INDEXES = os.getenv("FLOW_MIGRATE_KEY_INDEXES", str(FLOW_SIGNER_KEY_INDEX))
+
+TARGET_GAS_UTILIZATION = 0.7   # aim batches at 70% of BRIDGE_GAS_LIMIT
+MAX_TOKEN_ATTEMPTS = 3         # solo attempts before a token is recorded as failed
+SEAL_TIMEOUT = 180             # seconds to wait for one batch to seal
+SEAL_POLL_INTERVAL = 1.5
+DEFAULT_SEAL_SECONDS = 12.0    # estimate until real batches have been timed
+
+
+class MigrationState:
+    """Checkpoint file: cached listing, bridged / failed tokens, in-flight batches."""
+
+    def __init__(self, path: str, data: dict | None = None):
+        self.path = path
+        data = data or {}
+        self.source_coa = data.get("source_coa")
+        self.child_address = data.get("child_address")
+        self.tokens: list[int] = [int(t) for t in data.get("tokens", [])]
+        self.completed: dict[str, str] = data.get("completed", {})    # token_id -> tx_id
+        self.failed: dict[str, str] = data.get("failed", {})          # token_id -> error
+        self.in_flight: dict[str, dict] = data.get("in_flight", {})   # tx_id -> {ids, key, submitted_at}
+        self.stats: dict = {"txs": 0, "tokens": 0, "seal_seconds": 0.0, "computation": 0,
+                            "metered_tokens": 0, **data.get("stats", {})}
+
+    @classmethod
+    def load(cls, path: str) -> "MigrationState":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as f:
+            return cls(path, json.load(f))
+
+    def save(self):
+        """Write atomically so a crash never leaves a half-written checkpoint."""
+        data = {
+            "source_coa": self.source_coa,
+            "child_address": self.child_address,
+            "tokens": self.tokens,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "stats": self.stats,
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def set_tokens(self, token_ids):
+        """Merge a fresh listing into the cached one."""
+        self.tokens = sorted(set(self.tokens) | {int(t) for t in token_ids})
+
+    def remaining(self) -> list[int]:
+        busy = {int(t) for batch in self.in_flight.values() for t in batch["ids"]}
+        return [t for t in self.tokens
+                if str(t) not in self.completed and str(t) not in self.failed and t not in busy]
+
+    def submitted(self, tx_id: str, token_ids: list[int], key_index: int):
+        self.in_flight[tx_id] = {"ids": token_ids, "key": key_index, "submitted_at": time.time()}
+        self.save()
+
+    def sealed(self, tx_id: str, computation: int | None = None):
+        batch = self.in_flight.pop(tx_id)
+        for t in batch["ids"]:
+            self.completed[str(t)] = tx_id
+        self.stats["txs"] += 1
+        self.stats["tokens"] += len(batch["ids"])
+        self.stats["seal_seconds"] += time.time() - batch["submitted_at"]
+        if computation:
+            self.stats["computation"] += computation
+            self.stats["metered_tokens"] += len(batch["ids"])
+        self.save()
+
+    def released(self, tx_id: str) -> list[int]:
+        batch = self.in_flight.pop(tx_id)
+        self.save()
+        return batch["ids"]
+
+    def give_up(self, token_id: int, error: str):
+        self.failed[str(token_id)] = error[:300]
+        self.save()
+
+    def avg_seal_seconds(self) -> float:
+        return self.stats["seal_seconds"] / self.stats["txs"] if self.stats["txs"] else DEFAULT_SEAL_SECONDS
+
+    def computation_per_token(self) -> float | None:
+        if not self.stats["metered_tokens"]:
+            return None
+        return self.stats["computation"] / self.stats["metered_tokens"]
+
+
+def is_gas_limit_error(error: str) -> bool:
+    text = (error or "").lower()
+    return "computation" in text and ("limit" in text or "exceed" in text)
+
+
+class AdaptiveBatchSizer:
+    """Batch size from observed computation per token, halved on gas-limit failures."""
+
+    def __init__(self, initial: int, maximum: int, gas_limit: int = BRIDGE_GAS_LIMIT,
+                 utilization: float = TARGET_GAS_UTILIZATION, per_token: float | None = None):
+        self.maximum = max(1, maximum)
+        self.target = gas_limit * utilization
+        self.per_token = per_token
+        self.size = max(1, min(initial, self.maximum))
+        if per_token:
+            self.size = self._fit(per_token)
+
+    def _fit(self, per_token: float) -> int:
+        return max(1, min(self.maximum, int(self.target // max(per_token, 1))))
+
+    def record_success(self, batch_size: int, computation: int | None):
+        if not computation:
+            return
+        observed = computation / batch_size
+        # Smooth across batches: unwrap/bridge cost varies by token
+        self.per_token = observed if self.per_token is None else 0.7 * self.per_token + 0.3 * observed
+        # Grow at most 2x per sealed batch; shrink immediately
+        self.size = min(self._fit(self.per_token), self.size * 2)
+
+    def record_gas_failure(self, batch_size: int):
+        self.size = max(1, batch_size // 2)
+
+
+class WorkQueue:
+    """Tokens still to bridge; tokens from failed batches are retried one per tx."""
+
+    def __init__(self, token_ids):
+        self.pending = deque(token_ids)
+        self.solo = deque()
+        self.attempts: dict[int, int] = {}
+
+    def __bool__(self):
+        return bool(self.pending or self.solo)
+
+    def take(self, size: int) -> list[int]:
+        if self.solo:
+            return [self.solo.popleft()]
+        return [self.pending.popleft() for _ in range(min(size, len(self.pending)))]
+
+    def put_back(self, token_ids):
+        self.pending.extendleft(reversed(token_ids))
+
+    def isolate(self, token_ids):
+        self.solo.extend(token_ids)
+
+    def retry_solo(self, token_id: int) -> bool:
+        """Count a solo failure; False once the token is out of attempts."""
+        self.attempts[token_id] = self.attempts.get(token_id, 0) + 1
+        if self.attempts[token_id] >= MAX_TOKEN_ATTEMPTS:
+            return False
+        self.solo.append(token_id)
+        return True
+
+
+def fetch_tx_result(tx_id: str) -> dict:
+    """REST ``transaction_results`` (status, error_message, computation_used)."""
+    resp = requests.get(f"{FLOW_REST_API}/transaction_results/{tx_id}", timeout=15)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def wait_for_result(tx_id: str, timeout: float = SEAL_TIMEOUT) -> dict | None:
+    """Poll until SEALED/EXPIRED; None if still pending after ``timeout``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = await asyncio.to_thread(fetch_tx_result, tx_id)
+        except requests.RequestException:
+            result = {}
+        if (result.get("status") or "").upper() in ("SEALED", "EXPIRED"):
+            return result
+        await asyncio.sleep(SEAL_POLL_INTERVAL)
+    return None
+
+
+def _result_error(result: dict) -> str | None:
+    if (result.get("status") or "").upper() == "EXPIRED":
+        return result.get("error_message") or "Transaction expired"
+    return result.get("error_message") or None
+
+
+def settle_batch(state: MigrationState, queue: WorkQueue, sizer: AdaptiveBatchSizer,
+                 tx_id: str, result: dict | None):
+    """Apply one batch outcome to the checkpoint, the queue and the sizer."""
+    if result is None:
+        # Unknown outcome: leave it in flight; the next run resolves it
+        print(f"    ⏳ {tx_id[:12]}… still pending, left in the state file")
+        return
+    error = _result_error(result)
+    if not error:
+        computation = int(result.get("computation_used") or 0) or None
+        sizer.record_success(len(state.in_flight[tx_id]["ids"]), computation)
+        state.sealed(tx_id, computation)
+        return
+
+    token_ids = state.released(tx_id)
+    if is_gas_limit_error(error) and len(token_ids) > 1:
+        sizer.record_gas_failure(len(token_ids))
+        queue.put_back(token_ids)
+        print(f"    ⚠️  {tx_id[:12]}… hit the gas limit; batch size → {sizer.size}")
+    elif len(token_ids) > 1:
+        queue.isolate(token_ids)
+        print(f"    ⚠️  {tx_id[:12]}… failed; retrying its {len(token_ids)} tokens one per tx")
+    elif not queue.retry_solo(token_ids[0]):
+        state.give_up(token_ids[0], error)
+        print(f"    ❌ Token {token_ids[0]} failed {MAX_TOKEN_ATTEMPTS}x: {error[:120]}")
+
+
+async def resolve_in_flight(state: MigrationState, queue: WorkQueue, sizer: AdaptiveBatchSizer):
+    """Settle batches left in flight by a previous run before sending new ones."""
+    for tx_id in list(state.in_flight):
+        print(f"    \U0001f50e Resolving in-flight {tx_id[:12]}…")
+        settle_batch(state, queue, sizer, tx_id, await wait_for_result(tx_id))
+
+
+async def _bridge_lane(client, key_index: int, state: MigrationState, queue: WorkQueue,
+                       sizer: AdaptiveBatchSizer, child_address: str):
+    """Send, seal and checkpoint batches on one proposal key until the queue is empty."""
+    from flow_py_sdk.cadence import Address
+
+    signer_addr = Address.from_hex(FLOW_SIGNER_ADDRESS.removeprefix("0x"))
+    while queue:
+        token_ids = queue.take(sizer.size)
+        try:
+            block = await client.get_latest_block()
+            account = await client.get_account(address=signer_addr.bytes)
+            seq_number = account.keys[key_index].sequence_number
+            tx = build_bridge_tx(token_ids, child_address, block.id, key_index, seq_number)
+            response = await client.send_transaction(transaction=tx.to_signed_grpc())
+        except Exception as exc:
+            queue.put_back(token_ids)
+            print(f"    ❌ Key {key_index}: submit failed ({exc}); lane stopped")
+            return
+        tx_id = response.id.hex()
+        state.submitted(tx_id, token_ids, key_index)
+        print(f"    \U0001f4e4 Key {key_index}: {len(token_ids)} token(s) → {tx_id}")
+        settle_batch(state, queue, sizer, tx_id, await wait_for_result(tx_id))
+        if tx_id in state.in_flight:
+            return      # outcome unknown: don't reuse this key's sequence blindly
+
+
+async def migrate(state: MigrationState, child_address: str, key_indexes: list[int],
+                  sizer: AdaptiveBatchSizer):
+    from flow_py_sdk import flow_client
+
+    queue = WorkQueue([])
+    await resolve_in_flight(state, queue, sizer)
+    queue.put_back(state.remaining())
+    if not queue:
+        return
+    async with flow_client(host=FLOW_ACCESS_HOST, port=FLOW_ACCESS_PORT) as client:
+        await asyncio.gather(*(
+            _bridge_lane(client, k, state, queue, sizer, child_address) for k in key_indexes
+        ))
+
+
+def estimate_throughput(remaining: int, key_indexes: list[int], batch_size: int,
+                        seal_seconds: float) -> dict:
+    """Dry-run estimate for the pipelined migration vs. the sequential ``--send``."""
+    batches = math.ceil(remaining / batch_size) if remaining else 0
+    rounds = math.ceil(batches / len(key_indexes)) if batches else 0
+    seconds = rounds * seal_seconds
+    sequential = batches * (seal_seconds + 2)     # run_send sleeps 2 s between batches
+    return {
+        "tokens": remaining,
+        "batch_size": batch_size,
+        "batches": batches,
+        "keys": len(key_indexes),
+        "seconds": seconds,
+        "tokens_per_minute": remaining / seconds * 60 if seconds else 0.0,
+        "sequential_seconds": sequential,
+    }
+
+
+def run_migrate(state: MigrationState, child_address: str, key_indexes: list[int],
+                batch_size: int, max_batch_size: int, estimate_only: bool = False,
+                confirm=None):
+    """Print the plan and estimate, then (unless ``estimate_only``) run the migration."""
+    sizer = AdaptiveBatchSizer(batch_size, max_batch_size,
+                               per_token=state.computation_per_token())
+    remaining = state.remaining()
+    est = estimate_throughput(len(remaining), key_indexes, sizer.size, state.avg_seal_seconds())
+
+    print(f"\n  Migration state: {state.path}")
+    print(f"    Bridged: {len(state.completed)}  Failed: {len(state.failed)}  "
+          f"In flight: {sum(len(b['ids']) for b in state.in_flight.values())}  "
+          f"Remaining: {len(remaining)}")
+    print(f"    Keys: {', '.join(map(str, key_indexes))}  Batch size: {sizer.size} "
+          f"(max {sizer.maximum})  Seal time: {state.avg_seal_seconds():.1f}s"
+          f"{'' if state.stats['txs'] else ' (assumed)'}")
+    print(f"    Estimate: {est['batches']} batch(es), ~{est['seconds'] / 60:.1f} min "
+          f"({est['tokens_per_minute']:.0f} tokens/min) vs ~{est['sequential_seconds'] / 60:.1f} min "
+          f"sequential\n")
+    if estimate_only or not (remaining or state.in_flight):
+        return est
+    if confirm and not confirm():
+        print("    Aborted.")
+        return est
+
+    started = time.time()
+    asyncio.run(migrate(state, child_address, key_indexes, sizer))
+    elapsed = time.time() - started
+    left = len(state.remaining())
+    print(f"\n  Done in {elapsed:.0f}s: {len(state.completed)} bridged, {len(state.failed)} failed, "
+          f"{left} remaining, {len(state.in_flight)} batch(es) unresolved")
+    if left or state.in_flight:
+        print("  Re-run --migrate to continue from the checkpoint.")
+    return est
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  STEP 0 (optional): Resolve COA address from a Flow wallet
 # ═══════════════════════════════════════════════════════════════════
@@ -498,7 +841,7 @@ access(all) fun main(addr: Address): String {
     script_b64 = base64.b64encode(cadence_script.encode()).decode()
 
     resp = requests.post(
-        "https://rest-mainnet.onflow.org/v1/scripts",
+        f"{FLOW_REST_API}/scripts",
         json={"script": script_b64, "arguments": [arg_b64]},
         timeout=30,
     )
@@ -514,6 +857,31 @@ access(all) fun main(addr: Address): String {
 #  CLI
 # ═══════════════════════════════════════════════════════════════════
 
+def run_migrate_cli(args):
+    key_indexes = [int(k) for k in str(args.keys).split(",") if k.strip()]
+    state = MigrationState.load(args.state)
+    if state.source_coa and state.source_coa.lower() != args.source_coa.lower():
+        print(f"    ❌ {args.state} belongs to COA {state.source_coa}; use another --state file.")
+        sys.exit(1)
+    state.source_coa = args.source_coa
+    state.child_address = state.child_address or args.child_address
+
+    if args.relist or not state.tokens:
+        nfts = list_topshot_nfts(args.source_coa)
+        state.set_tokens(n["token_id"] for n in nfts)
+        state.save()
+    else:
+        print(f"\n  Using the cached listing in {args.state} ({len(state.tokens)} token(s); --relist to refresh)")
+
+    def confirm():
+        answer = input(f"    Bridge to {state.child_address}? Type 'yes' to proceed: ")
+        return answer.strip().lower() == "yes"
+
+    run_migrate(state, state.child_address, key_indexes, args.batch_size,
+                args.max_batch_size, estimate_only=args.estimate,
+                confirm=None if args.yes else confirm)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Bridge TopShot NFTs from Flow EVM back to Cadence (Dapper wallet)",
@@ -522,6 +890,7 @@ def main():
 Examples:
   python evm_topshot_migrate.py --list
   python evm_topshot_migrate.py --send --batch-size 2
+  python evm_topshot_migrate.py --migrate --keys 1,2,3 --estimate
   python evm_topshot_migrate.py --resolve-coa 0x6fd2465f3a22e34c
         """,
     )
@@ -529,6 +898,19 @@ Examples:
                         help="List all TopShot NFTs on the EVM side (read-only)")
     parser.add_argument("--send", action="store_true",
                         help="Bridge all TopShot NFTs to the child Dapper wallet")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Pipelined, resumable bridge with a checkpoint file")
+    parser.add_argument("--state", default=DEFAULT_STATE_FILE,
+                        help=f"Checkpoint file for --migrate (default: {DEFAULT_STATE_FILE})")
+    parser.add_argument("--keys", default=MIGRATE_KEY_INDEXES,
+                        help="Comma-separated proposal key indexes, one batch in flight per key "
+                             f"(default: {MIGRATE_KEY_INDEXES})")
+    parser.add_argument("--max-batch-size", type=int, default=20,
+                        help="Upper bound for adaptive batch sizes in --migrate (default: 20)")
+    parser.add_argument("--estimate", action="store_true",
+                        help="With --migrate: print the throughput estimate and exit")
+    parser.add_argument("--relist", action="store_true",
+                        help="With --migrate: re-list the COA even if the state file has a listing")
     parser.add_argument("--resolve-coa", metavar="FLOW_ADDR",
                         help="Resolve the COA EVM address for a given Flow wallet")
     parser.add_argument("--source-coa", default=DEFAULT_SOURCE_COA,
@@ -544,7 +926,7 @@ Examples:
 
     args = parser.parse_args()
 
-    if not any([args.list, args.send, args.resolve_coa]):
+    if not any([args.list, args.send, args.migrate, args.resolve_coa]):
         parser.print_help()
         sys.exit(0)
 
@@ -556,9 +938,14 @@ Examples:
             print(f"    COA EVM address: {coa}\n")
         else:
             print("    \u274c No COA found for this address.\n")
-        if not args.list and not args.send:
+        if not args.list and not args.send and not args.migrate:
             return
 
+    # -- Migrate (resumable) --
+    if args.migrate:
+        run_migrate_cli(args)
+        return
+
     # -- List --
     nfts = []
     if args.list or args.send:
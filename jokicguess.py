@@ -11,11 +11,17 @@ from flask import Flask
 from flask_cors import CORS
 
 import swapfest
-from config import DISCORD_TOKEN, FLASK_HOST, FLASK_PORT
+from config import DISCORD_TOKEN, FLASK_HOST, FLASK_PORT, SWAPFEST_GIFT_CONSUMER
 from db.init import get_db_connection, initialize_database
+from db.bot_db import start_loop_lag_monitor
 from routes.api import register_routes
 from bot.commands import register_commands
 from bot.bracket_poller import start_bracket_poller
+from bot.treasury_indexer import start_treasury_indexer
+from bot.swapboost_indexer import start_swapboost_indexer
+from bot.event_bus import start_event_bus
+from bot.tx_verifier import start_tx_verifier
+from bot.disbursements import start_disbursement_worker
 
 
 # Initialize Flask app
@@ -41,7 +47,7 @@ intents.message_content = True
 bot = commands.Bot(command_prefix='/', intents=intents)
 
 
-# Store DB connection on bot for per-command cursor creation
+# Legacy shared connection (slash commands use the db.bot_db pool)
 bot.db_conn = conn
 bot.db_type = db_type
 
@@ -58,6 +64,7 @@ async def on_ready():
     """Bot startup event handler."""
     await bot.tree.sync()
     print(f'Logged in as {bot.user}! Commands synced.')
+    start_loop_lag_monitor()
     # bot.loop.create_task(swapfest.main())
 
 
@@ -76,6 +83,26 @@ if __name__ == "__main__":
     # Start bracket poller daemon thread (every 10 min)
     start_bracket_poller()
 
+    # Start treasury inventory indexer daemon thread (every 1 min)
+    start_treasury_indexer()
+
+    # Start Swapboost NFT holders indexer daemon thread (every 2 min)
+    start_swapboost_indexer()
+
+    # Swapfest gifts are recorded from the shared event bus when enabled
+    if SWAPFEST_GIFT_CONSUMER:
+        swapfest.register_gift_consumer()
+        swapfest.start_gift_scorer()
+
+    # Start the chain event bus feeding the consumers registered above
+    start_event_bus()
+
+    # Start the transaction verifier behind the swap / bracket endpoints
+    start_tx_verifier()
+
+    # Start settling submitted treasury payout batches (sending stays on /disburse)
+    start_disbursement_worker()
+
     # Start Flask in background thread
     threading.Thread(target=run_flask, daemon=True).start()
     
@@ -0,0 +1 @@
+"""Load-testing tools: synthetic data, upstream simulator, benchmarks."""
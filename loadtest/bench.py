@@ -0,0 +1,414 @@
+"""End-to-end performance benchmarks for the API and background jobs.
+
+One command seeds a synthetic database (``loadtest.synthetic``), starts the
+offline upstream simulator (``loadtest.upstream_sim``) and times the hot
+paths in-process:
+
+  leaderboard              GET  /api/leaderboard
+  swap_leaderboard         GET  /api/swap/leaderboard
+  prediction_leaderboard   GET  /api/fastbreak/contest/<closed>/prediction-leaderboard
+  bracket_tournament       GET  /api/bracket/tournament/<active>
+  moment_lookup            POST /api/moment-lookup            (treasury moments)
+  enrich_moments           POST /api/bracket/tournament/<id>/enrich-moments
+                                (half cached, half new moments → TopShot)
+  bracket_poll_tick        ``bot.bracket_poller.bracket_poll_tick``
+  swapfest_block_window    ``swapfest.backfill`` over one window of OFFSET blocks
+
+Results are written as JSON (per benchmark: timings, percentiles, upstream
+requests by operation).  ``--baseline`` compares against an earlier
+results file and exits 1 when a benchmark's ``--metric`` got slower by
+more than ``--threshold`` (and by at least ``--min-delta-ms``).
+
+Usage:
+  python -m loadtest.bench --scale small --output bench.json
+  python -m loadtest.bench --scale small --baseline bench.json --threshold 0.2
+
+The SQLite database lives in ``--workdir`` (the app opens ``local.db`` in
+the working directory, so the run chdirs there and never touches the
+repo's own ``local.db``).  The seeded file is kept as a pristine copy and
+restored before every run; ``--reseed`` rebuilds it.  ``--postgres`` runs
+against ``DATABASE_URL`` instead and re-seeds it every run.
+
+Upstream URLs are read from the environment when ``config`` is imported,
+so everything that imports app code is imported lazily after the
+simulator address has been exported.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WORKDIR = os.path.join(REPO_ROOT, "loadtest_work")
+DATASET_STATE_KEY = "loadtest:dataset"
+SIM_HEIGHT_LEAD = 10_000        # blocks already sealed when the simulator starts
+
+LOOKUP_MOMENTS = 200
+ENRICH_MOMENTS = 200
+
+
+# ── Results ─────────────────────────────────────────────────────────
+
+def summarize(timings_ms, upstream=None, errors=0):
+    """Percentile summary of one benchmark's timings (milliseconds)."""
+    ordered = sorted(timings_ms)
+    n = len(ordered)
+
+    def pct(p):                                 # nearest-rank percentile
+        if not ordered:
+            return None
+        return round(ordered[max(0, math.ceil(p / 100 * n) - 1)], 3)
+
+    return {
+        "n": n,
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else None,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "min_ms": round(ordered[0], 3) if ordered else None,
+        "max_ms": round(ordered[-1], 3) if ordered else None,
+        "upstream_requests": dict(sorted((upstream or {}).items())),
+    }
+
+
+def upstream_request_count(result):
+    """HTTP requests sent upstream (GraphQL alias counts are not requests)."""
+    return sum(n for op, n in result["upstream_requests"].items() if ":field:" not in op)
+
+
+def compare(baseline, current, metric="p50_ms", threshold=0.2, min_delta_ms=1.0):
+    """Compare two results documents; returns ``(rows, regressions)``.
+
+    A benchmark regresses when ``metric`` grew by more than ``threshold``
+    (a fraction) *and* by at least ``min_delta_ms``, or when it started
+    failing.  Benchmarks missing from either side are reported, not flagged.
+    """
+    rows, regressions = [], []
+    base_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = base_results.get(name)
+        new_value = result.get(metric)
+        if not base or base.get(metric) is None or new_value is None:
+            rows.append({"name": name, "baseline": None, "current": new_value, "change": None, "status": "new"})
+            continue
+        old_value = base[metric]
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        status = "ok"
+        if result.get("errors") and not base.get("errors"):
+            status = "failing"
+        elif change > threshold and new_value - old_value >= min_delta_ms:
+            status = "regression"
+        elif change < -threshold and old_value - new_value >= min_delta_ms:
+            status = "improved"
+        row = {"name": name, "baseline": old_value, "current": new_value, "change": round(change, 4), "status": status}
+        rows.append(row)
+        if status in ("regression", "failing"):
+            regressions.append(row)
+    for name in base_results.keys() - current.get("results", {}).keys():
+        rows.append({"name": name, "baseline": base_results[name].get(metric), "current": None,
+                     "change": None, "status": "missing"})
+    return rows, regressions
+
+
+def format_comparison(rows, metric):
+    lines = [f"{'benchmark':<26} {'baseline':>12} {'current':>12} {'change':>9}  status  ({metric})"]
+    for r in rows:
+        base = f"{r['baseline']:.2f}" if r["baseline"] is not None else "-"
+        cur = f"{r['current']:.2f}" if r["current"] is not None else "-"
+        change = f"{r['change'] * 100:+.1f}%" if r["change"] is not None else "-"
+        marker = {"regression": "❌", "failing": "❌", "improved": "🚀"}.get(r["status"], "  ")
+        lines.append(f"{r['name']:<26} {base:>12} {cur:>12} {change:>9}  {marker} {r['status']}")
+    return "\n".join(lines)
+
+
+# ── Environment setup ───────────────────────────────────────────────
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _point_app_at_simulator(port, postgres):
+    """Export the simulator URLs (and the DB choice) before app code is imported."""
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        "TOPSHOT_GRAPHQL_URL": f"{base_url}/graphql",
+        "FLOW_REST_URL": f"{base_url}/v1",
+        "FLOW_SCAN_API_URL": f"{base_url}/flowscan/v1",
+        "DAPPER_PROFILE_URL": f"{base_url}/profile",
+    })
+    if not postgres:
+        os.environ.pop("DATABASE_URL", None)
+    elif not os.getenv("DATABASE_URL"):
+        sys.exit("--postgres needs DATABASE_URL")
+
+
+def _seed_database(args, workdir):
+    """Fill the database once per (scale, seed) and restore a pristine copy for this run."""
+    import sqlite3
+    from db.init import initialize_database
+    from loadtest.synthetic import generate, reset_tables
+    from utils.helpers import get_state_value, set_state_value
+
+    marker = f"{args.scale}:{args.seed}"
+    log = print if args.verbose else (lambda *_: None)
+
+    if args.postgres:
+        from db.init import get_db_connection
+        conn, db_type = get_db_connection()
+        initialize_database(conn, db_type)
+        reset_tables(conn, db_type)
+        print(f"🌱 Seeding PostgreSQL ({marker})…", flush=True)
+        generate(conn, db_type, args.scale, args.seed, log=log)
+        conn.close()
+        return
+
+    pristine = os.path.join(workdir, f"seed-{args.scale}-{args.seed}.db")
+    if args.reseed and os.path.exists(pristine):
+        os.remove(pristine)
+    if not os.path.exists(pristine):
+        print(f"🌱 Seeding {pristine}…", flush=True)
+        started = time.perf_counter()
+        conn = sqlite3.connect(pristine)
+        initialize_database(conn, "sqlite")
+        reset_tables(conn, "sqlite")
+        generate(conn, "sqlite", args.scale, args.seed, log=log)
+        set_state_value(conn.cursor(), "sqlite", DATASET_STATE_KEY, marker)
+        conn.commit()
+        conn.close()
+        print(f"   seeded in {time.perf_counter() - started:.1f}s", flush=True)
+    else:
+        conn = sqlite3.connect(pristine)
+        found = get_state_value(conn.cursor(), DATASET_STATE_KEY)
+        conn.close()
+        if found != marker:
+            sys.exit(f"{pristine} holds dataset {found!r}, expected {marker!r}; pass --reseed")
+    shutil.copyfile(pristine, os.path.join(workdir, "local.db"))
+
+
+# ── Benchmarks ──────────────────────────────────────────────────────
+
+class BenchContext:
+    """App client, simulator and the ids each benchmark needs."""
+
+    def __init__(self, client, sim, cursor):
+        self.client = client
+        self.sim = sim
+        self._fresh_moment = 9 * 10**8
+        cursor.execute("SELECT id FROM bracket_tournaments WHERE status = 'ACTIVE' ORDER BY id LIMIT 1")
+        self.active_tournament = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT c.id FROM fastbreakContests c JOIN fastbreakContestEntries e ON e.contest_id = c.id "
+            "WHERE c.status = 'CLOSED' GROUP BY c.id ORDER BY COUNT(*) DESC, c.id LIMIT 1"
+        )
+        self.closed_contest = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT moment_id, play_id, set_name, serial_number, subedition FROM treasury_inventory "
+            f"ORDER BY moment_id LIMIT {LOOKUP_MOMENTS}"
+        )
+        self.treasury_moments = [{"id": r[0], "playID": r[1], "setName": r[2], "serial": r[3], "subedition": r[4]}
+                                 for r in cursor.fetchall()]
+        cursor.execute(f"SELECT moment_id FROM moment_metadata ORDER BY moment_id LIMIT {ENRICH_MOMENTS // 2}")
+        self.cached_moments = [r[0] for r in cursor.fetchall()]
+        cursor.execute("SELECT scraper_state.value FROM scraper_state WHERE key = 'last_processed_block'")
+        row = cursor.fetchone()
+        self.next_block = int(row[0]) if row else 133_000_000
+
+    def upstream_counts(self):
+        return dict(self.sim.app.sim["stats"])
+
+    def get(self, url):
+        resp = self.client.get(url)
+        return resp.status_code
+
+    def post(self, url, body):
+        resp = self.client.post(url, json=body)
+        return resp.status_code
+
+    def enrich_payload(self):
+        fresh = range(self._fresh_moment, self._fresh_moment + ENRICH_MOMENTS - len(self.cached_moments))
+        self._fresh_moment += ENRICH_MOMENTS
+        ids = self.cached_moments + list(fresh)
+        return {"moments": [{"id": mid, "serial": i + 1} for i, mid in enumerate(ids)]}
+
+
+def _benchmarks(ctx):
+    """``[(name, fn, is_job)]``; ``fn`` returns an HTTP status or None.
+
+    Jobs run without warm-up; each swapfest run scans the next window.
+    """
+    import asyncio
+    import swapfest
+    from bot.bracket_poller import bracket_poll_tick
+
+    def swapfest_window():
+        start = ctx.next_block
+        ctx.next_block += swapfest.OFFSET + 1
+        asyncio.run(swapfest.backfill(start, start + swapfest.OFFSET, shards=1))
+
+    tid, contest = ctx.active_tournament, ctx.closed_contest
+    return [
+        ("leaderboard", lambda: ctx.get("/api/leaderboard"), False),
+        ("swap_leaderboard", lambda: ctx.get("/api/swap/leaderboard"), False),
+        ("prediction_leaderboard",
+         lambda: ctx.get(f"/api/fastbreak/contest/{contest}/prediction-leaderboard"), False),
+        ("bracket_tournament", lambda: ctx.get(f"/api/bracket/tournament/{tid}"), False),
+        ("moment_lookup", lambda: ctx.post("/api/moment-lookup", {"moments": ctx.treasury_moments}), False),
+        ("enrich_moments",
+         lambda: ctx.post(f"/api/bracket/tournament/{tid}/enrich-moments", ctx.enrich_payload()), False),
+        ("bracket_poll_tick", bracket_poll_tick, True),
+        ("swapfest_block_window", swapfest_window, True),
+    ]
+
+
+def run_benchmark(ctx, name, fn, iterations, warmup):
+    """Time ``fn``; a non-2xx status or an exception counts as an error."""
+    for _ in range(warmup):
+        fn()
+    before = ctx.upstream_counts()
+    timings, errors = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            status = fn()
+        except Exception as e:
+            print(f"   ⚠️  {name}: {type(e).__name__}: {e}", flush=True)
+            status = 500
+        timings.append((time.perf_counter() - started) * 1000)
+        if status is not None and not 200 <= status < 300:
+            errors += 1
+    after = ctx.upstream_counts()
+    upstream = {k: after[k] - before.get(k, 0) for k in after if after[k] != before.get(k, 0)}
+    return summarize(timings, upstream, errors)
+
+
+def run(args):
+    """Seed, start the simulator, run every selected benchmark; returns the results document."""
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    port = args.sim_port or _free_port()
+    _point_app_at_simulator(port, args.postgres)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    from loadtest.upstream_sim import SimServer, SimWorld, Injection, UPSTREAMS, BASE_HEIGHT
+
+    # Blocks from the synthetic checkpoint onwards are already sealed
+    world = SimWorld(args.seed, args.scale, base_height=BASE_HEIGHT + SIM_HEIGHT_LEAD)
+    injections = {name: Injection(latency_ms=args.upstream_latency_ms, jitter_ms=args.upstream_jitter_ms,
+                                  seed=args.seed) for name in UPSTREAMS}
+
+    with SimServer(world, injections, port=port) as sim:
+        _seed_database(args, workdir)
+
+        from flask import Flask
+        from db.connection import close_db
+        from db.init import get_db_connection
+        from routes.api import register_routes
+
+        app = Flask("bench")
+        register_routes(app)
+        app.teardown_appcontext(close_db)
+
+        conn, db_type = get_db_connection()
+        ctx = BenchContext(app.test_client(), sim, conn.cursor())
+        conn.close()
+
+        selected = set(args.only.split(",")) if args.only else None
+        results = {}
+        for name, fn, is_job in _benchmarks(ctx):
+            if selected and name not in selected:
+                continue
+            iterations, warmup = (args.job_repeat, 0) if is_job else (args.repeat, args.warmup)
+            print(f"⏱️  {name} ×{iterations}", flush=True)
+            results[name] = run_benchmark(ctx, name, fn, iterations, warmup)
+            r = results[name]
+            print(f"   p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  "
+                  f"upstream {upstream_request_count(r)} req"
+                  + (f"  ❌ {r['errors']} errors" if r["errors"] else ""), flush=True)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "db_type": db_type,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "job_repeat": args.job_repeat,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints and background jobs")
+    parser.add_argument("--scale", default="small", help="loadtest.synthetic scale (tiny/small/prod)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed iterations per endpoint")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed iterations per endpoint")
+    parser.add_argument("--job-repeat", type=int, default=3,
+                        help="Poll ticks / block windows to time (the first one runs cold)")
+    parser.add_argument("--only", help="Comma-separated benchmark names")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR)
+    parser.add_argument("--reseed", action="store_true", help="Rebuild the seeded SQLite database")
+    parser.add_argument("--postgres", action="store_true", help="Run against DATABASE_URL (re-seeded)")
+    parser.add_argument("--sim-port", type=int, default=0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=0)
+    parser.add_argument("--output", help="Write results JSON here (default: <workdir>/bench-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--metric", default="p50_ms", choices=("p50_ms", "p95_ms", "mean_ms", "max_ms"))
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown as a fraction (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    document = run(args)
+
+    output = output or os.path.join(os.path.abspath(args.workdir), f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if baseline is not None:
+        rows, regressions = compare(baseline, document, args.metric, args.threshold, args.min_delta_ms)
+        print(format_comparison(rows, args.metric))
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
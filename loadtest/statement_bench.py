@@ -0,0 +1,218 @@
+"""Per-statement overhead of the hot-query registry (``db.statements``).
+
+Times every registered statement against a synthetic dataset and reports
+microseconds per execution:
+
+  prepare_query   ``?`` → ``%s`` rewrite: ``str.replace`` per call vs memoized
+  sqlite          statement cache off (``cached_statements=0``, recompiled
+                  every run) vs ``SQLITE_STATEMENT_CACHE``
+  postgres        plain ``cursor.execute`` (parse + plan every run) vs
+                  ``EXECUTE`` of a server-side prepared statement
+
+Usage:
+  python -m loadtest.statement_bench                       # SQLite, tiny dataset
+  python -m loadtest.statement_bench --scale small --iterations 2000
+  DATABASE_URL=postgres://... python -m loadtest.statement_bench --postgres
+
+Writes run inside a transaction that is rolled back, so the dataset is left
+as seeded.  The SQLite file is shared with ``loadtest.bench`` (``--workdir``).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sqlite3
+import time
+import timeit
+
+from loadtest.bench import DEFAULT_WORKDIR, _free_port, _point_app_at_simulator, _seed_database
+
+
+def _param_samplers():
+    """``{statement name: fn(cursor) -> params}`` built from rows in the dataset."""
+    from config import (
+        SWAPFEST_START_TIME, SWAPFEST_END_TIME, SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF,
+    )
+
+    def one(cursor, sql):
+        cursor.execute(sql)
+        return cursor.fetchone()
+
+    def matchup(cursor):
+        return one(cursor, "SELECT id, tournament_id, round_number, player1_wallet FROM bracket_matchups "
+                           "ORDER BY id LIMIT 1")
+
+    def edition(cursor):
+        return one(cursor, "SELECT play_flow_id, set_name FROM jokic_editions ORDER BY edition_id LIMIT 1")
+
+    return {
+        "swapfest_leaderboard": lambda c: (SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF,
+                                           SWAPFEST_START_TIME, SWAPFEST_END_TIME),
+        "bracket_update_live_scores": lambda c: (55.0, 48.0, 10, 20, "[]", "[]", "fb-1", matchup(c)[0]),
+        "bracket_update_bye_score": lambda c: (55.0, 10, "[]", "fb-1", matchup(c)[0]),
+        "bracket_set_bye_winner": lambda c: (matchup(c)[3], matchup(c)[0]),
+        "bracket_set_winner": lambda c: (matchup(c)[3], matchup(c)[0]),
+        "bracket_eliminate": lambda c: (matchup(c)[2], matchup(c)[1], matchup(c)[3]),
+        "jokic_edition_by_play_and_set": lambda c: (edition(c)[0], edition(c)[1], "%+0"),
+        "jokic_edition_by_play": lambda c: (edition(c)[0], "%+0"),
+    }
+
+
+def _registered_statements():
+    # Statements register themselves when the modules that run them are imported
+    import routes.api  # noqa: F401
+    import bot.bracket_poller  # noqa: F401
+    import bot.treasury_indexer  # noqa: F401
+    from db.statements import registered
+    return registered()
+
+
+def _time_per_call(run, iterations, rounds):
+    """Median microseconds per call over ``rounds`` batches of ``iterations``."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        samples.append((time.perf_counter() - started) / iterations * 1e6)
+    return statistics.median(samples)
+
+
+def _runner(cursor, sql, params):
+    if sql.lstrip().upper().startswith(("SELECT", "WITH", "EXECUTE")):
+        def run():
+            cursor.execute(sql, params)
+            cursor.fetchall()
+    else:
+        def run():
+            cursor.execute(sql, params)
+    return run
+
+
+def bench_prepare_query(iterations):
+    import utils.helpers as helpers
+
+    statements = _registered_statements()
+    queries = [s.sql for s in statements.values()]
+    saved = helpers.db_type
+    helpers.db_type = "postgresql"
+    try:
+        for q in queries:
+            helpers.prepare_query(q)
+        memoized = timeit.timeit(lambda: [helpers.prepare_query(q) for q in queries], number=iterations)
+    finally:
+        helpers.db_type = saved
+    replaced = timeit.timeit(lambda: [q.replace("?", "%s") for q in queries], number=iterations)
+    calls = iterations * len(queries)
+    return {"replace_us": replaced / calls * 1e6, "memoized_us": memoized / calls * 1e6}
+
+
+def bench_sqlite(path, iterations, rounds):
+    from config import SQLITE_STATEMENT_CACHE
+
+    statements = _registered_statements()
+    samplers = _param_samplers()
+    results = {}
+    for label, cache in (("uncached_us", 0), ("cached_us", SQLITE_STATEMENT_CACHE)):
+        conn = sqlite3.connect(path, cached_statements=cache)
+        cursor = conn.cursor()
+        for name, statement in sorted(statements.items()):
+            if name not in samplers:
+                continue
+            run = _runner(cursor, statement.sql, samplers[name](cursor))
+            run()
+            results.setdefault(name, {})[label] = _time_per_call(run, iterations, rounds)
+        conn.rollback()
+        conn.close()
+    return results
+
+
+def bench_postgres(iterations, rounds):
+    import psycopg2
+    from config import DATABASE_URL
+
+    statements = _registered_statements()
+    samplers = _param_samplers()
+    conn = psycopg2.connect(DATABASE_URL, sslmode="require")
+    cursor = conn.cursor()
+    results = {}
+    try:
+        for name, statement in sorted(statements.items()):
+            if name not in samplers:
+                continue
+            params = samplers[name](cursor)
+            plain = _runner(cursor, statement.pg_sql, params)
+            plain()
+            cursor.execute(statement.prepare_sql)
+            prepared = _runner(cursor, statement.execute_sql, params)
+            prepared()
+            results[name] = {
+                "plain_us": _time_per_call(plain, iterations, rounds),
+                "prepared_us": _time_per_call(prepared, iterations, rounds),
+            }
+    finally:
+        conn.rollback()
+        conn.close()
+    return results
+
+
+def _print_table(title, results, before, after):
+    print(f"\n{title}")
+    print(f"  {'statement':<32} {before:>14} {after:>14} {'saved':>8}")
+    for name, r in results.items():
+        saved = 1 - r[after] / r[before] if r[before] else 0.0
+        print(f"  {name:<32} {r[before]:>14.1f} {r[after]:>14.1f} {saved:>7.0%}")
+
+
+def run(args):
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    port = _free_port()
+    _point_app_at_simulator(port, args.postgres)
+    # App modules open ``local.db`` in the working directory at import
+    os.chdir(workdir)
+
+    from loadtest.upstream_sim import SimServer, SimWorld
+    # Seeding looks up Jokic editions upstream; the simulator answers offline
+    with SimServer(SimWorld(args.seed, args.scale), port=port):
+        _seed_database(args, workdir)
+
+    report = {"scale": args.scale, "seed": args.seed, "iterations": args.iterations,
+              "prepare_query": bench_prepare_query(args.iterations)}
+    pq = report["prepare_query"]
+    print(f"\nprepare_query (µs/call): replace {pq['replace_us']:.3f}  memoized {pq['memoized_us']:.3f}")
+
+    if args.postgres:
+        report["postgres"] = bench_postgres(args.iterations, args.rounds)
+        _print_table("PostgreSQL (µs/statement)", report["postgres"], "plain_us", "prepared_us")
+    else:
+        report["sqlite"] = bench_sqlite(os.path.join(workdir, "local.db"), args.iterations, args.rounds)
+        _print_table("SQLite (µs/statement)", report["sqlite"], "uncached_us", "cached_us")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n📝 Results written to {args.output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", default="tiny", help="synthetic dataset scale (default tiny)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=500, help="executions per timing round")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds; the median is reported")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the cached SQLite dataset")
+    parser.add_argument("--postgres", action="store_true", help="benchmark DATABASE_URL instead of SQLite")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,635 @@
+"""Deterministic, production-scale synthetic data for load testing.
+
+Fills every table created by ``db.init.initialize_database`` with realistic
+volumes — a Swapfest worth of gifts, months of completed swaps, a full
+FastBreak rankings history, 128-player brackets, large prediction contests —
+on SQLite or PostgreSQL.
+
+Every table draws from its own ``random.Random(f"{seed}:{table}")``, so the
+same seed and scale always produce the same rows, and changing one table's
+volume never shifts another table's data.  Rows are streamed into
+``bulk_insert`` (``execute_values`` on PostgreSQL, chunked ``executemany``
+in one transaction on SQLite) and never held in memory all at once.
+
+Usage:
+  python -m loadtest.synthetic --scale prod --seed 42 --sqlite loadtest.db --reset
+  DATABASE_URL=postgres://... python -m loadtest.synthetic --scale prod --postgres --reset
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from itertools import islice
+
+from config import SWAPFEST_START_TIME, SWAPFEST_END_TIME, FLOW_ACCOUNT
+from utils.gift_scoring import DEFAULT_SCORING_RULES
+
+BULK_PAGE_ROWS = 5000
+
+# Row volumes per scale; "prod" approximates a busy season in production
+SCALES = {
+    "tiny": {
+        "wallets": 300, "gifts": 2_000, "swap_days": 7, "swaps_per_day": 20,
+        "fastbreaks": 10, "rankings_per_fastbreak": 200, "contests": 3, "entries_per_contest": 100,
+        "brackets": 2, "bracket_size": 16, "predictions": 500, "discord_contests": 10,
+        "editions": 40, "treasury_moments": 200, "chain_events": 500, "blog_comments": 50,
+    },
+    "small": {
+        "wallets": 5_000, "gifts": 40_000, "swap_days": 30, "swaps_per_day": 150,
+        "fastbreaks": 60, "rankings_per_fastbreak": 1_500, "contests": 10, "entries_per_contest": 1_000,
+        "brackets": 3, "bracket_size": 64, "predictions": 10_000, "discord_contests": 100,
+        "editions": 150, "treasury_moments": 1_500, "chain_events": 10_000, "blog_comments": 500,
+    },
+    "prod": {
+        "wallets": 25_000, "gifts": 300_000, "swap_days": 120, "swaps_per_day": 600,
+        "fastbreaks": 180, "rankings_per_fastbreak": 4_000, "contests": 40, "entries_per_contest": 5_000,
+        "brackets": 6, "bracket_size": 128, "predictions": 100_000, "discord_contests": 400,
+        "editions": 320, "treasury_moments": 6_000, "chain_events": 200_000, "blog_comments": 3_000,
+    },
+}
+
+# Generation order (parents before children); also the reset order reversed
+TABLES = (
+    "user_mapping", "user_rewards", "special_rewards", "contests", "predictions", "blog_comments",
+    "gift_scoring_rules", "gifts", "scraper_state", "fastbreaks", "fastbreak_rankings", "fastbreakContests",
+    "fastbreakContestEntries", "fastbreak_contest_standings", "jokic_editions", "jokic_moments",
+    "moment_metadata", "treasury_inventory", "completed_swaps", "bracket_tournaments",
+    "bracket_rounds", "bracket_participants", "bracket_matchups", "chain_events",
+    "sweepstakes_draws", "tx_verifications", "payout_batches", "payouts", "swapboost_holders",
+)
+
+# Tables whose SERIAL ids are supplied explicitly (children reference them)
+_EXPLICIT_ID_TABLES = ("fastbreakContests", "bracket_tournaments", "payout_batches")
+
+# Tables initialize_database already seeds; generate replaces their rows
+_SEEDED_TABLES = ("gift_scoring_rules",)
+
+TIERS = (("COMMON", 0.62), ("FANDOM", 0.12), ("RARE", 0.2), ("LEGENDARY", 0.05), ("ULTIMATE", 0.01))
+TEAMS = ("Denver Nuggets", "Los Angeles Lakers", "Boston Celtics", "Golden State Warriors",
+         "Milwaukee Bucks", "Phoenix Suns", "Miami Heat", "Dallas Mavericks")
+PLAYERS = ("Nikola Jokić", "Jamal Murray", "Aaron Gordon", "Michael Porter Jr.", "LeBron James",
+           "Stephen Curry", "Giannis Antetokounmpo", "Luka Dončić", "Jayson Tatum")
+SETS = ("Base Set", "Metallic Gold LE", "Rookie Debut", "Deck the Hoops", "Holo Icon",
+        "Fresh Faces", "Run It Back", "Throwdowns")
+_SYLLABLES = ("jo", "kic", "nug", "mile", "high", "den", "ver", "joker", "bron", "hoop",
+              "dunk", "swish", "mvp", "top", "shot", "fast", "break", "rim", "zen", "ace")
+
+DAY = 86_400
+
+
+def _rng(seed, table):
+    return random.Random(f"{seed}:{table}")
+
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_iso(value):
+    return int(datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+               .replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _hex(rng, nbytes):
+    return f"{rng.getrandbits(nbytes * 8):0{nbytes * 2}x}"
+
+
+def _weighted_choice(rng, options):
+    r = rng.random()
+    for value, weight in options:
+        r -= weight
+        if r <= 0:
+            return value
+    return options[-1][0]
+
+
+class Population:
+    """Shared wallets and usernames; activity is Zipf-skewed like real users."""
+
+    def __init__(self, seed, size):
+        rng = _rng(seed, "population")
+        self.wallets = [f"0x{_hex(rng, 8)}" for _ in range(size)]
+        self.dappers = [f"0x{_hex(rng, 8)}" for _ in range(size)]
+        self.usernames = []
+        seen = set()
+        while len(self.usernames) < size:
+            name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+            name = f"{name.capitalize()}{rng.randint(0, 9999)}" if rng.random() < 0.7 else name
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                self.usernames.append(name)
+        self.user_ids = [10**17 + i * 7919 for i in range(size)]
+        # Cumulative Zipf(1.1) weights for "who is active"
+        weights = [1 / (rank ** 1.1) for rank in range(1, size + 1)]
+        total = sum(weights)
+        acc, self._cdf = 0.0, []
+        for w in weights:
+            acc += w / total
+            self._cdf.append(acc)
+
+    def pick(self, rng):
+        """Index of an active user (heavy users come up far more often)."""
+        from bisect import bisect_left
+        return min(bisect_left(self._cdf, rng.random()), len(self._cdf) - 1)
+
+    def sample(self, rng, k):
+        """``k`` distinct user indexes, skewed towards heavy users."""
+        k = min(k, len(self.wallets))
+        chosen = set()
+        while len(chosen) < k:
+            chosen.add(self.pick(rng) if rng.random() < 0.8 else rng.randrange(len(self.wallets)))
+        return sorted(chosen)
+
+
+# ── Bulk loading ────────────────────────────────────────────────────
+
+def bulk_insert(conn, db_type, table, columns, rows, page_size=BULK_PAGE_ROWS):
+    """Insert an iterable of row tuples in pages; returns the row count (no commit)."""
+    cursor = conn.cursor()
+    column_list = ", ".join(columns)
+    count = 0
+    rows = iter(rows)
+    if db_type == "postgresql":
+        from psycopg2.extras import execute_values
+        query = f"INSERT INTO {table} ({column_list}) VALUES %s"
+        while page := list(islice(rows, page_size)):
+            execute_values(cursor, query, page, page_size=page_size)
+            count += len(page)
+    else:
+        query = f"INSERT INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))})"
+        while page := list(islice(rows, page_size)):
+            cursor.executemany(query, page)
+            count += len(page)
+    return count
+
+
+def reset_tables(conn, db_type, tables=TABLES):
+    """Empty the generated tables (children first)."""
+    cursor = conn.cursor()
+    for table in reversed(tables):
+        if db_type == "postgresql":
+            cursor.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE")
+        else:
+            cursor.execute(f"DELETE FROM {table}")
+    if db_type == "sqlite":
+        try:
+            cursor.execute("DELETE FROM sqlite_sequence")
+        except sqlite3.OperationalError:
+            pass
+    conn.commit()
+
+
+def _sync_sequences(conn, db_type):
+    """Move PostgreSQL SERIAL sequences past explicitly inserted ids."""
+    if db_type != "postgresql":
+        return
+    cursor = conn.cursor()
+    for table in _EXPLICIT_ID_TABLES:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table.lower()}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        )
+    conn.commit()
+
+
+# ── Table generators ────────────────────────────────────────────────
+# Each returns (columns, row iterator) and only uses its own Random.
+
+class Generator:
+    def __init__(self, seed=42, scale="small", now=None):
+        if scale not in SCALES:
+            raise ValueError(f"Unknown scale {scale!r} (expected one of {', '.join(SCALES)})")
+        self.seed = seed
+        self.scale = scale
+        self.v = SCALES[scale]
+        self.now = int(now if now is not None else _parse_iso(SWAPFEST_END_TIME))
+        self.people = Population(seed, self.v["wallets"])
+        self._fastbreaks = None
+        self._editions = None
+
+    # Users / Discord
+    def user_mapping(self):
+        return ("user_id", "username"), zip(self.people.user_ids, self.people.usernames)
+
+    def user_rewards(self):
+        rng = _rng(self.seed, "user_rewards")
+        day = _iso(self.now)[:10]
+        return ("user_id", "balance", "daily_pets_remaining", "last_pet_date"), (
+            (uid, round(rng.expovariate(1 / 12), 2), rng.randint(0, 3), day if rng.random() < 0.3 else None)
+            for uid in self.people.user_ids
+        )
+
+    def special_rewards(self):
+        return ("name", "probability", "amount"), iter([
+            ("Jokic Common", 0.01, 25), ("Swapboost NFT", 0.002, 5), ("Legendary Pack", 0.0005, 1),
+        ])
+
+    def contests(self):
+        rng = _rng(self.seed, "contests")
+        n = self.v["discord_contests"]
+        return ("channel_id", "contest_name", "start_time", "creator_id"), (
+            (9 * 10**17 + i, f"Nuggets vs {rng.choice(TEAMS)} #{i}",
+             self.now - (n - i) * DAY, self.people.user_ids[0])
+            for i in range(n)
+        )
+
+    def predictions(self):
+        rng = _rng(self.seed, "predictions")
+        n_contests = self.v["discord_contests"]
+        def rows():
+            for _ in range(self.v["predictions"]):
+                c = rng.randrange(n_contests)
+                stats = f"{rng.randint(15, 45)} pts, {rng.randint(5, 20)} reb, {rng.randint(3, 16)} ast"
+                yield (self.people.user_ids[self.people.pick(rng)], f"Nuggets vs {TEAMS[c % len(TEAMS)]} #{c}",
+                       stats, rng.choice(("Win", "Loss")), self.now - rng.randrange(n_contests * DAY))
+        return ("user_id", "contest_name", "stats", "outcome", "timestamp"), rows()
+
+    def blog_comments(self):
+        rng = _rng(self.seed, "blog_comments")
+        return ("article_id", "author_name", "comment_text", "timestamp"), (
+            (f"article-{rng.randint(1, 40)}", self.people.usernames[self.people.pick(rng)],
+             "Jokic is the best passing big of all time. " * rng.randint(1, 4),
+             self.now - rng.randrange(180 * DAY))
+            for _ in range(self.v["blog_comments"])
+        )
+
+    # Swapfest
+    def gift_scoring_rules(self):
+        # The production rules: the re-score UPDATE joins these per gift
+        return ("set_flow_id", "tier", "player_name", "points", "note"), iter(DEFAULT_SCORING_RULES)
+
+    def gifts(self):
+        rng = _rng(self.seed, "gifts")
+        start, end = _parse_iso(SWAPFEST_START_TIME), _parse_iso(SWAPFEST_END_TIME)
+        def rows():
+            for i in range(self.v["gifts"]):
+                # ~90% inside the Swapfest window, the rest in the weeks before
+                ts = rng.randrange(start, end) if rng.random() < 0.9 else rng.randrange(start - 60 * DAY, start)
+                yield (f"{_hex(rng, 32)}", 10**7 + i, self.people.wallets[self.people.pick(rng)],
+                       _weighted_choice(rng, ((1, 0.6), (2, 0.2), (5, 0.12), (15, 0.06), (50, 0.02))),
+                       _iso(ts))
+        return ("txn_id", "moment_id", "from_address", "points", "timestamp"), rows()
+
+    def scraper_state(self):
+        return ("key", "value"), iter([
+            ("last_processed_block", "133000000"), ("event_bus:swapfest", "133000000"),
+            ("event_bus:treasury", "133000000"),
+        ])
+
+    # FastBreak
+    def _fastbreak_list(self):
+        if self._fastbreaks is None:
+            rng = _rng(self.seed, "fastbreaks")
+            n = self.v["fastbreaks"]
+            self._fastbreaks = []
+            for i in range(n):
+                day = _iso(self.now - (n - 1 - i) * DAY)[:10]
+                status = "FAST_BREAK_FINISHED" if i < n - 2 else "FAST_BREAK_OPEN"
+                self._fastbreaks.append((str(uuid.UUID(int=rng.getrandbits(128))),
+                                         f"{day}T00:00:00Z", f"Classic Run {i // 7 + 1}", status))
+        return self._fastbreaks
+
+    def fastbreaks(self):
+        return ("id", "game_date", "run_name", "status"), iter(self._fastbreak_list())
+
+    def fastbreak_rankings(self):
+        rng = _rng(self.seed, "fastbreak_rankings")
+        per = self.v["rankings_per_fastbreak"]
+        def rows():
+            for fb_id, _, _, status in self._fastbreak_list():
+                if status != "FAST_BREAK_FINISHED":
+                    continue
+                players = self.people.sample(rng, per)
+                rng.shuffle(players)
+                points = sorted((rng.randint(40, 260) for _ in players), reverse=True)
+                for rank, (idx, pts) in enumerate(zip(players, points), start=1):
+                    yield fb_id, self.people.usernames[idx], rank, pts
+        return ("fastbreak_id", "username", "rank", "points"), rows()
+
+    def fastbreakContests(self):
+        fbs = self._fastbreak_list()
+        n = min(self.v["contests"], len(fbs))
+        def rows():
+            for i, (fb_id, game_date, run_name, status) in enumerate(fbs[-n:], start=1):
+                lock = _parse_iso(game_date[:10] + "T00:00:00") + 23 * 3600
+                yield (i, fb_id, f"{run_name} — {game_date[:10]}", str(lock), "$MVP", 5,
+                       "CLOSED" if status == "FAST_BREAK_FINISHED" else "OPEN")
+        return ("id", "fastbreak_id", "display_name", "lock_timestamp", "buy_in_currency",
+                "buy_in_amount", "status"), rows()
+
+    def fastbreakContestEntries(self):
+        rng = _rng(self.seed, "fastbreakContestEntries")
+        n = min(self.v["contests"], len(self._fastbreak_list()))
+        def rows():
+            for contest_id in range(1, n + 1):
+                for idx in self.people.sample(rng, self.v["entries_per_contest"]):
+                    # Mostly predict themselves; some pick a heavy hitter
+                    pick = idx if rng.random() < 0.7 else self.people.pick(rng)
+                    yield contest_id, self.people.usernames[pick], self.people.wallets[idx]
+        return ("contest_id", "topshotUsernamePrediction", "userWalletAddress"), rows()
+
+    def fastbreak_contest_standings(self):
+        rng = _rng(self.seed, "fastbreak_contest_standings")
+        fbs = self._fastbreak_list()
+        n = min(self.v["contests"], len(fbs))
+        finished = [i for i, fb in enumerate(fbs[-n:], start=1) if fb[3] == "FAST_BREAK_FINISHED"]
+        def rows():
+            # Frozen standings for the older half of the finished contests
+            for contest_id in finished[:(len(finished) + 1) // 2]:
+                for pos, idx in enumerate(self.people.sample(rng, min(200, self.v["entries_per_contest"])), 1):
+                    yield (contest_id, pos, self.people.wallets[idx], self.people.usernames[idx],
+                           pos, 300 - pos, json.dumps(["Nikola Jokić", "Jamal Murray"]), None, self.now)
+        return ("contest_id", "position", "wallet", "prediction", "rank", "points", "lineup",
+                "created_at", "frozen_at"), rows()
+
+    # Editions / moments
+    def _edition_list(self):
+        if self._editions is None:
+            rng = _rng(self.seed, "jokic_editions")
+            self._editions = []
+            for i in range(self.v["editions"]):
+                tier = _weighted_choice(rng, TIERS)
+                set_name = rng.choice(SETS)
+                self._editions.append({
+                    "edition_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "play_id": str(uuid.UUID(int=rng.getrandbits(128))), "play_flow_id": 1000 + i,
+                    "set_id": str(uuid.UUID(int=rng.getrandbits(128))), "set_flow_id": 1 + i % 40,
+                    "tier": f"MOMENT_TIER_{tier}", "set_name": set_name, "series": 1 + i % 7,
+                    "circulation": rng.choice((25, 99, 250, 1000, 4000, 15000, 40000)),
+                    "low_ask": round(rng.uniform(1, 400), 2),
+                })
+        return self._editions
+
+    def jokic_editions(self):
+        eds = self._edition_list()
+        return ("edition_id", "play_id", "play_flow_id", "set_id", "set_flow_id", "tier", "set_name",
+                "series_number", "play_category", "play_headline", "team", "date_of_moment",
+                "nba_season", "jersey_number", "image_url", "video_url", "circulation_count",
+                "low_ask", "updated_at"), (
+            (e["edition_id"], e["play_id"], e["play_flow_id"], e["set_id"], e["set_flow_id"], e["tier"],
+             e["set_name"], e["series"], "Assist", "Jokic threads the needle", "Denver Nuggets",
+             "2024-03-01T00:00:00Z", "2023-24", "15", f"https://assets.nbatopshot.com/{e['edition_id']}.jpg",
+             "", e["circulation"], e["low_ask"], self.now)
+            for e in eds
+        )
+
+    def jokic_moments(self):
+        rng = _rng(self.seed, "jokic_moments")
+        eds = self._edition_list()
+        return ("moment_id", "edition_id", "play_id", "set_id", "serial_number", "tier", "cached_at"), (
+            (5 * 10**7 + i, e["edition_id"], e["play_id"], e["set_id"],
+             rng.randint(1, e["circulation"]), e["tier"], self.now)
+            for i, e in enumerate(rng.choice(eds) for _ in range(self.v["treasury_moments"]))
+        )
+
+    def moment_metadata(self):
+        # Gifted moments: one metadata row per gift moment id
+        rng = _rng(self.seed, "moment_metadata")
+        return ("moment_id", "player_name", "tier", "set_name", "series_number", "image_url",
+                "team_name", "nba_season", "play_category", "cached_at", "set_flow_id"), (
+            (10**7 + i, rng.choice(PLAYERS), _weighted_choice(rng, TIERS), rng.choice(SETS),
+             rng.randint(1, 7), "", rng.choice(TEAMS), "2024-25", "Dunk", self.now, rng.randint(1, 40))
+            for i in range(self.v["gifts"])
+        )
+
+    def treasury_inventory(self):
+        rng = _rng(self.seed, "treasury_inventory")
+        eds = self._edition_list()
+        def rows():
+            for i in range(self.v["treasury_moments"]):
+                e = rng.choice(eds)
+                yield (5 * 10**7 + i, e["play_flow_id"], e["set_name"], rng.randint(1, e["circulation"]),
+                       0, int(rng.random() < 0.05), e["edition_id"], e["tier"], e["set_name"],
+                       e["series"], "Jokic threads the needle", "Denver Nuggets", "", self.now)
+        return ("moment_id", "play_id", "set_name", "serial_number", "subedition", "is_locked",
+                "edition_id", "tier", "edition_set_name", "series_number", "play_headline", "team",
+                "image_url", "updated_at"), rows()
+
+    def completed_swaps(self):
+        rng = _rng(self.seed, "completed_swaps")
+        days = self.v["swap_days"]
+        def rows():
+            for _ in range(days * self.v["swaps_per_day"]):
+                n = rng.choice((1, 1, 1, 2, 3, 5))
+                ids = [rng.randint(10**7, 9 * 10**7) for _ in range(n)]
+                points = sum(rng.choice((1, 1, 2, 5, 15)) for _ in ids)
+                yield (_hex(rng, 32), self.people.wallets[self.people.pick(rng)], json.dumps(ids),
+                       round(points * 1.5, 2), _hex(rng, 32), self.now - rng.randrange(days * DAY), points)
+        return ("tx_id", "user_addr", "moment_ids", "mvp_amount", "mvp_tx_id", "completed_at",
+                "points"), rows()
+
+    # Brackets
+    def _bracket_shape(self, t):
+        """(status, current_round, rounds played) for tournament ``t``."""
+        rounds = self.v["bracket_size"].bit_length() - 1
+        if t == 0:
+            return "SIGNUP", 0, 0
+        if t == 1:
+            return "ACTIVE", rounds // 2 + 1, rounds // 2
+        return "COMPLETE", rounds, rounds
+
+    def bracket_tournaments(self):
+        rng = _rng(self.seed, "bracket_tournaments")
+        rounds = self.v["bracket_size"].bit_length() - 1
+        def rows():
+            for t in range(self.v["brackets"]):
+                status, current, _ = self._bracket_shape(t)
+                winner = self.people.wallets[t] if status == "COMPLETE" else None
+                yield (t + 1, f"Fastbreak Bracket #{t + 1}", 5, "$MVP", rng.choice(("TOKEN", "MOMENT", "FREEROLL")),
+                       self.now + 3 * DAY if status == "SIGNUP" else self.now - 30 * DAY,
+                       status, current, rounds, winner)
+        return ("id", "name", "fee_amount", "fee_currency", "buyin_type", "signup_close_ts", "status",
+                "current_round", "max_rounds", "winner_wallet"), rows()
+
+    def bracket_rounds(self):
+        fbs = self._fastbreak_list()
+        rounds = self.v["bracket_size"].bit_length() - 1
+        def rows():
+            for t in range(self.v["brackets"]):
+                for r in range(1, rounds + 1):
+                    fb_id, game_date, _, _ = fbs[(t * rounds + r) % len(fbs)]
+                    yield t + 1, r, fb_id, game_date[:10]
+        return ("tournament_id", "round_number", "fastbreak_id", "game_date"), rows()
+
+    def _bracket_players(self, t):
+        rng = _rng(self.seed, f"bracket_players:{t}")
+        size = self.v["bracket_size"]
+        if t == 0:
+            size = size // 2            # signup still filling up
+        return self.people.sample(rng, size)
+
+    def bracket_participants(self):
+        def rows():
+            for t in range(self.v["brackets"]):
+                for seed_no, idx in enumerate(self._bracket_players(t), start=1):
+                    yield t + 1, self.people.wallets[idx], self.people.usernames[idx], seed_no
+        return ("tournament_id", "wallet_address", "ts_username", "seed_number"), rows()
+
+    def bracket_matchups(self):
+        rng = _rng(self.seed, "bracket_matchups")
+        fbs = self._fastbreak_list()
+        rounds = self.v["bracket_size"].bit_length() - 1
+        lineup = json.dumps(["Nikola Jokić", "Jamal Murray", "Aaron Gordon"])
+        def rows():
+            for t in range(self.v["brackets"]):
+                _, current, played = self._bracket_shape(t)
+                if not current:
+                    continue
+                alive = [self.people.wallets[i] for i in self._bracket_players(t)]
+                for r in range(1, min(current, rounds) + 1):
+                    fb_id = fbs[(t * rounds + r) % len(fbs)][0]
+                    winners = []
+                    for m in range(len(alive) // 2):
+                        p1, p2 = alive[2 * m], alive[2 * m + 1]
+                        if r <= played:
+                            s1, s2 = rng.randint(40, 260), rng.randint(40, 260)
+                            winner = p1 if s1 >= s2 else p2
+                            winners.append(winner)
+                            yield (t + 1, r, m, p1, p2, s1, s2, rng.randint(1, 5000), rng.randint(1, 5000),
+                                   lineup, lineup, winner, fb_id, "COMPLETE")
+                        else:
+                            yield (t + 1, r, m, p1, p2, None, None, None, None, None, None, None, fb_id, "PENDING")
+                    alive = winners
+        return ("tournament_id", "round_number", "match_index", "player1_wallet", "player2_wallet",
+                "player1_score", "player2_score", "player1_rank", "player2_rank", "player1_lineup",
+                "player2_lineup", "winner_wallet", "fastbreak_id", "status"), rows()
+
+    # Chain / payouts
+    def chain_events(self):
+        rng = _rng(self.seed, "chain_events")
+        base = 133_000_000 - self.v["chain_events"]
+        treasury = FLOW_ACCOUNT.lower()
+        def rows():
+            for i in range(self.v["chain_events"]):
+                deposit = rng.random() < 0.6
+                fields = {"id": 5 * 10**7 + rng.randrange(self.v["treasury_moments"] * 2),
+                          ("to" if deposit else "from"): treasury}
+                yield (base + i, _iso(self.now - (self.v["chain_events"] - i)), _hex(rng, 32), 0, 0,
+                       "A.0b2a3299cc857e29.TopShot." + ("Deposit" if deposit else "Withdraw"),
+                       json.dumps(fields, separators=(",", ":")))
+        return ("block_height", "block_timestamp", "transaction_id", "transaction_index", "event_index",
+                "event_type", "fields"), rows()
+
+    def sweepstakes_draws(self):
+        rng = _rng(self.seed, "sweepstakes_draws")
+        def rows():
+            for i in range(5):
+                winners = [self.people.wallets[self.people.pick(rng)] for _ in range(10)]
+                yield ("swapfest", SWAPFEST_START_TIME, SWAPFEST_END_TIME, _hex(rng, 16), 10, 0,
+                       len(self.people.wallets), self.v["gifts"], hashlib.sha256(str(i).encode()).hexdigest(),
+                       json.dumps(winners), "admin", self.now - i * DAY)
+        return ("source", "since", "until", "seed", "num_winners", "with_replacement", "num_wallets",
+                "total_entries", "entries_digest", "winners", "created_by", "created_at"), rows()
+
+    def tx_verifications(self):
+        rng = _rng(self.seed, "tx_verifications")
+        n = max(1, self.v["swaps_per_day"])
+        return ("tx_id", "status", "chain_status", "proposer", "events", "attempts", "registered_at",
+                "next_check_at", "sealed_at"), (
+            (_hex(rng, 32), "SEALED", "SEALED", self.people.wallets[self.people.pick(rng)], "[]", 1,
+             self.now - i * 60, self.now - i * 60, self.now - i * 60 + 8)
+            for i in range(n)
+        )
+
+    def payout_batches(self):
+        rng = _rng(self.seed, "payout_batches")
+        return ("id", "kind", "status", "tx_id", "proposal_seq", "line_count", "created_at",
+                "submitted_at", "sealed_at"), (
+            (i + 1, "MVP", "SEALED", _hex(rng, 32), 1000 + i, 100, self.now - (20 - i) * DAY,
+             self.now - (20 - i) * DAY, self.now - (20 - i) * DAY + 10)
+            for i in range(20)
+        )
+
+    def payouts(self):
+        rng = _rng(self.seed, "payouts")
+        def rows():
+            for b in range(20):
+                for i in range(100):
+                    ts = self.now - (20 - b) * DAY
+                    yield (f"petting:{b}:{i}", "MVP", self.people.wallets[self.people.pick(rng)],
+                           f"{rng.uniform(1, 40):.8f}", "petting", str(self.people.user_ids[i]), "SEALED",
+                           b + 1, 1, ts, ts)
+        return ("idempotency_key", "kind", "recipient", "amount", "source", "source_ref", "status",
+                "batch_id", "attempts", "created_at", "updated_at"), rows()
+
+    def swapboost_holders(self):
+        rng = _rng(self.seed, "swapboost_holders")
+        return ("nft_id", "name", "thumbnail", "owner", "dapper", "updated_at"), (
+            (i + 1, f"Swapboost 30 MVP #{i + 1}", "", self.people.wallets[idx], self.people.dappers[idx], self.now)
+            for i, idx in enumerate(self.people.pick(rng) for _ in range(min(500, self.v["wallets"])))
+        )
+
+
+def generate(conn, db_type, scale="small", seed=42, tables=TABLES, now=None, log=print):
+    """Fill ``tables`` (schema must exist) and return ``{table: rows}``."""
+    gen = Generator(seed, scale, now)
+    counts = {}
+    for table in tables:
+        started = time.perf_counter()
+        columns, rows = getattr(gen, table)()
+        if table in _SEEDED_TABLES:
+            conn.cursor().execute(f"DELETE FROM {table}")
+        counts[table] = bulk_insert(conn, db_type, table, columns, rows)
+        conn.commit()
+        log(f"  {table:<30} {counts[table]:>10,} rows  {time.perf_counter() - started:6.2f}s")
+    _sync_sequences(conn, db_type)
+    if db_type == "postgresql":
+        cursor = conn.cursor()
+        cursor.execute("REFRESH MATERIALIZED VIEW user_rankings_summary")
+        cursor.execute("ANALYZE")
+        conn.commit()
+    return counts
+
+
+def _connect(args):
+    if args.postgres:
+        from db.init import get_db_connection
+        conn, db_type = get_db_connection()
+        if db_type != "postgresql":
+            sys.exit("--postgres needs DATABASE_URL to point at a PostgreSQL database")
+        return conn, db_type
+    return sqlite3.connect(args.sqlite), "sqlite"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the schema with deterministic synthetic data")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite", default="loadtest.db", help="SQLite file to fill (default: loadtest.db)")
+    parser.add_argument("--postgres", action="store_true", help="Fill the DATABASE_URL PostgreSQL database")
+    parser.add_argument("--reset", action="store_true", help="Empty the generated tables first")
+    parser.add_argument("--tables", help="Comma-separated subset of tables")
+    args = parser.parse_args(argv)
+
+    from db.init import initialize_database
+
+    conn, db_type = _connect(args)
+    tables = tuple(t.strip() for t in args.tables.split(",")) if args.tables else TABLES
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        sys.exit(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+    initialize_database(conn, db_type)
+    if args.reset:
+        reset_tables(conn, db_type, tables)
+    else:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM gifts")
+        if cursor.fetchone()[0]:
+            sys.exit("Tables already hold data; pass --reset to replace it")
+
+    print(f"🌱 Generating '{args.scale}' data (seed {args.seed}) into {db_type}")
+    started = time.perf_counter()
+    counts = generate(conn, db_type, args.scale, args.seed, tables)
+    print(f"✅ {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,826 @@
+"""Offline stand-in for the upstream APIs the app talks to.
+
+Serves the operations this project actually uses, so hot paths can be
+load-tested and benchmarked on an isolated machine:
+
+  TopShot GraphQL  POST /graphql      getFastBreakLeadersV2, searchFastBreakRuns,
+                                      getMintedMoment (aliases too),
+                                      searchMarketplaceEditions, getUserProfileByUsername
+  Flow REST        /v1/...            blocks, events, transactions,
+                                      transaction_results, accounts, scripts
+  FlowScan         /flowscan/v1/...   same REST routes (``FLOW_SCAN_API_URL``)
+  Dapper profile   GET /profile       ``?address=`` → displayName
+
+Responses come from recorded fixtures when one matches, otherwise they are
+generated deterministically from the ``loadtest.synthetic`` seed, so the
+FastBreaks, usernames and editions line up with a database filled by
+``python -m loadtest.synthetic`` using the same seed and scale.  The chain
+grows one block every ``block_seconds`` from ``base_height``.  Block ids and
+transaction ids carry their height, so any id handed out can be looked up
+again without keeping state.
+
+Latency, jitter, errors, stalls, rate limits and a GraphQL alias limit can
+be set per upstream on the command line or at runtime through
+``POST /__sim/config``.  ``GET /__sim/stats`` counts requests per
+operation, and GraphQL fields under ``topshot:field:<name>``.
+
+Usage:
+  python -m loadtest.upstream_sim --port 8900 --latency-ms 80 --error-rate 0.01
+  # then start the app with the printed TOPSHOT_GRAPHQL_URL / FLOW_REST_URL / ... exports
+
+The Flow gRPC access node (``FLOW_ACCESS_NODE_HOST``) is not simulated;
+paths that run Cadence over gRPC still need a real access node.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import Blueprint, Flask, jsonify, request
+
+from config import FLOW_ACCOUNT
+from utils.cdc_events import TOPSHOT_DEPOSIT, TOPSHOT_WITHDRAW, NFT_DEPOSITED
+from utils.flow_rest import EVENTS_MAX_RANGE
+from loadtest.synthetic import Generator, PLAYERS, SETS, TEAMS, TIERS, _weighted_choice, _iso
+
+NFT_WITHDRAWN = "A.1d7e57aa55817448.NonFungibleToken.Withdrawn"
+TOPSHOT_NFT_TYPE = "A.0b2a3299cc857e29.TopShot.NFT"
+SWAPBOOST_NFT_TYPE = "A.aad9f8fa31ecbaf9.Swapboost30MVP.NFT"
+
+BASE_HEIGHT = 133_000_000
+UPSTREAMS = ("topshot", "flow", "flowscan", "dapper")
+GRAPHQL_FIELDS = ("getFastBreakLeadersV2", "searchFastBreakRuns", "getMintedMoment",
+                  "searchMarketplaceEditions", "getUserProfileByUsername")
+
+_OPERATION_HEADER = re.compile(r"^\s*(?:query|mutation)\s+\w+\s*(?:\([^)]*\))?", re.S)
+_FIELD_CALL = re.compile(r"(?:(\w+)\s*:\s*)?\b(" + "|".join(GRAPHQL_FIELDS) + r")\s*\(([^)]*)\)")
+_INLINE_ARG = re.compile(r'(\w+)\s*:\s*"([^"]*)"')
+_VARIABLE_ARG = re.compile(r"(\w+)\s*:\s*\$(\w+)")
+
+
+def _digest(*parts):
+    return hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _b64(obj):
+    return base64.b64encode(json.dumps(obj, separators=(",", ":")).encode()).decode()
+
+
+def _cdc(cdc_type, value):
+    return {"type": cdc_type, "value": value}
+
+
+def _cdc_address(address, optional=True):
+    inner = _cdc("Address", address)
+    return _cdc("Optional", inner) if optional else inner
+
+
+# ── Fault injection ─────────────────────────────────────────────────
+
+class Injection:
+    """Latency / failure / rate-limit settings for one upstream.
+
+    ``rate_limit`` is requests per second (0 = unlimited) with a token
+    bucket of ``burst`` requests; over-limit requests get 429 + Retry-After.
+    ``error_rate`` answers 503, ``stall_rate`` sleeps ``stall_seconds``
+    (past the callers' timeouts) before answering 504.  ``max_aliases``
+    rejects GraphQL requests with more aliased fields, like TopShot's
+    complexity limit (0 = unlimited).
+    """
+
+    FIELDS = ("latency_ms", "jitter_ms", "error_rate", "stall_rate", "stall_seconds",
+              "rate_limit", "burst", "max_aliases")
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, stall_rate=0.0, stall_seconds=35.0,
+                 rate_limit=0.0, burst=None, max_aliases=0, seed=0):
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_aliases = max_aliases
+        self._tokens = None
+        self._refilled = time.monotonic()
+
+    def update(self, **changes):
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown injection settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self._tokens = None
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def _capacity(self):
+        return self.burst if self.burst is not None else max(1.0, self.rate_limit)
+
+    def acquire(self):
+        """Take one rate-limit token; returns seconds to wait when none is left, else 0."""
+        if not self.rate_limit:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            capacity = self._capacity()
+            if self._tokens is None:
+                self._tokens = capacity
+            self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate_limit
+
+    def draw(self):
+        """Pick this request's fate: ``(delay_seconds, outcome)`` with outcome ok/error/stall."""
+        with self._lock:
+            delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+        if roll < self.stall_rate:
+            return delay, "stall"
+        if roll < self.stall_rate + self.error_rate:
+            return delay, "error"
+        return delay, "ok"
+
+
+# ── Deterministic upstream data ─────────────────────────────────────
+
+class SimWorld:
+    """Upstream data derived from the synthetic-dataset seed, plus recorded fixtures.
+
+    ``fixtures`` is ``{"graphql": {key: value}, "rest": {path: body},
+    "scripts": {sha256(cadence): json_cdc}}``.  GraphQL keys are the field
+    name, optionally followed by ``:<fastBreakId|momentId|username>``.
+    """
+
+    def __init__(self, seed=42, scale="small", base_height=BASE_HEIGHT, block_seconds=1.0,
+                 transfers_per_block=3, gift_rate=0.1, fixtures=None, clock=time.time):
+        self.seed = seed
+        self.gen = Generator(seed, scale)
+        self.base_height = base_height
+        self.block_seconds = block_seconds
+        self.transfers_per_block = transfers_per_block
+        self.gift_rate = gift_rate
+        self.fixtures = fixtures or {}
+        self.clock = clock
+        self.started = clock()
+        self.treasury = FLOW_ACCOUNT.lower()
+        self._usernames = {u.lower(): i for i, u in enumerate(self.gen.people.usernames)}
+
+    @classmethod
+    def load_fixtures(cls, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def recorded(self, kind, key):
+        return (self.fixtures.get(kind) or {}).get(key)
+
+    # Chain shape
+    def sealed_height(self):
+        return self.base_height + int((self.clock() - self.started) / self.block_seconds)
+
+    def block_time(self, height):
+        return self.started + (height - self.base_height) * self.block_seconds
+
+    def block_id(self, height):
+        return f"{height:016x}{_digest(self.seed, 'block', height)[:48]}"
+
+    def tx_id(self, height, index):
+        return f"{height:016x}{index:04x}{_digest(self.seed, 'tx', height, index)[:44]}"
+
+    @staticmethod
+    def height_of(block_or_tx_id):
+        try:
+            return int(block_or_tx_id[:16], 16)
+        except (TypeError, ValueError):
+            return None
+
+    def block(self, height):
+        return {
+            "header": {
+                "id": self.block_id(height),
+                "parent_id": self.block_id(height - 1),
+                "height": str(height),
+                "timestamp": _iso(self.block_time(height)).replace(".000Z", "Z"),
+                "parent_voter_signature": "",
+            },
+            "_expandable": {"payload": f"/v1/blocks/{self.block_id(height)}/payload"},
+        }
+
+    @lru_cache(maxsize=8192)
+    def transfers(self, height):
+        """NFT moves in one block: ``[{"tx_index", "id", "from", "to", "nft_type"}]``."""
+        rng = random.Random(f"{self.seed}:transfers:{height}")
+        wallets = self.gen.people.wallets
+        out = []
+        for index in range(rng.randint(0, 2 * self.transfers_per_block)):
+            sender = wallets[self.gen.people.pick(rng)]
+            receiver = wallets[rng.randrange(len(wallets))]
+            nft_type = TOPSHOT_NFT_TYPE
+            roll = rng.random()
+            if roll < self.gift_rate:
+                receiver = self.treasury
+            elif roll < self.gift_rate * 1.2:
+                sender = self.treasury
+            elif roll > 0.98:
+                nft_type = SWAPBOOST_NFT_TYPE
+            nft_id = rng.randint(1, 500) if nft_type == SWAPBOOST_NFT_TYPE else rng.randint(10**7, 9 * 10**7)
+            out.append({"tx_index": index, "id": nft_id, "from": sender, "to": receiver, "nft_type": nft_type})
+        return tuple(out)
+
+    def _tx_events(self, height, transfer):
+        """``(event_index, type, fields)`` emitted by one transfer transaction."""
+        nft_id, sender, receiver = transfer["id"], transfer["from"], transfer["to"]
+        uuid = _cdc("UInt64", str(nft_id * 7 + 3))
+        type_value = _cdc("Type", {"staticType": {"kind": "Resource", "typeID": transfer["nft_type"]}})
+        events = []
+        if transfer["nft_type"] == TOPSHOT_NFT_TYPE:
+            events.append((TOPSHOT_WITHDRAW, [{"name": "id", "value": _cdc("UInt64", str(nft_id))},
+                                              {"name": "from", "value": _cdc_address(sender)}]))
+        events.append((NFT_WITHDRAWN, [{"name": "type", "value": type_value},
+                                       {"name": "id", "value": _cdc("UInt64", str(nft_id))},
+                                       {"name": "uuid", "value": uuid},
+                                       {"name": "from", "value": _cdc_address(sender)}]))
+        if transfer["nft_type"] == TOPSHOT_NFT_TYPE:
+            events.append((TOPSHOT_DEPOSIT, [{"name": "id", "value": _cdc("UInt64", str(nft_id))},
+                                             {"name": "to", "value": _cdc_address(receiver)}]))
+        events.append((NFT_DEPOSITED, [{"name": "type", "value": type_value},
+                                       {"name": "id", "value": _cdc("UInt64", str(nft_id))},
+                                       {"name": "uuid", "value": uuid},
+                                       {"name": "to", "value": _cdc_address(receiver)}]))
+        tx_id = self.tx_id(height, transfer["tx_index"])
+        return [{
+            "type": event_type,
+            "transaction_id": tx_id,
+            "transaction_index": str(transfer["tx_index"]),
+            "event_index": str(i),
+            "payload": _b64({"type": "Event", "value": {"id": event_type, "fields": fields}}),
+        } for i, (event_type, fields) in enumerate(events)]
+
+    def events(self, event_type, start_height, end_height):
+        blocks = []
+        for height in range(start_height, end_height + 1):
+            evs = [ev for t in self.transfers(height) for ev in self._tx_events(height, t)
+                   if ev["type"] == event_type]
+            blocks.append({
+                "block_id": self.block_id(height),
+                "block_height": str(height),
+                "block_timestamp": self.block(height)["header"]["timestamp"],
+                "events": evs,
+            })
+        return blocks
+
+    def _transfer_for(self, tx_id):
+        height = self.height_of(tx_id)
+        if height is None or height > self.sealed_height() or tx_id != self.tx_id(height, int(tx_id[16:20], 16)):
+            return None, None
+        index = int(tx_id[16:20], 16)
+        for transfer in self.transfers(height):
+            if transfer["tx_index"] == index:
+                return height, transfer
+        return None, None
+
+    def transaction(self, tx_id):
+        height, transfer = self._transfer_for(tx_id)
+        if transfer is None:
+            return None
+        script = (
+            "import NonFungibleToken from 0x1d7e57aa55817448\n"
+            "import TopShot from 0x0b2a3299cc857e29\n"
+            f"transaction {{ prepare(acct: auth(BorrowValue) &Account) {{ "
+            f"let nft <- acct.storage.borrow<auth(NonFungibleToken.Withdraw) &TopShot.Collection>"
+            f"(from: /storage/MomentCollection)!.withdraw(withdrawID: {transfer['id']}) "
+            f"// tokenID: {transfer['id']}\n"
+            f"getAccount({transfer['to']}).capabilities.borrow<&{{NonFungibleToken.Receiver}}>"
+            f"(/public/MomentCollection)!.deposit(token: <-nft) }} }}"
+        )
+        sender = transfer["from"].removeprefix("0x")
+        return {
+            "id": tx_id,
+            "script": base64.b64encode(script.encode()).decode(),
+            "arguments": [],
+            "reference_block_id": self.block_id(height - 3),
+            "gas_limit": "9999",
+            "payer": sender,
+            "proposal_key": {"address": sender, "key_index": "0", "sequence_number": str(height % 10_000)},
+            "authorizers": [sender],
+            "payload_signatures": [],
+            "envelope_signatures": [],
+            "_expandable": {"result": f"/v1/transaction_results/{tx_id}"},
+        }
+
+    def transaction_result(self, tx_id):
+        height, transfer = self._transfer_for(tx_id)
+        if transfer is None:
+            return None
+        return {
+            "block_id": self.block_id(height),
+            "collection_id": _digest(self.seed, "collection", height),
+            "execution": "Success",
+            "status": "Sealed",
+            "status_code": 0,
+            "error_message": "",
+            "computation_used": "87",
+            "events": self._tx_events(height, transfer),
+        }
+
+    def account(self, address, keys=4):
+        return {
+            "address": address.removeprefix("0x"),
+            "balance": "100000000",
+            "keys": [{"index": str(i), "public_key": _digest("key", address, i) * 2, "signing_algorithm": "ECDSA_P256",
+                      "hashing_algorithm": "SHA3_256", "sequence_number": "0", "weight": "1000", "revoked": False}
+                     for i in range(keys)],
+        }
+
+    def script_result(self, cadence):
+        recorded = self.recorded("scripts", hashlib.sha256(cadence.encode()).hexdigest())
+        return recorded if recorded is not None else _cdc("Array", [])
+
+    # TopShot
+    def fastbreak_runs(self):
+        runs = {}
+        for fb_id, game_date, run_name, status in self.gen._fastbreak_list():
+            run = runs.setdefault(run_name, {
+                "id": _digest(self.seed, "run", run_name)[:32], "runName": run_name, "fastBreaks": [],
+            })
+            run["fastBreaks"].append({
+                "id": fb_id, "runId": run["id"], "gameDate": game_date[:10], "gamesStartAt": game_date,
+                "status": status, "stats": [{"id": "pts", "stat": "POINTS", "valueNeeded": 120, "valueType": "TOTAL"}],
+            })
+        # Pro runs exist upstream and are skipped by update_fastbreaks_table
+        runs["Classic Pro"] = {"id": _digest(self.seed, "run", "pro")[:32], "runName": "Classic Pro", "fastBreaks": []}
+        return list(runs.values())
+
+    @lru_cache(maxsize=64)
+    def leaders(self, fastbreak_id):
+        """Every population user ranked for one FastBreak: ``[(username, points)]``."""
+        rng = random.Random(f"{self.seed}:leaders:{fastbreak_id}")
+        scored = [(name, rng.randint(40, 260)) for name in self.gen.people.usernames]
+        scored.sort(key=lambda s: (-s[1], s[0]))
+        return tuple(scored)
+
+    def _leader(self, fastbreak_id, rank, username, points):
+        rng = random.Random(f"{self.seed}:lineup:{fastbreak_id}:{username}")
+        return {
+            "rank": rank, "points": points, "dapperId": f"auth0|{_digest('dapper', username)[:24]}",
+            "submissionId": _digest("submission", fastbreak_id, username)[:32], "winStatus": "NONE",
+            "onboardingStatus": "COMPLETE",
+            "user": {"dapperID": f"auth0|{_digest('dapper', username)[:24]}", "username": username,
+                     "profileImageUrl": "", "email": None},
+            "players": [{"playerId": str(200000 + i), "fullName": name, "points": rng.randint(5, 60),
+                         "teamId": str(1610612743 + i), "stats": []}
+                        for i, name in enumerate(rng.sample(PLAYERS, 3))],
+        }
+
+    def fastbreak_leaders(self, fastbreak_id, cursor="", limit=50, username=None):
+        ranked = self.leaders(fastbreak_id)
+        if username:
+            for rank, (name, points) in enumerate(ranked, start=1):
+                if name.lower() == username.lower():
+                    return {"leaders": [self._leader(fastbreak_id, rank, name, points)],
+                            "rightCursor": "", "totalCount": 1}
+            return {"leaders": [], "rightCursor": "", "totalCount": 0}
+        start = int(cursor or 0)
+        page = ranked[start:start + limit]
+        end = start + len(page)
+        return {
+            "leaders": [self._leader(fastbreak_id, start + i + 1, name, points) for i, (name, points) in enumerate(page)],
+            "rightCursor": str(end) if end < len(ranked) else "",
+            "totalCount": len(ranked),
+        }
+
+    def minted_moment(self, moment_id):
+        rng = random.Random(f"{self.seed}:moment:{moment_id}")
+        tier = "MOMENT_TIER_" + _weighted_choice(rng, TIERS)
+        player = PLAYERS[0] if rng.random() < 0.6 else rng.choice(PLAYERS)
+        set_flow_id = rng.randint(1, 230)
+        circulation = rng.choice((25, 99, 250, 1000, 4000, 15000))
+        circulations = {"circulationCount": circulation, "forSaleByCollectors": rng.randint(0, circulation // 4),
+                        "burned": 0, "locked": 0, "hiddenInPacks": 0, "ownedByCollectors": circulation}
+        asset = f"https://assets.nbatopshot.com/editions/{_digest('asset', moment_id)[:12]}/"
+        return {
+            "id": str(moment_id), "version": "1", "tier": tier, "tags": [],
+            "flowId": str(moment_id), "flowSerialNumber": str(rng.randint(1, circulation)),
+            "set": {"id": _digest("set", set_flow_id)[:32], "flowId": set_flow_id, "flowName": rng.choice(SETS),
+                    "flowSeriesNumber": rng.randint(1, 7), "setVisualId": "SET_VISUAL_COMMON"},
+            "setPlay": {"ID": _digest("setplay", moment_id)[:32], "flowRetired": False, "tags": [],
+                        "circulations": circulations},
+            "parallelSetPlay": {"circulations": circulations},
+            "assetPathPrefix": asset,
+            "play": {
+                "id": _digest("play", moment_id)[:32], "flowID": rng.randint(1, 5000),
+                "description": f"{player} makes a play", "shortDescription": "Highlight", "keyStats": [], "tags": [],
+                "stats": {"playerName": player, "playCategory": rng.choice(("Dunk", "Assist", "Layup", "3 Pointer")),
+                          "dateOfMoment": "2024-03-01T02:00:00Z", "teamAtMoment": rng.choice(TEAMS),
+                          "nbaSeason": "2024-25", "jerseyNumber": "15", "homeTeamName": TEAMS[0],
+                          "homeTeamScore": 120, "awayTeamName": TEAMS[1], "awayTeamScore": 110},
+                "statsPlayerGameScores": {"points": rng.randint(10, 45), "rebounds": rng.randint(3, 20),
+                                          "assists": rng.randint(2, 18)},
+                "statsPlayerSeasonAverageScores": {"points": 26.4, "rebounds": 12.4, "assists": 9.0},
+            },
+            "forSale": rng.random() < 0.1, "price": None, "lowAsk": round(rng.uniform(1, 300), 2),
+            "highestOffer": None, "lastPurchasePrice": None,
+            "owner": {"username": self.gen.people.usernames[self.gen.people.pick(rng)], "flowAddress": None},
+        }
+
+    def marketplace_editions(self, cursor="", limit=100, user_id=None):
+        editions = self.gen._edition_list()
+        start = int(cursor or 0)
+        page = editions[start:start + limit]
+        end = start + len(page)
+        data = []
+        for e in page:
+            rng = random.Random(f"{self.seed}:edition:{e['edition_id']}")
+            data.append({
+                "id": e["edition_id"], "tier": e["tier"],
+                "assetPathPrefix": f"https://assets.nbatopshot.com/editions/{e['edition_id'][:12]}/",
+                "set": {"id": e["set_id"], "flowId": e["set_flow_id"], "flowName": e["set_name"],
+                        "setVisualId": "SET_VISUAL_COMMON", "flowSeriesNumber": e["series"]},
+                "play": {"id": e["play_id"], "flowID": e["play_flow_id"], "description": "Jokic threads the needle",
+                         "shortDescription": "Assist", "tags": [], "statsPlayerGameScores": None,
+                         "stats": {"playerName": PLAYERS[0], "dateOfMoment": "2024-03-01T00:00:00Z",
+                                   "playCategory": "Assist", "teamAtMoment": "Denver Nuggets",
+                                   "nbaSeason": "2023-24", "jerseyNumber": "15"}},
+                "setPlay": {"ID": e["edition_id"], "flowRetired": False,
+                            "circulations": {"circulationCount": e["circulation"], "forSaleByCollectors": 0,
+                                             "ownedByCollectors": e["circulation"], "burned": 0, "locked": 0}},
+                "priceRange": {"min": e["low_ask"], "max": e["low_ask"] * 3},
+                "lowAsk": e["low_ask"], "highestOffer": round(e["low_ask"] * 0.7, 2),
+                "circulationCount": e["circulation"], "editionListingCount": rng.randint(0, 50),
+                "parallelID": 0, "parallelName": "",
+                "userOwnedCount": rng.randint(0, 3) if user_id else 0,
+                "averageSaleData": {"averagePrice": e["low_ask"], "numSales": rng.randint(0, 500)},
+            })
+        return {"data": {"searchSummary": {
+            "pagination": {"leftCursor": str(start), "rightCursor": str(end) if end < len(editions) else ""},
+            "data": {"size": len(data), "data": data},
+        }}}
+
+    def wallet_for(self, username):
+        index = self._usernames.get((username or "").lower())
+        if index is None:
+            return None
+        return self.gen.people.wallets[index]
+
+    def user_profile(self, username):
+        wallet = self.wallet_for(username)
+        if wallet is None:
+            return None
+        return {"publicInfo": {"username": self.gen.people.usernames[self._usernames[username.lower()]],
+                               "flowAddress": self.gen.people.dappers[self._usernames[username.lower()]][2:],
+                               "dapperID": f"auth0|{_digest('dapper', username)[:24]}",
+                               "profileImageUrl": ""}}
+
+    def dapper_profile(self, address):
+        address = (address or "").lower()
+        try:
+            index = self.gen.people.dappers.index(address)
+        except ValueError:
+            return {"address": address, "displayName": None}
+        return {"address": address, "displayName": self.gen.people.usernames[index]}
+
+
+# ── GraphQL ─────────────────────────────────────────────────────────
+
+def parse_graphql(query, variables=None):
+    """``[(response_key, field, args)]`` for each supported top-level field."""
+    variables = variables or {}
+    body = _OPERATION_HEADER.sub("", query or "", count=1)
+    calls = []
+    for alias, field, raw_args in _FIELD_CALL.findall(body):
+        args = {name: value for name, value in _INLINE_ARG.findall(raw_args)}
+        for name, var in _VARIABLE_ARG.findall(raw_args):
+            args[name] = variables.get(var)
+        calls.append((alias or field, field, args))
+    return calls
+
+
+def resolve_graphql(world, field, args, query, variables):
+    """Value for one field; raises ``LookupError`` for unknown entities."""
+    inp = args.get("input") if isinstance(args.get("input"), dict) else {}
+    if field == "getMintedMoment":
+        moment_id = str(args.get("momentId") or "")
+        recorded = world.recorded("graphql", f"getMintedMoment:{moment_id}")
+        if recorded is not None:
+            return recorded
+        if not moment_id.isdigit():
+            raise LookupError(f"moment {moment_id!r} not found")
+        return {"data": world.minted_moment(int(moment_id))}
+    if field == "getFastBreakLeadersV2":
+        fb_id = inp.get("fastBreakId")
+        recorded = world.recorded("graphql", f"getFastBreakLeadersV2:{fb_id}")
+        if recorded is not None:
+            return recorded
+        pagination = inp.get("pagination") or {}
+        return world.fastbreak_leaders(fb_id, pagination.get("cursor") or "", int(pagination.get("limit") or 50),
+                                       (inp.get("filters") or {}).get("byUsername"))
+    if field == "searchFastBreakRuns":
+        recorded = world.recorded("graphql", "searchFastBreakRuns")
+        return recorded if recorded is not None else {"fastBreakRuns": world.fastbreak_runs()}
+    if field == "searchMarketplaceEditions":
+        recorded = world.recorded("graphql", "searchMarketplaceEditions")
+        if recorded is not None:
+            return recorded
+        pagination = ((variables.get("searchInput") or {}).get("pagination")) or {}
+        user_id = re.search(r'userID:\s*"([^"]+)"', query or "")
+        return world.marketplace_editions(pagination.get("cursor") or "", int(pagination.get("limit") or 100),
+                                          user_id.group(1) if user_id else None)
+    if field == "getUserProfileByUsername":
+        username = inp.get("username")
+        recorded = world.recorded("graphql", f"getUserProfileByUsername:{username}")
+        if recorded is not None:
+            return recorded
+        profile = world.user_profile(username)
+        if profile is None:
+            raise LookupError(f"user {username!r} not found")
+        return profile
+    raise LookupError(f"unsupported field {field}")
+
+
+# ── Flask app ───────────────────────────────────────────────────────
+
+def _upstream_for(path):
+    if path == "/graphql":
+        return "topshot"
+    if path.startswith("/flowscan/"):
+        return "flowscan"
+    if path.startswith("/v1/"):
+        return "flow"
+    if path == "/profile":
+        return "dapper"
+    return None
+
+
+def _rest_blueprint(name, world, stats):
+    bp = Blueprint(name, __name__)
+
+    def _count(op):
+        stats[f"{name}:{op}"] += 1
+
+    def _error(code, message):
+        return jsonify({"code": code, "message": message}), code
+
+    def _height(value):
+        if value in ("sealed", "final"):
+            return world.sealed_height()
+        return int(value)
+
+    @bp.route("/blocks")
+    def blocks():
+        _count("blocks")
+        sealed = world.sealed_height()
+        try:
+            if request.args.get("height"):
+                heights = [_height(h) for h in request.args["height"].split(",")]
+            else:
+                heights = list(range(_height(request.args["start_height"]), _height(request.args["end_height"]) + 1))
+        except (KeyError, ValueError):
+            return _error(400, "invalid height")
+        if any(h > sealed for h in heights):
+            return _error(404, f"block height {max(heights)} not sealed (latest {sealed})")
+        return jsonify([world.block(h) for h in heights])
+
+    @bp.route("/blocks/<block_id>")
+    def block_by_id(block_id):
+        _count("blocks/id")
+        height = world.height_of(block_id)
+        if height is None or height > world.sealed_height() or world.block_id(height) != block_id:
+            return _error(404, "block not found")
+        return jsonify([world.block(height)])
+
+    @bp.route("/events")
+    def events():
+        _count("events")
+        event_type = request.args.get("type")
+        try:
+            start, end = _height(request.args["start_height"]), _height(request.args["end_height"])
+        except (KeyError, ValueError):
+            return _error(400, "start_height and end_height are required")
+        if not event_type:
+            return _error(400, "type is required")
+        if end < start or end - start + 1 > EVENTS_MAX_RANGE:
+            return _error(400, f"height range must be 1..{EVENTS_MAX_RANGE} blocks")
+        if end > world.sealed_height():
+            return _error(400, f"end height {end} is beyond the latest sealed block")
+        return jsonify(world.events(event_type, start, end))
+
+    @bp.route("/transactions/<tx_id>")
+    def transaction(tx_id):
+        _count("transactions")
+        recorded = world.recorded("rest", f"/transactions/{tx_id}")
+        body = recorded if recorded is not None else world.transaction(tx_id)
+        return jsonify(body) if body is not None else _error(404, "transaction not found")
+
+    @bp.route("/transaction_results/<tx_id>")
+    def transaction_result(tx_id):
+        _count("transaction_results")
+        recorded = world.recorded("rest", f"/transaction_results/{tx_id}")
+        body = recorded if recorded is not None else world.transaction_result(tx_id)
+        return jsonify(body) if body is not None else _error(404, "transaction result not found")
+
+    @bp.route("/accounts/<address>")
+    def account(address):
+        _count("accounts")
+        return jsonify(world.account(address))
+
+    @bp.route("/scripts", methods=["POST"])
+    def scripts():
+        _count("scripts")
+        body = request.get_json(silent=True) or {}
+        try:
+            cadence = base64.b64decode(body.get("script") or "").decode()
+        except (ValueError, UnicodeDecodeError):
+            return _error(400, "script must be base64")
+        return jsonify(_b64(world.script_result(cadence)))
+
+    return bp
+
+
+def create_app(world, injections=None):
+    """Flask app serving every simulated upstream for ``world``."""
+    app = Flask(__name__)
+    injections = injections or {}
+    for name in UPSTREAMS:
+        injections.setdefault(name, Injection(seed=world.seed))
+    stats = Counter()
+    injected = Counter()
+    stats_lock = threading.Lock()
+    app.sim = {"world": world, "injections": injections, "stats": stats, "injected": injected}
+
+    @app.before_request
+    def _inject():
+        upstream = _upstream_for(request.path)
+        if upstream is None:
+            return None
+        injection = injections[upstream]
+        retry_after = injection.acquire()
+        if retry_after:
+            with stats_lock:
+                injected[f"{upstream}:rate_limited"] += 1
+            resp = jsonify({"code": 429, "message": "rate limit exceeded"})
+            resp.status_code = 429
+            resp.headers["Retry-After"] = f"{retry_after:.2f}"
+            return resp
+        delay, outcome = injection.draw()
+        if delay:
+            time.sleep(delay)
+        if outcome == "stall":
+            with stats_lock:
+                injected[f"{upstream}:stalls"] += 1
+            time.sleep(injection.stall_seconds)
+            return jsonify({"code": 504, "message": "upstream timeout"}), 504
+        if outcome == "error":
+            with stats_lock:
+                injected[f"{upstream}:errors"] += 1
+            return jsonify({"code": 503, "message": "service unavailable"}), 503
+        return None
+
+    @app.route("/graphql", methods=["POST"])
+    def graphql():
+        body = request.get_json(silent=True) or {}
+        query, variables = body.get("query") or "", body.get("variables") or {}
+        calls = parse_graphql(query, variables)
+        with stats_lock:
+            stats["topshot:graphql"] += 1
+            for _, field, _ in calls:
+                stats[f"topshot:field:{field}"] += 1
+        if not calls:
+            return jsonify({"data": None, "errors": [{"message": "unsupported operation"}]})
+        limit = injections["topshot"].max_aliases
+        if limit and len(calls) > limit:
+            return jsonify({"data": None, "errors": [{"message": f"query complexity too high ({len(calls)} > {limit})"}]})
+        data, errors = {}, []
+        for key, field, args in calls:
+            try:
+                data[key] = resolve_graphql(world, field, args, query, variables)
+            except LookupError as e:
+                data[key] = None
+                errors.append({"message": str(e), "path": [key]})
+        out = {"data": data}
+        if errors:
+            out["errors"] = errors
+        return jsonify(out)
+
+    @app.route("/profile")
+    def profile():
+        with stats_lock:
+            stats["dapper:profile"] += 1
+        return jsonify(world.dapper_profile(request.args.get("address")))
+
+    app.register_blueprint(_rest_blueprint("flow", world, stats), url_prefix="/v1")
+    app.register_blueprint(_rest_blueprint("flowscan", world, stats), url_prefix="/flowscan/v1")
+
+    @app.route("/__sim/stats")
+    def sim_stats():
+        return jsonify({"requests": dict(stats), "injected": dict(injected),
+                        "sealed_height": world.sealed_height()})
+
+    @app.route("/__sim/config", methods=["GET", "POST"])
+    def sim_config():
+        if request.method == "POST":
+            try:
+                for upstream, changes in (request.get_json(silent=True) or {}).items():
+                    targets = UPSTREAMS if upstream == "all" else (upstream,)
+                    for name in targets:
+                        injections[name].update(**changes)
+            except (KeyError, ValueError, TypeError) as e:
+                return jsonify({"error": str(e)}), 400
+        return jsonify({name: inj.as_dict() for name, inj in injections.items()})
+
+    @app.route("/__sim/reset", methods=["POST"])
+    def sim_reset():
+        stats.clear()
+        injected.clear()
+        return jsonify({"ok": True})
+
+    return app
+
+
+def app_env(base_url):
+    """Environment variables that point the app at a simulator on ``base_url``."""
+    base_url = base_url.rstrip("/")
+    return {
+        "TOPSHOT_GRAPHQL_URL": f"{base_url}/graphql",
+        "FLOW_REST_URL": f"{base_url}/v1",
+        "FLOW_SCAN_API_URL": f"{base_url}/flowscan/v1",
+        "DAPPER_PROFILE_URL": f"{base_url}/profile",
+    }
+
+
+class SimServer:
+    """Run the simulator on a background thread (benchmarks, tests)."""
+
+    def __init__(self, world, injections=None, host="127.0.0.1", port=0):
+        from werkzeug.serving import make_server
+        self.app = create_app(world, injections)
+        self._server = make_server(host, port, self.app, threaded=True)
+        self.url = f"http://{host}:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join(timeout=5)
+        return False
+
+    def env(self):
+        return app_env(self.url)
+
+
+def _injection_from_args(args, seed):
+    return Injection(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                     stall_rate=args.stall_rate, stall_seconds=args.stall_seconds,
+                     rate_limit=args.rate_limit, burst=args.burst, max_aliases=args.max_aliases, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline TopShot / Flow REST / FlowScan simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=42, help="Same seed as loadtest.synthetic")
+    parser.add_argument("--scale", default="small", help="Same scale as loadtest.synthetic")
+    parser.add_argument("--fixtures", help="JSON file of recorded responses")
+    parser.add_argument("--base-height", type=int, default=BASE_HEIGHT)
+    parser.add_argument("--block-seconds", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=35.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second per upstream (0 = off)")
+    parser.add_argument("--burst", type=float, default=None)
+    parser.add_argument("--max-aliases", type=int, default=0, help="GraphQL alias limit (0 = off)")
+    args = parser.parse_args(argv)
+
+    fixtures = SimWorld.load_fixtures(args.fixtures) if args.fixtures else None
+    world = SimWorld(args.seed, args.scale, args.base_height, args.block_seconds, fixtures=fixtures)
+    injections = {name: _injection_from_args(args, args.seed + i) for i, name in enumerate(UPSTREAMS)}
+    app = create_app(world, injections)
+
+    base_url = f"http://{args.host}:{args.port}"
+    print(f"🛰️  Upstream simulator on {base_url} (seed {args.seed}, scale {args.scale})")
+    print("   Point the app at it with:")
+    for name, value in app_env(base_url).items():
+        print(f"   export {name}={value}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -641,6 +641,8 @@ export default function FastbreakBracket() {
       });
 
       setTxStatus(`✅ Transfer submitted: <a href="https://flowscan.io/tx/${txId}" target="_blank" rel="noopener noreferrer">${txId.slice(0, 12)}…</a>. Waiting for seal…`);
+      // Let the backend start verifying while we wait for the seal
+      fetch(`/api/tx/${txId}/verify`, { method: 'POST' }).catch(() => {});
       await fcl.tx(txId).onceSealed();
       setTxStatus('✅ Moments transferred! Verifying and registering…');
 
@@ -883,6 +883,8 @@ export default function Swap() {
       }
 
       setSwapModal(prev => ({ ...prev, step: 'submitted', txId: transactionId }));
+      // Let the backend start verifying while we wait for the seal
+      fetch(`/api/tx/${transactionId}/verify`, { method: 'POST' }).catch(() => {});
 
       /* Step 2: Wait for seal */
       setSwapModal(prev => ({ ...prev, step: 'sealing' }));
@@ -974,6 +976,8 @@ export default function Swap() {
       });
 
       setSwapModal(prev => ({ ...prev, step: 'submitted', txId: transactionId }));
+      // Let the backend start verifying while we wait for the seal
+      fetch(`/api/tx/${transactionId}/verify`, { method: 'POST' }).catch(() => {});
 
       /* Step 2: Wait for seal */
       setSwapModal(prev => ({ ...prev, step: 'sealing' }));
@@ -1,30 +1,79 @@
 """Flask API routes for JokicGuess application."""
 
+import hmac
 import math
 import datetime
 import statistics
+import threading
 import time
 import os
 import requests as http_requests
-from flask import jsonify, send_from_directory, request, g
+from flask import jsonify, send_from_directory, request, g, Response, stream_with_context
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.helpers import (
     prepare_query, map_wallet_to_username, 
     get_rank_and_lineup_for_user, get_flow_wallet_from_ts_username,
-    get_ts_username_from_flow_wallet, get_jokic_editions,
-    get_dapper_id_from_flow_wallet, extract_fastbreak_runs
+    get_ts_username_from_flow_wallet, get_ts_usernames_bulk, get_jokic_editions,
+    get_dapper_id_from_flow_wallet, extract_fastbreak_runs, fetch_minted_moments
+)
+from utils.csv_export import (
+    gifts_export_query, iter_rows, iter_csv, iter_gzip, gift_csv_row, GIFTS_CSV_HEADER,
+)
+from utils.cdc_events import TOPSHOT_DEPOSIT, NFT_DEPOSITED, FT_DEPOSITED
+from utils.contest_standings import (
+    build_contest_standings, load_contest_standings,
+    save_contest_standings, is_fastbreak_finished,
 )
 from config import (
     SWAPFEST_START_TIME, SWAPFEST_END_TIME,
     SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF,
     TREASURY_DATA, FLOW_ACCOUNT,
     FLOW_SWAP_ACCOUNT, FLOW_SWAP_PRIVATE_KEY, FLOW_SWAP_KEY_INDEX,
-    HORSE_NAMES, REWARD_POOL
+    HORSE_NAMES, REWARD_POOL, TOPSHOT_GRAPHQL_URL
 )
 
+from db import statements
+
+# Swapfest leaderboard aggregate over every gift in the event window
+_SWAPFEST_LEADERBOARD = statements.register("swapfest_leaderboard", '''
+    SELECT
+        from_address,
+        SUM(points * CASE
+            WHEN "timestamp" < ? THEN 1.4
+            WHEN "timestamp" < ? THEN 1.2
+            ELSE 1.0
+        END) AS total_points,
+        MAX("timestamp") AS last_scored_at
+    FROM gifts
+    WHERE "timestamp" BETWEEN ? AND ?
+    GROUP BY from_address
+    ORDER BY total_points DESC, last_scored_at ASC
+''')
+
+
+def _bearer_token_error(token):
+    """None if the request carries ``Authorization: Bearer <token>``, else an error response.
+
+    Fails closed: with no token configured the endpoint answers 404.
+    """
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
+
+
+def _admin_token_error():
+    from config import ADMIN_API_TOKEN
+    return _bearer_token_error(ADMIN_API_TOKEN)
+
 
 def register_routes(app):
     """Register all Flask routes."""
+    from utils import metrics
+    metrics.instrument_app(app)
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -47,22 +96,8 @@ def register_routes(app):
         db = get_db()
         cursor = db.cursor()
 
-        query = prepare_query('''
-            SELECT
-                from_address,
-                SUM(points * CASE
-                    WHEN "timestamp" < ? THEN 1.4
-                    WHEN "timestamp" < ? THEN 1.2
-                    ELSE 1.0
-                END) AS total_points,
-                MAX("timestamp") AS last_scored_at
-            FROM gifts
-            WHERE "timestamp" BETWEEN ? AND ?
-            GROUP BY from_address
-            ORDER BY total_points DESC, last_scored_at ASC
-        ''')
-
-        cursor.execute(query, (boost1_cutoff, boost2_cutoff, start_time, end_time))
+        statements.execute(cursor, _SWAPFEST_LEADERBOARD,
+                           (boost1_cutoff, boost2_cutoff, start_time, end_time))
         rows = cursor.fetchall()
 
         def _to_iso(ts):
@@ -101,6 +136,86 @@ def register_routes(app):
             "leaderboard": leaderboard_data
         })
 
+    @app.route("/api/export/gifts.csv")
+    def api_export_gifts_csv():
+        """Stream every Swapfest gift as CSV (``?from_address=`` filter, ``?gzip=1``).
+
+        Admin only, like the ``/export_gifts_csv`` bot command: requires
+        ``Authorization: Bearer <ADMIN_API_TOKEN>``.
+        """
+        denied = _admin_token_error()
+        if denied:
+            return denied
+        from_address = (request.args.get("from_address") or "").strip() or None
+        compress = request.args.get("gzip") in ("1", "true")
+
+        def _generate():
+            from db.init import get_db_connection
+            conn, db_type = get_db_connection()
+            try:
+                query, params = gifts_export_query(from_address)
+                chunks = iter_csv(iter_rows(conn, db_type, query, params), GIFTS_CSV_HEADER, gift_csv_row)
+                yield from (iter_gzip(chunks) if compress else chunks)
+            finally:
+                conn.close()
+
+        filename = "swapfest_gifts.csv.gz" if compress else "swapfest_gifts.csv"
+        return Response(
+            stream_with_context(_generate()),
+            mimetype="application/gzip" if compress else "text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    @app.route("/api/sweepstakes/draws")
+    def api_sweepstakes_draws():
+        """Recorded sweepstakes draws, newest first (``?limit=``, max 200)."""
+        from utils.sweepstakes import list_draws
+
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+        draws = list_draws(get_db().cursor(), limit)
+        for draw in draws:
+            draw["winner_usernames"] = [map_wallet_to_username(w) for w in draw["winners"]]
+        return jsonify({"draws": draws})
+
+    @app.route("/api/sweepstakes/draws/<int:draw_id>")
+    def api_sweepstakes_draw(draw_id):
+        """One recorded draw; ``?verify=1`` replays it from the seed to audit it."""
+        from utils.sweepstakes import load_draw, replay_draw
+
+        cursor = get_db().cursor()
+        draw = load_draw(cursor, draw_id)
+        if not draw:
+            return jsonify({"error": "Draw not found"}), 404
+        draw["winner_usernames"] = [map_wallet_to_username(w) for w in draw["winners"]]
+        if request.args.get("verify") in ("1", "true"):
+            draw["replay"] = replay_draw(cursor, draw)
+        return jsonify(draw)
+
+    @app.route("/api/sweepstakes/preview")
+    def api_sweepstakes_preview():
+        """Dry-run a weighted draw without recording it.
+
+        Query: ``source`` (swapfest | swaps), ``winners``, optional ``seed``,
+        ``replace=1`` (with replacement), ``since`` / ``until``.
+        """
+        from utils.sweepstakes import resolve_window, load_entries, run_draw
+
+        source = request.args.get("source", "swapfest")
+        num_winners = request.args.get("winners", 1, type=int)
+        if num_winners < 1 or num_winners > 1000:
+            return jsonify({"error": "winners must be between 1 and 1000"}), 400
+        try:
+            since, until = resolve_window(source, request.args.get("since"), request.args.get("until"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        entries = load_entries(get_db().cursor(), source, since, until)
+        draw = run_draw(entries, num_winners, request.args.get("seed") or None,
+                        request.args.get("replace") in ("1", "true"))
+        draw.update(source=source, since=since, until=until,
+                    winner_usernames=[map_wallet_to_username(w) for w in draw["winners"]])
+        return jsonify(draw)
+
     @app.route('/api/treasury')
     def api_treasury():
         # Get data from config
@@ -247,6 +362,20 @@ def register_routes(app):
                 "userEntries": user_entries
             })
 
+        # CLOSED + FINISHED: serve the frozen final standings
+        if status == 'CLOSED':
+            frozen = load_contest_standings(cursor, contest_id)
+            if frozen is not None:
+                for item in frozen:
+                    item["isUser"] = (item["wallet"] == user_wallet)
+                return jsonify({
+                    "status": "STARTED",
+                    "entries": frozen,
+                    "totalEntries": len(frozen),
+                    "totalPot": len(frozen) * float(buy_in_amount) * 0.95,
+                    "final": True,
+                })
+
         # STARTED: full leaderboard
         cursor.execute(prepare_query('''
             SELECT userWalletAddress, topshotUsernamePrediction, created_at
@@ -258,71 +387,30 @@ def register_routes(app):
         total_entries = len(entries)
         total_pot = total_entries * float(buy_in_amount) * 0.95
 
-        predictions = [e[1] for e in entries]
-        unique_predictions = list({p for p in predictions if p})
-
-        stats_map = {}
-
-        def _fetch(pred):
-            return pred, get_rank_and_lineup_for_user(pred, fastbreak_id)
-
-        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
-            futures = {pool.submit(_fetch, pred): pred for pred in unique_predictions}
-            for fut in as_completed(futures):
-                pred, data = fut.result()
-                stats_map[pred] = data
-
-        def _to_epoch_seconds(dt_val) -> int:
-            if dt_val is None:
-                return 2_147_483_647
-            if isinstance(dt_val, (int, float)):
-                return int(dt_val)
-            if isinstance(dt_val, datetime.datetime):
-                if dt_val.tzinfo is None:
-                    dt_val = dt_val.replace(tzinfo=datetime.UTC)
-                return int(dt_val.timestamp())
-            if isinstance(dt_val, str):
-                try:
-                    dt = datetime.datetime.fromisoformat(dt_val)
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=datetime.UTC)
-                    return int(dt.timestamp())
-                except Exception:
-                    return 2_147_483_647
-            return 2_147_483_647
-
-        result_entries = []
-        for wallet_addr, prediction, created_at in entries:
-            wallet = (wallet_addr or "").lower()
-            stats = stats_map.get(prediction, {})
-            created_epoch = _to_epoch_seconds(created_at)
-            result_entries.append({
-                "wallet": wallet,
-                "prediction": prediction,
-                "rank": stats.get("rank"),
-                "points": stats.get("points"),
-                "lineup": stats.get("players"),
-                "createdAt": created_at if isinstance(created_at, str)
-                              else (created_at.isoformat() if isinstance(created_at, datetime.datetime) else None),
-                "_createdEpoch": created_epoch,
-                "isUser": (wallet == user_wallet),
-            })
+        result_entries = build_contest_standings(entries, fastbreak_id, max_workers=_MAX_WORKERS)
 
-        def _sort_key(x):
-            r = x["rank"]
-            rank_key = r if isinstance(r, int) and r is not None else 1_000_000_000
-            return (rank_key, x["_createdEpoch"])
+        # First view after the FastBreak finished: freeze these standings.
+        # Only the local fastbreaks table is read; otherwise the bracket poller
+        # freezes them (_freeze_finished_contests), so views never query TopShot.
+        final = False
+        if status == 'CLOSED':
+            try:
+                if is_fastbreak_finished(cursor, fastbreak_id, remote=False):
+                    save_contest_standings(db, contest_id, result_entries)
+                    final = True
+            except Exception as e:
+                print(f"⚠️  Could not freeze standings for contest {contest_id}: {e}")
+                db.rollback()
 
-        result_entries.sort(key=_sort_key)
-        for i, item in enumerate(result_entries):
-            item["position"] = i + 1
-            item.pop("_createdEpoch", None)
+        for item in result_entries:
+            item["isUser"] = (item["wallet"] == user_wallet)
 
         return jsonify({
             "status": "STARTED",
             "entries": result_entries,
             "totalEntries": total_entries,
             "totalPot": total_pot,
+            "final": final,
         })
 
     @app.route("/api/fastbreak/contest/<int:contest_id>/entries", methods=["GET"])
@@ -486,6 +574,24 @@ def register_routes(app):
         username = get_ts_username_from_flow_wallet(wallet)
         return jsonify({"username": username})
 
+    _MAX_BULK_WALLETS = 100   # one batched Cadence script per request
+
+    @app.route("/api/linked_usernames", methods=["POST"])
+    def linked_usernames_bulk():
+        """Resolve up to ``_MAX_BULK_WALLETS`` Flow wallets to TopShot usernames.
+
+        Body: ``{"wallets": ["0x...", ...]}``.  Returns
+        ``{"usernames": {wallet: username_or_null}}`` keyed by lower-cased ``0x`` wallet.
+        """
+        data = request.get_json(silent=True) or {}
+        wallets = data.get("wallets")
+        if not isinstance(wallets, list) or not all(isinstance(w, str) for w in wallets):
+            return jsonify({"error": "wallets must be a list of addresses"}), 400
+        if len(wallets) > _MAX_BULK_WALLETS:
+            return jsonify({"error": f"At most {_MAX_BULK_WALLETS} wallets per request"}), 400
+
+        return jsonify({"usernames": get_ts_usernames_bulk(wallets)})
+
     @app.route("/api/fastbreak_racing_stats")
     def fastbreak_racing_stats_general():
         db = get_db()
@@ -877,11 +983,8 @@ def register_routes(app):
         # Distinguish: no child account vs child found but no username
         try:
             import asyncio as _asyncio
-            from utils.helpers import get_linked_child_account, _grpc_lock, _GRPC_DELAY
-            import time as _time
-            with _grpc_lock:
-                child = _asyncio.run(get_linked_child_account(wallet))
-                _time.sleep(_GRPC_DELAY)
+            from utils.helpers import get_linked_child_account
+            child = _asyncio.run(get_linked_child_account(wallet))
         except Exception:
             child = None
 
@@ -991,7 +1094,7 @@ def register_routes(app):
         _GQL_FIELDS = (
             "{ data {"
             " id tier"
-            " set { flowName flowSeriesNumber }"
+            " set { flowId flowName flowSeriesNumber }"
             " play { stats { playerName teamAtMoment nbaSeason playCategory } }"
             " assetPathPrefix"
             " } }"
@@ -1000,26 +1103,9 @@ def register_routes(app):
 
         def _fetch_batch(id_list):
             """Fetch a batch of moments in ONE GraphQL request via aliases."""
-            aliases = " ".join(
-                f'm{i}: getMintedMoment(momentId: "{mid}") {_GQL_FIELDS}'
-                for i, mid in enumerate(id_list)
-            )
-            query = f"query BatchEnrich {{ {aliases} }}"
             try:
-                resp = http_requests.post(
-                    'https://public-api.nbatopshot.com/graphql',
-                    json={'query': query},
-                    headers={**_TS_HEADERS, 'Content-Type': 'application/json'},
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                gql_data = resp.json().get('data') or {}
-                results = {}
-                for i, mid in enumerate(id_list):
-                    entry = gql_data.get(f'm{i}')
-                    if entry and entry.get('data'):
-                        results[int(mid)] = entry['data']
-                return results
+                found = fetch_minted_moments(id_list, _GQL_FIELDS, "BatchEnrich", headers=_TS_HEADERS)
+                return {int(mid): data for mid, data in found.items()}
             except Exception:
                 return {}
 
@@ -1072,6 +1158,7 @@ def register_routes(app):
                         meta['playerName'], meta['tier'], meta['setName'],
                         meta['seriesNumber'], meta['imageUrl'], meta['teamName'],
                         meta['nbaSeason'], meta['playCategory'],
+                        set_info.get('flowId'),
                         int(time.time()),
                     ))
 
@@ -1085,8 +1172,8 @@ def register_routes(app):
                         cur.execute(
                             "INSERT INTO moment_metadata "
                             "(moment_id, player_name, tier, set_name, series_number, "
-                            "image_url, team_name, nba_season, play_category, cached_at) "
-                            "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) "
+                            "image_url, team_name, nba_season, play_category, set_flow_id, cached_at) "
+                            "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) "
                             "ON CONFLICT (moment_id) DO NOTHING",
                             row,
                         )
@@ -1094,8 +1181,8 @@ def register_routes(app):
                     cur.executemany(
                         "INSERT OR IGNORE INTO moment_metadata "
                         "(moment_id, player_name, tier, set_name, series_number, "
-                        "image_url, team_name, nba_season, play_category, cached_at) "
-                        "VALUES (?,?,?,?,?,?,?,?,?,?)",
+                        "image_url, team_name, nba_season, play_category, set_flow_id, cached_at) "
+                        "VALUES (?,?,?,?,?,?,?,?,?,?,?)",
                         new_metadata,
                     )
                 db.commit()
@@ -1114,10 +1201,10 @@ def register_routes(app):
           – verifies on-chain that moments were deposited to treasury.
         """
         import json as _json
-        import base64 as _b64
 
+        from bot.tx_verifier import verified_deposits, normalize_tx_id
         from db.init import get_db_connection
-        conn, _ = get_db_connection()
+        conn, db_type = get_db_connection()
         cursor = conn.cursor()
 
         data = request.get_json() or {}
@@ -1167,7 +1254,7 @@ def register_routes(app):
 
         # ── MOMENT buy-in: on-chain verification ──────────────────
         if buyin_type == 'MOMENT':
-            tx_id = (data.get('txId') or '').strip()
+            tx_id = normalize_tx_id(data.get('txId'))
             moment_ids = data.get('momentIds', [])
 
             if not tx_id or not moment_ids:
@@ -1184,64 +1271,16 @@ def register_routes(app):
             if cursor.fetchone():
                 return jsonify({"error": "This transaction has already been used for a signup"}), 409
 
-            # Fetch transaction result from Flow REST API
-            treasury_addr_clean = FLOW_ACCOUNT.removeprefix('0x').lower()
-            try:
-                flow_resp = http_requests.get(
-                    f'https://rest-mainnet.onflow.org/v1/transaction_results/{tx_id}',
-                    timeout=15,
-                )
-                if flow_resp.status_code != 200:
-                    return jsonify({'error': f'Could not fetch tx from Flow (HTTP {flow_resp.status_code})'}), 502
-                tx_result = flow_resp.json()
-            except Exception as e:
-                return jsonify({'error': f'Flow API error: {str(e)}'}), 502
-
-            tx_status = tx_result.get('status', '').upper()
-            if tx_status != 'SEALED':
-                return jsonify({'error': f'Transaction not sealed (status: {tx_status})'}), 400
-            if tx_result.get('error_message'):
-                return jsonify({'error': f'Transaction failed on-chain: {tx_result["error_message"]}'}), 400
-
-            # Verify proposer matches claimed wallet
-            try:
-                tx_body_resp = http_requests.get(
-                    f'https://rest-mainnet.onflow.org/v1/transactions/{tx_id}',
-                    timeout=10,
-                )
-                if tx_body_resp.status_code == 200:
-                    tx_body = tx_body_resp.json()
-                    proposer = tx_body.get('proposer', '').removeprefix('0x').lower()
-                    claimed = wallet.removeprefix('0x').lower()
-                    if proposer and proposer != claimed:
-                        return jsonify({'error': 'Transaction proposer does not match your wallet'}), 403
-            except Exception:
-                pass  # non-fatal
+            # Sealed result from the verification cache (one chain fetch at most)
+            verification, error = _verified_transaction(conn, db_type, tx_id, wallet)
+            if error:
+                return error
 
-            # Parse TopShot.Deposit events
-            deposited_ids = set()
-            deposit_event_type = 'A.0b2a3299cc857e29.TopShot.Deposit'
-            for ev in tx_result.get('events', []):
-                if ev.get('type') != deposit_event_type:
-                    continue
-                try:
-                    payload = _json.loads(_b64.b64decode(ev['payload']).decode('utf-8'))
-                    fields = payload.get('value', {}).get('fields', [])
-                    ev_id = None
-                    ev_to = None
-                    for f in fields:
-                        if f.get('name') == 'id':
-                            ev_id = int(f['value']['value'])
-                        elif f.get('name') == 'to':
-                            val = f.get('value', {})
-                            if val.get('type') == 'Optional' and val.get('value'):
-                                ev_to = val['value'].get('value', '').removeprefix('0x').lower()
-                            elif val.get('value'):
-                                ev_to = str(val['value']).removeprefix('0x').lower()
-                    if ev_id is not None and ev_to == treasury_addr_clean:
-                        deposited_ids.add(ev_id)
-                except Exception:
-                    continue
+            deposited_ids = {
+                fields['id']
+                for fields in verified_deposits(verification, TOPSHOT_DEPOSIT, FLOW_ACCOUNT)
+                if fields.get('id') is not None
+            }
 
             claimed_set = set(int(mid) for mid in moment_ids)
             missing = claimed_set - deposited_ids
@@ -1518,13 +1557,19 @@ def register_routes(app):
           Dapper wallet (via HybridCustody, same as swap buy flow).
         - FREEROLL: no automated payout (returns error).
 
-        Stores the resulting tx id in ``payout_tx_id``.
+        Stores the resulting tx id in ``payout_tx_id``.  With ``queue``
+        (JSON body or query string) the prize is queued for the next
+        batched treasury disbursement instead (202); ``payout_tx_id`` is
+        filled in once that batch seals.
         """
         import asyncio
         import json as _json
         from db.init import get_db_connection
-        from utils.helpers import get_linked_child_account, _grpc_lock, _GRPC_DELAY
-        import time as _time
+        from utils.helpers import get_linked_child_account
+        from bot.disbursements import enqueue_payout, enqueue_moment_payouts, payouts_for_source
+
+        body = request.get_json(silent=True) or {}
+        queue = bool(body.get('queue')) or request.args.get('queue') in ('1', 'true')
 
         conn, db_type = get_db_connection()
         cursor = conn.cursor()
@@ -1550,6 +1595,14 @@ def register_routes(app):
         if payout_tx_id:
             conn.close()
             return jsonify({"error": "Payout already completed", "payout_tx_id": payout_tx_id}), 409
+        # FAILED lines count too: they stay blocking until an admin resolves them
+        queued = payouts_for_source(cursor, 'bracket', tid, include_failed=True)
+        if queued:
+            conn.close()
+            return jsonify({
+                "error": "Payout already queued",
+                "payouts": [{"id": p["id"], "status": p["status"]} for p in queued],
+            }), 409
 
         try:
             if buyin_type == 'TOKEN':
@@ -1563,6 +1616,21 @@ def register_routes(app):
                     conn.close()
                     return jsonify({"error": "No prize to pay out"}), 400
 
+                if queue:
+                    line = enqueue_payout(cursor, db_type, f"bracket:{tid}", winner_wallet,
+                                          amount=prize_amount, source='bracket', source_ref=tid)
+                    conn.commit()
+                    conn.close()
+                    return jsonify({
+                        "success": True,
+                        "queued": True,
+                        "payout_type": "TOKEN",
+                        "amount": prize_amount,
+                        "currency": fee_currency,
+                        "payout_ids": [line["id"]],
+                        "winner_wallet": winner_wallet,
+                    }), 202
+
                 tx_id = asyncio.run(_send_mvp_from_treasury(winner_wallet, prize_amount))
 
                 cursor.execute(prepare_query(
@@ -1597,14 +1665,27 @@ def register_routes(app):
                     return jsonify({"error": "No deposited moments found"}), 400
 
                 # Discover winner's child Dapper account
-                with _grpc_lock:
-                    winner_dapper = asyncio.run(get_linked_child_account(winner_wallet))
-                    _time.sleep(_GRPC_DELAY)
+                winner_dapper = asyncio.run(get_linked_child_account(winner_wallet))
 
                 if not winner_dapper:
                     conn.close()
                     return jsonify({"error": "Could not discover winner's Dapper wallet"}), 502
 
+                if queue:
+                    lines = enqueue_moment_payouts(cursor, db_type, f"bracket:{tid}", winner_dapper,
+                                                   all_moment_ids, source='bracket', source_ref=tid)
+                    conn.commit()
+                    conn.close()
+                    return jsonify({
+                        "success": True,
+                        "queued": True,
+                        "payout_type": "MOMENT",
+                        "moments_queued": len(all_moment_ids),
+                        "payout_ids": [line["id"] for line in lines],
+                        "winner_wallet": winner_wallet,
+                        "winner_dapper": winner_dapper,
+                    }), 202
+
                 tx_id = asyncio.run(_send_moments_from_treasury(winner_dapper, all_moment_ids))
 
                 cursor.execute(prepare_query(
@@ -1680,76 +1761,65 @@ def register_routes(app):
                       "Chrome/131.0.0.0 Safari/537.36",
     }
 
-    def _fetch_minted_moment(moment_id):
-        """Fetch moment detail via TopShot GraphQL API; return dict or None."""
-        try:
-            gql_query = """query GetMintedMoment($momentId: ID!) {
-  getMintedMoment(momentId: $momentId) {
-    data {
-      id version tier tags { id title visible level }
-      set { id flowName flowSeriesNumber setVisualId }
-      setPlay {
-        ID flowRetired
-        tags { id title visible level }
-        circulations {
-          circulationCount forSaleByCollectors burned locked
-          hiddenInPacks ownedByCollectors
-        }
-      }
-      parallelSetPlay {
-        circulations {
-          circulationCount forSaleByCollectors burned locked
-          hiddenInPacks ownedByCollectors
-        }
-      }
-      assetPathPrefix
-      play {
-        id description shortDescription keyStats
-        tags { id title visible level }
-        stats {
-          playerName playCategory dateOfMoment teamAtMoment
-          nbaSeason jerseyNumber
-          homeTeamName homeTeamScore awayTeamName awayTeamScore
-        }
-        statsPlayerGameScores {
-          points rebounds assists steals blocks minutes
-          fieldGoalsMade fieldGoalsAttempted
-          threePointsMade threePointsAttempted
-          freeThrowsMade freeThrowsAttempted
-        }
-        statsPlayerSeasonAverageScores {
-          points rebounds assists steals blocks
-        }
-      }
-      flowSerialNumber forSale price lowAsk highestOffer
-      lastPurchasePrice
-      owner { username flowAddress }
-      edition {
-        marketplaceInfo {
-          priceRange { min }
-          averageSaleData { averagePrice }
-        }
-      }
-      topshotScore { score averageSalePrice }
-      parallelID
+    # Full GetMintedMoment selection used for showcase enrichment
+    _MINTED_MOMENT_FIELDS = """{
+data {
+  id version tier tags { id title visible level }
+  set { id flowName flowSeriesNumber setVisualId }
+  setPlay {
+    ID flowRetired
+    tags { id title visible level }
+    circulations {
+      circulationCount forSaleByCollectors burned locked
+      hiddenInPacks ownedByCollectors
+    }
+  }
+  parallelSetPlay {
+    circulations {
+      circulationCount forSaleByCollectors burned locked
+      hiddenInPacks ownedByCollectors
+    }
+  }
+  assetPathPrefix
+  play {
+    id description shortDescription keyStats
+    tags { id title visible level }
+    stats {
+      playerName playCategory dateOfMoment teamAtMoment
+      nbaSeason jerseyNumber
+      homeTeamName homeTeamScore awayTeamName awayTeamScore
+    }
+    statsPlayerGameScores {
+      points rebounds assists steals blocks minutes
+      fieldGoalsMade fieldGoalsAttempted
+      threePointsMade threePointsAttempted
+      freeThrowsMade freeThrowsAttempted
+    }
+    statsPlayerSeasonAverageScores {
+      points rebounds assists steals blocks
+    }
+  }
+  flowSerialNumber forSale price lowAsk highestOffer
+  lastPurchasePrice
+  owner { username flowAddress }
+  edition {
+    marketplaceInfo {
+      priceRange { min }
+      averageSaleData { averagePrice }
     }
   }
+  topshotScore { score averageSalePrice }
+  parallelID
+}
 }"""
-            resp = http_requests.post(
-                "https://public-api.nbatopshot.com/graphql",
-                json={
-                    "operationName": "GetMintedMoment",
-                    "query": gql_query,
-                    "variables": {"momentId": moment_id},
-                },
-                headers={**_TS_HEADERS, "Content-Type": "application/json"},
-                timeout=20,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return (data.get("data") or {}).get("getMintedMoment", {}).get("data")
+    _SHOWCASE_BATCH_SIZE = 16  # full selection is costly; keep alias batches small
+
+    def _fetch_minted_moments_batch(moment_ids):
+        """Fetch many moments in ONE GraphQL request via aliases; return {id: data}."""
+        try:
+            return fetch_minted_moments(moment_ids, _MINTED_MOMENT_FIELDS, "BatchShowcase", headers=_TS_HEADERS)
         except Exception:
-            return None
+            return {}
 
     # Badge title → camelCase slug for GIF filenames
     _BADGE_TITLE_MAP = {
@@ -1916,71 +1986,152 @@ def register_routes(app):
             "userOwnedCount": 0,
         }
 
+    # ── Showcase cache ──────────────────────────────────────────────
+    # binder_id → (payload, fetched_at).  Only fully enriched showcases are
+    # cached; once older than _SHOWCASE_TTL the stale copy is still served
+    # while a background thread refreshes it.
+    _SHOWCASE_TTL = 600
+    _SHOWCASE_CACHE_MAX = 200
+    _SHOWCASE_MOMENT_TTL = 1800  # per-moment detail (prices/owner drift)
+    _SHOWCASE_MOMENT_CACHE_MAX = 20000
+    _showcase_cache = {}
+    _showcase_moment_cache = OrderedDict()  # moment_id → (GetMintedMoment data, expiry), LRU order
+    _showcase_moment_lock = threading.Lock()
+    _showcase_refreshing = set()
+
+    def _enrich_showcase_moments(moment_ids):
+        """Return {moment_id: GetMintedMoment data}, fetching only cache misses."""
+        now = time.time()
+        enriched = {}
+        missing = []
+        with _showcase_moment_lock:
+            for mid in dict.fromkeys(moment_ids):
+                cached = _showcase_moment_cache.get(mid)
+                if cached is not None and now < cached[1]:
+                    enriched[mid] = cached[0]
+                    _showcase_moment_cache.move_to_end(mid)
+                else:
+                    missing.append(mid)
+
+        if missing:
+            batches = [missing[i:i + _SHOWCASE_BATCH_SIZE]
+                       for i in range(0, len(missing), _SHOWCASE_BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(len(batches), 10)) as pool:
+                fetched = [r for batch_results in pool.map(_fetch_minted_moments_batch, batches)
+                           for r in batch_results.items()]
+
+            with _showcase_moment_lock:
+                for mid, data in fetched:
+                    enriched[mid] = data
+                    _showcase_moment_cache[mid] = (data, now + _SHOWCASE_MOMENT_TTL)
+                    _showcase_moment_cache.move_to_end(mid)
+                if len(_showcase_moment_cache) > _SHOWCASE_MOMENT_CACHE_MAX:
+                    for mid in [k for k, v in _showcase_moment_cache.items() if v[1] <= now]:
+                        _showcase_moment_cache.pop(mid, None)
+                # Still over the cap within one TTL window: drop least recently used
+                while len(_showcase_moment_cache) > _SHOWCASE_MOMENT_CACHE_MAX:
+                    _showcase_moment_cache.popitem(last=False)
+
+        return enriched
+
+    def _build_showcase(binder_id):
+        """Scrape + enrich one showcase; return (payload, status, fully_enriched)."""
+        import json as json_mod
+
+        # Step 1: Scrape __NEXT_DATA__ for moment IDs + showcase name
+        resp = http_requests.get(
+            f"https://nbatopshot.com/showcase/{binder_id}",
+            headers=_TS_HEADERS,
+            timeout=30,
+        )
+        resp.raise_for_status()
+
+        marker = '__NEXT_DATA__" type="application/json"'
+        idx = resp.text.find(marker)
+        if idx < 0:
+            return {"error": "Could not parse showcase page"}, 502, False
+
+        json_start = resp.text.find('>', idx + len(marker)) + 1
+        json_end = resp.text.find('</script>', json_start)
+        next_data = json_mod.loads(resp.text[json_start:json_end])
+
+        binder = next_data.get("props", {}).get("pageProps", {}).get("binder")
+        if not binder:
+            return {"error": "Showcase not found"}, 404, False
+
+        # Collect all moments from binder pages (preserving order)
+        binder_moments = []
+        for page in binder.get("pages") or []:
+            for m in page.get("moments") or []:
+                binder_moments.append(m)
+
+        name = binder.get("name", "Showcase")
+        if not binder_moments:
+            return {"editions": [], "showcaseName": name}, 200, True
+
+        # Step 2: Enrich via cached / aliased-batch GetMintedMoment
+        enriched = _enrich_showcase_moments([m["id"] for m in binder_moments if m.get("id")])
+
+        # Step 3: Build editions – use enriched data where available, fall back to __NEXT_DATA__
+        editions = []
+        for m in binder_moments:
+            rich = enriched.get(m.get("id"))
+            if rich:
+                editions.append(_moment_to_edition(rich))
+            else:
+                editions.append(_moment_to_edition_light(m))
+
+        complete = all(m.get("id") in enriched for m in binder_moments)
+        return {"editions": editions, "showcaseName": name}, 200, complete
+
+    def _store_showcase(binder_id, payload):
+        _showcase_cache[binder_id] = (payload, time.time())
+        if len(_showcase_cache) > _SHOWCASE_CACHE_MAX:
+            oldest = min(_showcase_cache, key=lambda k: _showcase_cache[k][1])
+            _showcase_cache.pop(oldest, None)
+
+    def _refresh_showcase_async(binder_id):
+        """Rebuild a stale showcase in the background; keep the stale copy on failure."""
+        import threading
+        if binder_id in _showcase_refreshing:
+            return
+        _showcase_refreshing.add(binder_id)
+
+        def _run():
+            try:
+                payload, status, complete = _build_showcase(binder_id)
+                if status == 200 and complete:
+                    _store_showcase(binder_id, payload)
+            except Exception as e:
+                print(f"⚠️  Showcase refresh {binder_id} failed: {e}")
+            finally:
+                _showcase_refreshing.discard(binder_id)
+
+        threading.Thread(target=_run, daemon=True, name=f"showcase-{binder_id[:8]}").start()
+
     @app.route("/api/showcase/<binder_id>")
     def museum_showcase(binder_id):
-        """Fetch a TopShot showcase and enrich each moment via GetMintedMoment."""
-        import re, json as json_mod
+        """Fetch a TopShot showcase and enrich each moment via GetMintedMoment.
+
+        Served from a per-binder cache (stale-while-revalidate); moment
+        detail comes from a per-moment cache filled by aliased batch queries.
+        """
+        import re
         if not re.match(r'^[0-9a-f\-]{36}$', binder_id):
             return jsonify({"error": "Invalid showcase ID"}), 400
 
-        try:
-            # Step 1: Scrape __NEXT_DATA__ for moment IDs + showcase name
-            resp = http_requests.get(
-                f"https://nbatopshot.com/showcase/{binder_id}",
-                headers=_TS_HEADERS,
-                timeout=30,
-            )
-            resp.raise_for_status()
-
-            marker = '__NEXT_DATA__" type="application/json"'
-            idx = resp.text.find(marker)
-            if idx < 0:
-                return jsonify({"error": "Could not parse showcase page"}), 502
-
-            json_start = resp.text.find('>', idx + len(marker)) + 1
-            json_end = resp.text.find('</script>', json_start)
-            next_data = json_mod.loads(resp.text[json_start:json_end])
-
-            binder = next_data.get("props", {}).get("pageProps", {}).get("binder")
-            if not binder:
-                return jsonify({"error": "Showcase not found"}), 404
-
-            # Collect all moments from binder pages (preserving order)
-            binder_moments = []
-            for page in binder.get("pages") or []:
-                for m in page.get("moments") or []:
-                    binder_moments.append(m)
-
-            if not binder_moments:
-                return jsonify({"editions": [], "showcaseName": binder.get("name", "Showcase")})
-
-            # Step 2: Enrich each moment via GetMintedMoment (parallel)
-            enriched = {}
-            with ThreadPoolExecutor(max_workers=min(len(binder_moments), 10)) as pool:
-                future_to_id = {
-                    pool.submit(_fetch_minted_moment, m["id"]): m["id"]
-                    for m in binder_moments if m.get("id")
-                }
-                for future in as_completed(future_to_id):
-                    mid = future_to_id[future]
-                    result = future.result()
-                    if result:
-                        enriched[mid] = result
-
-            # Step 3: Build editions – use enriched data where available, fall back to __NEXT_DATA__
-            editions = []
-            for m in binder_moments:
-                mid = m.get("id")
-                rich = enriched.get(mid)
-                if rich:
-                    editions.append(_moment_to_edition(rich))
-                else:
-                    editions.append(_moment_to_edition_light(m))
+        cached = _showcase_cache.get(binder_id)
+        if cached is not None:
+            payload, fetched_at = cached
+            if time.time() - fetched_at >= _SHOWCASE_TTL:
+                _refresh_showcase_async(binder_id)
+            return jsonify(payload)
 
-            return jsonify({
-                "editions": editions,
-                "showcaseName": binder.get("name", "Showcase"),
-            })
+        try:
+            payload, status, complete = _build_showcase(binder_id)
+            if status == 200 and complete:
+                _store_showcase(binder_id, payload)
+            return jsonify(payload), status
         except http_requests.RequestException as e:
             return jsonify({"error": f"Failed to fetch showcase: {str(e)}"}), 502
         except Exception as e:
@@ -2200,6 +2351,39 @@ def register_routes(app):
         'LEGENDARY': 2000,
     }
 
+    @app.route('/api/tx/<tx_id>/verify', methods=['POST'])
+    def api_tx_verify(tx_id):
+        """Register a submitted transaction for background verification.
+
+        Clients call this right after submitting a swap / signup transaction;
+        the verifier polls Flow until it is sealed, so the completion call
+        that follows is answered from the local cache.
+        Returns JSON: { txId, status, chainStatus } (202 while pending).
+        """
+        from bot.tx_verifier import (
+            register_transaction, load_verification, normalize_tx_id, VerificationQueueFull, PENDING,
+        )
+        from db.connection import db_type as _db_type
+
+        tx_id = normalize_tx_id(tx_id)
+        if len(tx_id) != 64 or any(c not in '0123456789abcdef' for c in tx_id):
+            return jsonify({'error': 'Invalid transaction id'}), 400
+
+        db = get_db()
+        cur = db.cursor()
+        try:
+            register_transaction(cur, _db_type, tx_id)
+        except VerificationQueueFull as e:
+            db.rollback()
+            return jsonify({'error': str(e)}), 429
+        db.commit()
+        verification = load_verification(cur, tx_id)
+        return jsonify({
+            'txId': tx_id,
+            'status': verification['status'],
+            'chainStatus': verification['chain_status'],
+        }), 202 if verification['status'] == PENDING else 200
+
     @app.route('/api/swap/complete', methods=['POST'])
     def api_swap_complete():
         """Verify moment transfer tx on-chain and send $MVP from treasury.
@@ -2209,17 +2393,18 @@ def register_routes(app):
 
         Security:
         1. Replay protection – rejects txId already in completed_swaps.
-        2. On-chain verification – queries Flow REST API to confirm the
-           transaction is sealed and TopShot.Deposit events prove the
-           claimed moments arrived at the treasury address.
+        2. On-chain verification – the sealed-result cache (``bot/tx_verifier.py``)
+           confirms the transaction is sealed and its TopShot.Deposit events
+           prove the claimed moments arrived at the treasury address.
         3. Only then sends $MVP from treasury.
         """
         import asyncio
         import json as _json
-        import base64 as _b64
+        from bot.tx_verifier import verified_deposits, normalize_tx_id
+        from db.connection import db_type as _db_type
 
         data = request.get_json(force=True) or {}
-        tx_id = data.get('txId', '').strip()
+        tx_id = normalize_tx_id(data.get('txId'))
         user_addr = data.get('userAddr', '').strip()
         moment_ids = data.get('momentIds', [])
         boost_nft_id = data.get('boostNftId')  # optional horse NFT id
@@ -2237,67 +2422,17 @@ def register_routes(app):
         if cur.fetchone():
             return jsonify({'error': 'This transaction has already been processed'}), 409
 
-        # --- 1. On-chain verification via Flow REST API ---
+        # --- 1. On-chain verification (sealed-result cache) ---
         # Verify moments were deposited to the Dapper treasury wallet
-        treasury_addr_clean = FLOW_ACCOUNT.removeprefix('0x').lower()
-        try:
-            flow_resp = http_requests.get(
-                f'https://rest-mainnet.onflow.org/v1/transaction_results/{tx_id}',
-                timeout=15,
-            )
-            if flow_resp.status_code != 200:
-                return jsonify({'error': f'Could not fetch tx result from Flow (HTTP {flow_resp.status_code})'}), 502
-            tx_result = flow_resp.json()
-        except Exception as e:
-            return jsonify({'error': f'Flow API error: {str(e)}'}), 502
-
-        # Verify sealed
-        tx_status = tx_result.get('status', '').upper()
-        if tx_status != 'SEALED':
-            return jsonify({'error': f'Transaction not sealed (status: {tx_status})'}), 400
-        if tx_result.get('error_message'):
-            return jsonify({'error': f'Transaction failed on-chain: {tx_result["error_message"]}'}), 400
-
-        # Verify the transaction was proposed by the claiming user
-        try:
-            tx_body_resp = http_requests.get(
-                f'https://rest-mainnet.onflow.org/v1/transactions/{tx_id}',
-                timeout=10,
-            )
-            if tx_body_resp.status_code == 200:
-                tx_body = tx_body_resp.json()
-                proposer = tx_body.get('proposer', '').removeprefix('0x').lower()
-                claimed = user_addr.removeprefix('0x').lower()
-                if proposer and proposer != claimed:
-                    return jsonify({'error': 'Transaction proposer does not match your wallet'}), 403
-        except Exception:
-            pass  # non-fatal — event verification is the primary guard
-
-        # Parse TopShot.Deposit events to verify moments arrived at treasury
-        deposited_ids = set()
-        deposit_event_type = 'A.0b2a3299cc857e29.TopShot.Deposit'
-        for ev in tx_result.get('events', []):
-            if ev.get('type') != deposit_event_type:
-                continue
-            try:
-                payload = _json.loads(_b64.b64decode(ev['payload']).decode('utf-8'))
-                fields = payload.get('value', {}).get('fields', [])
-                ev_id = None
-                ev_to = None
-                for f in fields:
-                    if f.get('name') == 'id':
-                        ev_id = int(f['value']['value'])
-                    elif f.get('name') == 'to':
-                        val = f.get('value', {})
-                        # Optional<Address> — could be wrapped
-                        if val.get('type') == 'Optional' and val.get('value'):
-                            ev_to = val['value'].get('value', '').removeprefix('0x').lower()
-                        elif val.get('value'):
-                            ev_to = str(val['value']).removeprefix('0x').lower()
-                if ev_id is not None and ev_to == treasury_addr_clean:
-                    deposited_ids.add(ev_id)
-            except Exception:
-                continue
+        verification, error = _verified_transaction(db, _db_type, tx_id, user_addr)
+        if error:
+            return error
+
+        deposited_ids = {
+            fields['id']
+            for fields in verified_deposits(verification, TOPSHOT_DEPOSIT, FLOW_ACCOUNT)
+            if fields.get('id') is not None
+        }
 
         # Every claimed moment must appear in deposits to treasury
         claimed_set = set(int(mid) for mid in moment_ids)
@@ -2316,37 +2451,14 @@ def register_routes(app):
             # event is the standard NonFungibleToken.Deposited (not a custom
             # Swapboost30MVP.Deposit).  We match on the event type string and
             # additionally verify the embedded nftType contains our contract.
-            swap_treasury_clean = FLOW_SWAP_ACCOUNT.removeprefix('0x').lower()
-            nft_deposited_type = 'A.1d7e57aa55817448.NonFungibleToken.Deposited'
             horse_nft_type_fragment = 'Swapboost30MVP.NFT'
-            for ev in tx_result.get('events', []):
-                if ev.get('type') != nft_deposited_type:
-                    continue
-                try:
-                    payload = _json.loads(_b64.b64decode(ev['payload']).decode('utf-8'))
-                    fields = payload.get('value', {}).get('fields', [])
-                    ev_id = None
-                    ev_to = None
-                    ev_nft_type = None
-                    for f in fields:
-                        if f.get('name') == 'id':
-                            ev_id = int(f['value']['value'])
-                        elif f.get('name') == 'to':
-                            val = f.get('value', {})
-                            if val.get('type') == 'Optional' and val.get('value'):
-                                ev_to = val['value'].get('value', '').removeprefix('0x').lower()
-                            elif val.get('value'):
-                                ev_to = str(val['value']).removeprefix('0x').lower()
-                        elif f.get('name') == 'type':
-                            ev_nft_type = str(f['value'].get('value', ''))
-                    if (ev_id == boost_nft_id
-                            and ev_to == swap_treasury_clean
-                            and ev_nft_type
-                            and horse_nft_type_fragment in ev_nft_type):
-                        boost_verified = True
-                        break
-                except Exception:
-                    continue
+            for fields in verified_deposits(verification, NFT_DEPOSITED, FLOW_SWAP_ACCOUNT):
+                ev_nft_type = fields.get('type')
+                if (fields.get('id') == boost_nft_id
+                        and ev_nft_type
+                        and horse_nft_type_fragment in str(ev_nft_type)):
+                    boost_verified = True
+                    break
             if not boost_verified:
                 return jsonify({
                     'error': f'Horse NFT #{boost_nft_id} deposit to treasury not verified in tx {tx_id}',
@@ -2499,19 +2611,18 @@ def register_routes(app):
         '''), (start_ts, end_ts))
         rows = cur.fetchall()
 
-        # Resolve TopShot usernames in parallel
+        # Resolve TopShot usernames with one batched Cadence script
         addrs = [r[0] for r in rows]
         username_map = {}
         if addrs:
-            def _lookup(addr):
-                try:
-                    return addr, get_ts_username_from_flow_wallet(addr)
-                except Exception:
-                    return addr, None
-            with ThreadPoolExecutor(max_workers=min(len(addrs), 3)) as pool:
-                for addr, uname in pool.map(lambda a: _lookup(a), addrs):
-                    if uname:
-                        username_map[addr] = uname
+            try:
+                resolved = get_ts_usernames_bulk(addrs)
+            except Exception:
+                resolved = {}
+            for addr in addrs:
+                uname = resolved.get(addr.strip().lower())
+                if uname:
+                    username_map[addr] = uname
 
         # Also fetch the list of distinct months that have data
         cur.execute(prepare_query('''
@@ -2550,327 +2661,121 @@ def register_routes(app):
         })
 
     # ── NFT collection: all holders ────────────────────────────────
-    _nft_holders_cache = {"data": None, "ts": 0}
 
     @app.route('/api/nft/holders')
     def api_nft_holders():
         """Return all Swapboost30MVP NFTs with owner info.
 
-        Scans the chain by resolving HybridCustody parents for every
-        known Dapper child address, then probing each parent for
-        Swapboost NFTs.  Results are cached for 5 minutes.
+        Served from the ``swapboost_holders`` index maintained by
+        ``bot/swapboost_indexer.py``.  Responses carry an ETag so clients
+        polling the NFT page get a 304 until ownership changes.  Before the
+        indexer's first reconcile the listing may be incomplete; it is
+        returned with ``indexing: true`` and not cached.
         """
-        import base64 as _b64
-
-        now = time.time()
-        if _nft_holders_cache["data"] and now - _nft_holders_cache["ts"] < 300:
-            return jsonify(_nft_holders_cache["data"])
+        import hashlib
+        import json as _json
+        from utils.helpers import DAPPER_WALLET_USERNAME_MAP, get_state_value
 
-        from utils.helpers import DAPPER_WALLET_USERNAME_MAP
+        db = get_db()
+        cur = db.cursor()
+        indexing = get_state_value(cur, 'swapboost_index_reconciled_at') is None
 
-        dapper_children = list(DAPPER_WALLET_USERNAME_MAP.keys())
         child_to_username = {k.lower(): v for k, v in DAPPER_WALLET_USERNAME_MAP.items()}
 
-        cadence = r"""
-import NonFungibleToken from 0x1d7e57aa55817448
-import MetadataViews from 0x1d7e57aa55817448
-import Swapboost30MVP from 0xaad9f8fa31ecbaf9
-import HybridCustody from 0xd8a7e05a7ac670c0
-
-access(all) fun main(dapperChildren: [Address], directAddresses: [Address]): [[String]] {
-  let totalSupply = Swapboost30MVP.totalSupply
-  var result: [[String]] = []
-  var checked: {Address: Bool} = {}
-
-  // Check direct addresses first (e.g. treasury wallets)
-  for addr in directAddresses {
-    if checked[addr] != nil { continue }
-    checked[addr] = true
-
-    let acct = getAccount(addr)
-    let col = acct.capabilities
-      .borrow<&{NonFungibleToken.Collection}>(
-        /public/Swapboost30MVP_aad9f8fa31ecbaf9
-      )
-    if col == nil { continue }
-
-    var id: UInt64 = 1
-    while id <= totalSupply {
-      let nft = col!.borrowNFT(id)
-      if nft != nil {
-        var name = ""
-        var thumb = ""
-        if let display = nft!.resolveView(Type<MetadataViews.Display>()) {
-          let d = display as! MetadataViews.Display
-          name = d.name
-          thumb = d.thumbnail.uri()
-        }
-        result.append([
-          id.toString(), name, thumb,
-          addr.toString(), addr.toString()
-        ])
-      }
-      id = id + 1
-    }
-  }
-
-  // Then discover via HybridCustody parents of Dapper children
-  for child in dapperChildren {
-    let childAcct = getAuthAccount<auth(Storage) &Account>(child)
-    let ownedAcct = childAcct.storage
-      .borrow<auth(HybridCustody.Owner) &HybridCustody.OwnedAccount>(
-        from: HybridCustody.OwnedAccountStoragePath
-      )
-    if ownedAcct == nil { continue }
-    let parents = ownedAcct!.getParentAddresses()
-
-    for parent in parents {
-      if checked[parent] != nil { continue }
-      checked[parent] = true
-
-      let acct = getAccount(parent)
-      let col = acct.capabilities
-        .borrow<&{NonFungibleToken.Collection}>(
-          /public/Swapboost30MVP_aad9f8fa31ecbaf9
-        )
-      if col == nil { continue }
-
-      var id: UInt64 = 1
-      while id <= totalSupply {
-        let nft = col!.borrowNFT(id)
-        if nft != nil {
-          var name = ""
-          var thumb = ""
-          if let display = nft!.resolveView(Type<MetadataViews.Display>()) {
-            let d = display as! MetadataViews.Display
-            name = d.name
-            thumb = d.thumbnail.uri()
-          }
-          result.append([
-            id.toString(), name, thumb,
-            parent.toString(), child.toString()
-          ])
-        }
-        id = id + 1
-      }
-    }
-  }
-  return result
-}
-"""
-        import json as _json
-
-        args_val = [{"type": "Address", "value": a} for a in dapper_children]
-        direct_val = [{"type": "Address", "value": f"0x{FLOW_SWAP_ACCOUNT.removeprefix('0x')}"}]
-        body = {
-            "script": _b64.b64encode(cadence.encode()).decode(),
-            "arguments": [
-                _b64.b64encode(
-                    _json.dumps({"type": "Array", "value": args_val}).encode()
-                ).decode(),
-                _b64.b64encode(
-                    _json.dumps({"type": "Array", "value": direct_val}).encode()
-                ).decode(),
-            ],
-        }
-
-        try:
-            resp = http_requests.post(
-                "https://rest-mainnet.onflow.org/v1/scripts",
-                json=body, timeout=30,
-            )
-            if resp.status_code != 200:
-                return jsonify({"error": "chain query failed"}), 502
-
-            raw = resp.json()
-            decoded = _json.loads(_b64.b64decode(raw).decode()) if isinstance(raw, str) else raw
-            entries = decoded.get("value", [])
-
-            nfts = []
-            for entry in entries:
-                vals = [v["value"] for v in entry["value"]]
-                nft_id, name, thumb, owner, dapper = vals
-                nid = int(nft_id)
-                horse = HORSE_NAMES.get(nid)
-                display_name = f"{horse} #{nid}" if horse else name
-                username = child_to_username.get(dapper.lower())
-                nfts.append({
-                    "id": nid,
-                    "name": display_name,
-                    "thumbnail": thumb,
-                    "owner": owner,
-                    "dapper": dapper,
-                    "username": username,
-                })
+        cur.execute(prepare_query(
+            "SELECT nft_id, name, thumbnail, owner, dapper "
+            "FROM swapboost_holders ORDER BY nft_id"
+        ))
+        nfts = []
+        for nft_id, name, thumb, owner, dapper in cur.fetchall():
+            nid = int(nft_id)
+            horse = HORSE_NAMES.get(nid)
+            nfts.append({
+                "id": nid,
+                "name": f"{horse} #{nid}" if horse else name,
+                "thumbnail": thumb,
+                "owner": owner,
+                "dapper": dapper,
+                "username": child_to_username.get((dapper or "").lower()),
+            })
 
-            nfts.sort(key=lambda n: n["id"])
-            result = {"totalSupply": 50, "nfts": nfts}
-            _nft_holders_cache["data"] = result
-            _nft_holders_cache["ts"] = now
-            return jsonify(result)
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 500
+        result = {"totalSupply": 50, "nfts": nfts}
+        if indexing:
+            result["indexing"] = True
+            response = jsonify(result)
+            response.headers["Cache-Control"] = "no-store"
+            return response
+        response = jsonify(result)
+        response.set_etag(hashlib.sha1(
+            _json.dumps(result, sort_keys=True).encode()
+        ).hexdigest())
+        response.headers["Cache-Control"] = "public, max-age=30"
+        return response.make_conditional(request)
 
     # ──────────────────────────────────────────────────────────
     #  Treasury moments listing (for "buy" direction)
     # ──────────────────────────────────────────────────────────
 
-    _treasury_moments_cache = {"data": None, "ts": 0}
-
     @app.route('/api/treasury/moments')
     def api_treasury_moments():
         """List Jokic moments in the treasury Dapper wallet.
 
-        Queries on-chain via Flow REST API Cadence script execution,
-        enriches via local DB, caches for 60 seconds.
+        Served from the ``treasury_inventory`` index maintained by
+        ``bot/treasury_indexer.py``.  Optional ``tier`` and ``set`` query
+        params filter the list.  Until the indexer's first reconcile has
+        finished (fresh deploy) the list may be incomplete and the response
+        carries ``indexing: true``; the scan itself is left to the indexer
+        thread rather than run per request.
         Returns JSON: { moments: [...] }
         """
-        import json as _json
-        import base64 as _b64
-
-        now = time.time()
-        if _treasury_moments_cache["data"] and now - _treasury_moments_cache["ts"] < 60:
-            return jsonify(_treasury_moments_cache["data"])
-
-        # Execute Cadence script via Flow REST API
-        treasury_addr = FLOW_ACCOUNT  # 0xf853bd09d46e7db6
-        cadence_script = """
-import TopShot from 0x0b2a3299cc857e29
-import TopShotLocking from 0x0b2a3299cc857e29
-
-access(all) fun main(account: Address): [[String]] {
-  let acct = getAccount(account)
-  let ref = acct.capabilities
-    .borrow<&TopShot.Collection>(/public/MomentCollection)!
-  let ids = ref.getIDs()
-  var setNames: {UInt32: String} = {}
-  var result: [[String]] = []
-  for id in ids {
-    let nft = ref.borrowMoment(id: id)!
-    let sid = nft.data.setID
-    if setNames[sid] == nil {
-      setNames[sid] = TopShot.getSetName(setID: sid) ?? ""
-    }
-    let locked = TopShotLocking.isLocked(nftRef: nft)
-    let subedition = TopShot.getMomentsSubedition(nftID: id) ?? 0
-    result.append([
-      id.toString(),
-      nft.data.playID.toString(),
-      setNames[sid]!,
-      nft.data.serialNumber.toString(),
-      locked ? "1" : "0",
-      subedition.toString()
-    ])
-  }
-  return result
-}
-"""
-        try:
-            import base64 as _b64
-            cadence_b64 = _b64.b64encode(cadence_script.encode()).decode()
-            addr_no_prefix = treasury_addr.removeprefix('0x')
-            # Encode Address argument in JSON-CDC format
-            arg_json = _json.dumps({"type": "Address", "value": "0x" + addr_no_prefix})
-            arg_b64 = _b64.b64encode(arg_json.encode()).decode()
-
-            resp = http_requests.post(
-                'https://rest-mainnet.onflow.org/v1/scripts',
-                json={
-                    'script': cadence_b64,
-                    'arguments': [arg_b64],
-                },
-                timeout=30,
-            )
-            if resp.status_code != 200:
-                return jsonify({'error': f'Flow script failed (HTTP {resp.status_code})'}), 502
-
-            # Response is base64-encoded JSON-CDC
-            result_b64 = resp.text.strip().strip('"')
-            result_json = _json.loads(_b64.b64decode(result_b64).decode())
-
-            # Parse JSON-CDC array of arrays of strings
-            raw_moments = []
-            for item in result_json.get('value', []):
-                arr = [f['value'] for f in item.get('value', [])]
-                if len(arr) >= 6:
-                    raw_moments.append({
-                        'id': int(arr[0]),
-                        'playID': int(arr[1]),
-                        'setName': arr[2],
-                        'serial': int(arr[3]),
-                        'isLocked': arr[4] == '1',
-                        'subedition': int(arr[5]),
-                    })
-        except Exception as e:
-            return jsonify({'error': f'Failed to query treasury moments: {str(e)}'}), 502
+        from utils.helpers import get_state_value
 
-        # Filter out locked moments
-        unlocked = [m for m in raw_moments if not m.get('isLocked')]
-
-        # Enrich via DB lookup (same as moment-lookup endpoint)
         db = get_db()
         cur = db.cursor()
-        enriched = []
-        for m in unlocked:
-            play_id = m['playID']
-            set_name = m.get('setName', '')
-            subedition = m.get('subedition', 0)
-            edition_suffix = '+' + str(subedition)
-
-            cur.execute(
-                prepare_query(
-                    "SELECT edition_id, tier, set_name, series_number, "
-                    "play_headline, play_category, team, date_of_moment, "
-                    "nba_season, jersey_number, image_url, video_url, "
-                    "circulation_count, low_ask "
-                    "FROM jokic_editions WHERE play_flow_id = ? AND set_name = ? "
-                    "ORDER BY CASE WHEN edition_id LIKE ? THEN 0 ELSE 1 END "
-                    "LIMIT 1"
-                ),
-                (int(play_id), set_name, '%' + edition_suffix),
-            )
-            row = cur.fetchone()
-
-            # Fallback: match by play_flow_id only
-            if not row:
-                cur.execute(
-                    prepare_query(
-                        "SELECT edition_id, tier, set_name, series_number, "
-                        "play_headline, play_category, team, date_of_moment, "
-                        "nba_season, jersey_number, image_url, video_url, "
-                        "circulation_count, low_ask "
-                        "FROM jokic_editions WHERE play_flow_id = ? "
-                        "ORDER BY CASE WHEN edition_id LIKE ? THEN 0 ELSE 1 END "
-                        "LIMIT 1"
-                    ),
-                    (int(play_id), '%' + edition_suffix),
-                )
-                row = cur.fetchone()
+        indexing = get_state_value(cur, 'treasury_index_reconciled_at') is None
+
+        where = ["is_locked = 0", "edition_id IS NOT NULL"]
+        params = []
+        tier_filter = (request.args.get('tier') or '').strip().upper()
+        if tier_filter:
+            where.append("tier = ?")
+            params.append(tier_filter)
+        set_filter = (request.args.get('set') or '').strip()
+        if set_filter:
+            where.append("edition_set_name = ?")
+            params.append(set_filter)
 
-            if not row:
-                continue
+        cur.execute(
+            prepare_query(
+                "SELECT moment_id, serial_number, edition_id, tier, edition_set_name, "
+                "series_number, play_headline, team, image_url, subedition "
+                "FROM treasury_inventory WHERE " + " AND ".join(where) + " "
+                "ORDER BY tier, edition_set_name, serial_number"
+            ),
+            tuple(params),
+        )
 
-            tier = row[1] or 'COMMON'
-            mvp_cost = _BUY_MVP_RATES.get(tier, 0)
-            enriched.append({
-                'id': m['id'],
-                'serial': m['serial'],
-                'editionId': row[0],
+        moments = []
+        for row in cur.fetchall():
+            tier = row[3] or 'COMMON'
+            moments.append({
+                'id': int(row[0]),
+                'serial': row[1],
+                'editionId': row[2],
                 'tier': tier,
-                'setName': row[2] or '',
-                'seriesNumber': row[3],
-                'headline': row[4] or '',
+                'setName': row[4] or '',
+                'seriesNumber': row[5],
+                'headline': row[6] or '',
                 'player': 'Nikola Jokić',
-                'team': row[6] or '',
-                'imageUrl': row[10] or None,
-                'mvpCost': mvp_cost,
-                'subedition': m.get('subedition', 0),
+                'team': row[7] or '',
+                'imageUrl': row[8] or None,
+                'mvpCost': _BUY_MVP_RATES.get(tier, 0),
+                'subedition': row[9] or 0,
             })
 
-        result_data = {'moments': enriched}
-        _treasury_moments_cache["data"] = result_data
-        _treasury_moments_cache["ts"] = now
-        return jsonify(result_data)
+        if indexing:
+            return jsonify({'moments': moments, 'indexing': True})
+        return jsonify({'moments': moments})
 
     # ──────────────────────────────────────────────────────────
     #  Swap buy endpoint: $MVP → moments
@@ -2892,10 +2797,11 @@ access(all) fun main(account: Address): [[String]] {
         """
         import asyncio
         import json as _json
-        import base64 as _b64
+        from bot.tx_verifier import verified_deposits, normalize_tx_id
+        from db.connection import db_type as _db_type
 
         data = request.get_json(force=True) or {}
-        tx_id = data.get('txId', '').strip()
+        tx_id = normalize_tx_id(data.get('txId'))
         user_addr = data.get('userAddr', '').strip()
         user_dapper = data.get('userDapperAddr', '').strip()
         moment_ids = data.get('momentIds', [])
@@ -2930,70 +2836,20 @@ access(all) fun main(account: Address): [[String]] {
             return jsonify({'error': 'No $MVP value for selected moments'}), 400
 
         # --- 2. On-chain verification: $MVP deposited to treasury ---
-        treasury_mvp_addr = FLOW_SWAP_ACCOUNT.removeprefix('0x').lower()
-        try:
-            flow_resp = http_requests.get(
-                f'https://rest-mainnet.onflow.org/v1/transaction_results/{tx_id}',
-                timeout=15,
-            )
-            if flow_resp.status_code != 200:
-                return jsonify({'error': f'Could not fetch tx result from Flow (HTTP {flow_resp.status_code})'}), 502
-            tx_result = flow_resp.json()
-        except Exception as e:
-            return jsonify({'error': f'Flow API error: {str(e)}'}), 502
-
-        tx_status = tx_result.get('status', '').upper()
-        if tx_status != 'SEALED':
-            return jsonify({'error': f'Transaction not sealed (status: {tx_status})'}), 400
-        if tx_result.get('error_message'):
-            return jsonify({'error': f'Transaction failed on-chain: {tx_result["error_message"]}'}), 400
-
-        # Verify the transaction was proposed by the claiming user
-        try:
-            tx_body_resp = http_requests.get(
-                f'https://rest-mainnet.onflow.org/v1/transactions/{tx_id}',
-                timeout=10,
-            )
-            if tx_body_resp.status_code == 200:
-                tx_body = tx_body_resp.json()
-                proposer = tx_body.get('proposer', '').removeprefix('0x').lower()
-                claimed = user_addr.removeprefix('0x').lower()
-                if proposer and proposer != claimed:
-                    return jsonify({'error': 'Transaction proposer does not match your wallet'}), 403
-        except Exception:
-            pass  # non-fatal — deposit event verification is the primary guard
+        verification, error = _verified_transaction(db, _db_type, tx_id, user_addr)
+        if error:
+            return error
 
         # Look for FungibleToken.Deposited event with PetJokicsHorses vault → treasury
         # Cadence 1.0 emits generic FungibleToken.Deposited with a "type" field
         # identifying the vault, e.g. "A.6fd2465f3a22e34c.PetJokicsHorses.Vault"
-        ft_deposited_type = 'A.f233dcee88fe0abe.FungibleToken.Deposited'
         deposited_amount = 0.0
-        for ev in tx_result.get('events', []):
-            if ev.get('type') != ft_deposited_type:
-                continue
-            try:
-                payload = _json.loads(_b64.b64decode(ev['payload']).decode('utf-8'))
-                fields = payload.get('value', {}).get('fields', [])
-                ev_vault_type = None
-                ev_amount = None
-                ev_to = None
-                for f in fields:
-                    if f.get('name') == 'type':
-                        ev_vault_type = f.get('value', {}).get('value', '')
-                    elif f.get('name') == 'amount':
-                        ev_amount = float(f['value']['value'])
-                    elif f.get('name') == 'to':
-                        val = f.get('value', {})
-                        if val.get('type') == 'Optional' and val.get('value'):
-                            ev_to = val['value'].get('value', '').removeprefix('0x').lower()
-                        elif val.get('value'):
-                            ev_to = str(val['value']).removeprefix('0x').lower()
-                # Must be a PetJokicsHorses vault deposit to treasury address
-                if (ev_vault_type and 'PetJokicsHorses' in ev_vault_type
-                        and ev_amount and ev_to == treasury_mvp_addr):
-                    deposited_amount += ev_amount
-            except Exception:
-                continue
+        for fields in verified_deposits(verification, FT_DEPOSITED, FLOW_SWAP_ACCOUNT):
+            ev_vault_type = fields.get('type')
+            ev_amount = fields.get('amount')
+            # Must be a PetJokicsHorses vault deposit to treasury address
+            if ev_vault_type and 'PetJokicsHorses' in str(ev_vault_type) and ev_amount:
+                deposited_amount += ev_amount
 
         # Allow small floating-point tolerance
         if deposited_amount < total_cost - 0.001:
@@ -3027,8 +2883,15 @@ access(all) fun main(account: Address): [[String]] {
         )
         db.commit()
 
-        # Invalidate treasury moments cache
-        _treasury_moments_cache["data"] = None
+        # Drop sold moments from the inventory index right away; the
+        # indexer's Withdraw events would otherwise lag a poll interval
+        if moments_tx_id:
+            try:
+                from bot.treasury_indexer import remove_treasury_moments
+                remove_treasury_moments(db, moment_ids)
+                db.commit()
+            except Exception:
+                db.rollback()
 
         result = {
             'momentsTxId': moments_tx_id,
@@ -3043,11 +2906,91 @@ access(all) fun main(account: Address): [[String]] {
 
         return jsonify(result), 200
 
+    # ──────────────────────────────────────────────────────────
+    #  Prometheus scrape endpoint
+    # ──────────────────────────────────────────────────────────
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Latency histograms per route, SQL label, upstream operation and job.
+
+        Requires ``Authorization: Bearer <METRICS_TOKEN>``; 404 while the
+        token is unset.
+        """
+        from config import METRICS_ENABLED, METRICS_TOKEN
+        if not METRICS_ENABLED:
+            return jsonify({"error": "Metrics are disabled"}), 404
+        denied = _bearer_token_error(METRICS_TOKEN)
+        if denied:
+            return denied
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+    @app.route('/api/admin/slow-queries')
+    def api_slow_queries():
+        """Top slow statement fingerprints with their captured EXPLAIN plans.
+
+        Query params: ``limit`` (default 20, max 200) and ``order``
+        (``total_ms`` default, ``max_ms`` or ``count``).  Samples carry raw
+        SQL, so this requires ``Authorization: Bearer <ADMIN_API_TOKEN>``
+        and answers 404 while no token is configured.
+        """
+        from config import SLOW_QUERY_MS
+        from db.slow_queries import top_slow_queries
+        denied = _admin_token_error()
+        if denied:
+            return denied
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 200)
+            queries = top_slow_queries(limit, request.args.get('order', 'total_ms'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "enabled": SLOW_QUERY_MS > 0,
+            "threshold_ms": SLOW_QUERY_MS,
+            "queries": queries,
+        })
+
     return app
 
 
 # ─── Swap helpers (module-level) ────────────────────────────────
 
+def _verified_transaction(conn, db_type, tx_id, claimed_addr):
+    """Return ``(verification, None)`` for a sealed tx, else ``(None, error response)``.
+
+    Reads the ``tx_verifications`` cache (see ``bot/tx_verifier.py``); the
+    chain is only contacted for a txId that was never registered or whose
+    backoff is due.
+    """
+    from bot.tx_verifier import (
+        get_verified_transaction, VerificationQueueFull, SEALED, FAILED, UNAVAILABLE,
+    )
+
+    try:
+        verification = get_verified_transaction(conn, db_type, tx_id)
+    except VerificationQueueFull as e:
+        conn.rollback()
+        return None, (jsonify({'error': str(e)}), 429)
+    except Exception as e:
+        return None, (jsonify({'error': f'Transaction verification error: {str(e)}'}), 502)
+
+    status = verification['status']
+    if status == FAILED:
+        return None, (jsonify({'error': f'Transaction failed on-chain: {verification["error_message"]}'}), 400)
+    if status != SEALED:
+        if verification['chain_status'] == UNAVAILABLE:
+            return None, (jsonify({'error': 'Could not fetch tx from Flow; verification will retry'}), 502)
+        chain_status = verification['chain_status'] or status
+        return None, (jsonify({'error': f'Transaction not sealed (status: {chain_status})', 'status': status}), 400)
+
+    # Verify the transaction was proposed by the claiming wallet
+    proposer = (verification['proposer'] or '').removeprefix('0x').lower()
+    claimed = claimed_addr.removeprefix('0x').lower()
+    if proposer and proposer != claimed:
+        return None, (jsonify({'error': 'Transaction proposer does not match your wallet'}), 403)
+    return verification, None
+
+
 def _get_moment_tier(moment_id):
     """Look up moment tier from local DB, fallback to TopShot GraphQL."""
     # --- Try local DB first ---
@@ -3075,7 +3018,7 @@ def _get_moment_tier(moment_id):
     """
     try:
         resp = http_requests.post(
-            'https://public-api.nbatopshot.com/graphql',
+            TOPSHOT_GRAPHQL_URL,
             json={'query': query, 'variables': {'momentId': str(moment_id)}},
             headers={'User-Agent': 'MVPonFlow', 'Content-Type': 'application/json'},
             timeout=10,
@@ -3139,6 +3082,9 @@ async def _send_mvp_from_treasury(recipient_addr: str, amount: float) -> str:
         host='access.mainnet.nodes.onflow.org',
         port=9000,
     ) as client:
+        from utils.metrics import grpc_client
+        client = grpc_client(client)
+
         # Get latest block for reference
         block = await client.get_latest_block()
         ref_block_id = block.id
@@ -4,14 +4,30 @@
 import requests
 import random
 import asyncio
-import json
 import sys
 import base64
 import re
+import time
+import threading
 
+import json
 from json import JSONDecodeError
-from utils.helpers import get_last_processed_block, save_last_processed_block, save_gift
-from config import FLOW_SCAN_API_URL, FLOW_ACCOUNT
+from utils import helpers
+from utils.helpers import (
+    get_last_processed_block, save_last_processed_block, save_gift, prepare_query,
+    get_state_value, set_state_value,
+)
+from db.bot_db import run_db
+from utils.cdc_events import iter_deposits, TOPSHOT_DEPOSIT, TOPSHOT_WITHDRAW
+from bot.event_bus import register_consumer
+from utils.gift_scoring import (
+    MOMENT_METADATA_FIELDS, load_scoring_rules, score_metadata,
+    moment_metadata_row, save_moment_metadata, rescore_gifts,
+)
+from config import (
+    FLOW_SCAN_API_URL, FLOW_ACCOUNT, SWAPFEST_START_TIME, SWAPFEST_END_TIME, TOPSHOT_GRAPHQL_URL,
+    EVENT_BUS_INTERVAL,
+)
 
 # ==============================
 # CONFIG
@@ -30,7 +46,8 @@ async def get_with_retries(url, headers={}, max_retries=6, backoff_factor=1.5, *
 
     while attempt < max_retries:
         try:
-            response = requests.get(url, headers=headers, **kwargs)
+            # Off the event loop so concurrent scanners (backfill shards) overlap
+            response = await asyncio.to_thread(requests.get, url, headers=headers, **kwargs)
             if response.status_code == 200:
                 return response
 
@@ -57,39 +74,32 @@ async def get_with_retries(url, headers={}, max_retries=6, backoff_factor=1.5, *
 
 
 # ==============================
-# TIER → POINTS
+# SCORING RULES
 # ==============================
-def get_points_for_tier(tier: str) -> int:
-    mapping = {
-        "MOMENT_TIER_COMMON": 1,
-        "MOMENT_TIER_FANDOM": 1,
-        "MOMENT_TIER_RARE": 50,
-        "MOMENT_TIER_LEGENDARY": 1000,
-        "MOMENT_TIER_ULTIMATE": 1000,
-        "MOMENT_TIER_ANTHOLOGY": 1000,
-    }
-    return mapping.get(tier, 0)
+_scoring_rules = None
+
+
+def _load_scoring_rules(conn, cursor):
+    return load_scoring_rules(cursor)
+
+
+async def get_scoring_rules(reload=False) -> dict:
+    """Scoring rules from ``gift_scoring_rules``, cached after the first load."""
+    global _scoring_rules
+    if _scoring_rules is None or reload:
+        _scoring_rules = await run_db(_load_scoring_rules)
+    return _scoring_rules
+
 
 # ==============================
 # GRAPHQL CALL
 # ==============================
 async def query_moment_metadata(moment_id: int) -> dict:
-    url = "https://public-api.nbatopshot.com/graphql"
-    query = """
-    query getMintedMoment($momentId: ID!) {
-      getMintedMoment(momentId: $momentId) {
-        data {
-          id
-          tier
-          set {
-            flowId
-          }
-          play {
-            headline
-          }
-        }
-      }
-    }
+    url = TOPSHOT_GRAPHQL_URL
+    query = f"""
+    query getMintedMoment($momentId: ID!) {{
+      getMintedMoment(momentId: $momentId) {MOMENT_METADATA_FIELDS}
+    }}
     """
     variables = {"momentId": str(moment_id)}
     payload = {"query": query, "variables": variables}
@@ -112,43 +122,137 @@ async def query_moment_metadata(moment_id: int) -> dict:
     return None
 
 
+# ==============================
+# BATCHED GRAPHQL CALL
+# ==============================
+METADATA_BATCH_SIZE = 48      # aliased lookups per request (stays under TopShot's complexity limit)
+METADATA_CONCURRENCY = 4      # batch requests in flight at once
+METADATA_BATCH_RETRIES = 3
+
+
+def _post_metadata_batch(moment_ids) -> dict:
+    """Blocking: one aliased GraphQL request for up to ``METADATA_BATCH_SIZE`` moments.
+
+    Returns ``{moment_id: metadata}`` for every moment TopShot resolved;
+    moments it could not resolve are simply missing from the result.
+    """
+    headers = {"User-Agent": "PetJokicsHorses"}
+
+    for attempt in range(METADATA_BATCH_RETRIES):
+        try:
+            found = helpers.fetch_minted_moments(
+                moment_ids, MOMENT_METADATA_FIELDS, "BatchMomentPoints", headers=headers,
+            )
+            return {int(mid): metadata for mid, metadata in found.items()}
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            print(f"Error querying GraphQL batch (attempt {attempt + 1}): {e}")
+            time.sleep(1.5 * (attempt + 1))
+
+    print(f"Failed to get metadata for {len(moment_ids)} moments after retries.")
+    return {}
+
+
+async def query_moments_metadata(moment_ids, progress=None) -> dict:
+    """Resolve metadata for many moments with concurrent batched requests.
+
+    ``progress`` is an optional ``async (done, total)`` callback awaited as
+    each batch finishes.  Returns ``{moment_id: metadata}``.
+    """
+    ids = list(dict.fromkeys(int(m) for m in moment_ids))
+    batches = [ids[i:i + METADATA_BATCH_SIZE] for i in range(0, len(ids), METADATA_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(METADATA_CONCURRENCY)
+    results = {}
+    done = 0
+
+    async def _run(batch):
+        nonlocal done
+        async with semaphore:
+            found = await asyncio.to_thread(_post_metadata_batch, batch)
+        results.update(found)
+        done += len(batch)
+        if progress:
+            await progress(done, len(ids))
+
+    await asyncio.gather(*(_run(batch) for batch in batches))
+    return results
+
+
 # ==============================
 # FINAL GET MOMENT POINTS
 # ==============================
+def _save_moment_metadata(conn, cursor, rows):
+    save_moment_metadata(cursor, rows)
+
+
 async def get_moment_points(moment_id: int) -> int:
     metadata = await query_moment_metadata(moment_id)
     if metadata is None:
         print(f"Failed to get metadata for moment {moment_id}", file=sys.stderr, flush=True)
         return 0
+    try:
+        # Cache it so later rule changes can re-score this gift in SQL
+        await run_db(_save_moment_metadata, [moment_metadata_row(moment_id, metadata)])
+    except Exception as e:
+        print(f"⚠️  Failed to cache metadata for moment {moment_id}: {e}", file=sys.stderr, flush=True)
+    return score_metadata(await get_scoring_rules(), metadata)
 
-    # Special rule: if set.flowId == 2, award 250 points
-    flow_id = metadata.get("set", {}).get("flowId")
-    if flow_id == 2:
-        # print(f"Moment ID {moment_id} has set.flowId 2 → 250 points.")
-        return 250
 
-    # Only award points for Nikola Jokić moments
-    if not metadata.get("play", {}).get("headline", "").startswith("Nikola Joki"):
-        return 0
-   
-    # Special rule: 3x points for Equinox set (flowId 227)
-    if metadata['set']['flowId'] == 227:
-        return 150
-
-    # Special rule: 3 points for S25/26 base set (flowId 218)
-    if metadata['set']['flowId'] == 218:
-        return 3
-    tier = metadata.get("tier")
-    points = get_points_for_tier(tier)
-
-    # print(f"Moment ID {moment_id} is tier {tier}, awarded {points} points.")
-    return points
-
-def get_to_address(event):
-    for field in event["value"]["fields"]:
-        if field["name"] == "to":
-            return field["value"]["value"]["value"]   # the actual address
-    return None
+# ==============================
+# RE-SCORE GIFTS
+# ==============================
+def _fetch_zero_point_gifts(conn, cursor):
+    """``(moment_id, cached set flowId or None)`` for every gift worth 0."""
+    cursor.execute(prepare_query('''
+        SELECT g.moment_id, mm.set_flow_id
+        FROM gifts g
+        LEFT JOIN moment_metadata mm ON mm.moment_id = g.moment_id
+        WHERE COALESCE(g.points, 0) = 0
+    '''))
+    return cursor.fetchall()
+
+
+def _rescore_zero_point_gifts(conn, cursor):
+    rescore_gifts(cursor, only_zero=True)
+    cursor.execute(prepare_query("SELECT COUNT(*) FROM gifts WHERE COALESCE(points, 0) = 0"))
+    return cursor.fetchone()[0]
+
+
+def _rescore_gifts(conn, cursor, since, until):
+    return rescore_gifts(cursor, since=since, until=until)
+
+
+async def rescore_zero_point_gifts(progress=None):
+    """Re-score every gift stored with 0 points.
+
+    Moments without cached metadata are resolved concurrently in batches
+    and cached; the gifts are then re-scored by one set-based UPDATE
+    against the rules table.  ``progress`` is passed through to
+    ``query_moments_metadata``.  Returns ``(zero_point_gifts, updated_gifts)``.
+    """
+    rows = await run_db(_fetch_zero_point_gifts)
+    if not rows:
+        return 0, 0
+
+    missing = {int(moment_id) for moment_id, set_flow_id in rows
+               if moment_id is not None and set_flow_id is None}
+    if missing:
+        metadata = await query_moments_metadata(missing, progress)
+        if metadata:
+            await run_db(_save_moment_metadata,
+                         [moment_metadata_row(mid, md) for mid, md in metadata.items()])
+
+    still_zero = await run_db(_rescore_zero_point_gifts)
+    return len(rows), max(len(rows) - still_zero, 0)
+
+
+async def apply_scoring_rules(since=None, until=None):
+    """Re-score all gifts in ``[since, until]`` from cached metadata — no remote calls.
+
+    Reloads the cached rules first so the live scanner picks up edits.
+    Returns the number of gifts updated.
+    """
+    await get_scoring_rules(reload=True)
+    return await run_db(_rescore_gifts, since, until)
 
 
 # ==============================
@@ -181,15 +285,9 @@ async def get_block_gifts(block_height, offset):
     new_events = [ev for block in list(response.json()) for ev in block.get("events", [])]
     eventsjson.extend(new_events)
 
-    for event in eventsjson:
-        # decode base64 → get JSON text
-        decoded_json = base64.b64decode(event['payload']).decode()
-        
-        # load into dict
-        event_decoded = json.loads(decoded_json)
-
-        if get_to_address(event_decoded) == FLOW_ACCOUNT:
-            gift_txns.append(event['transaction_id'])
+    # Already filtered to TopShot.Deposit by the query; only decode deposits to us
+    for event, _ in iter_deposits(eventsjson, None, FLOW_ACCOUNT, names=()):
+        gift_txns.append(event['transaction_id'])
 
     # print(f"Block {block_height}: Found gift transactions {gift_txns}")
 
@@ -233,6 +331,262 @@ async def get_block_gifts(block_height, offset):
     return gifts
 
 
+# ==============================
+# SHARDED BACKFILL
+# ==============================
+BACKFILL_SHARDS = 4
+
+
+def split_block_range(start, end, shards):
+    """Split the inclusive range ``[start, end]`` into up to ``shards`` contiguous ranges."""
+    total = end - start + 1
+    shards = max(1, min(shards, total))
+    size, extra = divmod(total, shards)
+    ranges = []
+    low = start
+    for i in range(shards):
+        high = low + size - 1 + (1 if i < extra else 0)
+        ranges.append((low, high))
+        low = high + 1
+    return ranges
+
+
+# scraper_state key holding the merged ``[[low, high], ...]`` block ranges
+# already backfilled — separate from the live tail's ``last_block``.  Coverage
+# is tracked by range rather than per shard, so a resume may use any --shards.
+BACKFILL_COVERED_KEY = "backfill_covered"
+_LEGACY_CHECKPOINT_PREFIX = "backfill:"   # old per-shard "backfill:<lo>-<hi>" → last height
+
+
+def merge_block_ranges(ranges):
+    """Sort and merge overlapping or adjacent inclusive ``(low, high)`` ranges."""
+    merged = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return [tuple(r) for r in merged]
+
+
+def uncovered_block_ranges(start, end, covered):
+    """The parts of ``[start, end]`` not in the merged ``covered`` ranges."""
+    gaps = []
+    low = start
+    for c_low, c_high in covered:
+        if c_high < low:
+            continue
+        if c_low > end:
+            break
+        if c_low > low:
+            gaps.append((low, c_low - 1))
+        low = max(low, c_high + 1)
+    if low <= end:
+        gaps.append((low, end))
+    return gaps
+
+
+def split_block_ranges(ranges, shards):
+    """Deal the blocks of ``ranges`` into up to ``shards`` contiguous work lists of similar size."""
+    total = sum(high - low + 1 for low, high in ranges)
+    if total <= 0:
+        return []
+    per_shard = -(-total // max(1, min(shards, total)))
+    work, current, room = [], [], per_shard
+    for low, high in ranges:
+        while low <= high:
+            take = min(room, high - low + 1)
+            current.append((low, low + take - 1))
+            low += take
+            room -= take
+            if room == 0:
+                work.append(current)
+                current, room = [], per_shard
+    if current:
+        work.append(current)
+    return work
+
+
+def _load_backfill_coverage(conn, cursor):
+    value = get_state_value(cursor, BACKFILL_COVERED_KEY)
+    covered = [tuple(r) for r in json.loads(value)] if value else []
+    # Fold in checkpoints written by the old per-shard keys
+    cursor.execute(prepare_query("SELECT key, value FROM scraper_state WHERE key LIKE ?"),
+                   (_LEGACY_CHECKPOINT_PREFIX + "%",))
+    for key, height in cursor.fetchall():
+        try:
+            low = int(key[len(_LEGACY_CHECKPOINT_PREFIX):].split("-")[0])
+            covered.append((low, int(height)))
+        except ValueError:
+            continue
+    return merge_block_ranges(covered)
+
+
+def _merge_backfill_chunk(conn, cursor, gifts, metadata_rows, low, high):
+    """Store one scanned chunk and record ``[low, high]`` as covered in one transaction.
+
+    Gifts already stored (by the live tail or an earlier run) are skipped by
+    ``save_gift``'s ``txn_id`` conflict handling, so re-scanning is harmless.
+    """
+    if metadata_rows:
+        save_moment_metadata(cursor, metadata_rows)
+    for gift in gifts:
+        save_gift(cur=cursor, **gift)
+    value = get_state_value(cursor, BACKFILL_COVERED_KEY)
+    covered = [tuple(r) for r in json.loads(value)] if value else []
+    covered = merge_block_ranges(covered + [(low, high)])
+    set_state_value(cursor, helpers.db_type, BACKFILL_COVERED_KEY, json.dumps(covered))
+
+
+async def _score_gifts(gifts):
+    """Resolve every gift's moment in batched requests and attach points."""
+    moment_ids = {int(g['moment_id']) for g in gifts if g['moment_id']}
+    metadata = await query_moments_metadata(moment_ids) if moment_ids else {}
+    rules = await get_scoring_rules()
+    rows = []
+    for gift in gifts:
+        if not gift['moment_id']:
+            continue  # skip if moment_id not found in txn script, such as in purchase txns
+        moment_id = int(gift['moment_id'])
+        md = metadata.get(moment_id)
+        rows.append({
+            'txn_id': gift['txn_id'],
+            'moment_id': moment_id,
+            'from_address': gift.get('from', 'unknown'),
+            'points': score_metadata(rules, md) if md else 0,
+            'timestamp': gift.get('timestamp', ''),
+        })
+    return rows, [moment_metadata_row(mid, md) for mid, md in metadata.items()]
+
+
+async def _backfill_shard(ranges, offset, stats, coverage_lock):
+    for low, high in ranges:
+        height = low
+        while height <= high:
+            span = min(offset, high - height)
+            gifts = await get_block_gifts(height, span)
+            if gifts is False:
+                continue  # blocks not available yet; get_block_gifts already waited
+            rows, metadata_rows = await _score_gifts(gifts)
+            # Shards share one coverage record; serialize its read-modify-write
+            async with coverage_lock:
+                await run_db(_merge_backfill_chunk, rows, metadata_rows, height, height + span)
+            stats['blocks'] += span + 1
+            stats['gifts'] += len(rows)
+            height += span + 1
+
+    print(f"✅ Shard {', '.join(f'{lo}-{hi}' for lo, hi in ranges)} done", flush=True)
+
+
+async def backfill(start, end, shards=BACKFILL_SHARDS, offset=OFFSET):
+    """Re-scan ``[start, end]`` with ``shards`` concurrent workers.
+
+    Scanned chunks are recorded as covered block ranges under
+    ``BACKFILL_COVERED_KEY``, so an interrupted backfill resumes with only
+    the blocks not yet covered — whatever ``shards`` it is restarted with —
+    and the live tail's ``last_block`` is never touched.  Run one backfill
+    process at a time.  Returns a stats dict with ``blocks``, ``gifts``,
+    ``seconds`` and ``blocks_per_second``.
+    """
+    stats = {'blocks': 0, 'gifts': 0}
+    started = time.perf_counter()
+    covered = await run_db(_load_backfill_coverage)
+    work = split_block_ranges(uncovered_block_ranges(start, end, covered), shards)
+    coverage_lock = asyncio.Lock()
+    await asyncio.gather(*(_backfill_shard(ranges, offset, stats, coverage_lock) for ranges in work))
+    seconds = time.perf_counter() - started
+    stats['seconds'] = round(seconds, 2)
+    stats['blocks_per_second'] = round(stats['blocks'] / seconds, 1) if seconds > 0 else 0.0
+    return stats
+
+
+# ==============================
+# EVENT BUS CONSUMER
+# ==============================
+# Marketplace sales also deposit into FLOW_ACCOUNT; those are not gifts
+PURCHASE_EVENT_TYPES = (
+    'A.4eb8a10cb9f87357.NFTStorefrontV2.ListingCompleted',
+    'A.c1e4f4f4c4257510.TopShotMarketV3.MomentPurchased',
+)
+
+
+def is_gift_deposit(event):
+    """Event-bus filter: a TopShot deposit into the Swapfest account."""
+    return (event["type"] == TOPSHOT_DEPOSIT
+            and str(event["fields"].get("to") or "").lower() == FLOW_ACCOUNT.lower())
+
+
+def apply_gift_events(conn, db_type, events, start_height, end_height):
+    """Record gifts from logged TopShot events (event-bus handler).
+
+    The sender comes from the Withdraw paired with each Deposit in the same
+    transaction; transactions with a marketplace purchase event are skipped.
+    Gifts are scored from cached metadata only; moments not cached yet stay
+    at 0 points until ``gift_scoring_tick`` resolves them.
+    """
+    by_tx = {}
+    for ev in events:
+        by_tx.setdefault(ev["transaction_id"], []).append(ev)
+
+    gifts = []
+    for tx_id, tx_events in by_tx.items():
+        if any(ev["type"] in PURCHASE_EVENT_TYPES for ev in tx_events):
+            continue
+        senders = {str(ev["fields"].get("id")): ev["fields"].get("from")
+                   for ev in tx_events if ev["type"] == TOPSHOT_WITHDRAW}
+        for ev in tx_events:
+            if not is_gift_deposit(ev):
+                continue
+            moment_id = int(ev["fields"]["id"])
+            gifts.append({
+                'txn_id': tx_id,
+                'moment_id': moment_id,
+                'from_address': senders.get(str(moment_id)) or 'unknown',
+                'timestamp': ev.get("block_timestamp") or '',
+            })
+    if not gifts:
+        return 0
+
+    cursor = conn.cursor()
+    for gift in gifts:
+        save_gift(points=0, cur=cursor, **gift)
+    # Moments already cached score now; the rest wait for the gift scorer so
+    # no GraphQL call runs while the bus holds dispatch_lock
+    rescore_gifts(cursor, only_zero=True)
+    print(f"🎁 Recorded {len(gifts)} gifts from blocks {start_height}-{end_height}", flush=True)
+    return len(gifts)
+
+
+def register_gift_consumer():
+    """Record gifts from the shared event bus instead of running ``main``'s poller."""
+    register_consumer(
+        "swapfest_gifts", (TOPSHOT_DEPOSIT, TOPSHOT_WITHDRAW, *PURCHASE_EVENT_TYPES),
+        apply_gift_events, accept=is_gift_deposit,
+    )
+
+
+def gift_scoring_tick():
+    """Resolve metadata for zero-point gifts and re-score them, outside the bus."""
+    try:
+        scanned, updated = asyncio.run(rescore_zero_point_gifts())
+        if updated:
+            print(f"🎁 Scored {updated} of {scanned} zero-point gifts", flush=True)
+    except Exception as e:
+        print(f"⚠️  Gift scoring failed: {e}", file=sys.stderr, flush=True)
+
+
+def start_gift_scorer(interval=EVENT_BUS_INTERVAL):
+    """Start the background thread scoring gifts recorded by the bus consumer (daemon)."""
+    def _loop():
+        while True:
+            time.sleep(interval)
+            gift_scoring_tick()
+
+    thread = threading.Thread(target=_loop, daemon=True, name="swapfest-gift-scorer")
+    thread.start()
+    return thread
+
+
 # ==============================
 # MAIN LOOP
 # ==============================
@@ -273,4 +627,41 @@ async def main(offset = OFFSET):
 
         # Optional stop condition
         # if block_height > STARTING_HEIGHT + 1000:
-        #     break
\ No newline at end of file
+        #     break
+
+
+# ==============================
+# CLI
+# ==============================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Swapfest gift scanner tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rescore", help="Re-score gifts currently stored with 0 points")
+    apply_parser = subparsers.add_parser(
+        "apply-rules", help="Re-score the event's gifts from cached metadata after a rule change")
+    apply_parser.add_argument("--since", default=SWAPFEST_START_TIME, help="earliest gift timestamp (ISO)")
+    apply_parser.add_argument("--until", default=SWAPFEST_END_TIME, help="latest gift timestamp (ISO)")
+    apply_parser.add_argument("--all", action="store_true", help="ignore the time window")
+    backfill_parser = subparsers.add_parser(
+        "backfill", help="Re-scan a block range with sharded workers alongside the live tail")
+    backfill_parser.add_argument("start", type=int, help="first block height")
+    backfill_parser.add_argument("end", type=int, help="last block height (inclusive)")
+    backfill_parser.add_argument("--shards", type=int, default=BACKFILL_SHARDS, help="concurrent workers")
+    args = parser.parse_args()
+
+    if args.command == "rescore":
+        async def _print_progress(done, total):
+            print(f"🔄 Resolved metadata for {done}/{total} moments", flush=True)
+
+        scanned, updated = asyncio.run(rescore_zero_point_gifts(_print_progress))
+        print(f"✅ Refreshed points for {updated} of {scanned} zero-point gifts.")
+    elif args.command == "apply-rules":
+        since, until = (None, None) if args.all else (args.since, args.until)
+        updated = asyncio.run(apply_scoring_rules(since, until))
+        print(f"✅ Re-scored {updated} gifts from the scoring rules table.")
+    elif args.command == "backfill":
+        stats = asyncio.run(backfill(args.start, args.end, args.shards))
+        print(f"✅ Backfilled {stats['blocks']} blocks ({stats['gifts']} gifts) in {stats['seconds']}s "
+              f"— {stats['blocks_per_second']} blocks/s across {args.shards} shards")
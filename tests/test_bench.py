@@ -0,0 +1,61 @@
+"""Tests for the end-to-end benchmark suite."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from loadtest.bench import summarize, compare, upstream_request_count, REPO_ROOT
+
+
+def _doc(**p50s):
+    return {"results": {name: {"p50_ms": value, "errors": 0} for name, value in p50s.items()}}
+
+
+class TestSummarize:
+    def test_percentiles(self):
+        result = summarize([float(i) for i in range(1, 101)], {"flow:events": 2, "topshot:field:getMintedMoment": 96})
+        assert result["n"] == 100
+        assert result["p50_ms"] == 50.0 and result["p95_ms"] == 95.0
+        assert result["min_ms"] == 1.0 and result["max_ms"] == 100.0
+        assert upstream_request_count(result) == 2
+
+
+class TestCompare:
+    """Slowdowns beyond the threshold and the absolute floor are regressions."""
+
+    def test_flags_regressions_only_over_threshold(self):
+        rows, regressions = compare(_doc(a=10.0, b=10.0, c=10.0, d=0.2),
+                                    _doc(a=13.0, b=11.0, c=7.0, d=0.6, e=1.0), threshold=0.2)
+        status = {r["name"]: r["status"] for r in rows}
+        assert status == {"a": "regression", "b": "ok", "c": "improved", "d": "ok", "e": "new"}
+        assert [r["name"] for r in regressions] == ["a"]
+
+    def test_new_errors_fail_and_missing_is_reported(self):
+        current = _doc(a=10.0)
+        current["results"]["a"]["errors"] = 2
+        rows, regressions = compare(_doc(a=10.0, gone=5.0), current)
+        assert [r["status"] for r in regressions] == ["failing"]
+        assert {"name": "gone", "baseline": 5.0, "current": None, "change": None, "status": "missing"} in rows
+
+
+@pytest.mark.slow
+class TestEndToEnd:
+    def test_tiny_run_writes_results(self, tmp_path):
+        out = tmp_path / "bench.json"
+        proc = subprocess.run(
+            [sys.executable, "-m", "loadtest.bench", "--scale", "tiny", "--repeat", "1", "--warmup", "0",
+             "--job-repeat", "1", "--workdir", str(tmp_path), "--output", str(out)],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=300,
+            env={k: v for k, v in os.environ.items() if k != "DATABASE_URL"},
+        )
+        assert proc.returncode == 0, proc.stdout + proc.stderr
+        results = json.loads(out.read_text())["results"]
+        assert set(results) == {
+            "leaderboard", "swap_leaderboard", "prediction_leaderboard", "bracket_tournament",
+            "moment_lookup", "enrich_moments", "bracket_poll_tick", "swapfest_block_window",
+        }
+        assert all(r["errors"] == 0 for r in results.values())
+        assert results["enrich_moments"]["upstream_requests"]["topshot:graphql"] > 0
@@ -0,0 +1,167 @@
+"""Unit tests for the bot's non-blocking DB layer."""
+
+import asyncio
+import sqlite3
+import threading
+import psycopg2
+import pytest
+from unittest.mock import Mock, patch
+
+from db import bot_db
+from db.bot_db import ConnectionPool, call_db, run_db, run_blocking, record_loop_lag
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    """Fresh pool whose connections point at a throwaway SQLite file."""
+    path = str(tmp_path / 'bot.db')
+    setup = sqlite3.connect(path)
+    setup.execute('CREATE TABLE user_rewards (user_id BIGINT PRIMARY KEY, balance REAL)')
+    setup.commit()
+    setup.close()
+
+    def _connect():
+        return sqlite3.connect(path, check_same_thread=False), 'sqlite'
+
+    monkeypatch.setattr(bot_db, 'get_db_connection', _connect)
+    p = ConnectionPool(2)
+    monkeypatch.setattr(bot_db, '_pool', p)
+    yield p
+    p.close_all()
+
+
+def _insert(conn, cursor, user_id, balance):
+    cursor.execute('INSERT INTO user_rewards (user_id, balance) VALUES (?, ?)', (user_id, balance))
+
+
+def _balance(conn, cursor, user_id):
+    cursor.execute('SELECT balance FROM user_rewards WHERE user_id = ?', (user_id,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class TestCallDb:
+    """Test the transaction wrapper around pooled connections."""
+
+    def test_commits_and_reuses_connection(self, pool):
+        call_db(_insert, 1, 5.0)
+        assert call_db(_balance, 1) == 5.0
+        assert pool._idle.qsize() == 1
+
+    def test_rolls_back_on_error(self, pool):
+        def _insert_then_fail(conn, cursor):
+            _insert(conn, cursor, 2, 9.0)
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            call_db(_insert_then_fail)
+        assert call_db(_balance, 2) is None
+
+    def test_retries_once_on_dead_connection(self, pool):
+        dead = Mock()
+        dead.cursor.return_value.execute.side_effect = psycopg2.OperationalError('server closed the connection')
+        pool._idle.put(dead)
+
+        call_db(_insert, 3, 1.0)
+
+        dead.close.assert_called_once()
+        assert call_db(_balance, 3) == 1.0
+
+    def test_gives_up_after_second_dead_connection(self, pool, monkeypatch):
+        dead = Mock()
+        dead.cursor.return_value.execute.side_effect = psycopg2.OperationalError('server closed the connection')
+        monkeypatch.setattr(bot_db, 'get_db_connection', lambda: (dead, 'sqlite'))
+
+        with pytest.raises(psycopg2.OperationalError):
+            call_db(_insert, 4, 1.0)
+        assert dead.close.call_count == 2
+
+    def test_run_db_runs_off_event_loop_thread(self, pool):
+        seen = {}
+
+        def _where(conn, cursor):
+            seen['thread'] = threading.current_thread().name
+            return 'ok'
+
+        assert asyncio.run(run_db(_where)) == 'ok'
+        assert seen['thread'].startswith('bot-db')
+
+    def test_sql_errors_are_not_retried(self, pool, monkeypatch):
+        """A bad statement is a bug, not a dead connection: no reconnect."""
+        calls = []
+
+        def _bad(conn, cursor):
+            calls.append(conn)
+            cursor.execute('SELECT ?', ())   # wrong binding count
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            call_db(_bad)
+        assert len(calls) == 1
+
+    def test_run_blocking_uses_its_own_executor(self):
+        seen = {}
+
+        def _where():
+            seen['thread'] = threading.current_thread().name
+
+        asyncio.run(run_blocking(_where))
+        assert seen['thread'].startswith('bot-blocking')
+
+
+class TestGetBotDb:
+    """get_bot_db no longer probes the connection with SELECT 1."""
+
+    @patch('db.init.get_db_connection')
+    def test_no_probe_query(self, mock_get_conn):
+        from db.init import get_bot_db
+        bot = Mock()
+        bot.db_conn.closed = 0
+
+        conn, cursor = get_bot_db(bot)
+
+        cursor.execute.assert_not_called()
+        mock_get_conn.assert_not_called()
+
+    @patch('db.init.get_db_connection')
+    def test_reconnects_closed_connection(self, mock_get_conn):
+        from db.init import get_bot_db
+        fresh = Mock()
+        mock_get_conn.return_value = (fresh, 'postgresql')
+        bot = Mock()
+        bot.db_conn.closed = 1
+
+        conn, cursor = get_bot_db(bot)
+
+        assert conn is fresh
+        assert bot.db_type == 'postgresql'
+
+
+class TestLoopLag:
+    """Test event-loop lag bookkeeping."""
+
+    @pytest.fixture(autouse=True)
+    def reset_stats(self, monkeypatch):
+        monkeypatch.setattr(bot_db, 'loop_lag_stats',
+                            {"samples": 0, "last_ms": 0.0, "max_ms": 0.0, "stalls": 0})
+
+    def test_records_samples_and_stalls(self):
+        assert record_loop_lag(0.01, threshold=0.25) is False
+        assert record_loop_lag(0.5, threshold=0.25) is True
+        stats = bot_db.loop_lag_stats
+        assert stats["samples"] == 2
+        assert stats["stalls"] == 1
+        assert stats["last_ms"] == pytest.approx(500)
+        assert stats["max_ms"] == pytest.approx(500)
+
+    def test_monitor_detects_blocking_call(self):
+        import time
+
+        async def _scenario():
+            task = asyncio.create_task(bot_db.monitor_event_loop_lag(interval=0.01, threshold=0.05))
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # block the loop
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(_scenario())
+        assert bot_db.loop_lag_stats["stalls"] >= 1
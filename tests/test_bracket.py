@@ -580,10 +580,10 @@ class TestMomentSignup:
         assert 'already been used' in json.loads(resp.data)['error']
 
     @patch('routes.api.FLOW_ACCOUNT', '0xTREASURY')
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_ts_username_from_flow_wallet', return_value='momentuser1')
     @patch('db.init.get_db_connection')
-    def test_signup_moment_success(self, mock_get_conn, mock_ts, mock_http, client):
+    def test_signup_moment_success(self, mock_get_conn, mock_ts, mock_verify, client):
         """Full moment signup with on-chain verification should succeed."""
         import base64 as _b64
 
@@ -603,30 +603,23 @@ class TestMomentSignup:
         deposit_payload = json.dumps({
             'value': {
                 'fields': [
-                    {'name': 'id', 'value': {'value': '12345'}},
-                    {'name': 'to', 'value': {'type': 'Optional', 'value': {'value': '0xtreasury'}}},
+                    {'name': 'id', 'value': {'type': 'UInt64', 'value': '12345'}},
+                    {'name': 'to', 'value': {'type': 'Optional', 'value': {'type': 'Address', 'value': '0xtreasury'}}},
                 ]
             }
         })
         b64_payload = _b64.b64encode(deposit_payload.encode()).decode()
 
-        # Mock Flow REST API responses
-        mock_tx_result = Mock()
-        mock_tx_result.status_code = 200
-        mock_tx_result.json.return_value = {
+        # Sealed result as cached by the transaction verifier
+        from bot.tx_verifier import build_verification
+        mock_verify.side_effect = lambda conn, db_type, tx_id: build_verification(tx_id, {
             'status': 'SEALED',
             'error_message': '',
             'events': [{
                 'type': 'A.0b2a3299cc857e29.TopShot.Deposit',
                 'payload': b64_payload,
             }],
-        }
-        mock_tx_body = Mock()
-        mock_tx_body.status_code = 200
-        mock_tx_body.json.return_value = {
-            'proposer': '0xmomentplayer',
-        }
-        mock_http.get.side_effect = [mock_tx_result, mock_tx_body]
+        }, proposer='0xmomentplayer')
 
         resp = client.post(
             '/api/bracket/tournament/1/signup',
@@ -726,7 +719,7 @@ class TestEnrichMoments:
         data = json.loads(resp.data)
         assert data['moments'] == []
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_enriches_moments(self, mock_get_db, mock_http, client):
         """Should call TopShot GraphQL batch and return enriched data."""
@@ -775,7 +768,7 @@ class TestEnrichMoments:
         assert m['seriesNumber'] == 4
         assert m['teamName'] == 'Denver Nuggets'
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_enriches_skips_failures(self, mock_get_db, mock_http, client):
         """Failed GraphQL batch calls should be silently skipped."""
@@ -792,7 +785,7 @@ class TestEnrichMoments:
         data = json.loads(resp.data)
         assert data['moments'] == []
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_enriches_multiple_moments_in_batch(self, mock_get_db, mock_http, client):
         """Multiple moments should be batched into a single GraphQL request."""
@@ -844,7 +837,7 @@ class TestEnrichMoments:
         # Only ONE HTTP call should have been made (both moments in one batch)
         assert mock_http.post.call_count == 1
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_cap_at_2000(self, mock_get_db, mock_http, client):
         """Moments list should be capped at 2000."""
@@ -989,7 +982,7 @@ class TestPrizeDescription:
 class TestEnrichMomentsCache:
     """Cache layer tests for enrich-moments endpoint."""
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_cache_hit_skips_graphql(self, mock_get_db, mock_http, client):
         """When all moments are cached, no GraphQL call is made."""
@@ -1031,7 +1024,7 @@ class TestEnrichMomentsCache:
         # No GraphQL call should have been made
         mock_http.post.assert_not_called()
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_cache_miss_fetches_and_stores(self, mock_get_db, mock_http, client):
         """Uncached moments should be fetched via GraphQL and then cached."""
@@ -1074,7 +1067,7 @@ class TestEnrichMomentsCache:
         assert cur.executemany.called or cur.execute.called
         db.commit.assert_called()
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_mixed_cached_and_uncached(self, mock_get_db, mock_http, client):
         """Moments partly in cache: only uncached ones hit GraphQL."""
@@ -1138,7 +1131,7 @@ class TestEnrichMomentsCache:
         # Only 1 GraphQL call (for moment 200 only)
         assert mock_http.post.call_count == 1
 
-    @patch('routes.api.http_requests')
+    @patch('utils.helpers.requests')
     @patch('db.connection.get_db')
     def test_cache_read_failure_falls_through(self, mock_get_db, mock_http, client):
         """If cache read fails, all moments should go to GraphQL."""
@@ -1212,9 +1205,9 @@ class TestBracketPayout:
         cursor.fetchone.side_effect = [
             ('COMPLETE', '0xwinner', 'MOMENT', 0.0, '', None),  # tournament row
         ]
-        cursor.fetchall.return_value = [
-            ('[100, 200]',),
-            ('[300]',),
+        cursor.fetchall.side_effect = [
+            [],  # nothing queued for this tournament
+            [('[100, 200]',), ('[300]',)],
         ]
 
         import asyncio
@@ -1228,6 +1221,63 @@ class TestBracketPayout:
         assert data['payout_tx_id'] == 'tx_payout_moment_abc'
         assert data['winner_dapper'] == '0xWinnerDapper'
 
+    @patch('routes.api._send_mvp_from_treasury')
+    @patch('db.init.get_db_connection')
+    def test_payout_token_queued(self, mock_get_conn, mock_send_mvp, client):
+        """With queue=1 the prize is queued for the next disbursement instead of sent."""
+        db, cursor = _mock_db()
+        mock_get_conn.return_value = (db, 'sqlite')
+        cursor.fetchone.side_effect = [
+            ('COMPLETE', '0xwinner', 'TOKEN', 10.0, '$MVP', None),
+            (4,),
+        ]
+        cursor.fetchall.return_value = []
+
+        with patch('bot.disbursements.enqueue_payout', return_value={'id': 7}) as mock_enqueue:
+            resp = client.post('/api/bracket/tournament/1/payout?queue=1')
+
+        assert resp.status_code == 202
+        data = json.loads(resp.data)
+        assert data['queued'] is True and data['payout_ids'] == [7]
+        mock_send_mvp.assert_not_called()
+        args, kwargs = mock_enqueue.call_args
+        assert args[2:4] == ('bracket:1', '0xwinner')
+        assert kwargs['amount'] == 38.0 and kwargs['source_ref'] == 1
+
+    @patch('routes.api._send_mvp_from_treasury')
+    @patch('db.init.get_db_connection')
+    def test_payout_already_queued(self, mock_get_conn, mock_send_mvp, client):
+        """An immediate payout is refused while a queued one is outstanding."""
+        db, cursor = _mock_db()
+        mock_get_conn.return_value = (db, 'sqlite')
+        cursor.fetchone.return_value = ('COMPLETE', '0xwinner', 'TOKEN', 10.0, '$MVP', None)
+        cursor.fetchall.return_value = [
+            (7, 'bracket:1', 'MVP', '0xwinner', '38.00000000', None, 'bracket', '1', 'SUBMITTED', 3, 0, None, 0),
+        ]
+
+        resp = client.post('/api/bracket/tournament/1/payout')
+
+        assert resp.status_code == 409
+        assert json.loads(resp.data)['payouts'] == [{'id': 7, 'status': 'SUBMITTED'}]
+        mock_send_mvp.assert_not_called()
+
+    @patch('routes.api._send_mvp_from_treasury')
+    @patch('db.init.get_db_connection')
+    def test_payout_blocked_by_failed_line(self, mock_get_conn, mock_send_mvp, client):
+        """A FAILED queued line blocks a new payout until an admin resolves it."""
+        db, cursor = _mock_db()
+        mock_get_conn.return_value = (db, 'sqlite')
+        cursor.fetchone.return_value = ('COMPLETE', '0xwinner', 'TOKEN', 10.0, '$MVP', None)
+
+        with patch('bot.disbursements.payouts_for_source',
+                   return_value=[{'id': 7, 'status': 'FAILED'}]) as mock_queued:
+            resp = client.post('/api/bracket/tournament/1/payout')
+
+        assert resp.status_code == 409
+        assert json.loads(resp.data)['payouts'] == [{'id': 7, 'status': 'FAILED'}]
+        assert mock_queued.call_args.kwargs == {'include_failed': True}
+        mock_send_mvp.assert_not_called()
+
     @patch('db.init.get_db_connection')
     def test_payout_not_complete(self, mock_get_conn, client):
         """Payout on non-complete tournament should return 400."""
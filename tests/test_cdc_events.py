@@ -0,0 +1,139 @@
+"""Unit tests for the shared JSON-CDC event decoder."""
+
+import base64
+import json
+import random
+import pytest
+from unittest.mock import patch
+
+from utils.cdc_events import (
+    TOPSHOT_DEPOSIT, FT_DEPOSITED, normalize_address, payload_may_mention,
+    cdc_typed, decode_fields, iter_deposits,
+)
+
+TREASURY = '0xf853bd09d46e7db6'
+
+
+def _deposit_event(moment_id, to, event_type=TOPSHOT_DEPOSIT, tx='tx1'):
+    payload = {
+        'type': 'Event',
+        'value': {
+            'id': event_type,
+            'fields': [
+                {'value': {'value': str(moment_id), 'type': 'UInt64'}, 'name': 'id'},
+                {'value': {'value': {'value': to, 'type': 'Address'}, 'type': 'Optional'}, 'name': 'to'},
+            ],
+        },
+    }
+    return {
+        'type': event_type,
+        'transaction_id': tx,
+        'payload': base64.b64encode(json.dumps(payload).encode()).decode(),
+    }
+
+
+def _recorded_block(n_events, share_to_treasury=0.02, seed=7):
+    """A block's worth of TopShot.Deposit events, mostly to other wallets."""
+    rng = random.Random(seed)
+    events = []
+    for i in range(n_events):
+        to = TREASURY if rng.random() < share_to_treasury else '0x%016x' % rng.getrandbits(64)
+        events.append(_deposit_event(40_000_000 + i, to, tx=f'tx{i}'))
+    return events
+
+
+def _legacy_deposits(events, to_address):
+    """The decode loop previously copy-pasted across swapfest and the API routes."""
+    target = to_address.removeprefix('0x').lower()
+    out = set()
+    for ev in events:
+        if ev.get('type') != TOPSHOT_DEPOSIT:
+            continue
+        payload = json.loads(base64.b64decode(ev['payload']).decode('utf-8'))
+        ev_id = ev_to = None
+        for f in payload.get('value', {}).get('fields', []):
+            if f.get('name') == 'id':
+                ev_id = int(f['value']['value'])
+            elif f.get('name') == 'to':
+                val = f.get('value', {})
+                if val.get('type') == 'Optional' and val.get('value'):
+                    ev_to = val['value'].get('value', '').removeprefix('0x').lower()
+        if ev_id is not None and ev_to == target:
+            out.add(ev_id)
+    return out
+
+
+class TestPrefilter:
+    """The base64 prefilter must never reject a payload that mentions the address."""
+
+    def test_no_false_negatives_at_any_alignment(self):
+        rng = random.Random(1)
+        for _ in range(300):
+            address = '0x%016x' % rng.getrandbits(64)
+            raw = bytes(rng.getrandbits(7) | 0x20 for _ in range(rng.randint(0, 40)))
+            payload = base64.b64encode(raw + address.encode() + raw[:rng.randint(0, 5)]).decode()
+            assert payload_may_mention(payload, address.upper())
+
+    def test_rejects_other_addresses(self):
+        ev = _deposit_event(1, '0x0000000000000001')
+        assert not payload_may_mention(ev['payload'], TREASURY)
+        assert payload_may_mention(ev['payload'].encode(), '0x0000000000000001')
+
+
+class TestDecode:
+    """Test typed field extraction."""
+
+    def test_typed_values(self):
+        assert cdc_typed({'type': 'UInt64', 'value': '42'}) == 42
+        assert cdc_typed({'type': 'UFix64', 'value': '1.50000000'}) == 1.5
+        assert cdc_typed({'type': 'Optional', 'value': {'type': 'Address', 'value': '0xABC'}}) == '0xabc'
+        assert cdc_typed({'type': 'Optional', 'value': None}) is None
+        assert cdc_typed({'type': 'Type', 'value': {'staticType': {'typeID': 'A.1.X.NFT'}}}) == 'A.1.X.NFT'
+        assert cdc_typed({'type': 'String', 'value': 'hi'}) == 'hi'
+
+    def test_only_requested_fields(self):
+        ev = _deposit_event(99, TREASURY)
+        assert decode_fields(ev['payload'], ('id',)) == {'id': 99}
+        assert decode_fields(ev['payload']) == {'id': 99, 'to': TREASURY}
+
+    def test_iter_deposits_filters_type_address_and_garbage(self):
+        events = [
+            _deposit_event(1, TREASURY),
+            _deposit_event(2, '0x0000000000000002'),
+            _deposit_event(3, TREASURY, event_type=FT_DEPOSITED),
+            {'type': TOPSHOT_DEPOSIT, 'payload': base64.b64encode(TREASURY.encode()).decode()},
+            {'type': TOPSHOT_DEPOSIT},
+        ]
+        assert [f['id'] for _, f in iter_deposits(events, TOPSHOT_DEPOSIT, TREASURY.upper())] == [1]
+        assert [f['id'] for _, f in iter_deposits(events[:2], None, TREASURY)] == [1]
+        assert normalize_address('F853BD09D46E7DB6') == TREASURY
+
+    @patch('utils.flow_rest.requests.get')
+    def test_rest_events_use_the_same_decoder(self, mock_get):
+        from utils.flow_rest import get_events
+        ev = dict(_deposit_event(7, TREASURY.upper().replace('0X', '0x')), event_index='0', transaction_index='0')
+        mock_get.return_value.json.return_value = [{'block_height': '10', 'events': [ev]}]
+
+        [decoded] = get_events(TOPSHOT_DEPOSIT, 10, 10)
+
+        assert decoded['fields'] == {'id': 7, 'to': TREASURY}
+
+
+class TestPrefilterSavesDecodes:
+    """On a recorded-style block only payloads for the treasury are JSON-decoded."""
+
+    @pytest.mark.parametrize("n_events", [500, 5000])
+    def test_prefilter_skips_decoding_other_wallets(self, n_events, monkeypatch):
+        from utils import cdc_events
+        events = _recorded_block(n_events)
+        before = _legacy_deposits(events, TREASURY)
+
+        decodes = []
+        real_loads = cdc_events.json.loads
+        monkeypatch.setattr(cdc_events.json, 'loads', lambda data: decodes.append(1) or real_loads(data))
+        after = {f['id'] for _, f in iter_deposits(events, TOPSHOT_DEPOSIT, TREASURY)}
+        monkeypatch.undo()
+
+        assert after == before and before
+        # The legacy loop decoded all n_events payloads
+        assert len(decodes) == len(before)
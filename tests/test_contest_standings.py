@@ -0,0 +1,103 @@
+"""Unit tests for frozen FastBreak contest standings."""
+
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from utils.contest_standings import (
+    build_contest_standings, freeze_contest_standings, load_contest_standings,
+    is_fastbreak_finished,
+)
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE fastbreaks (id TEXT PRIMARY KEY, game_date TEXT, run_name TEXT, status TEXT);
+        CREATE TABLE fastbreakContests (
+            id INTEGER PRIMARY KEY, fastbreak_id TEXT, display_name TEXT,
+            lock_timestamp TEXT, buy_in_currency TEXT, buy_in_amount NUMERIC, status TEXT
+        );
+        CREATE TABLE fastbreakContestEntries (
+            id INTEGER PRIMARY KEY, contest_id INTEGER, topshotUsernamePrediction TEXT,
+            userWalletAddress TEXT, created_at TEXT
+        );
+        CREATE TABLE fastbreak_contest_standings (
+            contest_id INTEGER NOT NULL, position INTEGER NOT NULL, wallet TEXT,
+            prediction TEXT, rank INTEGER, points INTEGER, lineup TEXT,
+            created_at TEXT, frozen_at BIGINT, PRIMARY KEY (contest_id, position)
+        );
+        INSERT INTO fastbreakContests VALUES (1, 'fb1', 'C1', '0', '$MVP', 5, 'CLOSED');
+        INSERT INTO fastbreakContestEntries VALUES
+            (1, 1, 'alice', '0xAAA', '2025-01-01T00:00:00'),
+            (2, 1, 'bob', '0xBBB', '2025-01-01T00:00:01'),
+            (3, 1, 'alice', '0xCCC', '2025-01-01T00:00:02');
+    ''')
+    yield c
+    c.close()
+
+
+_STATS = {
+    'alice': {'rank': 2, 'points': 90, 'players': ['Nikola Jokić']},
+    'bob': {'rank': 1, 'points': 120, 'players': ['Jamal Murray']},
+}
+
+
+class TestBuildStandings:
+    """Test ranking of contest entries."""
+
+    @patch('utils.contest_standings.get_rank_and_lineup_for_user')
+    def test_orders_by_rank_then_entry_time(self, mock_rank):
+        mock_rank.side_effect = lambda user, fb: _STATS.get(user, {})
+        entries = [('0xA', 'alice', '2025-01-01T00:00:05'),
+                   ('0xB', 'bob', '2025-01-01T00:00:09'),
+                   ('0xC', 'alice', '2025-01-01T00:00:01'),
+                   ('0xD', 'nobody', None)]
+
+        standings = build_contest_standings(entries, 'fb1')
+
+        assert [s['wallet'] for s in standings] == ['0xb', '0xc', '0xa', '0xd']
+        assert [s['position'] for s in standings] == [1, 2, 3, 4]
+        # Each unique prediction is fetched once
+        assert mock_rank.call_count == 3
+
+
+class TestFreezeStandings:
+    """Test snapshotting and reading final standings."""
+
+    @patch('utils.contest_standings.get_rank_and_lineup_for_user')
+    def test_freeze_and_load_round_trip(self, mock_rank, conn):
+        mock_rank.side_effect = lambda user, fb: _STATS.get(user, {})
+        conn.execute("INSERT INTO fastbreaks VALUES ('fb1', '', '', 'FAST_BREAK_FINISHED')")
+
+        assert freeze_contest_standings(conn, 1) == 3
+        frozen = load_contest_standings(conn.cursor(), 1)
+
+        assert [f['prediction'] for f in frozen] == ['bob', 'alice', 'alice']
+        assert frozen[0]['lineup'] == ['Jamal Murray']
+        assert frozen[0]['position'] == 1
+
+    @patch('utils.contest_standings.get_rank_and_lineup_for_user')
+    def test_rebuild_replaces_snapshot(self, mock_rank, conn):
+        mock_rank.side_effect = lambda user, fb: _STATS.get(user, {})
+        freeze_contest_standings(conn, 1, fastbreak_finished=True)
+        freeze_contest_standings(conn, 1, fastbreak_finished=True)
+        assert conn.execute("SELECT COUNT(*) FROM fastbreak_contest_standings").fetchone()[0] == 3
+
+    @patch('utils.contest_standings.extract_fastbreak_runs', return_value=[
+        {'fastBreaks': [{'id': 'fb1', 'status': 'FAST_BREAK_LIVE'}]}])
+    def test_refuses_unfinished_fastbreak(self, mock_runs, conn):
+        with pytest.raises(ValueError):
+            freeze_contest_standings(conn, 1)
+        assert load_contest_standings(conn.cursor(), 1) is None
+
+    @patch('utils.contest_standings.extract_fastbreak_runs')
+    def test_local_only_check_skips_upstream(self, mock_runs, conn):
+        conn.execute("INSERT INTO fastbreaks VALUES ('fb1', '', '', 'FAST_BREAK_LIVE')")
+
+        assert is_fastbreak_finished(conn.cursor(), 'fb1', remote=False) is False
+        mock_runs.assert_not_called()
+
+        conn.execute("UPDATE fastbreaks SET status = 'FAST_BREAK_FINISHED'")
+        assert is_fastbreak_finished(conn.cursor(), 'fb1', remote=False) is True
@@ -4,6 +4,7 @@ import pytest
 import sqlite3
 from unittest.mock import Mock, patch, MagicMock
 from db.init import get_db_connection, initialize_database
+from db.instrumented import sqlite_connect_kwargs, postgres_connect_kwargs
 
 
 class TestDatabaseConnection:
@@ -19,7 +20,7 @@ class TestDatabaseConnection:
         conn, db_type = get_db_connection()
         
         assert db_type == 'sqlite'
-        mock_connect.assert_called_once_with('local.db', check_same_thread=False)
+        mock_connect.assert_called_once_with('local.db', check_same_thread=False, **sqlite_connect_kwargs())
 
     @patch('db.init.DATABASE_URL', 'postgresql://test')
     @patch('db.init.psycopg2.connect')
@@ -31,7 +32,7 @@ class TestDatabaseConnection:
         conn, db_type = get_db_connection()
         
         assert db_type == 'postgresql'
-        mock_connect.assert_called_once_with('postgresql://test', sslmode='require')
+        mock_connect.assert_called_once_with('postgresql://test', sslmode='require', **postgres_connect_kwargs())
 
 
 class TestDatabaseInitialization:
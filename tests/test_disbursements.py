@@ -0,0 +1,299 @@
+"""Unit tests for batched multi-recipient treasury disbursements."""
+
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch
+
+from bot import disbursements
+from bot.disbursements import (
+    enqueue_payout, enqueue_moment_payouts, plan_batches, claim_batch, submit_batch,
+    reconcile_open_batches, disburse_pending, payouts_for_source, build_batch_transaction,
+    format_amount, MVP, MOMENTS, PENDING, BUILDING, SUBMITTED, SEALED, FAILED,
+)
+from utils.cdc_events import FT_DEPOSITED, TOPSHOT_DEPOSIT
+
+MVP_VAULT = 'A.6fd2465f3a22e34c.PetJokicsHorses.Vault'
+TX = 'ef' * 32
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE payout_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, status TEXT NOT NULL,
+            tx_id TEXT, proposal_seq BIGINT, line_count INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT, created_at BIGINT NOT NULL, submitted_at BIGINT, sealed_at BIGINT
+        );
+        CREATE TABLE payouts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL, recipient TEXT NOT NULL, amount TEXT, moment_ids TEXT,
+            source TEXT, source_ref TEXT, status TEXT NOT NULL, batch_id INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0, error_message TEXT,
+            created_at BIGINT NOT NULL, updated_at BIGINT NOT NULL, solo INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE bracket_tournaments (id INTEGER PRIMARY KEY, payout_tx_id TEXT);
+        INSERT INTO bracket_tournaments (id) VALUES (5);
+    ''')
+    yield c
+    c.close()
+
+
+@pytest.fixture(autouse=True)
+def disburse_key(monkeypatch):
+    monkeypatch.setattr(disbursements, 'DISBURSE_KEY_INDEX', '2')
+
+
+def _line(id_, moments=0):
+    return {'id': id_, 'moment_ids': list(range(moments))}
+
+
+def _statuses(conn):
+    return dict(conn.execute('SELECT idempotency_key, status FROM payouts').fetchall())
+
+
+def _sealed(events, error=None):
+    return {'tx_id': TX, 'status': FAILED if error else SEALED, 'error_message': error,
+            'events': [{'type': t, 'event_index': i, 'fields': f} for i, (t, f) in enumerate(events)]}
+
+
+def _ft(to, amount):
+    return FT_DEPOSITED, {'type': MVP_VAULT, 'amount': amount, 'to': to}
+
+
+def _submitted_batch(conn, seq=41):
+    """Claim the MVP queue and pretend it was sent as TX with proposal ``seq``."""
+    batch_id, lines = claim_batch(conn, 'sqlite', MVP, now=1000)
+    conn.execute('UPDATE payout_batches SET status = ?, tx_id = ?, proposal_seq = ?, submitted_at = 1000 '
+                 'WHERE id = ?', (SUBMITTED, TX, seq, batch_id))
+    conn.commit()
+    return batch_id, lines
+
+
+class TestQueue:
+    """Lines are keyed for idempotency; moments are split to the per-tx cap."""
+
+    def test_enqueue_is_idempotent(self, conn):
+        cur = conn.cursor()
+        first = enqueue_payout(cur, 'sqlite', 'prize:1', '0xABC', amount=12.345678912)
+        again = enqueue_payout(cur, 'sqlite', 'prize:1', '0xabc', amount=99)
+
+        assert again == first
+        assert first['amount'] == '12.34567891' and first['recipient'] == '0xabc'
+        assert conn.execute('SELECT COUNT(*) FROM payouts').fetchone()[0] == 1
+
+    def test_moments_are_chunked(self, conn):
+        with patch.object(disbursements, 'DISBURSE_MAX_MOMENTS', 2):
+            lines = enqueue_moment_payouts(conn.cursor(), 'sqlite', 'bracket:5', '0xd', [1, 2, 3],
+                                           source='bracket', source_ref=5)
+
+        assert [(l['idempotency_key'], l['moment_ids']) for l in lines] == [
+            ('bracket:5:1', [1, 2]), ('bracket:5:2', [3]),
+        ]
+        assert len(payouts_for_source(conn.cursor(), 'bracket', 5)) == 2
+
+    def test_rejects_bad_lines(self, conn):
+        with pytest.raises(ValueError):
+            format_amount(0)
+        with pytest.raises(ValueError):
+            enqueue_payout(conn.cursor(), 'sqlite', 'k', '0xa', amount=1, moment_ids=[1])
+
+
+class TestPlanBatches:
+    """Batches respect both the recipient and the moment limits."""
+
+    def test_recipient_limit(self):
+        batches = plan_batches([_line(i) for i in range(7)], max_recipients=3, max_moments=10)
+        assert [len(b) for b in batches] == [3, 3, 1]
+
+    def test_moment_limit(self):
+        lines = [_line(1, 60), _line(2, 50), _line(3, 20), _line(4, 120)]
+        batches = plan_batches(lines, max_recipients=10, max_moments=120)
+        assert [[l['id'] for l in b] for b in batches] == [[1, 2], [3], [4]]
+
+    def test_batch_transaction_arguments(self):
+        lines = [{'recipient': '0x0000000000000001', 'amount': '1.50000000', 'moment_ids': []}]
+        cadence, (recipients, amounts) = build_batch_transaction(MVP, lines)
+        assert 'recipients: [Address], amounts: [UFix64]' in cadence
+        assert amounts.value[0].value == 150_000_000
+
+
+class TestSettlement:
+    """A line is only SEALED when its deposit is in the sealed transaction."""
+
+    @patch('bot.tx_verifier.fetch_verification')
+    def test_sealed_batch_settles_delivered_lines(self, mock_fetch, conn):
+        cur = conn.cursor()
+        enqueue_payout(cur, 'sqlite', 'a', '0xa', amount=1.5, source='bracket', source_ref=5)
+        enqueue_payout(cur, 'sqlite', 'b', '0xb', amount=2)
+        conn.commit()
+        _submitted_batch(conn)
+
+        # 0xb has no receiver: the transaction skipped it
+        mock_fetch.return_value = (_sealed([_ft('0xa', 1.5)]), 'SEALED')
+        reconcile_open_batches(conn, now=1010)
+
+        assert _statuses(conn) == {'a': SEALED, 'b': PENDING}
+        assert conn.execute('SELECT payout_tx_id FROM bracket_tournaments').fetchone()[0] == TX
+        assert conn.execute('SELECT status FROM payout_batches').fetchone()[0] == SEALED
+
+    @patch('bot.tx_verifier.fetch_verification')
+    def test_failed_batch_retries_then_gives_up(self, mock_fetch, conn):
+        enqueue_payout(conn.cursor(), 'sqlite', 'a', '0xa', amount=1)
+        conn.commit()
+        mock_fetch.return_value = (_sealed([], error='panic'), 'SEALED')
+
+        for _ in range(disbursements.MAX_PAYOUT_ATTEMPTS):
+            _submitted_batch(conn)
+            reconcile_open_batches(conn, now=1010)
+
+        assert _statuses(conn) == {'a': FAILED}
+        assert claim_batch(conn, 'sqlite', MVP) is None
+
+    @patch('bot.tx_verifier.fetch_verification')
+    def test_failed_batch_lines_are_retried_alone(self, mock_fetch, conn):
+        cur = conn.cursor()
+        enqueue_payout(cur, 'sqlite', 'a', '0xa', amount=1)
+        enqueue_payout(cur, 'sqlite', 'b', '0xb', amount=2)
+        conn.commit()
+        mock_fetch.return_value = (_sealed([], error='panic'), 'SEALED')
+
+        _submitted_batch(conn)
+        reconcile_open_batches(conn, now=1010)
+
+        # The batch failure is not counted against either line
+        rows = conn.execute('SELECT idempotency_key, status, attempts, solo FROM payouts').fetchall()
+        assert rows == [('a', PENDING, 0, 1), ('b', PENDING, 0, 1)]
+        assert len(disburse_pending(conn, 'sqlite', dry_run=True)) == 2
+
+        _, lines = _submitted_batch(conn)
+        assert [line['idempotency_key'] for line in lines] == ['a']
+        reconcile_open_batches(conn, now=1010)
+        attempts = dict(conn.execute('SELECT idempotency_key, attempts FROM payouts').fetchall())
+        assert attempts == {'a': 1, 'b': 0}
+
+    @patch('bot.tx_verifier.fetch_verification')
+    def test_moment_lines_need_every_id(self, mock_fetch, conn):
+        cur = conn.cursor()
+        enqueue_payout(cur, 'sqlite', 'm1', '0xd1', moment_ids=[1, 2])
+        enqueue_payout(cur, 'sqlite', 'm2', '0xd2', moment_ids=[3])
+        conn.commit()
+        batch_id, _ = claim_batch(conn, 'sqlite', MOMENTS, now=1000)
+        conn.execute('UPDATE payout_batches SET status = ?, tx_id = ? WHERE id = ?', (SUBMITTED, TX, batch_id))
+
+        mock_fetch.return_value = (_sealed([
+            (TOPSHOT_DEPOSIT, {'id': 1, 'to': '0xd1'}),
+            (TOPSHOT_DEPOSIT, {'id': 2, 'to': '0xd1'}),
+            (TOPSHOT_DEPOSIT, {'id': 3, 'to': '0xother'}),
+        ]), 'SEALED')
+        reconcile_open_batches(conn, now=1010)
+
+        assert _statuses(conn) == {'m1': SEALED, 'm2': PENDING}
+
+
+class TestInterruptedSends:
+    """The recorded proposal sequence number decides whether a lost batch may be retried."""
+
+    def test_send_error_before_signing_requeues(self, conn):
+        enqueue_payout(conn.cursor(), 'sqlite', 'a', '0x0000000000000001', amount=1)
+        conn.commit()
+        batch_id, lines = claim_batch(conn, 'sqlite', MVP, now=1000)
+
+        with patch('bot.disbursements._send_transaction', side_effect=ConnectionError('down')):
+            assert submit_batch(conn, batch_id, MVP, lines) is None
+        assert conn.execute('SELECT status FROM payout_batches').fetchone()[0] == BUILDING
+
+        reconcile_open_batches(conn, now=1001)
+        assert _statuses(conn) == {'a': PENDING}
+
+    @pytest.mark.parametrize('tx_id, chain_seq, expected', [
+        (None, 41, PENDING),        # never reached the chain
+        (None, 42, FAILED),         # sequence used by an unknown tx: manual check
+        (TX, 41, PENDING),          # acknowledged but never executed (expired)
+        (TX, 42, SUBMITTED),        # executed: keep waiting for its result
+    ])
+    @patch('bot.tx_verifier.fetch_verification', return_value=(None, 'UNAVAILABLE'))
+    def test_lost_transaction_uses_sequence_number(self, mock_fetch, tx_id, chain_seq, expected, conn):
+        enqueue_payout(conn.cursor(), 'sqlite', 'a', '0xa', amount=1)
+        conn.commit()
+        batch_id, _ = _submitted_batch(conn, seq=41)
+        if tx_id is None:
+            conn.execute('UPDATE payout_batches SET status = ?, tx_id = NULL, submitted_at = NULL '
+                         'WHERE id = ?', (BUILDING, batch_id))
+
+        with patch('bot.disbursements.get_key_sequence', return_value=chain_seq) as mock_seq:
+            reconcile_open_batches(conn, now=1010)                  # too early to judge
+            assert _statuses(conn) == {'a': SUBMITTED}
+            mock_seq.assert_not_called()
+
+            reconcile_open_batches(conn, now=1000 + disbursements.STALE_BATCH_SECONDS)
+        assert _statuses(conn) == {'a': expected}
+
+
+class TestDisbursePending:
+    """End to end: one transaction per planned batch."""
+
+    def test_sends_one_transaction_per_batch(self, conn):
+        cur = conn.cursor()
+        for i in range(5):
+            enqueue_payout(cur, 'sqlite', f'k{i}', f'0x{i:016x}', amount=1)
+        conn.commit()
+
+        sent = []
+
+        async def fake_send(cadence, arguments, on_sequence):
+            on_sequence(len(sent))
+            sent.append(len(arguments[0].value))
+            return f'tx{len(sent)}'
+
+        with patch.object(disbursements, 'DISBURSE_MAX_RECIPIENTS', 2), \
+             patch.object(disbursements, 'FLOW_SWAP_PRIVATE_KEY', 'key'), \
+             patch('bot.disbursements._send_transaction', side_effect=fake_send):
+            assert len(disburse_pending(conn, 'sqlite', dry_run=True)) == 3
+            results = disburse_pending(conn, 'sqlite', kinds=(MVP,))
+
+        assert sent == [2, 2, 1]
+        assert [r['tx_id'] for r in results] == ['tx1', 'tx2', 'tx3']
+        assert set(_statuses(conn).values()) == {SUBMITTED}
+
+
+class TestDisburseKey:
+    """Batches need their own proposal key; there is no fallback to the swap key."""
+
+    @pytest.mark.parametrize('key_index, error', [
+        ('', 'not configured'),
+        ('1', 'must differ'),
+    ])
+    def test_refuses_missing_or_shared_key(self, key_index, error, conn):
+        enqueue_payout(conn.cursor(), 'sqlite', 'a', '0xa', amount=1)
+        conn.commit()
+
+        with patch.object(disbursements, 'FLOW_SWAP_PRIVATE_KEY', 'key'), \
+             patch.object(disbursements, 'FLOW_SWAP_KEY_INDEX', 1), \
+             patch.object(disbursements, 'DISBURSE_KEY_INDEX', key_index), \
+             patch('bot.disbursements._send_transaction') as mock_send:
+            with pytest.raises(RuntimeError, match=error):
+                disburse_pending(conn, 'sqlite')
+
+        mock_send.assert_not_called()
+        assert _statuses(conn) == {'a': PENDING}
+
+
+class TestDisburseCommand:
+    """/disburse runs on its own connection, not a pooled bot-DB transaction."""
+
+    def test_uses_and_closes_a_dedicated_connection(self, conn):
+        from bot import disbursement_commands
+
+        enqueue_payout(conn.cursor(), 'sqlite', 'a', '0xa', amount=1)
+        conn.commit()
+        closed = []
+        dedicated = Mock(wraps=conn)
+        dedicated.close.side_effect = lambda: closed.append(True)
+
+        with patch('bot.disbursement_commands.get_db_connection', return_value=(dedicated, 'sqlite')):
+            results, summary = disbursement_commands._disburse(True)
+
+        assert results == [{'kind': MVP, 'lines': 1, 'batch_id': None, 'tx_id': None}]
+        assert summary[MVP][PENDING][0] == 1
+        assert closed == [True]
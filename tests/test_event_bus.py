@@ -0,0 +1,145 @@
+"""Unit tests for the chain-event ingestion bus."""
+
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch
+
+from bot import event_bus
+from bot.event_bus import (
+    register_consumer, ingest_range, dispatch, load_transaction_events, event_bus_tick,
+)
+
+DEPOSIT = 'A.0b2a3299cc857e29.TopShot.Deposit'
+WITHDRAW = 'A.0b2a3299cc857e29.TopShot.Withdraw'
+TREASURY = '0xf853bd09d46e7db6'
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE chain_events (
+            block_height BIGINT NOT NULL, block_timestamp TEXT, transaction_id TEXT NOT NULL,
+            transaction_index INTEGER NOT NULL, event_index INTEGER NOT NULL,
+            event_type TEXT NOT NULL, fields TEXT NOT NULL,
+            PRIMARY KEY (transaction_id, event_index)
+        );
+    ''')
+    yield c
+    c.close()
+
+
+@pytest.fixture(autouse=True)
+def no_consumers(monkeypatch):
+    monkeypatch.setattr(event_bus, '_consumers', {})
+
+
+def _ev(event_type, height, tx, index, **fields):
+    return {'type': event_type, 'block_height': height, 'block_timestamp': '2025-12-10T00:00:00Z',
+            'transaction_id': tx, 'transaction_index': 0, 'event_index': index, 'fields': fields}
+
+
+CHAIN = {
+    WITHDRAW: [_ev(WITHDRAW, 101, 'gift', 0, id='7', **{'from': '0xfan'}),
+               _ev(WITHDRAW, 102, 'noise', 0, id='8', **{'from': '0xa'})],
+    DEPOSIT: [_ev(DEPOSIT, 101, 'gift', 1, id='7', to=TREASURY),
+              _ev(DEPOSIT, 102, 'noise', 1, id='8', to='0xb')],
+}
+
+
+def _to_treasury(ev):
+    return ev['fields'].get('to') == TREASURY
+
+
+class TestIngest:
+    """Events are fetched once per type and only relevant transactions are logged."""
+
+    @patch('bot.event_bus.get_events')
+    def test_logs_relevant_transactions_once(self, mock_get, conn):
+        mock_get.side_effect = lambda t, s, e: CHAIN[t]
+        register_consumer('a', (DEPOSIT, WITHDRAW), lambda *a: None, accept=_to_treasury)
+        register_consumer('b', (DEPOSIT,), lambda *a: None, accept=_to_treasury)
+
+        assert ingest_range(conn, 'sqlite', 100, 110) == 2
+        assert sorted(c.args[0] for c in mock_get.call_args_list) == [DEPOSIT, WITHDRAW]
+        # The Withdraw rides along because it shares the gift transaction
+        assert [e['type'] for e in load_transaction_events(conn.cursor(), 'gift')] == [WITHDRAW, DEPOSIT]
+        assert load_transaction_events(conn.cursor(), 'noise') == []
+        assert conn.execute("SELECT value FROM scraper_state WHERE key = 'event_bus_block'").fetchone() == ('110',)
+
+        ingest_range(conn, 'sqlite', 100, 110)  # replay is harmless
+        assert conn.execute("SELECT COUNT(*) FROM chain_events").fetchone()[0] == 2
+
+
+class TestDispatch:
+    """Each consumer has its own checkpoint."""
+
+    @patch('bot.event_bus.get_events')
+    def test_independent_checkpoints(self, mock_get, conn):
+        mock_get.side_effect = lambda t, s, e: CHAIN[t]
+        seen = {}
+
+        def _ok(conn, db_type, events, start, end):
+            seen['ok'] = ([e['type'] for e in events], start, end)
+
+        def _boom(conn, db_type, events, start, end):
+            conn.execute("INSERT INTO scraper_state VALUES ('partial', '1')")
+            raise RuntimeError('down')
+
+        register_consumer('ok', (DEPOSIT, WITHDRAW), _ok, accept=_to_treasury)
+        register_consumer('boom', (DEPOSIT,), _boom, accept=_to_treasury, checkpoint_key='boom_block')
+        conn.executemany("INSERT INTO scraper_state VALUES (?, ?)",
+                         [('event_bus:ok', '99'), ('boom_block', '99')])
+        ingest_range(conn, 'sqlite', 100, 110)
+        register_consumer('late', (DEPOSIT,), _ok)
+
+        delivered = dispatch(conn, 'sqlite', 110)
+
+        assert delivered == {'ok': 2}
+        assert seen['ok'] == ([WITHDRAW, DEPOSIT], 100, 110)
+        state = dict(conn.execute("SELECT key, value FROM scraper_state").fetchall())
+        assert state['event_bus:ok'] == '110'
+        assert state['boom_block'] == '99'          # rolled back, retried next tick
+        assert 'partial' not in state
+        assert state['event_bus:late'] == '110'     # new consumers start from now
+
+
+    @patch('bot.event_bus.get_events')
+    def test_reenabled_consumer_is_backfilled(self, mock_get, conn):
+        mock_get.side_effect = lambda t, s, e: [ev for ev in CHAIN[t] if s <= ev['block_height'] <= e]
+        seen = []
+        conn.execute("INSERT INTO scraper_state VALUES ('event_bus:a', '99')")
+        # Blocks 100-110 were ingested while 'a' was disabled: none of its events were logged
+        ingest_range(conn, 'sqlite', 100, 110, {'other': {
+            'event_types': (DEPOSIT,), 'handler': None, 'accept': lambda ev: False}})
+        register_consumer('a', (DEPOSIT, WITHDRAW), lambda c, d, ev, s, e: seen.append(
+            ([x['transaction_id'] for x in ev], s, e)), accept=_to_treasury)
+        ingest_range(conn, 'sqlite', 111, 120)
+        assert conn.execute("SELECT COUNT(*) FROM chain_events").fetchone()[0] == 0
+
+        assert dispatch(conn, 'sqlite', 120) == {'a': 2}
+        assert dispatch(conn, 'sqlite', 120) == {'a': 0}
+
+        assert seen == [(['gift', 'gift'], 100, 110), ([], 111, 120)]
+        assert conn.execute("SELECT value FROM scraper_state WHERE key = 'event_bus:a'").fetchone() == ('120',)
+
+
+class TestTick:
+    """The bus starts from the oldest consumer checkpoint."""
+
+    @patch('bot.event_bus.get_sealed_height', return_value=1000)
+    @patch('bot.event_bus.get_events', return_value=[])
+    @patch('bot.event_bus.get_db_connection')
+    def test_resumes_from_consumer_checkpoint(self, mock_conn, mock_get, mock_sealed, conn):
+        conn.execute("INSERT INTO scraper_state VALUES ('treasury_index_block', '900')")
+        wrapper = Mock(wraps=conn)
+        mock_conn.return_value = (wrapper, 'sqlite')
+        handled = []
+        register_consumer('treasury', (DEPOSIT,), lambda c, d, ev, s, e: handled.append((s, e)),
+                          checkpoint_key='treasury_index_block')
+
+        event_bus_tick()
+
+        mock_get.assert_called_once_with(DEPOSIT, 901, 1000)
+        assert handled == [(901, 1000)]
@@ -0,0 +1,159 @@
+"""Unit tests for the pipelined, resumable EVM → Cadence migration mode."""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+
+import evm_topshot_migrate as mig
+from evm_topshot_migrate import (
+    MigrationState, AdaptiveBatchSizer, WorkQueue, settle_batch, estimate_throughput,
+)
+
+
+@pytest.fixture
+def state(tmp_path):
+    s = MigrationState(str(tmp_path / 'state.json'))
+    s.set_tokens(range(1, 11))
+    return s
+
+
+def _sealed(computation=None, error=''):
+    return {'status': 'Sealed', 'error_message': error, 'computation_used': computation}
+
+
+class FakeClient:
+    """Access node stand-in: counts sequence numbers per key, returns tx ids."""
+
+    def __init__(self):
+        self.sent = []
+        self.seqs = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_latest_block(self):
+        return Mock(id=b'block')
+
+    async def get_account(self, address):
+        return Mock(keys={k: Mock(sequence_number=v) for k, v in self.seqs.items()} | {
+            k: Mock(sequence_number=0) for k in (1, 2, 3) if k not in self.seqs
+        })
+
+    async def send_transaction(self, transaction):
+        ids, key = transaction
+        self.seqs[key] = self.seqs.get(key, 0) + 1
+        self.sent.append((key, ids))
+        return Mock(id=bytes([len(self.sent)]) * 32)
+
+
+class TestMigrationState:
+    """The checkpoint file drives what a re-run still has to bridge."""
+
+    def test_round_trip_and_remaining(self, state):
+        state.submitted('tx1', [1, 2], key_index=1)
+        state.sealed('tx1', computation=900)
+        state.submitted('tx2', [3], key_index=2)
+        state.give_up(4, 'boom')
+
+        reloaded = MigrationState.load(state.path)
+        assert reloaded.completed == {'1': 'tx1', '2': 'tx1'}
+        assert reloaded.remaining() == [5, 6, 7, 8, 9, 10]
+        assert reloaded.computation_per_token() == 450
+        assert list(reloaded.in_flight) == ['tx2']
+
+
+class TestAdaptiveBatchSizer:
+    """Sizes track computation per token and back off on gas-limit errors."""
+
+    def test_grows_towards_gas_target_at_most_2x(self):
+        sizer = AdaptiveBatchSizer(2, 50, gas_limit=10_000, utilization=0.7)
+        sizer.record_success(2, computation=200)        # 100 per token → fits 70
+        assert sizer.size == 4
+        sizer.record_success(4, computation=400)
+        assert sizer.size == 8
+
+    def test_shrinks_for_expensive_tokens_and_gas_failures(self):
+        sizer = AdaptiveBatchSizer(10, 50, gas_limit=10_000, utilization=0.7)
+        sizer.record_success(10, computation=20_000)    # 2000 per token → fits 3
+        assert sizer.size == 3
+        sizer.record_gas_failure(3)
+        assert sizer.size == 1
+
+    def test_starts_from_learned_cost(self):
+        assert AdaptiveBatchSizer(2, 50, gas_limit=10_000, utilization=0.7, per_token=700).size == 10
+
+
+class TestSettleBatch:
+    """Failed batches are split; a token failing alone is eventually given up."""
+
+    def test_failed_batch_isolates_then_gives_up(self, state):
+        queue, sizer = WorkQueue([]), AdaptiveBatchSizer(5, 5)
+        state.submitted('tx1', [1, 2], key_index=1)
+        settle_batch(state, queue, sizer, 'tx1', _sealed(error='unwrap failed'))
+        assert queue.take(5) == [1] and queue.take(5) == [2]
+
+        for attempt in range(mig.MAX_TOKEN_ATTEMPTS):
+            state.submitted(f'solo{attempt}', [1], key_index=1)
+            settle_batch(state, queue, sizer, f'solo{attempt}', _sealed(error='unwrap failed'))
+            if attempt < mig.MAX_TOKEN_ATTEMPTS - 1:
+                assert queue.take(5) == [1]
+        assert state.failed == {'1': 'unwrap failed'}
+
+    def test_gas_limit_requeues_whole_batch(self, state):
+        queue, sizer = WorkQueue([9]), AdaptiveBatchSizer(4, 4)
+        state.submitted('tx1', [1, 2, 3, 4], key_index=1)
+        settle_batch(state, queue, sizer, 'tx1', _sealed(error='[Error Code: 1110] computation exceeds limit (9999)'))
+        assert sizer.size == 2
+        assert queue.take(10) == [1, 2, 3, 4, 9]
+
+    def test_gas_limit_on_one_token_counts_as_solo_failure(self, state):
+        queue, sizer = WorkQueue([]), AdaptiveBatchSizer(1, 4)
+        error = '[Error Code: 1110] computation exceeds limit (9999)'
+        for attempt in range(mig.MAX_TOKEN_ATTEMPTS):
+            state.submitted(f'tx{attempt}', [7], key_index=1)
+            settle_batch(state, queue, sizer, f'tx{attempt}', _sealed(error=error))
+            if attempt < mig.MAX_TOKEN_ATTEMPTS - 1:
+                assert queue.take(4) == [7]
+        assert not queue
+        assert state.failed == {'7': error}
+
+
+class TestMigrate:
+    """Every key keeps a batch in flight; a re-run resumes from the checkpoint."""
+
+    def test_pipelines_across_keys_and_resumes(self, state):
+        client = FakeClient()
+        state.submitted('old', [1, 2], key_index=1)     # in flight when the last run stopped
+        results = {'old': _sealed(computation=200)}
+
+        async def fake_wait(tx_id, timeout=None):
+            await asyncio.sleep(0)          # let the other lanes submit
+            return results.get(tx_id, _sealed(computation=100))
+
+        with patch('flow_py_sdk.flow_client', return_value=client), \
+             patch.object(mig, 'build_bridge_tx', side_effect=lambda ids, child, block, key, seq:
+                          Mock(to_signed_grpc=Mock(return_value=(ids, key)))), \
+             patch.object(mig, 'wait_for_result', side_effect=fake_wait):
+            sizer = AdaptiveBatchSizer(2, 2)
+            asyncio.run(mig.migrate(state, '0xchild', [1, 2, 3], sizer))
+
+        assert {key for key, _ in client.sent} == {1, 2, 3}
+        assert sorted(int(t) for t in state.completed) == list(range(1, 11))
+        assert state.completed['1'] == 'old'
+        assert sorted(t for _, ids in client.sent for t in ids) == list(range(3, 11))
+
+        # Nothing left: a re-run sends nothing
+        reloaded = MigrationState.load(state.path)
+        assert reloaded.remaining() == []
+
+
+class TestEstimate:
+    def test_parallel_keys_divide_wall_time(self):
+        est = estimate_throughput(100, [1, 2, 3, 4], batch_size=5, seal_seconds=10)
+        assert est['batches'] == 20
+        assert est['seconds'] == 50
+        assert est['sequential_seconds'] == 240
+        assert est['tokens_per_minute'] == 120
@@ -0,0 +1,66 @@
+"""Unit tests for the shared Flow access-node client."""
+
+from unittest.mock import patch
+from flow_py_sdk.cadence import Address, Dictionary, KeyValuePair, String
+from utils import flow_access
+from utils.flow_access import get_linked_accounts_bulk, _decode_linked_accounts
+
+
+def _links_value(mapping):
+    """Build the Cadence ``{Address: {String: Address}}`` the script returns."""
+    return Dictionary([
+        KeyValuePair(
+            Address.from_hex(addr),
+            Dictionary([KeyValuePair(String(k), Address.from_hex(v)) for k, v in links.items()]),
+        )
+        for addr, links in mapping.items()
+    ])
+
+
+class TestDecodeLinkedAccounts:
+    """Test decoding of the batched HybridCustody script result."""
+
+    def test_decodes_child_and_parent(self):
+        value = _links_value({
+            '0x0000000000000001': {'child': '0x00000000000000c1'},
+            '0x0000000000000002': {'parent': '0x00000000000000a2'},
+        })
+        assert _decode_linked_accounts(value) == {
+            '0x0000000000000001': {'child': '0x00000000000000c1'},
+            '0x0000000000000002': {'parent': '0x00000000000000a2'},
+        }
+
+
+class TestLinkedAccountsBulk:
+    """Test chunking and failure handling of bulk resolution."""
+
+    @patch('utils.flow_access.execute_script')
+    def test_chunks_addresses(self, mock_exec):
+        """Addresses are split into LINKED_ACCOUNTS_CHUNK-sized scripts."""
+        mock_exec.return_value = _links_value({})
+        addrs = [f'0x{i:016x}' for i in range(flow_access.LINKED_ACCOUNTS_CHUNK + 5)]
+
+        result = get_linked_accounts_bulk(addrs)
+
+        assert mock_exec.call_count == 2
+        assert len(result) == len(addrs)
+        assert all(v == {'child': '', 'parent': ''} for v in result.values())
+
+    @patch('utils.flow_access.execute_script')
+    def test_normalizes_and_dedupes(self, mock_exec):
+        """Mixed-case / unprefixed duplicates collapse to one lookup."""
+        mock_exec.return_value = _links_value({
+            '0x00000000000000aa': {'child': '0x00000000000000c1', 'parent': '0x00000000000000b1'},
+        })
+
+        result = get_linked_accounts_bulk(['0x00000000000000AA', '00000000000000aa'])
+
+        assert result == {'0x00000000000000aa': {'child': '0x00000000000000c1', 'parent': '0x00000000000000b1'}}
+        script = mock_exec.call_args[0][0]
+        assert len(script.arguments[0].value) == 1
+
+    @patch('utils.flow_access.execute_script', side_effect=TimeoutError('slow'))
+    def test_failed_chunk_left_empty(self, mock_exec):
+        """A failing script leaves its addresses unresolved instead of raising."""
+        result = get_linked_accounts_bulk(['0x0000000000000001'])
+        assert result == {'0x0000000000000001': {'child': '', 'parent': ''}}
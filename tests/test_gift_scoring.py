@@ -0,0 +1,124 @@
+"""Unit tests for data-driven gift scoring rules."""
+
+import itertools
+import sqlite3
+import pytest
+
+from utils.gift_scoring import (
+    DEFAULT_SCORING_RULES, JOKIC, load_scoring_rules, seed_default_scoring_rules,
+    score_moment, score_metadata, moment_metadata_row, save_moment_metadata, rescore_gifts,
+)
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''CREATE TABLE gift_scoring_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, set_flow_id INTEGER, tier TEXT,
+        player_name TEXT, points INTEGER NOT NULL, note TEXT)''')
+    conn.execute('''CREATE TABLE moment_metadata (
+        moment_id BIGINT PRIMARY KEY, player_name TEXT, tier TEXT, set_name TEXT,
+        series_number INTEGER, image_url TEXT, team_name TEXT, nba_season TEXT,
+        play_category TEXT, cached_at BIGINT, set_flow_id INTEGER)''')
+    conn.execute('''CREATE TABLE gifts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, txn_id TEXT UNIQUE, moment_id BIGINT,
+        from_address TEXT, points BIGINT, timestamp TEXT)''')
+    seed_default_scoring_rules(conn.cursor())
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _gql(flow_id, tier="MOMENT_TIER_COMMON", player=JOKIC):
+    return {"id": "1", "tier": tier, "set": {"flowId": flow_id, "flowName": "Set"},
+            "play": {"stats": {"playerName": player}}}
+
+
+class TestRuleLookup:
+    """Test the in-memory rule lookup."""
+
+    def test_seed_is_idempotent(self, db):
+        assert seed_default_scoring_rules(db.cursor()) == 0
+        assert len(load_scoring_rules(db.cursor())) == len(DEFAULT_SCORING_RULES)
+
+    def test_default_rules_match_previous_scoring(self, db):
+        rules = load_scoring_rules(db.cursor())
+        assert score_metadata(rules, _gql(2, player="Jamal Murray")) == 250
+        assert score_metadata(rules, _gql(2)) == 250
+        assert score_metadata(rules, _gql(10, player="Jamal Murray")) == 0
+        assert score_metadata(rules, _gql(227, tier="MOMENT_TIER_LEGENDARY")) == 150
+        assert score_metadata(rules, _gql(218)) == 3
+        assert score_metadata(rules, _gql(10, tier="MOMENT_TIER_RARE")) == 50
+        assert score_metadata(rules, _gql(10, tier="MOMENT_TIER_ULTIMATE")) == 1000
+        assert score_metadata(rules, {"set": None, "play": None}) == 0
+
+    def test_most_specific_rule_wins(self):
+        rules = {
+            (None, None, "A"): 1,
+            (None, "RARE", None): 2,
+            (7, None, None): 3,
+            (7, "RARE", "A"): 4,
+        }
+        assert score_moment(rules, 7, "RARE", "A") == 4
+        assert score_moment(rules, 7, "COMMON", "A") == 3    # set beats player
+        assert score_moment(rules, 8, "RARE", "A") == 1      # player beats tier
+        assert score_moment(rules, 8, "MOMENT_TIER_RARE", "B") == 2
+        assert score_moment(rules, 8, "COMMON", "B") == 0
+
+    def test_newest_duplicate_wins(self, db):
+        db.execute("INSERT INTO gift_scoring_rules (set_flow_id, tier, player_name, points) VALUES (218, NULL, ?, 9)", (JOKIC,))
+        assert score_moment(load_scoring_rules(db.cursor()), 218, "COMMON", JOKIC) == 9
+
+
+class TestSetBasedRescore:
+    """The SQL rescoring must agree with the in-memory lookup."""
+
+    def test_sql_matches_lookup(self, db):
+        db.execute("INSERT INTO gift_scoring_rules (set_flow_id, tier, player_name, points) VALUES (7, 'RARE', 'B', 42)")
+        db.execute("INSERT INTO gift_scoring_rules (set_flow_id, tier, player_name, points) VALUES (NULL, 'RARE', NULL, 5)")
+        cur = db.cursor()
+        combos = list(itertools.product(
+            [2, 7, 218, 227, 10], ["COMMON", "RARE", "LEGENDARY", "FANDOM"], [JOKIC, "B"]))
+        save_moment_metadata(cur, [
+            moment_metadata_row(i, _gql(s, f"MOMENT_TIER_{t}", p)) for i, (s, t, p) in enumerate(combos)
+        ])
+        db.executemany("INSERT INTO gifts (txn_id, moment_id, points, timestamp) VALUES (?, ?, 0, '2025-12-10')",
+                       [(f"t{i}", i) for i in range(len(combos))])
+
+        assert rescore_gifts(cur) == len(combos)
+
+        rules = load_scoring_rules(cur)
+        got = dict(db.execute("SELECT moment_id, points FROM gifts").fetchall())
+        for i, (s, t, p) in enumerate(combos):
+            assert got[i] == score_moment(rules, s, t, p), (s, t, p)
+
+    def test_window_and_missing_metadata(self, db):
+        cur = db.cursor()
+        save_moment_metadata(cur, [moment_metadata_row(1, _gql(218)), moment_metadata_row(2, _gql(218))])
+        db.execute("INSERT INTO moment_metadata (moment_id, player_name, tier) VALUES (3, ?, 'RARE')", (JOKIC,))
+        db.executemany("INSERT INTO gifts (txn_id, moment_id, points, timestamp) VALUES (?, ?, ?, ?)", [
+            ("a", 1, 0, "2025-12-10"), ("b", 2, 0, "2024-01-01"), ("c", 3, 0, "2025-12-10"), ("d", 4, 0, "2025-12-10"),
+        ])
+
+        assert rescore_gifts(cur, since="2025-12-01", until="2026-01-01") == 1
+        assert dict(db.execute("SELECT txn_id, points FROM gifts").fetchall()) == {"a": 3, "b": 0, "c": 0, "d": 0}
+
+    def test_unknown_tier_is_stored_as_null(self, db):
+        """A moment without a tier scores 0 in both the SQL and Python paths."""
+        cur = db.cursor()
+        db.execute("INSERT INTO gift_scoring_rules (set_flow_id, tier, player_name, points) VALUES (NULL, 'COMMON', NULL, 1)")
+        data = _gql(10, tier=None)
+        row = moment_metadata_row(6, data)
+        assert row[2] is None
+        save_moment_metadata(cur, [row])
+        db.execute("INSERT INTO gifts (txn_id, moment_id, points, timestamp) VALUES ('u', 6, 0, '2025-12-10')")
+
+        rescore_gifts(cur)
+
+        assert db.execute("SELECT points FROM gifts WHERE txn_id = 'u'").fetchone()[0] == 0
+        assert score_metadata(load_scoring_rules(cur), data) == 0
+
+    def test_metadata_upsert_fills_flow_id(self, db):
+        db.execute("INSERT INTO moment_metadata (moment_id, player_name, tier) VALUES (5, ?, 'RARE')", (JOKIC,))
+        save_moment_metadata(db.cursor(), [moment_metadata_row(5, _gql(227, "MOMENT_TIER_RARE"))])
+        assert db.execute("SELECT set_flow_id, tier FROM moment_metadata WHERE moment_id = 5").fetchone() == (227, "RARE")
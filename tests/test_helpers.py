@@ -171,3 +171,81 @@ class TestGiftHelpers:
         from utils.helpers import get_last_processed_block
         block = get_last_processed_block()
         assert block is None or isinstance(block, (int, str))
+
+
+class TestBulkUsernameResolution:
+    """Test batched Flow wallet → TopShot username resolution."""
+
+    @patch('utils.helpers.get_username_from_dapper_wallet_flow')
+    @patch('utils.helpers.get_linked_accounts_bulk')
+    def test_resolves_children_in_one_batch(self, mock_bulk, mock_profile):
+        """All uncached wallets are resolved with a single bulk call."""
+        from utils.helpers import get_ts_usernames_bulk, _username_cache
+        _username_cache.clear()
+        mock_bulk.return_value = {
+            '0x01': {'child': '0xc1', 'parent': ''},
+            '0x02': {'child': '', 'parent': ''},
+        }
+        mock_profile.side_effect = lambda child: {'0xc1': 'alice'}[child]
+
+        result = get_ts_usernames_bulk(['0x01', '0x02'])
+
+        assert result == {'0x01': 'alice', '0x02': None}
+        mock_bulk.assert_called_once_with(['0x01', '0x02'])
+        # Only successes are cached
+        assert '0x01' in _username_cache
+        assert '0x02' not in _username_cache
+        _username_cache.clear()
+
+    @patch('utils.helpers.get_linked_accounts_bulk')
+    def test_known_and_cached_skip_chain(self, mock_bulk):
+        """Known treasury wallet and cached entries never hit the chain."""
+        import time
+        from utils.helpers import get_ts_usernames_bulk, _username_cache
+        _username_cache['0x03'] = ('cached_user', time.time() + 60)
+
+        result = get_ts_usernames_bulk(['0xf853bd09d46e7db6', '0x03'])
+
+        assert result == {'0xf853bd09d46e7db6': 'PetJokicsHorses', '0x03': 'cached_user'}
+        mock_bulk.assert_not_called()
+        _username_cache.clear()
+
+    @patch('utils.helpers.get_username_from_dapper_wallet_flow')
+    @patch('utils.helpers.get_linked_accounts_bulk')
+    def test_addresses_without_prefix_match_bulk_keys(self, mock_bulk, mock_profile):
+        """Wallets given without ``0x`` are keyed the way the bulk lookup keys them."""
+        from utils.helpers import get_ts_usernames_bulk, _username_cache
+        _username_cache.clear()
+        mock_bulk.return_value = {'0x01': {'child': '0xc1', 'parent': ''}}
+        mock_profile.return_value = 'alice'
+
+        assert get_ts_usernames_bulk([' 01 ', '0x01']) == {'0x01': 'alice'}
+        mock_bulk.assert_called_once_with(['0x01'])
+        _username_cache.clear()
+
+
+class TestFetchMintedMoments:
+    """Test the shared aliased getMintedMoment lookup."""
+
+    @patch('utils.helpers.requests.post')
+    def test_ids_travel_as_variables(self, mock_post):
+        """Moment IDs never appear in the query text."""
+        from utils.helpers import fetch_minted_moments
+        mock_post.return_value.json.return_value = {
+            'data': {'m0': {'data': {'id': 'a'}}, 'm1': None},
+        }
+        hostile = '1") { __typename } x: getMintedMoment(momentId: "2'
+
+        result = fetch_minted_moments([7, hostile], '{ data { id } }', 'Lookup')
+
+        payload = mock_post.call_args.kwargs['json']
+        assert payload['query'].startswith('query Lookup($m0: ID!, $m1: ID!) {')
+        assert hostile not in payload['query']
+        assert payload['variables'] == {'m0': '7', 'm1': hostile}
+        assert result == {7: {'id': 'a'}}
+
+    @patch('utils.helpers.requests.post')
+    def test_empty_batch_skips_request(self, mock_post):
+        from utils.helpers import fetch_minted_moments
+        assert fetch_minted_moments([], '{ data { id } }') == {}
+        mock_post.assert_not_called()
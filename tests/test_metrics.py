@@ -0,0 +1,148 @@
+"""Tests for the latency metrics registry and its instrumentation hooks."""
+
+import asyncio
+import sqlite3
+
+import pytest
+import requests
+from unittest.mock import AsyncMock, Mock, patch
+from flask import Flask
+
+from utils import metrics
+from db.instrumented import SQLiteConnection
+from routes.api import register_routes
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _series(histogram, *labels):
+    return histogram.snapshot().get(labels)
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_and_rendered(self):
+        h = metrics.HTTP_REQUEST_SECONDS
+        h.observe(0.003, "/api/x", "GET", "200")
+        h.observe(0.2, "/api/x", "GET", "200")
+        h.observe(60.0, "/api/x", "GET", "200")
+        cumulative, total, count = _series(h, "/api/x", "GET", "200")
+        assert count == 3 and total == pytest.approx(60.203)
+        assert cumulative[metrics.LATENCY_BUCKETS.index(0.0025)] == 0
+        assert cumulative[metrics.LATENCY_BUCKETS.index(0.005)] == 1
+        assert cumulative[metrics.LATENCY_BUCKETS.index(0.25)] == 2
+        assert cumulative[-1] == 3
+
+        text = metrics.render()
+        assert '# TYPE jokic_http_request_duration_seconds histogram' in text
+        assert ('jokic_http_request_duration_seconds_bucket'
+                '{route="/api/x",method="GET",status="200",le="+Inf"} 3') in text
+        assert 'jokic_http_request_duration_seconds_count{route="/api/x",method="GET",status="200"} 3' in text
+
+
+class TestLabels:
+    @pytest.mark.parametrize("sql,label", [
+        ("SELECT from_address, SUM(points) FROM gifts GROUP BY 1", "SELECT gifts"),
+        ('  insert into "fastbreakContests" (id) values (?)', "INSERT fastbreakContests"),
+        ("UPDATE bracket_matchups SET status = ? WHERE id = ?", "UPDATE bracket_matchups"),
+        (b"DELETE FROM treasury_moments WHERE moment_id IN (1)", "DELETE treasury_moments"),
+        ("BEGIN", "BEGIN"),
+    ])
+    def test_query_label(self, sql, label):
+        assert metrics.query_label(sql) == label
+
+    def test_upstream_operation(self):
+        with patch.multiple(metrics, TOPSHOT_GRAPHQL_URL="https://ts/graphql",
+                            FLOW_REST_URL="https://rest/v1", FLOW_SCAN_API_URL=""):
+            assert metrics.upstream_operation(
+                "POST", "https://ts/graphql", b'{"operationName": "SearchFastBreakRuns", "query": "..."}'
+            ) == ("topshot", "SearchFastBreakRuns")
+            assert metrics.upstream_operation(
+                "POST", "https://ts/graphql", '{"query": "query getMintedMoment($id: ID!) {...}"}'
+            ) == ("topshot", "getMintedMoment")
+            assert metrics.upstream_operation(
+                "GET", "https://rest/v1/transaction_results/" + "ab" * 32
+            ) == ("flow_rest", "GET /transaction_results/{id}")
+            assert metrics.upstream_operation(
+                "GET", "https://rest/v1/events?type=A.x.Deposit&start_height=1"
+            ) == ("flow_rest", "GET /events")
+            assert metrics.upstream_operation("GET", "https://example.com/x") == ("other", "example.com")
+
+
+class TestFlaskInstrumentation:
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        register_routes(app)
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_requests_are_timed_by_route_template(self, client):
+        with patch('routes.api.get_db') as mock_get_db:
+            mock_get_db.return_value.cursor.return_value.fetchone.return_value = None
+            client.get('/api/fastbreak/contest/42/prediction-leaderboard')
+
+        routes = {labels[0] for labels in metrics.HTTP_REQUEST_SECONDS.snapshot()}
+        assert '/api/fastbreak/contest/<int:contest_id>/prediction-leaderboard' in routes
+
+        with patch('config.METRICS_TOKEN', 'secret'):
+            response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        assert 'route="/api/fastbreak/contest/<int:contest_id>/prediction-leaderboard"' in response.get_data(as_text=True)
+
+    def test_metrics_token(self, client):
+        with patch('config.METRICS_TOKEN', 'secret'):
+            assert client.get('/metrics').status_code == 401
+            ok = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+            assert ok.status_code == 200
+
+    def test_metrics_closed_without_token(self, client):
+        with patch('config.METRICS_TOKEN', ''):
+            assert client.get('/metrics').status_code == 404
+
+
+class TestHooks:
+    def test_sqlite_statements_are_timed(self):
+        conn = sqlite3.connect(':memory:', factory=SQLiteConnection)
+        conn.execute('CREATE TABLE gifts (id INTEGER)')
+        conn.cursor().executemany('INSERT INTO gifts (id) VALUES (?)', [(1,), (2,)])
+        assert conn.execute('SELECT COUNT(*) FROM gifts').fetchone()[0] == 2
+        labels = {k[0]: v[2] for k, v in metrics.DB_QUERY_SECONDS.snapshot().items()}
+        assert labels == {'CREATE': 1, 'INSERT gifts': 1, 'SELECT gifts': 1}
+
+    def test_requests_calls_are_timed(self):
+        metrics.instrument_requests()
+        response = requests.Response()
+        response.status_code = 503
+        with patch('requests.adapters.HTTPAdapter.send', return_value=response), \
+                patch.object(metrics, 'FLOW_REST_URL', 'https://rest/v1'):
+            requests.get('https://rest/v1/blocks', params={'height': 'sealed'})
+        assert _series(metrics.UPSTREAM_SECONDS, 'flow_rest', 'GET /blocks', '503')[2] == 1
+
+    def test_grpc_client_times_each_rpc(self):
+        client = Mock(channel='chan')
+        client.get_latest_block = AsyncMock(return_value='block')
+        client.send_transaction = AsyncMock(side_effect=RuntimeError('boom'))
+        proxy = metrics.grpc_client(client)
+
+        async def calls():
+            assert await proxy.get_latest_block() == 'block'
+            with pytest.raises(RuntimeError):
+                await proxy.send_transaction(transaction=None)
+
+        asyncio.run(calls())
+        assert proxy.channel == 'chan'
+        assert _series(metrics.UPSTREAM_SECONDS, 'flow_grpc', 'get_latest_block', 'ok')[2] == 1
+        assert _series(metrics.UPSTREAM_SECONDS, 'flow_grpc', 'send_transaction', 'error')[2] == 1
+
+    def test_job_ticks_and_errors(self):
+        with patch('bot.tx_verifier.get_db_connection', side_effect=RuntimeError('db down')):
+            from bot.tx_verifier import tx_verifier_tick
+            tx_verifier_tick()
+        assert _series(metrics.JOB_TICK_SECONDS, 'tx_verifier')[2] == 1
+        assert metrics.JOB_ERRORS.value('tx_verifier') == 1
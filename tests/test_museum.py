@@ -184,14 +184,26 @@ def _mock_post_graphql(moment_map):
     """Return a side_effect for http_requests.post that serves GraphQL responses.
 
     moment_map: dict of moment_id → moment_dict (from _make_rich_moment).
+    Handles both single ``$momentId`` queries and aliased batch queries
+    (``m0: getMintedMoment(momentId: $m0)``).
     Moments not in the map get None → light fallback.
     """
+    import re
+
     def side_effect(url, json=None, **kwargs):
         resp = Mock()
         resp.status_code = 200
         resp.raise_for_status = Mock()
-        mid = (json or {}).get("variables", {}).get("momentId", "")
-        resp.json = Mock(return_value=_make_graphql_response(moment_map.get(mid)))
+        body = json or {}
+        aliases = re.findall(r'(m\d+): getMintedMoment\(momentId: \$(m\d+)\)', body.get("query", ""))
+        if aliases:
+            variables = body.get("variables") or {}
+            resp.json = Mock(return_value={"data": {
+                alias: {"data": moment_map.get(variables.get(var))} for alias, var in aliases
+            }})
+        else:
+            mid = body.get("variables", {}).get("momentId", "")
+            resp.json = Mock(return_value=_make_graphql_response(moment_map.get(mid)))
         return resp
     return side_effect
 
@@ -444,6 +456,81 @@ class TestShowcaseMuseumSuccess:
         assert ids == ["m0", "m1", "m2", "m3", "m4"]
 
 
+class TestShowcaseMuseumCache:
+    """Showcase and per-moment caching."""
+
+    BINDER = "d9d1bbca-a418-483e-aaae-61d78fe1156a"
+
+    @patch("routes.api.http_requests.post")
+    @patch("routes.api.http_requests.get")
+    def test_batches_moments_in_one_query(self, mock_get, mock_post, client):
+        """Several moments are enriched by a single aliased GraphQL request."""
+        moments = [_make_binder_moment(moment_id=f"m{i}") for i in range(3)]
+        mock_get.side_effect = TestShowcaseMuseumSuccess._mock_showcase_get(
+            _make_showcase_html("Batch", moments))
+        mock_post.side_effect = _mock_post_graphql({f"m{i}": _make_rich_moment(moment_id=f"m{i}") for i in range(3)})
+
+        resp = client.get(f"/api/showcase/{self.BINDER}")
+
+        assert resp.status_code == 200
+        assert mock_post.call_count == 1
+        assert all(e["gameStats"] for e in resp.get_json()["editions"])
+
+    @patch("routes.api.http_requests.post")
+    @patch("routes.api.http_requests.get")
+    def test_second_view_served_from_cache(self, mock_get, mock_post, client):
+        """A fully enriched showcase is not re-scraped within the TTL."""
+        mock_get.side_effect = TestShowcaseMuseumSuccess._mock_showcase_get(
+            _make_showcase_html("Cached", [_make_binder_moment(moment_id="c1")]))
+        mock_post.side_effect = _mock_post_graphql({"c1": _make_rich_moment(moment_id="c1")})
+
+        first = client.get(f"/api/showcase/{self.BINDER}").get_json()
+        second = client.get(f"/api/showcase/{self.BINDER}").get_json()
+
+        assert first == second
+        assert mock_get.call_count == 1
+        assert mock_post.call_count == 1
+
+    @patch("routes.api.http_requests.post", side_effect=Exception("no graphql"))
+    @patch("routes.api.http_requests.get")
+    def test_partial_enrichment_not_cached(self, mock_get, mock_post, client):
+        """Light-fallback results are never cached, so the next view retries."""
+        mock_get.side_effect = TestShowcaseMuseumSuccess._mock_showcase_get(
+            _make_showcase_html("Partial", [_make_binder_moment(moment_id="p1")]))
+
+        client.get(f"/api/showcase/{self.BINDER}")
+        client.get(f"/api/showcase/{self.BINDER}")
+
+        assert mock_get.call_count == 2
+
+    @patch("routes.api.time.time")
+    @patch("routes.api.http_requests.post")
+    @patch("routes.api.http_requests.get")
+    def test_stale_served_while_refreshing(self, mock_get, mock_post, mock_time, client):
+        """After the TTL the cached copy is returned and a refresh runs in the background."""
+        import threading
+        mock_time.return_value = 1000.0
+        mock_get.side_effect = TestShowcaseMuseumSuccess._mock_showcase_get(
+            _make_showcase_html("Old Name", [_make_binder_moment(moment_id="s1")]))
+        mock_post.side_effect = _mock_post_graphql({"s1": _make_rich_moment(moment_id="s1")})
+        client.get(f"/api/showcase/{self.BINDER}")
+
+        refreshed = threading.Event()
+
+        def _slow_get(url, **kwargs):
+            resp = TestShowcaseMuseumSuccess._mock_showcase_get(
+                _make_showcase_html("New Name", [_make_binder_moment(moment_id="s1")]))(url)
+            refreshed.set()
+            return resp
+        mock_get.side_effect = _slow_get
+        mock_time.return_value = 1000.0 + 601
+
+        stale = client.get(f"/api/showcase/{self.BINDER}").get_json()
+
+        assert stale["showcaseName"] == "Old Name"
+        assert refreshed.wait(5)
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  EDITION TRANSFORM HELPERS
 # ═══════════════════════════════════════════════════════════════════════
@@ -39,3 +39,318 @@ class TestPettingCommands:
         interaction.channel_id = 1333948717824475187  # Correct channel
         interaction.response = AsyncMock()
         return interaction
+
+
+class _CountingCursor:
+    """sqlite3 cursor proxy that counts statements sent to the database."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = 0
+
+    def execute(self, *args):
+        self.statements += 1
+        return self._cursor.execute(*args)
+
+    def executemany(self, *args):
+        self.statements += 1
+        return self._cursor.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TestPetAllBatching:
+    """pet_all draws every banked pet against one read of special_rewards."""
+
+    TODAY = '2026-01-01'
+
+    @pytest.fixture
+    def db(self):
+        import sqlite3
+        conn = sqlite3.connect(':memory:')
+        conn.executescript('''
+            CREATE TABLE user_rewards (
+                user_id BIGINT PRIMARY KEY, balance REAL NOT NULL DEFAULT 0,
+                daily_pets_remaining INTEGER NOT NULL DEFAULT 1, last_pet_date TEXT
+            );
+            CREATE TABLE special_rewards (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+                probability REAL NOT NULL, amount INTEGER
+            );
+        ''')
+        yield conn
+        conn.close()
+
+    def _bank(self, conn, user_id, pets, balance=0.0):
+        conn.execute(
+            "INSERT INTO user_rewards VALUES (?, ?, ?, ?)", (user_id, balance, pets, self.TODAY)
+        )
+
+    def test_draw_respects_stock(self):
+        from bot.petting_commands import draw_pet_outcomes
+        rewards = [(1, 'Pack', 1.0, 3), (2, 'Grail', 1.0, 0)]
+        total, won, used = draw_pet_outcomes(10, rewards)
+        assert won == ['Pack'] * 3
+        assert used == {1: 3}
+        assert total > 0  # the other 7 pets earned $MVP
+
+    def test_draw_without_hits_pays_mvp_per_pet(self):
+        from unittest.mock import patch
+        from bot.petting_commands import draw_pet_outcomes
+        with patch('bot.petting_commands.custom_reward', return_value=0.05):
+            total, won, used = draw_pet_outcomes(4, [(1, 'Pack', 0.0, 5)])
+        assert total == 0.2
+        assert won == [] and used == {}
+
+    def test_pet_all_applies_stock_and_balance(self, db):
+        from bot.petting_commands import _pet_all
+        self._bank(db, 1, 5, balance=1.0)
+        db.execute("INSERT INTO special_rewards VALUES (1, 'Pack', 1.0, 2)")
+
+        pets_used, total, won, new_balance = _pet_all(db, db.cursor(), 1, self.TODAY)
+
+        assert pets_used == 5
+        assert won == ['Pack', 'Pack']
+        assert new_balance == pytest.approx(1.0 + total)
+        assert db.execute("SELECT COUNT(*) FROM special_rewards").fetchone()[0] == 0
+        assert db.execute(
+            "SELECT balance, daily_pets_remaining FROM user_rewards WHERE user_id = 1"
+        ).fetchone() == (pytest.approx(new_balance), 0)
+
+    def test_pet_all_partial_stock_is_decremented(self, db):
+        from bot.petting_commands import _pet_all
+        self._bank(db, 1, 3)
+        db.execute("INSERT INTO special_rewards VALUES (1, 'Pack', 1.0, 10)")
+
+        _pet_all(db, db.cursor(), 1, self.TODAY)
+
+        assert db.execute("SELECT amount FROM special_rewards WHERE id = 1").fetchone()[0] == 7
+
+    def test_stock_is_claimed_in_id_order(self, monkeypatch):
+        """Concurrent draws lock reward rows in one global order (no deadlocks)."""
+        from bot import petting_commands
+        order = []
+        monkeypatch.setattr(petting_commands, '_claim_stock',
+                            lambda cursor, reward_id, wanted: order.append(reward_id) or wanted)
+        rewards = [(9, 'Grail', 0.1, 5), (2, 'Pack', 0.1, 5), (5, 'Pin', 0.1, 5)]
+
+        petting_commands._settle_special_rewards(Mock(), rewards, 0, ['Grail', 'Pack', 'Pin'],
+                                                 {9: 1, 2: 1, 5: 1})
+
+        assert order == [2, 5, 9]
+
+    def test_lost_races_report_busy(self):
+        """Running out of retries raises instead of claiming there is nothing left."""
+        from bot.petting_commands import PettingBusy, _take_all_pets, _claim_balance, _claim_stock
+        cursor = Mock(rowcount=0)
+        cursor.fetchone.return_value = (3,)
+
+        with pytest.raises(PettingBusy):
+            _take_all_pets(cursor, 1, self.TODAY)
+        with pytest.raises(PettingBusy):
+            _claim_balance(None, cursor, 1)
+        with pytest.raises(PettingBusy):
+            _claim_stock(cursor, 7, 1)
+
+    @pytest.mark.parametrize("pets", [1, 100, 500])
+    def test_benchmark_statement_count_independent_of_pets(self, db, pets):
+        """Hundreds of banked pets still cost a fixed handful of statements."""
+        import time
+        from bot.petting_commands import _pet_all
+        self._bank(db, 1, pets)
+        db.executemany(
+            "INSERT INTO special_rewards VALUES (?, ?, ?, ?)",
+            [(i, f'Reward {i}', 0.01, 1000) for i in range(1, 21)],
+        )
+        cursor = _CountingCursor(db.cursor())
+
+        started = time.perf_counter()
+        pets_used, _, won, _ = _pet_all(db, cursor, 1, self.TODAY)
+        elapsed = time.perf_counter() - started
+
+        assert pets_used == pets
+        # Fixed cost for the user row + a guarded claim per reward that hit;
+        # never one round trip per pet
+        assert cursor.statements <= 7 + 3 * len(set(won))
+        assert elapsed < 1.0
+        remaining = db.execute("SELECT SUM(amount) FROM special_rewards").fetchone()[0]
+        assert remaining == 20 * 1000 - len(won)
+
+
+class TestPettingConcurrency:
+    """Thousands of simultaneous pets must not lose updates or oversell stock.
+
+    Runs against a throwaway SQLite file, and against Postgres too when
+    ``TEST_POSTGRES_URL`` points at a scratch database.
+    """
+
+    TODAY = '2026-01-01'
+    USERS = list(range(9001, 9021))
+    BANKED = 100            # pets per user -> 2000 pets in total
+    STOCK = 10              # per special reward, far below expected hits
+
+    SCHEMA = [
+        '''CREATE TABLE IF NOT EXISTS user_rewards (
+            user_id BIGINT PRIMARY KEY, balance REAL NOT NULL DEFAULT 0,
+            daily_pets_remaining INTEGER NOT NULL DEFAULT 1, last_pet_date TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS special_rewards (
+            id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+            probability REAL NOT NULL, amount INTEGER
+        )''',
+    ]
+
+    def _sqlite_connect(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / 'stress.db')
+
+        def _connect():
+            conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA synchronous = OFF')
+            return conn, 'sqlite'
+        return _connect
+
+    def _postgres_connect(self, url, monkeypatch):
+        import psycopg2
+        import utils.helpers
+        monkeypatch.setattr(utils.helpers, 'db_type', 'postgresql')
+        return lambda: (psycopg2.connect(url), 'postgresql')
+
+    def _run_stress(self, connect, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from db import bot_db
+        from bot.petting_commands import _pet_once, _pet_all, _claim_balance, PettingBusy
+        from utils.helpers import prepare_query
+
+        monkeypatch.setattr(bot_db, 'get_db_connection', connect)
+        pool = bot_db.ConnectionPool(16)
+        monkeypatch.setattr(bot_db, '_pool', pool)
+
+        def _setup(conn, cursor):
+            for stmt in self.SCHEMA:
+                cursor.execute(stmt)
+            cursor.execute(prepare_query('DELETE FROM user_rewards WHERE user_id >= ? AND user_id <= ?'),
+                           (self.USERS[0], self.USERS[-1]))
+            cursor.execute(prepare_query('DELETE FROM special_rewards WHERE id IN (?, ?)'), (901, 902))
+            for uid in self.USERS:
+                cursor.execute(prepare_query('INSERT INTO user_rewards VALUES (?, ?, ?, ?)'),
+                               (uid, 0, self.BANKED, self.TODAY))
+            cursor.execute(prepare_query('INSERT INTO special_rewards VALUES (?, ?, ?, ?)'),
+                           (901, 'Stress Pack', 0.05, self.STOCK))
+            cursor.execute(prepare_query('INSERT INTO special_rewards VALUES (?, ?, ?, ?)'),
+                           (902, 'Stress Grail', 0.05, self.STOCK))
+        bot_db.call_db(_setup)
+
+        # Every user: more single pets than banked, a few pet_alls and claims
+        jobs = []
+        for uid in self.USERS:
+            jobs += [(_pet_once, uid, self.TODAY)] * (self.BANKED + 10)
+            jobs += [(_pet_all, uid, self.TODAY)] * 3
+            jobs += [(_claim_balance, uid)] * 3
+        import random
+        random.shuffle(jobs)
+
+        def _run(job):
+            fn, *args = job
+            try:
+                return fn, args[0], bot_db.call_db(fn, *args)
+            except PettingBusy:
+                return fn, args[0], None     # rolled back; nothing changed
+
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            results = list(ex.map(_run, jobs))
+
+        pets = {uid: 0 for uid in self.USERS}
+        credited = {uid: 0.0 for uid in self.USERS}
+        claimed = {uid: 0.0 for uid in self.USERS}
+        specials = 0
+        for fn, uid, result in results:
+            if result is None:
+                continue
+            if fn is _pet_once:
+                pets[uid] += 1
+                credited[uid] += result[0]
+                specials += 1 if result[1] else 0
+            elif fn is _pet_all:
+                pets[uid] += result[0]
+                credited[uid] += result[1]
+                specials += len(result[2])
+            else:
+                claimed[uid] += result
+
+        def _final(conn, cursor):
+            cursor.execute(prepare_query(
+                'SELECT user_id, balance, daily_pets_remaining FROM user_rewards '
+                'WHERE user_id >= ? AND user_id <= ?'), (self.USERS[0], self.USERS[-1]))
+            users = {r[0]: (r[1], r[2]) for r in cursor.fetchall()}
+            cursor.execute(prepare_query('SELECT COALESCE(SUM(amount), 0) FROM special_rewards WHERE id IN (?, ?)'),
+                           (901, 902))
+            return users, cursor.fetchone()[0]
+        users, stock_left = bot_db.call_db(_final)
+        pool.close_all()
+
+        for uid in self.USERS:
+            balance, remaining = users[uid]
+            assert remaining == 0
+            assert pets[uid] == self.BANKED          # every banked pet spent exactly once
+            assert balance + claimed[uid] == pytest.approx(credited[uid], abs=1e-6)
+        assert stock_left >= 0
+        assert specials + stock_left == 2 * self.STOCK   # no reward oversold or lost
+
+    @pytest.mark.slow
+    def test_sqlite_stress(self, tmp_path, monkeypatch):
+        self._run_stress(self._sqlite_connect(tmp_path), monkeypatch)
+
+    @pytest.mark.slow
+    def test_postgres_stress(self, monkeypatch):
+        import os
+        url = os.getenv('TEST_POSTGRES_URL')
+        if not url:
+            pytest.skip('TEST_POSTGRES_URL not set')
+        self._run_stress(self._postgres_connect(url, monkeypatch), monkeypatch)
+
+
+class TestClaimToWallet:
+    """Claims queued as treasury payouts."""
+
+    @pytest.fixture
+    def db(self):
+        import sqlite3
+        conn = sqlite3.connect(':memory:')
+        conn.executescript('''
+            CREATE TABLE user_rewards (
+                user_id BIGINT PRIMARY KEY, balance REAL NOT NULL DEFAULT 0,
+                daily_pets_remaining INTEGER NOT NULL DEFAULT 1, last_pet_date TEXT
+            );
+            CREATE TABLE payouts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL, recipient TEXT NOT NULL, amount TEXT, moment_ids TEXT,
+                source TEXT, source_ref TEXT, status TEXT NOT NULL, batch_id INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0, error_message TEXT,
+                created_at BIGINT NOT NULL, updated_at BIGINT NOT NULL, solo INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT INTO user_rewards VALUES (1, 5.0, 0, NULL);
+        ''')
+        yield conn
+        conn.close()
+
+    def test_claims_in_the_same_second_are_both_queued(self, db):
+        from bot.petting_commands import _claim_to_wallet
+        wallet = '0x' + 'ab' * 8
+
+        assert _claim_to_wallet(db, db.cursor(), 'sqlite', 1, wallet, 1700000000) == 5.0
+        db.execute("UPDATE user_rewards SET balance = 2.5 WHERE user_id = 1")
+        assert _claim_to_wallet(db, db.cursor(), 'sqlite', 1, wallet, 1700000000) == 2.5
+
+        amounts = [r[0] for r in db.execute("SELECT amount FROM payouts ORDER BY id")]
+        assert amounts == ['5.00000000', '2.50000000']
+
+    def test_mismatched_stored_line_raises(self, db, monkeypatch):
+        from bot import petting_commands
+        from bot.petting_commands import _claim_to_wallet, PettingBusy
+        monkeypatch.setattr(petting_commands, 'enqueue_payout',
+                            lambda *a, **k: {'idempotency_key': 'petting:1:x', 'amount': '1.00000000'})
+
+        with pytest.raises(PettingBusy):
+            _claim_to_wallet(db, db.cursor(), 'sqlite', 1, '0x' + 'ab' * 8, 1700000000)
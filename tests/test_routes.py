@@ -208,6 +208,142 @@ class TestFastbreakAPI:
         assert 'error' in data
 
 
+class TestLinkedUsernamesAPI:
+    """Test bulk wallet → TopShot username resolution endpoint."""
+
+    @patch('routes.api.get_ts_usernames_bulk')
+    def test_linked_usernames_returns_map(self, mock_bulk, client):
+        """Returns the resolved username map for the given wallets."""
+        mock_bulk.return_value = {'0xaaa': 'alice', '0xbbb': None}
+
+        response = client.post('/api/linked_usernames', json={'wallets': ['0xAAA', '0xbbb']})
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['usernames'] == {'0xaaa': 'alice', '0xbbb': None}
+        mock_bulk.assert_called_once_with(['0xAAA', '0xbbb'])
+
+    def test_linked_usernames_rejects_bad_body(self, client):
+        """Non-list wallets payload returns 400."""
+        response = client.post('/api/linked_usernames', json={'wallets': '0xaaa'})
+        assert response.status_code == 400
+
+    def test_linked_usernames_rejects_too_many(self, client):
+        """More than the per-request cap returns 400."""
+        wallets = [f'0x{i:016x}' for i in range(101)]
+        response = client.post('/api/linked_usernames', json={'wallets': wallets})
+        assert response.status_code == 400
+
+
+class TestTreasuryMomentsAPI:
+    """Test treasury moments listing served from the inventory index."""
+
+    @pytest.fixture
+    def inventory_db(self):
+        import sqlite3
+        db = sqlite3.connect(':memory:')
+        db.executescript('''
+            CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO scraper_state VALUES ('treasury_index_reconciled_at', '1');
+            CREATE TABLE treasury_inventory (
+                moment_id BIGINT PRIMARY KEY, play_id INTEGER, set_name TEXT,
+                serial_number INTEGER, subedition INTEGER DEFAULT 0,
+                is_locked INTEGER DEFAULT 0, edition_id TEXT, tier TEXT,
+                edition_set_name TEXT, series_number INTEGER, play_headline TEXT,
+                team TEXT, image_url TEXT, updated_at BIGINT
+            );
+            INSERT INTO treasury_inventory (moment_id, serial_number, edition_id, tier, edition_set_name, is_locked)
+            VALUES (1, 10, 'e1', 'COMMON', 'Base Set', 0),
+                   (2, 20, 'e2', 'RARE', 'Metallic Gold LE', 0),
+                   (3, 30, 'e3', 'RARE', 'Metallic Gold LE', 1),
+                   (4, 40, NULL, NULL, 'Other', 0);
+        ''')
+        yield db
+        db.close()
+
+    @patch('routes.api.get_db')
+    def test_lists_unlocked_jokic_moments(self, mock_get_db, client, inventory_db):
+        """Locked and non-Jokic moments are excluded."""
+        mock_get_db.return_value = inventory_db
+        response = client.get('/api/treasury/moments')
+        assert response.status_code == 200
+        ids = [m['id'] for m in json.loads(response.data)['moments']]
+        assert sorted(ids) == [1, 2]
+
+    @patch('routes.api.get_db')
+    def test_filters_by_tier_and_set(self, mock_get_db, client, inventory_db):
+        """tier/set query params narrow the listing."""
+        mock_get_db.return_value = inventory_db
+        response = client.get('/api/treasury/moments?tier=rare&set=Metallic Gold LE')
+        moments = json.loads(response.data)['moments']
+        assert [m['id'] for m in moments] == [2]
+        assert moments[0]['mvpCost'] > 0
+
+    @patch('bot.treasury_indexer.reconcile_treasury_inventory')
+    @patch('routes.api.get_db')
+    def test_cold_index_does_not_reconcile_inline(self, mock_get_db, mock_reconcile, client, inventory_db):
+        """Before the first reconcile the current rows are served and flagged."""
+        inventory_db.execute("DELETE FROM scraper_state")
+        mock_get_db.return_value = inventory_db
+        response = client.get('/api/treasury/moments')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['indexing'] is True
+        assert sorted(m['id'] for m in data['moments']) == [1, 2]
+        mock_reconcile.assert_not_called()
+
+
+class TestNftHoldersAPI:
+    """Test Swapboost holders endpoint served from the index."""
+
+    @pytest.fixture
+    def holders_db(self):
+        import sqlite3
+        db = sqlite3.connect(':memory:')
+        db.executescript('''
+            CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO scraper_state VALUES ('swapboost_index_reconciled_at', '1');
+            CREATE TABLE swapboost_holders (
+                nft_id BIGINT PRIMARY KEY, name TEXT, thumbnail TEXT,
+                owner TEXT NOT NULL, dapper TEXT, updated_at BIGINT
+            );
+            INSERT INTO swapboost_holders VALUES (2, 'raw', 't.png', '0xparent', '0xunknown', 1);
+        ''')
+        yield db
+        db.close()
+
+    @patch('routes.api.get_db')
+    def test_holders_from_index(self, mock_get_db, client, holders_db):
+        """NFTs are listed with horse display names."""
+        mock_get_db.return_value = holders_db
+        response = client.get('/api/nft/holders')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['nfts'][0]['id'] == 2
+        assert data['nfts'][0]['name'] == 'Sombor Star #2'
+        assert response.headers.get('ETag')
+
+    @patch('routes.api.get_db')
+    def test_holders_etag_not_modified(self, mock_get_db, client, holders_db):
+        """A matching If-None-Match returns 304."""
+        mock_get_db.return_value = holders_db
+        etag = client.get('/api/nft/holders').headers['ETag']
+        response = client.get('/api/nft/holders', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    @patch('bot.swapboost_indexer.reconcile_swapboost_holders')
+    @patch('routes.api.get_db')
+    def test_cold_index_does_not_reconcile_inline(self, mock_get_db, mock_reconcile, client, holders_db):
+        """Before the first reconcile the current rows are served uncached."""
+        holders_db.execute("DELETE FROM scraper_state")
+        mock_get_db.return_value = holders_db
+        response = client.get('/api/nft/holders')
+        assert response.status_code == 200
+        assert json.loads(response.data)['indexing'] is True
+        assert response.headers['Cache-Control'] == 'no-store'
+        mock_reconcile.assert_not_called()
+
+
 class TestFastbreakEntryAPI:
     """Test FastBreak entry endpoints."""
 
@@ -249,6 +385,18 @@ class TestFastbreakEntryAPI:
         assert response.status_code == 404
 
 
+def _cached(tx_result, proposer=None):
+    """Stand-in for get_verified_transaction serving ``tx_result`` from the cache."""
+    from bot.tx_verifier import build_verification
+
+    def _get(conn, db_type, tx_id):
+        return build_verification(tx_id, tx_result, proposer) or {
+            'tx_id': tx_id, 'status': 'PENDING', 'chain_status': tx_result['status'].upper(),
+            'proposer': None, 'error_message': None, 'events': [],
+        }
+    return _get
+
+
 class TestSwapComplete:
     """Test /api/swap/complete endpoint with on-chain verification."""
 
@@ -283,18 +431,18 @@ class TestSwapComplete:
             'events': events,
         }
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_missing_fields_returns_400(self, mock_get_db, mock_http, client):
+    def test_missing_fields_returns_400(self, mock_get_db, mock_verify, client):
         """Missing txId / userAddr / momentIds → 400."""
         resp = client.post('/api/swap/complete',
                            data=json.dumps({'txId': '', 'userAddr': '', 'momentIds': []}),
                            content_type='application/json')
         assert resp.status_code == 400
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_replay_rejected(self, mock_get_db, mock_http, client):
+    def test_replay_rejected(self, mock_get_db, mock_verify, client):
         """Duplicate txId → 409."""
         mock_db = Mock()
         mock_cursor = Mock()
@@ -309,9 +457,9 @@ class TestSwapComplete:
         assert resp.status_code == 409
         assert 'already been processed' in resp.get_json()['error']
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_unsealed_tx_rejected(self, mock_get_db, mock_http, client):
+    def test_unsealed_tx_rejected(self, mock_get_db, mock_verify, client):
         """Non-sealed transaction → 400."""
         mock_db = Mock()
         mock_cursor = Mock()
@@ -319,10 +467,7 @@ class TestSwapComplete:
         mock_get_db.return_value = mock_db
         mock_cursor.fetchone.return_value = None  # no replay
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = {'status': 'PENDING', 'error_message': '', 'events': []}
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached({'status': 'PENDING', 'error_message': '', 'events': []})
 
         resp = client.post('/api/swap/complete',
                            data=json.dumps({'txId': 'tx1', 'userAddr': '0xabc', 'momentIds': [1]}),
@@ -330,9 +475,9 @@ class TestSwapComplete:
         assert resp.status_code == 400
         assert 'not sealed' in resp.get_json()['error'].lower()
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_missing_deposit_rejected(self, mock_get_db, mock_http, client):
+    def test_missing_deposit_rejected(self, mock_get_db, mock_verify, client):
         """Claimed moment not in Deposit events → 400."""
         mock_db = Mock()
         mock_cursor = Mock()
@@ -340,11 +485,8 @@ class TestSwapComplete:
         mock_get_db.return_value = mock_db
         mock_cursor.fetchone.return_value = None
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
         # Only moment 99 deposited, but user claims 1
-        flow_resp.json.return_value = self._flow_sealed_response([99])
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(self._flow_sealed_response([99]))
 
         resp = client.post('/api/swap/complete',
                            data=json.dumps({'txId': 'tx1', 'userAddr': '0xabc', 'momentIds': [1]}),
@@ -354,9 +496,9 @@ class TestSwapComplete:
 
     @patch('routes.api._get_moment_tier')
     @patch('routes.api.FLOW_SWAP_PRIVATE_KEY', '')
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_valid_swap_no_treasury_key(self, mock_get_db, mock_http,
+    def test_valid_swap_no_treasury_key(self, mock_get_db, mock_verify,
                                         mock_tier, client):
         """Valid on-chain swap but no FLOW_SWAP_PRIVATE_KEY → 200 with note."""
         mock_db = Mock()
@@ -365,10 +507,7 @@ class TestSwapComplete:
         mock_get_db.return_value = mock_db
         mock_cursor.fetchone.return_value = None  # no replay
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = self._flow_sealed_response([42, 43])
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(self._flow_sealed_response([42, 43]))
 
         mock_tier.return_value = 'COMMON'
 
@@ -420,9 +559,9 @@ class TestSwapComplete:
 
     @patch('routes.api._get_moment_tier')
     @patch('routes.api.FLOW_SWAP_PRIVATE_KEY', '')
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_boost_applies_20pct(self, mock_get_db, mock_http,
+    def test_boost_applies_20pct(self, mock_get_db, mock_verify,
                                   mock_tier, client):
         """Valid swap with horse boost → 200, mvpAmount is 1.2× base."""
         mock_db = Mock()
@@ -435,10 +574,7 @@ class TestSwapComplete:
         # Add horse NFT deposit event to the swap treasury
         sealed['events'].append(self._horse_deposit_event(7))
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = sealed
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(sealed)
 
         mock_tier.return_value = 'COMMON'
 
@@ -454,9 +590,9 @@ class TestSwapComplete:
         assert data['boostApplied'] is True
         assert data['points'] == 2  # boost does NOT affect points
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_boost_wrong_recipient_rejected(self, mock_get_db, mock_http, client):
+    def test_boost_wrong_recipient_rejected(self, mock_get_db, mock_verify, client):
         """Horse NFT deposited to wrong address → 400."""
         mock_db = Mock()
         mock_cursor = Mock()
@@ -468,10 +604,7 @@ class TestSwapComplete:
         # Horse goes to wrong address (Dapper treasury instead of Flow swap)
         sealed['events'].append(self._horse_deposit_event(7, 'f853bd09d46e7db6'))
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = sealed
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(sealed)
 
         resp = client.post('/api/swap/complete',
                            data=json.dumps({'txId': 'tx_bad', 'userAddr': '0xabc',
@@ -481,9 +614,9 @@ class TestSwapComplete:
         assert resp.status_code == 400
         assert 'not verified' in resp.get_json()['error'].lower()
 
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_boost_wrong_nft_id_rejected(self, mock_get_db, mock_http, client):
+    def test_boost_wrong_nft_id_rejected(self, mock_get_db, mock_verify, client):
         """Horse NFT id mismatch → 400."""
         mock_db = Mock()
         mock_cursor = Mock()
@@ -495,10 +628,7 @@ class TestSwapComplete:
         # Horse #5 deposited, but user claims boost with #7
         sealed['events'].append(self._horse_deposit_event(5))
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = sealed
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(sealed)
 
         resp = client.post('/api/swap/complete',
                            data=json.dumps({'txId': 'tx_wrong', 'userAddr': '0xabc',
@@ -510,9 +640,9 @@ class TestSwapComplete:
 
     @patch('routes.api._get_moment_tier')
     @patch('routes.api.FLOW_SWAP_PRIVATE_KEY', '')
-    @patch('routes.api.http_requests')
+    @patch('bot.tx_verifier.get_verified_transaction')
     @patch('routes.api.get_db')
-    def test_no_boost_field_ignored(self, mock_get_db, mock_http,
+    def test_no_boost_field_ignored(self, mock_get_db, mock_verify,
                                      mock_tier, client):
         """Swap without boostNftId → no boost applied (backward compat)."""
         mock_db = Mock()
@@ -521,10 +651,7 @@ class TestSwapComplete:
         mock_get_db.return_value = mock_db
         mock_cursor.fetchone.return_value = None
 
-        flow_resp = Mock()
-        flow_resp.status_code = 200
-        flow_resp.json.return_value = self._flow_sealed_response([42])
-        mock_http.get.return_value = flow_resp
+        mock_verify.side_effect = _cached(self._flow_sealed_response([42]))
 
         mock_tier.return_value = 'RARE'
 
@@ -536,3 +663,151 @@ class TestSwapComplete:
         assert resp.status_code == 200
         assert data['mvpAmount'] == 75  # RARE rate, no boost
         assert data['boostApplied'] is False
+
+
+class TestTxVerifyAPI:
+    """Test /api/tx/<txId>/verify registration and proposer checks from the cache."""
+
+    @patch('routes.api.get_db')
+    def test_invalid_tx_id_rejected(self, mock_get_db, client):
+        resp = client.post('/api/tx/not-a-tx/verify')
+        assert resp.status_code == 400
+        mock_get_db.assert_not_called()
+
+    @patch('bot.tx_verifier.load_verification')
+    @patch('bot.tx_verifier.register_transaction')
+    @patch('routes.api.get_db')
+    def test_register_returns_202_while_pending(self, mock_get_db, mock_register, mock_load, client):
+        mock_load.return_value = {'status': 'PENDING', 'chain_status': None}
+
+        resp = client.post('/api/tx/0x' + 'AB' * 32 + '/verify')
+
+        assert resp.status_code == 202
+        assert resp.get_json() == {'txId': 'ab' * 32, 'status': 'PENDING', 'chainStatus': None}
+        assert mock_register.call_args[0][2] == 'ab' * 32
+        mock_get_db.return_value.commit.assert_called_once()
+
+    @patch('bot.tx_verifier.register_transaction')
+    @patch('routes.api.get_db')
+    def test_full_queue_returns_429(self, mock_get_db, mock_register, client):
+        from bot.tx_verifier import VerificationQueueFull
+        mock_register.side_effect = VerificationQueueFull('busy')
+
+        resp = client.post('/api/tx/' + 'ab' * 32 + '/verify')
+
+        assert resp.status_code == 429
+        mock_get_db.return_value.commit.assert_not_called()
+
+    @patch('bot.tx_verifier.get_verified_transaction')
+    @patch('routes.api.get_db')
+    def test_swap_complete_normalizes_tx_id(self, mock_get_db, mock_verify, client):
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = None
+        mock_get_db.return_value.cursor.return_value = mock_cursor
+        mock_verify.side_effect = _cached(
+            TestSwapComplete()._flow_sealed_response([42]), proposer='0xdef')
+
+        client.post('/api/swap/complete',
+                    data=json.dumps({'txId': ' 0xAB12 ', 'userAddr': '0xabc', 'momentIds': [42]}),
+                    content_type='application/json')
+
+        # Replay protection and verification both see the canonical id
+        assert mock_cursor.execute.call_args_list[0][0][1] == ('ab12',)
+        assert mock_verify.call_args[0][2] == 'ab12'
+
+    @patch('bot.tx_verifier.get_verified_transaction')
+    @patch('routes.api.get_db')
+    def test_proposer_mismatch_rejected(self, mock_get_db, mock_verify, client):
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = None
+        mock_get_db.return_value.cursor.return_value = mock_cursor
+        mock_verify.side_effect = _cached(
+            TestSwapComplete()._flow_sealed_response([42]), proposer='0xdef')
+
+        resp = client.post('/api/swap/complete',
+                           data=json.dumps({'txId': 'tx1', 'userAddr': '0xabc', 'momentIds': [42]}),
+                           content_type='application/json')
+        assert resp.status_code == 403
+        assert 'proposer' in resp.get_json()['error']
+
+
+class TestSweepstakesAPI:
+    """Test /api/sweepstakes/* draw listing, audit and preview."""
+
+    @patch('routes.api.get_db')
+    def test_unknown_draw_404(self, mock_get_db, client):
+        mock_get_db.return_value.cursor.return_value.fetchone.return_value = None
+        assert client.get('/api/sweepstakes/draws/99').status_code == 404
+
+    @patch('routes.api.get_db')
+    def test_preview_rejects_unknown_source(self, mock_get_db, client):
+        resp = client.get('/api/sweepstakes/preview?source=lottery&winners=3')
+        assert resp.status_code == 400
+        assert 'lottery' in resp.get_json()['error']
+
+    @patch('routes.api.get_db')
+    def test_preview_draws_from_swap_points(self, mock_get_db, client):
+        mock_get_db.return_value.cursor.return_value.fetchall.return_value = [('0xa', 5), ('0xb', 0)]
+
+        resp = client.get('/api/sweepstakes/preview?source=swaps&winners=2&seed=s1')
+
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data['winners'] == ['0xa']
+        assert data['seed'] == 's1' and data['total_entries'] == 5
+
+
+class TestExportGiftsAPI:
+    """Test the streamed /api/export/gifts.csv download."""
+
+    @pytest.fixture
+    def gifts_conn(self):
+        import sqlite3
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        conn.execute('CREATE TABLE gifts (txn_id TEXT, moment_id BIGINT, from_address TEXT, points BIGINT, timestamp TEXT)')
+        conn.executemany('INSERT INTO gifts VALUES (?, ?, ?, ?, ?)', [
+            ('tx1', 1, '0xc246d05ba775362e', 10, '2025-12-10'),
+            ('tx2', 2, '0xabc', 20, '2025-12-11'),
+        ])
+        return conn
+
+    AUTH = {'Authorization': 'Bearer admin-secret'}
+
+    @pytest.fixture(autouse=True)
+    def admin_token(self):
+        with patch('config.ADMIN_API_TOKEN', 'admin-secret'):
+            yield
+
+    @patch('db.init.get_db_connection')
+    def test_requires_admin_token(self, mock_get_conn, client):
+        assert client.get('/api/export/gifts.csv').status_code == 401
+        assert client.get('/api/export/gifts.csv', headers={'Authorization': 'Bearer nope'}).status_code == 401
+        with patch('config.ADMIN_API_TOKEN', ''):
+            assert client.get('/api/export/gifts.csv', headers=self.AUTH).status_code == 404
+        mock_get_conn.assert_not_called()
+
+    @patch('db.init.get_db_connection')
+    def test_streams_csv(self, mock_get_conn, client, gifts_conn):
+        mock_get_conn.return_value = (gifts_conn, 'sqlite')
+
+        response = client.get('/api/export/gifts.csv', headers=self.AUTH)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'txn_id,moment_id,from_address,points,timestamp'
+        assert lines[1] == 'tx2,2,0xabc,20,2025-12-11'
+        assert lines[2] == 'tx1,1,KnotBean,10,2025-12-10'
+
+    @patch('db.init.get_db_connection')
+    def test_gzip_and_filter(self, mock_get_conn, client, gifts_conn):
+        import gzip
+        mock_get_conn.return_value = (gifts_conn, 'sqlite')
+
+        response = client.get('/api/export/gifts.csv?gzip=1&from_address=0xabc', headers=self.AUTH)
+
+        assert response.mimetype == 'application/gzip'
+        assert 'swapfest_gifts.csv.gz' in response.headers['Content-Disposition']
+        text = gzip.decompress(response.get_data()).decode()
+        assert text.splitlines()[1:] == ['tx2,2,0xabc,20,2025-12-11']
@@ -0,0 +1,119 @@
+"""Tests for the slow-query log and its EXPLAIN capture."""
+
+import logging
+import sqlite3
+
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+
+from db import slow_queries
+from db.instrumented import SQLiteConnection
+from routes.api import register_routes
+
+
+@pytest.fixture(autouse=True)
+def clean_log():
+    slow_queries.reset()
+    yield
+    slow_queries.reset()
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:', factory=SQLiteConnection)
+    c.execute('CREATE TABLE gifts (txn_id TEXT, moment_id INTEGER, from_address TEXT, points INTEGER)')
+    c.execute('CREATE INDEX idx_gifts_from ON gifts (from_address)')
+    yield c
+    c.close()
+
+
+class TestFingerprint:
+    def test_literals_and_lists_collapse(self):
+        a = slow_queries.fingerprint("SELECT * FROM gifts WHERE moment_id IN (1, 2, 3) AND from_address = '0xab'")
+        b = slow_queries.fingerprint("SELECT *  FROM gifts\n WHERE moment_id IN (?, ?) AND from_address = ?")
+        c = slow_queries.fingerprint("SELECT * FROM gifts WHERE moment_id IN (%s) AND from_address = %s -- note")
+        assert a == b == c
+        assert a[1] == "SELECT * FROM gifts WHERE moment_id IN (...) AND from_address = ?"
+
+    def test_values_rows_collapse_and_identifiers_survive(self):
+        _, text = slow_queries.fingerprint(b"INSERT INTO t1 (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z')")
+        assert text == "INSERT INTO t1 (a, b) VALUES (...)"
+
+
+class TestRecord:
+    def test_slow_statements_are_logged_with_one_explain(self, conn, caplog):
+        with patch('db.instrumented._SLOW_SECONDS', 0.0), \
+                patch('db.slow_queries._explain', wraps=slow_queries._explain) as explain, \
+                caplog.at_level(logging.WARNING, logger='db.slow_queries'):
+            for wallet in ('0x1', '0x2', '0x3'):
+                conn.execute('SELECT SUM(points) FROM gifts WHERE from_address = ?', (wallet,)).fetchone()
+
+        assert explain.call_count == 1
+        [entry] = [e for e in slow_queries.top_slow_queries() if e['query'].startswith('SELECT SUM')]
+        assert entry['count'] == 3 and entry['db_type'] == 'sqlite'
+        assert any('idx_gifts_from' in line for line in entry['plan'])
+        assert sum('[SlowQuery]' in r.message for r in caplog.records) >= 3
+        assert 'plan:' in caplog.records[0].message
+
+    def test_fast_statements_are_ignored(self, conn):
+        conn.execute('SELECT COUNT(*) FROM gifts').fetchone()
+        assert slow_queries.top_slow_queries() == []
+
+    def test_explain_does_not_disturb_the_cursor(self, conn):
+        conn.executemany('INSERT INTO gifts (moment_id) VALUES (?)', [(1,), (2,), (3,)])
+        with patch('db.instrumented._SLOW_SECONDS', 0.0):
+            cur = conn.cursor()
+            cur.execute('SELECT moment_id FROM gifts ORDER BY moment_id')
+            assert [r[0] for r in cur.fetchall()] == [1, 2, 3]
+
+    def test_postgres_explain_uses_a_savepoint(self):
+        pg_conn = Mock(autocommit=False)
+        cur = Mock()
+        cur.fetchall.return_value = [('Seq Scan on gifts',)]
+        with patch('psycopg2.extensions.cursor', return_value=cur):
+            plan = slow_queries._explain(pg_conn, 'postgresql', 'SELECT * FROM gifts WHERE id = %s', (1,))
+        assert plan == ['Seq Scan on gifts']
+        statements = [c.args[0] for c in cur.execute.call_args_list]
+        assert statements == ['SAVEPOINT slow_query_explain', 'EXPLAIN SELECT * FROM gifts WHERE id = %s',
+                              'RELEASE SAVEPOINT slow_query_explain']
+
+    def test_ddl_is_not_explained(self, conn):
+        assert slow_queries._explain(conn, 'sqlite', 'CREATE TABLE x (a INT)', ()) is None
+
+    def test_top_orders(self, conn):
+        slow_queries.record(conn, 'sqlite', 'SELECT 1 FROM gifts', (), 0.5)
+        for _ in range(3):
+            slow_queries.record(conn, 'sqlite', 'SELECT 2 FROM gifts WHERE points > 1', (), 0.2)
+        assert [e['count'] for e in slow_queries.top_slow_queries(order='total_ms')] == [3, 1]
+        assert [e['count'] for e in slow_queries.top_slow_queries(order='max_ms')] == [1, 3]
+        with pytest.raises(ValueError):
+            slow_queries.top_slow_queries(order='bogus')
+
+
+class TestSlowQueriesEndpoint:
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        register_routes(app)
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_lists_fingerprints(self, client, conn):
+        slow_queries.record(conn, 'sqlite', 'SELECT * FROM gifts WHERE points > 5', (), 0.3)
+        auth = {'Authorization': 'Bearer secret'}
+        with patch('config.ADMIN_API_TOKEN', 'secret'):
+            data = client.get('/api/admin/slow-queries?limit=5', headers=auth).get_json()
+            assert client.get('/api/admin/slow-queries?order=bogus', headers=auth).status_code == 400
+        assert data['queries'][0]['query'] == 'SELECT * FROM gifts WHERE points > ?'
+        assert data['queries'][0]['avg_ms'] == pytest.approx(300.0)
+
+    def test_requires_admin_token(self, client):
+        with patch('config.ADMIN_API_TOKEN', 'secret'):
+            assert client.get('/api/admin/slow-queries').status_code == 401
+            assert client.get('/api/admin/slow-queries',
+                              headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+    def test_closed_without_token(self, client):
+        with patch('config.ADMIN_API_TOKEN', ''):
+            assert client.get('/api/admin/slow-queries').status_code == 404
@@ -0,0 +1,118 @@
+"""Tests for the hot-statement registry and PostgreSQL prepared statements."""
+
+import sqlite3
+
+import psycopg2
+import pytest
+from unittest.mock import Mock, patch
+
+from db import statements
+from db.instrumented import sqlite_connect_kwargs
+from utils.helpers import prepare_query
+
+
+class FakePgCursor:
+    """Stands in for a psycopg2 cursor; records statements, optionally failing PREPARE."""
+
+    def __init__(self, connection, fail_prepare=False):
+        self.connection = connection
+        self.fail_prepare = fail_prepare
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if self.fail_prepare and sql.startswith("PREPARE"):
+            raise psycopg2.ProgrammingError("could not determine data type of parameter $1")
+
+
+@pytest.fixture
+def pg(monkeypatch):
+    monkeypatch.setattr(statements.psycopg2.extensions, "cursor", FakePgCursor)
+    monkeypatch.setattr(statements, "POSTGRES_PREPARE_THRESHOLD", 2)
+    monkeypatch.setattr(statements, "_unpreparable", set())
+    return Mock(autocommit=False)
+
+
+@pytest.fixture
+def stmt():
+    return statements.Statement("test_lookup", "SELECT tier FROM jokic_editions WHERE play_flow_id = ? AND set_name = ?")
+
+
+class TestStatement:
+    def test_postgres_forms(self, stmt):
+        assert stmt.pg_sql == "SELECT tier FROM jokic_editions WHERE play_flow_id = %s AND set_name = %s"
+        assert stmt.prepare_sql == ("PREPARE jg_test_lookup AS "
+                                    "SELECT tier FROM jokic_editions WHERE play_flow_id = $1 AND set_name = $2")
+        assert stmt.execute_sql == "EXECUTE jg_test_lookup (%s, %s)"
+        assert statements.Statement("no_args", "SELECT 1").execute_sql == "EXECUTE jg_no_args"
+
+    def test_register_is_idempotent_and_rejects_conflicts(self):
+        first = statements.register("test_register_once", "SELECT 1")
+        assert statements.register("test_register_once", "SELECT 1") is first
+        with pytest.raises(ValueError):
+            statements.register("test_register_once", "SELECT 2")
+        with pytest.raises(ValueError):
+            statements.register("not an identifier", "SELECT 1")
+
+    def test_hot_statements_are_registered(self):
+        import routes.api  # noqa: F401
+        import bot.bracket_poller  # noqa: F401
+        import bot.treasury_indexer  # noqa: F401
+        names = set(statements.registered())
+        assert {"swapfest_leaderboard", "jokic_edition_by_play_and_set", "jokic_edition_by_play",
+                "bracket_update_live_scores", "bracket_set_winner"} <= names
+
+
+class TestExecute:
+    def test_sqlite_runs_the_statement_directly(self, stmt):
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE TABLE jokic_editions (play_flow_id INTEGER, set_name TEXT, tier TEXT)')
+        conn.execute("INSERT INTO jokic_editions VALUES (7, 'Base', 'RARE')")
+        cur = conn.cursor()
+        statements.execute(cur, stmt, (7, 'Base'))
+        assert cur.fetchone() == ('RARE',)
+
+    def test_prepares_after_threshold_per_connection(self, pg, stmt):
+        cur = FakePgCursor(pg)
+        statements.execute(cur, stmt, (1, 'a'))
+        assert cur.executed == [stmt.pg_sql]
+
+        statements.execute(cur, stmt, (1, 'a'))
+        statements.execute(cur, stmt, (2, 'b'))
+        assert cur.executed[1:] == ["SAVEPOINT jg_prepare", stmt.prepare_sql, "RELEASE SAVEPOINT jg_prepare",
+                                    stmt.execute_sql, stmt.execute_sql]
+        assert statements.prepared_on(pg) == {"test_lookup"}
+
+        # A new connection (session) starts counting again
+        other = FakePgCursor(Mock(autocommit=True))
+        statements.execute(other, stmt, (1, 'a'))
+        statements.execute(other, stmt, (1, 'a'))
+        assert other.executed == [stmt.pg_sql, stmt.prepare_sql, stmt.execute_sql]
+
+    def test_failed_prepare_falls_back(self, pg, stmt):
+        cur = FakePgCursor(pg, fail_prepare=True)
+        for _ in range(3):
+            statements.execute(cur, stmt, (1, 'a'))
+        assert cur.executed == [stmt.pg_sql, "SAVEPOINT jg_prepare", stmt.prepare_sql,
+                                "ROLLBACK TO SAVEPOINT jg_prepare", stmt.pg_sql, stmt.pg_sql]
+        assert statements.prepared_on(pg) == set()
+
+    def test_threshold_zero_disables_prepare(self, pg, stmt, monkeypatch):
+        monkeypatch.setattr(statements, "POSTGRES_PREPARE_THRESHOLD", 0)
+        cur = FakePgCursor(pg)
+        for _ in range(3):
+            statements.execute(cur, stmt, (1, 'a'))
+        assert cur.executed == [stmt.pg_sql] * 3
+
+
+class TestQueryCaches:
+    @patch('utils.helpers.db_type', 'postgresql')
+    def test_prepare_query_is_memoized(self):
+        query = "SELECT * FROM gifts WHERE from_address = ? -- memo test"
+        first = prepare_query(query)
+        assert first == "SELECT * FROM gifts WHERE from_address = %s -- memo test"
+        assert prepare_query(query) is first
+
+    def test_sqlite_statement_cache_is_sized(self):
+        from config import SQLITE_STATEMENT_CACHE
+        assert sqlite_connect_kwargs()["cached_statements"] == SQLITE_STATEMENT_CACHE
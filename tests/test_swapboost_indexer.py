@@ -0,0 +1,84 @@
+"""Unit tests for the Swapboost NFT holders indexer."""
+
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from bot import swapboost_indexer
+from bot.swapboost_indexer import apply_swapboost_events, reconcile_swapboost_holders
+
+NFT_TYPE = swapboost_indexer.SWAPBOOST_NFT_TYPE
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE swapboost_holders (
+            nft_id BIGINT PRIMARY KEY, name TEXT, thumbnail TEXT,
+            owner TEXT NOT NULL, dapper TEXT, updated_at BIGINT
+        );
+    ''')
+    yield c
+    c.close()
+
+
+def _ev(nft_id, height, idx=0, nft_type=NFT_TYPE, **fields):
+    return {'block_height': height, 'transaction_id': 'tx', 'transaction_index': 0,
+            'event_index': idx, 'fields': {'type': nft_type, 'id': str(nft_id), **fields}}
+
+
+def _script_rows(rows):
+    return {'value': [{'value': [{'value': v} for v in row]} for row in rows]}
+
+
+class TestApplySwapboostEvents:
+    """Test incremental ownership updates."""
+
+    @patch('bot.swapboost_indexer.get_linked_accounts_bulk')
+    @patch('bot.swapboost_indexer.execute_script')
+    @patch('bot.swapboost_indexer.get_events')
+    def test_transfer_updates_owner(self, mock_events, mock_script, mock_links, conn):
+        conn.execute("INSERT INTO swapboost_holders VALUES (7, 'n', 't', '0xold', '0xolddapper', 1)")
+        deposits = [_ev(7, 101, idx=1, to='0xnew'), _ev(9, 101, nft_type='A.x.Other.NFT', to='0xnew')]
+        withdrawals = [_ev(7, 101, idx=0, **{'from': '0xold'})]
+        mock_events.side_effect = lambda t, s, e: deposits if t == swapboost_indexer.NFT_DEPOSITED else withdrawals
+        mock_script.return_value = _script_rows([['7', 'Horse', 'thumb.png', '0xnew']])
+        mock_links.return_value = {'0xnew': {'child': '0xnewdapper', 'parent': ''}}
+
+        moved, gone = apply_swapboost_events(conn, 'sqlite', 100, 120)
+
+        assert (moved, gone) == (1, 0)
+        rows = conn.execute("SELECT nft_id, owner, dapper FROM swapboost_holders").fetchall()
+        assert rows == [(7, '0xnew', '0xnewdapper')]
+        assert conn.execute(
+            "SELECT value FROM scraper_state WHERE key = 'swapboost_index_block'"
+        ).fetchone() == ('120',)
+
+    @patch('bot.swapboost_indexer.execute_script')
+    @patch('bot.swapboost_indexer.get_events')
+    def test_withdraw_without_deposit_removes(self, mock_events, mock_script, conn):
+        conn.execute("INSERT INTO swapboost_holders VALUES (3, 'n', 't', '0xold', '0xold', 1)")
+        mock_events.side_effect = lambda t, s, e: [] if t == swapboost_indexer.NFT_DEPOSITED else [_ev(3, 101, **{'from': '0xold'})]
+
+        apply_swapboost_events(conn, 'sqlite', 100, 120)
+
+        mock_script.assert_not_called()
+        assert conn.execute("SELECT COUNT(*) FROM swapboost_holders").fetchone()[0] == 0
+
+
+class TestReconcileSwapboost:
+    """Test full-scan reconciliation."""
+
+    @patch('bot.swapboost_indexer.execute_script')
+    def test_reconcile_replaces_table(self, mock_script, conn):
+        conn.execute("INSERT INTO swapboost_holders VALUES (40, 'n', 't', '0xgone', '0xgone', 1)")
+        mock_script.return_value = _script_rows([
+            ['1', 'Horse 1', 'a.png', '0xparent', '0xchild'],
+            ['2', 'Horse 2', 'b.png', '0xtreasury', '0xtreasury'],
+        ])
+
+        assert reconcile_swapboost_holders(conn, 'sqlite', sealed_height=900) == 2
+        ids = [r[0] for r in conn.execute("SELECT nft_id FROM swapboost_holders ORDER BY nft_id")]
+        assert ids == [1, 2]
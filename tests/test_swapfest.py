@@ -0,0 +1,289 @@
+"""Unit tests for Swapfest gift scoring and zero-point re-scoring."""
+
+import asyncio
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch
+
+import swapfest
+from swapfest import (
+    query_moments_metadata, rescore_zero_point_gifts, apply_scoring_rules,
+    split_block_range, backfill, BACKFILL_COVERED_KEY,
+    merge_block_ranges, uncovered_block_ranges, split_block_ranges,
+)
+from utils.gift_scoring import seed_default_scoring_rules, save_moment_metadata, moment_metadata_row
+
+
+def _metadata(flow_id, player="Nikola Jokić", tier="MOMENT_TIER_COMMON"):
+    return {"id": "x", "tier": tier, "set": {"flowId": flow_id}, "play": {"stats": {"playerName": player}}}
+
+
+def _fake_graphql(known):
+    """requests.post replacement answering aliased getMintedMoment queries from ``known``."""
+    calls = []
+
+    def _post(url, json=None, headers=None, timeout=None):
+        import re
+        assert '"' not in json["query"]   # IDs only travel as variables
+        ids = [(alias, json["variables"][var])
+               for alias, var in re.findall(r'(m\d+): getMintedMoment\(momentId: \$(m\d+)\)', json["query"])]
+        calls.append([int(mid) for _, mid in ids])
+        data = {alias: ({"data": known[int(mid)]} if int(mid) in known else None) for alias, mid in ids}
+        resp = Mock()
+        resp.json.return_value = {"data": data}
+        return resp
+
+    return _post, calls
+
+
+class TestQueryMomentsMetadata:
+    """Test concurrent batched metadata resolution."""
+
+    def test_batches_and_reports_progress(self, monkeypatch):
+        known = {i: _metadata(10) for i in range(1, 101) if i % 10}
+        post, calls = _fake_graphql(known)
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        monkeypatch.setattr(swapfest, "METADATA_BATCH_SIZE", 25)
+        progress = []
+
+        async def _progress(done, total):
+            progress.append((done, total))
+
+        result = asyncio.run(query_moments_metadata(list(range(1, 101)) + [1, 2], _progress))
+
+        assert set(result) == set(known)
+        assert sorted(len(c) for c in calls) == [25, 25, 25, 25]
+        assert sorted(progress) == [(25, 100), (50, 100), (75, 100), (100, 100)]
+
+    def test_failed_batch_is_skipped(self, monkeypatch):
+        import requests
+        monkeypatch.setattr(swapfest.requests, "post", Mock(side_effect=requests.ConnectionError("down")))
+        monkeypatch.setattr(swapfest.time, "sleep", lambda s: None)
+
+        assert asyncio.run(query_moments_metadata([1, 2, 3])) == {}
+
+
+@pytest.fixture
+def gifts_db():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE gifts (txn_id TEXT PRIMARY KEY, moment_id BIGINT, from_address TEXT, points REAL, timestamp TEXT)")
+    conn.execute("""CREATE TABLE moment_metadata (
+        moment_id BIGINT PRIMARY KEY, player_name TEXT, tier TEXT, set_name TEXT,
+        series_number INTEGER, image_url TEXT, team_name TEXT, nba_season TEXT,
+        play_category TEXT, cached_at BIGINT, set_flow_id INTEGER)""")
+    conn.execute("""CREATE TABLE gift_scoring_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, set_flow_id INTEGER, tier TEXT,
+        player_name TEXT, points INTEGER NOT NULL, note TEXT)""")
+    conn.execute("CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT)")
+    seed_default_scoring_rules(conn.cursor())
+    conn.executemany("INSERT INTO gifts VALUES (?, ?, '0xa', ?, '2025-12-10')", [
+        ("t1", 1, 0), ("t2", 1, None), ("t3", 2, 0), ("t4", 3, 0), ("t5", 4, 50), ("t6", None, 0),
+    ])
+    conn.commit()
+    calls = []
+
+    async def _run_db(fn, *args):
+        calls.append(fn.__name__)
+        result = fn(conn, conn.cursor(), *args)
+        conn.commit()
+        return result
+
+    with patch.object(swapfest, "run_db", _run_db), patch.object(swapfest, "_scoring_rules", None):
+        yield conn, calls
+    conn.close()
+
+
+class TestRescoreZeroPointGifts:
+    """Test the zero-point re-scoring job."""
+
+    def test_batched_fetch_then_one_set_based_update(self, gifts_db, monkeypatch):
+        conn, calls = gifts_db
+        known = {1: _metadata(227), 2: _metadata(10, player="Aaron Gordon"), 4: _metadata(2)}
+        post, graphql_calls = _fake_graphql(known)
+        monkeypatch.setattr(swapfest.requests, "post", post)
+
+        scanned, updated = asyncio.run(rescore_zero_point_gifts())
+
+        assert (scanned, updated) == (5, 2)
+        assert calls == ["_fetch_zero_point_gifts", "_save_moment_metadata", "_rescore_zero_point_gifts"]
+        assert len(graphql_calls) == 1 and sorted(graphql_calls[0]) == [1, 2, 3]
+        points = dict(conn.execute("SELECT txn_id, points FROM gifts").fetchall())
+        assert points == {"t1": 150, "t2": 150, "t3": 0, "t4": 0, "t5": 50, "t6": 0}
+
+    def test_cached_metadata_is_not_refetched(self, gifts_db, monkeypatch):
+        conn, calls = gifts_db
+        post, graphql_calls = _fake_graphql({1: _metadata(227), 2: _metadata(218), 3: _metadata(218)})
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        asyncio.run(rescore_zero_point_gifts())
+
+        assert asyncio.run(rescore_zero_point_gifts()) == (1, 0)  # only the moment-less gift is left
+        assert len(graphql_calls) == 1
+
+    def test_nothing_to_rescore(self, gifts_db, monkeypatch):
+        conn, calls = gifts_db
+        conn.execute("DELETE FROM gifts")
+        post = Mock()
+        monkeypatch.setattr(swapfest.requests, "post", post)
+
+        assert asyncio.run(rescore_zero_point_gifts()) == (0, 0)
+        assert calls == ["_fetch_zero_point_gifts"]
+        post.assert_not_called()
+
+
+class TestApplyScoringRules:
+    """A rule change re-scores stored gifts without remote calls."""
+
+    def test_rule_change_rescores_event(self, gifts_db, monkeypatch):
+        conn, calls = gifts_db
+        post, _ = _fake_graphql({1: _metadata(227), 2: _metadata(218), 3: _metadata(218)})
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        asyncio.run(rescore_zero_point_gifts())
+        monkeypatch.setattr(swapfest.requests, "post", Mock(side_effect=AssertionError("remote call")))
+
+        conn.execute("UPDATE gift_scoring_rules SET points = 10 WHERE set_flow_id = 218")
+        conn.commit()
+        updated = asyncio.run(apply_scoring_rules("2025-12-01", "2026-01-01"))
+
+        assert updated == 4
+        points = dict(conn.execute("SELECT txn_id, points FROM gifts").fetchall())
+        assert points == {"t1": 150, "t2": 150, "t3": 10, "t4": 10, "t5": 50, "t6": 0}
+        assert swapfest._scoring_rules[(218, None, "Nikola Jokić")] == 10
+
+
+class TestBackfill:
+    """Test the sharded historical backfill."""
+
+    @pytest.fixture
+    def chain(self, gifts_db, monkeypatch):
+        """Fake chain: one gift every 10 blocks in [1000, 1199]; records scanned ranges."""
+        scanned = []
+        in_flight = {"now": 0, "max": 0}
+
+        async def _get_block_gifts(height, offset):
+            scanned.append((height, height + offset))
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.001)
+            in_flight["now"] -= 1
+            return [{"txn_id": f"bf{h}", "moment_id": str(h), "from": "0xb", "timestamp": "2025-12-10"}
+                    for h in range(height, height + offset + 1) if h % 10 == 0]
+
+        monkeypatch.setattr(swapfest, "get_block_gifts", _get_block_gifts)
+        monkeypatch.setattr(swapfest.helpers, "db_type", "sqlite")
+        post, _ = _fake_graphql({h: _metadata(218) for h in range(1000, 1200)})
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        return scanned, in_flight
+
+    def test_split_block_range(self):
+        assert split_block_range(1, 10, 3) == [(1, 4), (5, 7), (8, 10)]
+        assert split_block_range(5, 6, 8) == [(5, 5), (6, 6)]
+        ranges = split_block_range(100, 1099, 7)
+        assert ranges[0][0] == 100 and ranges[-1][1] == 1099
+        assert all(b[0] == a[1] + 1 for a, b in zip(ranges, ranges[1:]))
+
+    def test_shards_run_concurrently_and_checkpoint(self, gifts_db, chain):
+        conn, _ = gifts_db
+        scanned, in_flight = chain
+
+        stats = asyncio.run(backfill(1000, 1199, shards=4, offset=24))
+
+        assert stats["blocks"] == 200 and stats["gifts"] == 20
+        assert in_flight["max"] > 1
+        assert sorted(h for lo, hi in scanned for h in range(lo, hi + 1)) == list(range(1000, 1200))
+        assert conn.execute("SELECT COUNT(*), SUM(points) FROM gifts WHERE txn_id LIKE 'bf%'").fetchone() == (20, 60)
+        state = dict(conn.execute("SELECT key, value FROM scraper_state").fetchall())
+        assert state == {BACKFILL_COVERED_KEY: '[[1000, 1199]]'}
+
+    def test_range_helpers(self):
+        assert merge_block_ranges([(20, 30), (1, 5), (6, 9), (25, 40)]) == [(1, 9), (20, 40)]
+        assert uncovered_block_ranges(1, 50, [(1, 9), (20, 40)]) == [(10, 19), (41, 50)]
+        assert uncovered_block_ranges(1, 50, [(0, 60)]) == []
+        assert split_block_ranges([(10, 19), (41, 50)], 3) == [[(10, 16)], [(17, 19), (41, 44)], [(45, 50)]]
+        assert split_block_ranges([], 4) == []
+
+    def test_resume_with_different_shard_count(self, gifts_db, chain):
+        conn, _ = gifts_db
+        scanned, _ = chain
+        conn.execute("INSERT INTO scraper_state VALUES (?, '[[1000, 1049], [1100, 1124]]')", (BACKFILL_COVERED_KEY,))
+        conn.commit()
+
+        stats = asyncio.run(backfill(1000, 1199, shards=3, offset=24))
+
+        assert stats["blocks"] == 125
+        assert sorted(h for lo, hi in scanned for h in range(lo, hi + 1)) == \
+            list(range(1050, 1100)) + list(range(1125, 1200))
+        assert conn.execute("SELECT value FROM scraper_state WHERE key = ?",
+                            (BACKFILL_COVERED_KEY,)).fetchone()[0] == '[[1000, 1199]]'
+
+    def test_resumes_and_merges_idempotently(self, gifts_db, chain):
+        conn, _ = gifts_db
+        scanned, _ = chain
+        # An older run's per-shard checkpoint stopped half way; the live tail
+        # already stored one of its gifts
+        conn.execute("INSERT INTO scraper_state VALUES ('backfill:1000-1049', '1024')")
+        conn.execute("INSERT INTO gifts VALUES ('bf1030', 1030, '0xb', 3, '2025-12-10')")
+        conn.execute("INSERT INTO scraper_state VALUES ('last_block', '5000')")
+        conn.commit()
+
+        stats = asyncio.run(backfill(1000, 1199, shards=4, offset=24))
+
+        assert min(lo for lo, _ in scanned) == 1025
+        assert stats["blocks"] == 175
+        assert conn.execute("SELECT COUNT(*) FROM gifts WHERE txn_id LIKE 'bf%'").fetchone()[0] == 17  # 1000-1024 skipped
+        assert conn.execute("SELECT value FROM scraper_state WHERE key = 'last_block'").fetchone()[0] == '5000'
+
+        scanned.clear()
+        assert asyncio.run(backfill(1000, 1199, shards=4, offset=24))["blocks"] == 0
+        assert scanned == []
+
+
+class TestGiftConsumer:
+    """Gifts recorded from the shared event bus."""
+
+    def _ev(self, event_type, tx, **fields):
+        return {"type": event_type, "transaction_id": tx, "block_height": 1,
+                "block_timestamp": "2025-12-10T01:00:00Z", "transaction_index": 0,
+                "event_index": 0, "fields": fields}
+
+    def test_records_gifts_and_skips_purchases(self, gifts_db, monkeypatch):
+        conn, _ = gifts_db
+        monkeypatch.setattr(swapfest.helpers, "db_type", "sqlite")
+        post, graphql_calls = _fake_graphql({10: _metadata(227)})
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        to_us = swapfest.FLOW_ACCOUNT
+        events = [
+            self._ev(swapfest.TOPSHOT_WITHDRAW, "g1", id="10", **{"from": "0xfan"}),
+            self._ev(swapfest.TOPSHOT_DEPOSIT, "g1", id="10", to=to_us),
+            self._ev(swapfest.TOPSHOT_WITHDRAW, "buy", id="11", **{"from": "0xseller"}),
+            self._ev(swapfest.TOPSHOT_DEPOSIT, "buy", id="11", to=to_us),
+            self._ev(swapfest.PURCHASE_EVENT_TYPES[0], "buy"),
+            self._ev(swapfest.TOPSHOT_DEPOSIT, "other", id="12", to="0xelse"),
+        ]
+
+        assert swapfest.apply_gift_events(conn, "sqlite", events, 1, 5) == 1
+
+        row = conn.execute("SELECT moment_id, from_address, points, timestamp FROM gifts WHERE txn_id = 'g1'").fetchone()
+        assert row == (10, "0xfan", 0, "2025-12-10T01:00:00Z")
+        assert conn.execute("SELECT COUNT(*) FROM gifts WHERE txn_id IN ('buy', 'other')").fetchone()[0] == 0
+        assert graphql_calls == []  # nothing upstream while the bus holds dispatch_lock
+
+        swapfest.gift_scoring_tick()
+
+        assert len(graphql_calls) == 1 and sorted(graphql_calls[0]) == [1, 2, 3, 10]
+        assert conn.execute("SELECT points FROM gifts WHERE txn_id = 'g1'").fetchone()[0] == 150
+
+    def test_cached_metadata_scores_immediately(self, gifts_db, monkeypatch):
+        conn, _ = gifts_db
+        monkeypatch.setattr(swapfest.helpers, "db_type", "sqlite")
+        post = Mock()
+        monkeypatch.setattr(swapfest.requests, "post", post)
+        save_moment_metadata(conn.cursor(), [moment_metadata_row(10, _metadata(227))])
+        events = [
+            self._ev(swapfest.TOPSHOT_WITHDRAW, "g1", id="10", **{"from": "0xfan"}),
+            self._ev(swapfest.TOPSHOT_DEPOSIT, "g1", id="10", to=swapfest.FLOW_ACCOUNT),
+        ]
+
+        assert swapfest.apply_gift_events(conn, "sqlite", events, 1, 5) == 1
+
+        assert conn.execute("SELECT points FROM gifts WHERE txn_id = 'g1'").fetchone()[0] == 150
+        post.assert_not_called()
@@ -0,0 +1,155 @@
+"""Unit tests for the weighted sweepstakes draw engine."""
+
+import bisect
+import random
+import sqlite3
+import time
+import pytest
+from collections import Counter
+from itertools import accumulate
+
+from utils.sweepstakes import (
+    load_entries, draw_winners, run_draw, record_draw, load_draw, list_draws,
+    replay_draw, entries_digest,
+)
+from bot.swapfest_commands import _draw_sweepstakes
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE gifts (txn_id TEXT, moment_id BIGINT, from_address TEXT, points INTEGER, timestamp TEXT);
+        CREATE TABLE completed_swaps (
+            tx_id TEXT PRIMARY KEY, user_addr TEXT NOT NULL, moment_ids TEXT NOT NULL,
+            mvp_amount REAL NOT NULL, mvp_tx_id TEXT, completed_at BIGINT NOT NULL,
+            points INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE sweepstakes_draws (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, since TEXT, until TEXT,
+            seed TEXT NOT NULL, num_winners INTEGER NOT NULL, with_replacement INTEGER NOT NULL DEFAULT 0,
+            num_wallets INTEGER NOT NULL, total_entries BIGINT NOT NULL, entries_digest TEXT NOT NULL,
+            winners TEXT NOT NULL, created_by TEXT, created_at BIGINT NOT NULL
+        );
+    ''')
+    c.executemany('INSERT INTO completed_swaps VALUES (?, ?, ?, 1.5, NULL, ?, ?)', [
+        ('t1', '0xb', '[1]', 100, 2),
+        ('t2', '0xa', '[2]', 200, 5),
+        ('t3', '0xb', '[3]', 300, 1),
+        ('t4', '0xc', '[4]', 400, 0),
+    ])
+    c.executemany('INSERT INTO gifts VALUES (?, ?, ?, ?, ?)', [
+        ('g1', 1, '0xfan', 10, '2025-12-10T00:00:00.000Z'),
+        ('g2', 2, '0xfan', 1, '2025-12-11T00:00:00.000Z'),
+        ('g3', 3, '0xother', 3, '2025-12-11T00:00:00.000Z'),
+        ('g4', 4, '0xearly', 50, '2025-01-01T00:00:00.000Z'),   # outside the Swapfest
+    ])
+    yield c
+    c.close()
+
+
+def _naive_without_replacement(entries, n, seed):
+    """Reference: rebuild the prefix sums after every pick."""
+    rng = random.Random(str(seed))
+    pool = list(entries)
+    winners = []
+    for _ in range(min(n, len(pool))):
+        prefix = list(accumulate(count for _, count in pool))
+        idx = bisect.bisect_right(prefix, rng.randrange(prefix[-1]))
+        winners.append(pool.pop(idx)[0])
+    return winners
+
+
+class TestLoadEntries:
+    """Entries come from one aggregate per source, ordered by wallet."""
+
+    def test_swaps_source(self, conn):
+        assert load_entries(conn.cursor(), 'swaps') == [('0xa', 5), ('0xb', 3)]
+        assert load_entries(conn.cursor(), 'swaps', since=250) == [('0xb', 1)]
+
+    def test_swapfest_source_uses_event_window(self, conn):
+        assert load_entries(conn.cursor(), 'swapfest') == [('0xfan', 11), ('0xother', 3)]
+
+    def test_unknown_source(self, conn):
+        with pytest.raises(ValueError):
+            load_entries(conn.cursor(), 'lottery')
+
+
+class TestDrawWinners:
+    """Binary search over prefix sums, with and without replacement."""
+
+    ENTRIES = [(f'0x{i:04x}', (i * 7919) % 97 + 1) for i in range(300)]
+
+    def test_same_seed_same_winners(self):
+        a = draw_winners(self.ENTRIES, 10, 'audit-me')
+        assert a == draw_winners(self.ENTRIES, 10, 'audit-me')
+        assert a != draw_winners(self.ENTRIES, 10, 'other-seed')
+
+    def test_without_replacement_matches_reference(self):
+        for seed in ('a', 'b', 'c'):
+            assert draw_winners(self.ENTRIES, 50, seed) == _naive_without_replacement(self.ENTRIES, 50, seed)
+
+    def test_without_replacement_is_unique_and_capped(self):
+        winners = draw_winners([('0xa', 1), ('0xb', 1000)], 5, 's')
+        assert sorted(winners) == ['0xa', '0xb']
+
+    def test_with_replacement_follows_weights(self):
+        winners = draw_winners([('0xa', 1), ('0xb', 3)], 20000, 'dist', with_replacement=True)
+        share = Counter(winners)['0xb'] / len(winners)
+        assert 0.72 < share < 0.78
+
+    def test_empty_pool(self):
+        assert draw_winners([], 3, 's') == []
+
+
+class TestRecordedDraws:
+    """Draws are stored with their seed and entry digest and can be replayed."""
+
+    def test_record_and_replay(self, conn):
+        cur = conn.cursor()
+        entries = load_entries(cur, 'swaps')
+        draw = run_draw(entries, 1, seed='fixed')
+        draw_id = record_draw(cur, 'sqlite', 'swaps', None, None, draw, created_by='admin')
+        conn.commit()
+
+        stored = load_draw(cur, draw_id)
+        assert stored['winners'] == draw['winners']
+        assert stored['entries_digest'] == entries_digest(entries)
+        assert [d['id'] for d in list_draws(cur)] == [draw_id]
+        assert replay_draw(cur, stored) == {
+            'entries_match': True, 'winners_match': True, 'winners': draw['winners'],
+        }
+
+        # New swap points change the pool: the replay reports it
+        conn.execute("INSERT INTO completed_swaps VALUES ('t5', '0xz', '[5]', 1.5, NULL, 500, 9)")
+        assert replay_draw(cur, stored)['entries_match'] is False
+
+    def test_command_helper_records_resolved_window(self, conn):
+        draw = _draw_sweepstakes(conn, conn.cursor(), 'sqlite', 'swapfest', 2, 'cmd', False, 'admin#1')
+
+        stored = load_draw(conn.cursor(), draw['id'])
+        assert sorted(stored['winners']) == ['0xfan', '0xother']
+        assert stored['since'] == '2025-12-09T22:00:00.000Z'
+        assert stored['created_by'] == 'admin#1'
+
+
+class TestDrawBenchmark:
+    """Draw time over millions of entries stays in the milliseconds."""
+
+    @pytest.mark.parametrize("wallets", [10_000, 200_000])
+    def test_draw_speed(self, wallets):
+        rng = random.Random(7)
+        entries = [(f'0x{i:016x}', rng.randint(1, 50)) for i in range(wallets)]
+        total = sum(count for _, count in entries)
+
+        started = time.perf_counter()
+        draw_winners(entries, 100, 'bench')
+        without_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        draw_winners(entries, 100, 'bench', with_replacement=True)
+        with_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n{wallets:,} wallets / {total:,} entries: 100 winners in "
+              f"{without_ms:.1f} ms (no replacement), {with_ms:.1f} ms (with replacement)")
+        assert without_ms < 2000 and with_ms < 2000
@@ -0,0 +1,77 @@
+"""Tests for the deterministic synthetic load-test dataset generator."""
+
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from db.init import initialize_database
+from loadtest.synthetic import generate, reset_tables, Generator, TABLES, SCALES
+
+
+def _fresh_db(path):
+    conn = sqlite3.connect(str(path))
+    with patch('db.init._seed_jokic_editions'):
+        initialize_database(conn, 'sqlite')
+    return conn
+
+
+def _dump(conn, table):
+    # Only generated columns: defaults such as created_at depend on the clock
+    columns, _ = getattr(Generator(7, 'tiny'), table)()
+    return conn.execute(f'SELECT {", ".join(columns)} FROM {table} ORDER BY 1, 2').fetchall()
+
+
+@pytest.fixture
+def filled(tmp_path):
+    conn = _fresh_db(tmp_path / 'a.db')
+    counts = generate(conn, 'sqlite', 'tiny', seed=7, log=lambda *_: None)
+    yield conn, counts
+    conn.close()
+
+
+class TestGenerate:
+    """Every schema table is filled, and the same seed gives the same rows."""
+
+    def test_fills_every_table(self, filled):
+        conn, counts = filled
+        assert set(counts) == set(TABLES)
+        for table in TABLES:
+            assert conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] == counts[table] > 0, table
+        assert counts['gifts'] == SCALES['tiny']['gifts']
+
+    def test_same_seed_is_deterministic(self, filled, tmp_path):
+        conn, _ = filled
+        other = _fresh_db(tmp_path / 'b.db')
+        generate(other, 'sqlite', 'tiny', seed=7, log=lambda *_: None)
+        for table in ('gifts', 'fastbreak_rankings', 'bracket_matchups', 'chain_events'):
+            assert _dump(conn, table) == _dump(other, table), table
+        other.close()
+
+    def test_data_is_consistent(self, filled):
+        conn, _ = filled
+        # Bracket rounds halve the field and winners come from the matchup
+        bad = conn.execute('''
+            SELECT COUNT(*) FROM bracket_matchups
+            WHERE status = 'COMPLETE' AND winner_wallet NOT IN (player1_wallet, player2_wallet)
+        ''').fetchone()[0]
+        assert bad == 0
+        # Rankings are dense 1..n per finished FastBreak
+        for fb_id, n, top in conn.execute(
+                'SELECT fastbreak_id, COUNT(*), MAX(rank) FROM fastbreak_rankings GROUP BY fastbreak_id'):
+            assert n == top
+        # Contest entries point at generated contests
+        orphans = conn.execute('''
+            SELECT COUNT(*) FROM fastbreakContestEntries e
+            LEFT JOIN fastbreakContests c ON c.id = e.contest_id WHERE c.id IS NULL
+        ''').fetchone()[0]
+        assert orphans == 0
+
+    def test_reset_allows_regeneration(self, filled):
+        conn, counts = filled
+        reset_tables(conn, 'sqlite')
+        assert conn.execute('SELECT COUNT(*) FROM gifts').fetchone()[0] == 0
+        assert generate(conn, 'sqlite', 'tiny', seed=7, log=lambda *_: None) == counts
+
+    def test_unknown_scale(self):
+        with pytest.raises(ValueError):
+            Generator(scale='huge')
@@ -0,0 +1,118 @@
+"""Unit tests for the treasury inventory indexer."""
+
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch
+
+from bot import treasury_indexer
+from bot.treasury_indexer import (
+    apply_treasury_events, reconcile_treasury_inventory, treasury_index_tick,
+)
+from bot.event_bus import dispatch_lock
+
+TREASURY = '0xf853bd09d46e7db6'
+
+
+@pytest.fixture
+def conn():
+    """In-memory DB with just the tables the indexer touches."""
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE scraper_state (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE jokic_editions (
+            edition_id TEXT PRIMARY KEY, play_flow_id INTEGER, tier TEXT,
+            set_name TEXT, series_number INTEGER, play_headline TEXT,
+            team TEXT, image_url TEXT
+        );
+        CREATE TABLE treasury_inventory (
+            moment_id BIGINT PRIMARY KEY, play_id INTEGER, set_name TEXT,
+            serial_number INTEGER, subedition INTEGER DEFAULT 0,
+            is_locked INTEGER DEFAULT 0, edition_id TEXT, tier TEXT,
+            edition_set_name TEXT, series_number INTEGER, play_headline TEXT,
+            team TEXT, image_url TEXT, updated_at BIGINT
+        );
+        INSERT INTO jokic_editions VALUES
+            ('ed1+0', 10, 'RARE', 'Metallic Gold LE', 2, 'Dime', 'DEN', 'img');
+    ''')
+    yield c
+    c.close()
+
+
+def _raw(mid, play_id=10, set_name='Metallic Gold LE'):
+    return {'id': mid, 'playID': play_id, 'setName': set_name, 'serial': mid,
+            'isLocked': False, 'subedition': 0}
+
+
+def _ev(mid, height, **fields):
+    return {'block_height': height, 'transaction_id': 'tx', 'transaction_index': 0,
+            'event_index': 0, 'fields': {'id': str(mid), **fields}}
+
+
+class TestApplyTreasuryEvents:
+    """Test incremental Deposit/Withdraw application."""
+
+    @patch('bot.treasury_indexer.fetch_treasury_moments')
+    @patch('bot.treasury_indexer.get_events')
+    def test_applies_deposits_and_withdrawals(self, mock_events, mock_fetch, conn):
+        conn.execute("INSERT INTO treasury_inventory (moment_id, edition_id) VALUES (2, 'ed1+0')")
+        deposits = [_ev(1, 100, to=TREASURY), _ev(3, 100, to='0xsomeoneelse')]
+        withdrawals = [_ev(2, 101, **{'from': TREASURY})]
+        mock_events.side_effect = lambda t, s, e: deposits if t == treasury_indexer.TOPSHOT_DEPOSIT else withdrawals
+        mock_fetch.return_value = [_raw(1)]
+
+        arrived, left = apply_treasury_events(conn, 'sqlite', 100, 110)
+
+        assert (arrived, left) == (1, 1)
+        mock_fetch.assert_called_once_with([1])
+        rows = conn.execute("SELECT moment_id, edition_id, tier FROM treasury_inventory").fetchall()
+        assert rows == [(1, 'ed1+0', 'RARE')]
+        checkpoint = conn.execute("SELECT value FROM scraper_state WHERE key = 'treasury_index_block'").fetchone()
+        assert checkpoint == ('110',)
+
+    @patch('bot.treasury_indexer.fetch_treasury_moments')
+    @patch('bot.treasury_indexer.get_events')
+    def test_deposit_then_withdraw_in_window_is_absent(self, mock_events, mock_fetch, conn):
+        deposits = [_ev(5, 100, to=TREASURY)]
+        withdrawals = [_ev(5, 105, **{'from': TREASURY})]
+        mock_events.side_effect = lambda t, s, e: deposits if t == treasury_indexer.TOPSHOT_DEPOSIT else withdrawals
+
+        apply_treasury_events(conn, 'sqlite', 100, 110)
+
+        mock_fetch.assert_not_called()
+        assert conn.execute("SELECT COUNT(*) FROM treasury_inventory").fetchone()[0] == 0
+
+
+class TestReconcile:
+    """Test full-scan reconciliation."""
+
+    @patch('bot.treasury_indexer.fetch_treasury_moments')
+    def test_reconcile_replaces_stale_rows(self, mock_fetch, conn):
+        conn.execute("INSERT INTO treasury_inventory (moment_id) VALUES (99)")
+        mock_fetch.return_value = [_raw(1), _raw(7, play_id=555, set_name='Other')]
+
+        count = reconcile_treasury_inventory(conn, 'sqlite', sealed_height=500)
+
+        assert count == 2
+        rows = dict(conn.execute("SELECT moment_id, edition_id FROM treasury_inventory").fetchall())
+        # Non-Jokic moment is indexed without an edition so it is filtered from the buy page
+        assert rows == {1: 'ed1+0', 7: None}
+        state = dict(conn.execute("SELECT key, value FROM scraper_state").fetchall())
+        assert state['treasury_index_block'] == '500'
+        assert 'treasury_index_reconciled_at' in state
+
+
+class TestIndexTick:
+    """The reconcile moves the shared bus checkpoint, so it runs under the dispatch lock."""
+
+    @patch('bot.treasury_indexer.get_sealed_height', return_value=800)
+    @patch('bot.treasury_indexer.get_db_connection')
+    @patch('bot.treasury_indexer.reconcile_treasury_inventory')
+    def test_reconcile_holds_dispatch_lock(self, mock_reconcile, mock_conn, mock_sealed, conn):
+        mock_conn.return_value = (Mock(wraps=conn), 'sqlite')
+        mock_reconcile.side_effect = lambda *a, **kw: held.append(dispatch_lock.locked())
+        held = []
+
+        treasury_index_tick()
+
+        assert held == [True]
+        assert not dispatch_lock.locked()
@@ -0,0 +1,179 @@
+"""Unit tests for background transaction verification and its sealed-result cache."""
+
+import base64
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from bot import tx_verifier
+from bot.tx_verifier import (
+    register_transaction, load_verification, get_verified_transaction,
+    verify_due, verified_deposits, backoff_delay, prune_expired, VerificationQueueFull,
+    PENDING, SEALED, FAILED, EXPIRED, UNAVAILABLE,
+)
+
+DEPOSIT = 'A.0b2a3299cc857e29.TopShot.Deposit'
+TREASURY = '0xf853bd09d46e7db6'
+TX = 'ab' * 32
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(':memory:')
+    c.executescript('''
+        CREATE TABLE tx_verifications (
+            tx_id TEXT PRIMARY KEY, status TEXT NOT NULL, chain_status TEXT,
+            proposer TEXT, error_message TEXT, events TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0, registered_at BIGINT NOT NULL,
+            next_check_at BIGINT NOT NULL, sealed_at BIGINT
+        );
+    ''')
+    yield c
+    c.close()
+
+
+def _deposit(moment_id, to=TREASURY):
+    payload = {'type': 'Event', 'value': {'id': DEPOSIT, 'fields': [
+        {'name': 'id', 'value': {'type': 'UInt64', 'value': str(moment_id)}},
+        {'name': 'to', 'value': {'type': 'Optional', 'value': {'type': 'Address', 'value': to}}},
+    ]}}
+    return {'type': DEPOSIT, 'payload': base64.b64encode(json.dumps(payload).encode()).decode()}
+
+
+def _result(status, events=(), error=''):
+    return {'status': status, 'error_message': error, 'events': list(events)}
+
+
+class TestGetVerifiedTransaction:
+    """Endpoints read the cache; the chain is only hit for unknown or due txIds."""
+
+    @patch('bot.tx_verifier.get_transaction', return_value={'proposer': '0xABC'})
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_sealed_result_is_cached(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Sealed', [_deposit(7), _deposit(8, '0xother')])
+
+        first = get_verified_transaction(conn, 'sqlite', TX, now=1000)
+        second = get_verified_transaction(conn, 'sqlite', TX, now=1001)
+
+        assert first['status'] == SEALED and first['proposer'] == '0xabc'
+        assert second == first
+        assert mock_result.call_count == 1 and mock_tx.call_count == 1
+        assert [f['id'] for f in verified_deposits(second, DEPOSIT, TREASURY)] == [7]
+
+    @patch('bot.tx_verifier.get_transaction')
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_pending_retries_wait_for_backoff(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Executed')
+
+        row = get_verified_transaction(conn, 'sqlite', TX, now=1000)
+        assert row['status'] == PENDING and row['chain_status'] == 'EXECUTED'
+        assert row['next_check_at'] == 1000 + backoff_delay(1)
+
+        # Client retries inside the backoff window: no chain calls
+        for t in range(1001, 1000 + backoff_delay(1)):
+            assert get_verified_transaction(conn, 'sqlite', TX, now=t)['status'] == PENDING
+        assert mock_result.call_count == 1
+        mock_tx.assert_not_called()
+
+        mock_result.return_value = _result('Sealed', [_deposit(7)])
+        mock_tx.return_value = {'proposer': '0xabc'}
+        row = get_verified_transaction(conn, 'sqlite', TX, now=1000 + backoff_delay(1))
+        assert row['status'] == SEALED
+        assert mock_result.call_count == 2
+
+    @patch('bot.tx_verifier.get_transaction', return_value={'proposer': '0xabc'})
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_failed_tx_is_final(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Sealed', error='panic: nope')
+
+        row = get_verified_transaction(conn, 'sqlite', TX, now=1000)
+
+        assert row['status'] == FAILED
+        assert row['error_message'] == 'panic: nope'
+
+    @patch('bot.tx_verifier.get_transaction_result', side_effect=Exception('timeout'))
+    def test_unreachable_flow_stays_pending(self, mock_result, conn):
+        row = get_verified_transaction(conn, 'sqlite', TX, now=1000)
+
+        assert row['status'] == PENDING
+        assert row['chain_status'] == UNAVAILABLE
+
+
+class TestSealedRowsAreImmutable:
+    """A final result is written once; re-registering or re-checking cannot change it."""
+
+    @patch('bot.tx_verifier.get_transaction', return_value={'proposer': '0xabc'})
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_register_and_check_leave_sealed_row_alone(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Sealed', [_deposit(7)])
+        sealed = get_verified_transaction(conn, 'sqlite', TX, now=1000)
+
+        register_transaction(conn.cursor(), 'sqlite', TX, now=2000)
+        tx_verifier._seal(conn.cursor(), dict(sealed, status=FAILED, error_message='forged'))
+        conn.commit()
+
+        assert load_verification(conn.cursor(), TX) == sealed
+        assert mock_result.call_count == 1
+
+
+class TestWorker:
+    """The worker checks due PENDING rows and gives up after VERIFY_MAX_AGE."""
+
+    @patch('bot.tx_verifier.get_transaction', return_value={'proposer': '0xabc'})
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_verify_due_seals_registered_transactions(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Sealed', [_deposit(7)])
+        register_transaction(conn.cursor(), 'sqlite', TX, now=1000)
+        register_transaction(conn.cursor(), 'sqlite', 'cd' * 32, now=1005)
+        conn.commit()
+
+        assert verify_due(conn, now=1001) == 1
+        assert load_verification(conn.cursor(), TX)['status'] == SEALED
+        assert load_verification(conn.cursor(), 'cd' * 32)['status'] == PENDING
+
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_gives_up_and_reregisters(self, mock_result, conn):
+        mock_result.return_value = _result('Pending')
+        register_transaction(conn.cursor(), 'sqlite', TX, now=1000)
+        conn.commit()
+
+        verify_due(conn, now=1000 + tx_verifier.VERIFY_MAX_AGE)
+        assert load_verification(conn.cursor(), TX)['status'] == EXPIRED
+
+        mock_result.return_value = _result('Sealed', [_deposit(7)])
+        with patch('bot.tx_verifier.get_transaction', return_value={}):
+            row = get_verified_transaction(conn, 'sqlite', TX, now=5000)
+        assert row['status'] == SEALED
+
+
+class TestRegistrationLimits:
+    """Ids are normalized, the PENDING queue is capped and EXPIRED rows are pruned."""
+
+    @patch('bot.tx_verifier.get_transaction', return_value={'proposer': '0xabc'})
+    @patch('bot.tx_verifier.get_transaction_result')
+    def test_raw_ids_share_one_row(self, mock_result, mock_tx, conn):
+        mock_result.return_value = _result('Sealed', [_deposit(7)])
+
+        first = get_verified_transaction(conn, 'sqlite', ' 0x' + TX.upper() + ' ', now=1000)
+        second = get_verified_transaction(conn, 'sqlite', TX, now=1001)
+
+        assert first['tx_id'] == TX and second == first
+        assert mock_result.call_count == 1
+
+    def test_new_ids_refused_when_queue_is_full(self, conn, monkeypatch):
+        monkeypatch.setattr(tx_verifier, 'VERIFY_MAX_PENDING', 1)
+        register_transaction(conn.cursor(), 'sqlite', TX, now=1000)
+
+        with pytest.raises(VerificationQueueFull):
+            register_transaction(conn.cursor(), 'sqlite', 'cd' * 32, now=1000)
+        register_transaction(conn.cursor(), 'sqlite', TX, now=1001)  # already queued
+        assert conn.execute("SELECT COUNT(*) FROM tx_verifications").fetchone()[0] == 1
+
+    def test_prunes_only_old_expired_rows(self, conn):
+        conn.executemany(
+            "INSERT INTO tx_verifications (tx_id, status, registered_at, next_check_at) VALUES (?, ?, ?, ?)",
+            [('old', EXPIRED, 0, 0), ('recent', EXPIRED, 9000, 9000), ('sealed', SEALED, 0, 0)])
+
+        assert prune_expired(conn, now=10000, retention=5000) == 1
+        assert sorted(r[0] for r in conn.execute("SELECT tx_id FROM tx_verifications")) == ['recent', 'sealed']
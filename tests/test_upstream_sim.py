@@ -0,0 +1,115 @@
+"""Tests for the offline TopShot / Flow REST / FlowScan simulator."""
+
+import pytest
+from unittest.mock import patch
+
+from loadtest.upstream_sim import SimWorld, SimServer, Injection, create_app, parse_graphql
+from utils.cdc_events import TOPSHOT_DEPOSIT
+
+
+@pytest.fixture
+def world():
+    now = [0.0]
+    w = SimWorld(seed=7, scale='tiny', base_height=1000, block_seconds=1.0, clock=lambda: now[0])
+    now[0] = 4000.0                 # 4000 blocks sealed since start
+    return w
+
+
+@pytest.fixture
+def client(world):
+    return create_app(world).test_client()
+
+
+def _gql(client, query, variables=None):
+    return client.post('/graphql', json={'query': query, 'variables': variables or {}}).get_json()
+
+
+class TestGraphQL:
+    """The operations the app sends resolve to deterministic data."""
+
+    def test_aliased_minted_moments(self, client):
+        query = 'query BatchEnrich { m0: getMintedMoment(momentId: "11") { data { id } } ' \
+                'm1: getMintedMoment(momentId: "12") { data { id } } }'
+        data = _gql(client, query)['data']
+        assert data['m0']['data']['id'] == '11' and data['m1']['data']['id'] == '12'
+        assert _gql(client, query)['data'] == data
+
+    def test_operation_name_is_not_a_field(self):
+        query = 'query getMintedMoment($momentId: ID!) { getMintedMoment(momentId: $momentId) { data { tier } } }'
+        assert parse_graphql(query, {'momentId': '5'}) == [('getMintedMoment', 'getMintedMoment', {'momentId': '5'})]
+
+    def test_leaders_page_and_user_filter(self, client, world):
+        fb_id = world.gen._fastbreak_list()[0][0]
+        query = 'query GetFastBreakLeadersByFastBreakId($input: X!) { getFastBreakLeadersV2(input: $input) { rank } }'
+        page = _gql(client, query, {'input': {'fastBreakId': fb_id, 'pagination': {'cursor': '', 'limit': 50}}})
+        leaders = page['data']['getFastBreakLeadersV2']
+        assert [l['rank'] for l in leaders['leaders']] == list(range(1, 51))
+        assert leaders['rightCursor'] == '50'
+
+        name = leaders['leaders'][3]['user']['username']
+        one = _gql(client, query, {'input': {'fastBreakId': fb_id, 'pagination': {'cursor': '', 'limit': 10},
+                                             'filters': {'byUsername': name}}})
+        assert one['data']['getFastBreakLeadersV2']['leaders'][0]['rank'] == 4
+
+    def test_runs_match_synthetic_fastbreaks(self, client, world):
+        data = _gql(client, 'query SearchFastBreakRuns($input: R!) { searchFastBreakRuns(input: $input) { id } }')
+        ids = {fb['id'] for run in data['data']['searchFastBreakRuns']['fastBreakRuns'] for fb in run['fastBreaks']}
+        assert ids == {fb[0] for fb in world.gen._fastbreak_list()}
+
+    def test_recorded_fixture_wins(self, world):
+        world.fixtures = {'graphql': {'getMintedMoment:9': {'data': {'id': '9', 'tier': 'MOMENT_TIER_ULTIMATE'}}}}
+        data = _gql(create_app(world).test_client(),
+                    '{ m0: getMintedMoment(momentId: "9") { data { tier } } }')['data']
+        assert data['m0']['data']['tier'] == 'MOMENT_TIER_ULTIMATE'
+
+
+class TestFlowRest:
+    """The app's own REST helpers work unchanged against the simulator."""
+
+    def test_events_and_transactions_round_trip(self, world):
+        from utils import flow_rest
+        with SimServer(world) as sim, patch.object(flow_rest, 'FLOW_REST_URL', sim.env()['FLOW_REST_URL']):
+            sealed = flow_rest.get_sealed_height()
+            assert sealed == 5000
+            events = flow_rest.get_events(TOPSHOT_DEPOSIT, sealed - 300, sealed)
+            assert events and all(e['fields']['to'].startswith('0x') for e in events)
+
+            tx_id = events[0]['transaction_id']
+            result = flow_rest.get_transaction_result(tx_id)
+            assert result['status'] == 'Sealed'
+            assert TOPSHOT_DEPOSIT in {e['type'] for e in result['events']}
+            assert flow_rest.get_transaction(tx_id)['id'] == tx_id
+
+    def test_unknown_and_future_lookups(self, client):
+        assert client.get('/v1/transaction_results/' + 'ab' * 32).status_code == 404
+        assert client.get('/v1/blocks?height=999999').status_code == 404
+        assert client.get('/flowscan/v1/blocks?height=sealed').get_json()[0]['header']['height'] == '5000'
+
+    def test_events_range_limit(self, client):
+        resp = client.get(f'/v1/events?type={TOPSHOT_DEPOSIT}&start_height=1000&end_height=1300')
+        assert resp.status_code == 400
+
+
+class TestInjection:
+    """Failures, rate limits and alias limits are applied per upstream."""
+
+    def test_errors_only_hit_the_configured_upstream(self, client):
+        client.post('/__sim/config', json={'flow': {'error_rate': 1.0}})
+        assert client.get('/v1/blocks?height=sealed').status_code == 503
+        assert client.get('/flowscan/v1/blocks?height=sealed').status_code == 200
+        assert client.get('/__sim/stats').get_json()['injected'] == {'flow:errors': 1}
+
+    def test_rate_limit_returns_retry_after(self, world):
+        app = create_app(world, {'topshot': Injection(rate_limit=1, burst=2)})
+        c = app.test_client()
+        codes = [c.post('/graphql', json={'query': '{ searchFastBreakRuns(input: {}) { id } }'}) for _ in range(3)]
+        assert [r.status_code for r in codes] == [200, 200, 429]
+        assert float(codes[2].headers['Retry-After']) > 0
+
+    def test_alias_limit(self, world):
+        c = create_app(world, {'topshot': Injection(max_aliases=1)}).test_client()
+        data = _gql(c, '{ a: getMintedMoment(momentId: "1") { id } b: getMintedMoment(momentId: "2") { id } }')
+        assert data['data'] is None and 'complexity' in data['errors'][0]['message']
+
+    def test_rejects_unknown_setting(self, client):
+        assert client.post('/__sim/config', json={'flow': {'bogus': 1}}).status_code == 400
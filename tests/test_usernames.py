@@ -0,0 +1,92 @@
+"""Unit tests for batched Discord username resolution."""
+
+import asyncio
+import sqlite3
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+from bot import usernames
+from bot.usernames import resolve_usernames
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE user_mapping (user_id BIGINT PRIMARY KEY, username TEXT NOT NULL)')
+    conn.execute("INSERT INTO user_mapping VALUES (1, 'stored_one')")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def counted_run_db(db):
+    """Replace run_db with an in-thread call on the test DB that records each call."""
+    calls = []
+
+    async def _run_db(fn, *args):
+        calls.append(fn.__name__)
+        result = fn(db, db.cursor(), *args)
+        db.commit()
+        return result
+
+    with patch.object(usernames, 'run_db', _run_db):
+        yield calls
+
+
+def _member(name):
+    m = Mock()
+    m.name = name
+    return m
+
+
+class TestResolveUsernames:
+    """Test the DB → cache → REST resolution order."""
+
+    def test_one_query_one_upsert(self, db, counted_run_db):
+        bot = Mock()
+        bot.get_user.return_value = None
+        bot.fetch_user = AsyncMock(side_effect=lambda uid: _member(f'fetched_{uid}'))
+        guild = Mock()
+        guild.get_member.side_effect = lambda uid: _member('guild_two') if uid == 2 else None
+
+        names = asyncio.run(resolve_usernames(bot, [1, 2, 3, 1, 3], 'sqlite', guild=guild))
+
+        assert names == {1: 'stored_one', 2: 'guild_two', 3: 'fetched_3'}
+        assert counted_run_db == ['_load_mapped_usernames', '_save_usernames']
+        bot.fetch_user.assert_awaited_once_with(3)
+        stored = dict(db.execute('SELECT user_id, username FROM user_mapping').fetchall())
+        assert stored == {1: 'stored_one', 2: 'guild_two', 3: 'fetched_3'}
+
+    def test_failed_fetch_falls_back_and_is_not_stored(self, db, counted_run_db):
+        bot = Mock()
+        bot.get_user.return_value = None
+        bot.fetch_user = AsyncMock(side_effect=Exception('404'))
+
+        names = asyncio.run(resolve_usernames(bot, [7], 'sqlite'))
+
+        assert names == {7: 'User 7'}
+        assert counted_run_db == ['_load_mapped_usernames']
+
+    def test_fetches_are_bounded(self, db, counted_run_db):
+        in_flight = {'now': 0, 'max': 0}
+
+        async def _fetch(uid):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.001)
+            in_flight['now'] -= 1
+            return _member(f'u{uid}')
+
+        bot = Mock()
+        bot.get_user.return_value = None
+        bot.fetch_user = _fetch
+
+        names = asyncio.run(resolve_usernames(bot, range(100, 130), 'sqlite'))
+
+        assert len(names) == 30
+        assert in_flight['max'] <= usernames.FETCH_CONCURRENCY
+
+    def test_empty_input(self, counted_run_db):
+        assert asyncio.run(resolve_usernames(Mock(), [], 'sqlite')) == {}
+        assert counted_run_db == []
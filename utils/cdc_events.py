@@ -0,0 +1,128 @@
+"""Shared decoder for Flow JSON-CDC event payloads.
+
+Event payloads arrive base64-encoded.  Most of the events we look at are
+deposits to *someone else's* address, so ``payload_may_mention`` first
+checks the still-encoded payload for the target address — a base64 string
+search against the address encoded at each of the three byte alignments —
+and only events that pass are decoded.  ``decode_fields`` parses the
+payload with ``json.loads`` and converts just the requested fields by their
+CDC type (integers, UFix64 → float, addresses → ``0x``-prefixed lowercase).
+It is the only JSON-CDC event decoder; ``utils.flow_rest.get_events`` uses
+it too.
+"""
+
+import base64
+import json
+from functools import lru_cache
+
+TOPSHOT_DEPOSIT = 'A.0b2a3299cc857e29.TopShot.Deposit'
+TOPSHOT_WITHDRAW = 'A.0b2a3299cc857e29.TopShot.Withdraw'
+NFT_DEPOSITED = 'A.1d7e57aa55817448.NonFungibleToken.Deposited'
+FT_DEPOSITED = 'A.f233dcee88fe0abe.FungibleToken.Deposited'
+
+_INT_TYPES = frozenset({
+    'Int', 'Int8', 'Int16', 'Int32', 'Int64', 'Int128', 'Int256',
+    'UInt', 'UInt8', 'UInt16', 'UInt32', 'UInt64', 'UInt128', 'UInt256',
+    'Word8', 'Word16', 'Word32', 'Word64',
+})
+_FIX_TYPES = frozenset({'UFix64', 'Fix64'})
+
+
+def normalize_address(address):
+    """``0xABC…`` / ``abc…`` → ``0xabc…``; None stays None."""
+    if not address:
+        return None
+    return '0x' + str(address).lower().removeprefix('0x')
+
+
+@lru_cache(maxsize=64)
+def address_patterns(address):
+    """Base64 fragments that appear in any payload containing ``address``.
+
+    Flow encodes addresses as lowercase hex, so the hex digits (without the
+    ``0x``) are encoded at each of the three possible byte offsets and the
+    characters that depend on neighbouring bytes are trimmed off.
+    """
+    needle = normalize_address(address)[2:].encode()
+    patterns = []
+    for offset in range(3):
+        encoded = base64.b64encode(b'\0' * offset + needle)
+        start = -(-offset * 8 // 6)                 # first char made only of needle bits
+        end = (offset + len(needle)) * 8 // 6       # last char made only of needle bits
+        patterns.append(encoded[start:end].decode())
+    return tuple(patterns)
+
+
+def payload_may_mention(payload_b64, address):
+    """False when the encoded payload certainly does not contain ``address``."""
+    if isinstance(payload_b64, bytes):
+        payload_b64 = payload_b64.decode('ascii')
+    return any(p in payload_b64 for p in address_patterns(address))
+
+
+def cdc_typed(value):
+    """Unwrap a JSON-CDC value to a typed Python value."""
+    while isinstance(value, dict):
+        cdc_type = value.get('type')
+        inner = value.get('value')
+        if cdc_type == 'Optional':
+            value = inner
+            continue
+        if inner is None:
+            return None
+        if cdc_type in _INT_TYPES:
+            return int(inner)
+        if cdc_type in _FIX_TYPES:
+            return float(inner)
+        if cdc_type == 'Address':
+            return normalize_address(inner)
+        if cdc_type == 'Type' and isinstance(inner, dict):
+            static = inner.get('staticType')
+            return static.get('typeID') if isinstance(static, dict) else static
+        value = inner
+    return value
+
+
+def decode_fields(payload_b64, names=None):
+    """Decode an event payload into ``{field_name: typed value}``.
+
+    With ``names``, only those fields are converted and the scan stops as
+    soon as all of them have been seen.
+    """
+    payload = json.loads(base64.b64decode(payload_b64))
+    fields = (payload.get('value') or {}).get('fields') or []
+    if names is None:
+        return {f.get('name'): cdc_typed(f.get('value')) for f in fields}
+    wanted = set(names)
+    out = {}
+    for f in fields:
+        name = f.get('name')
+        if name in wanted:
+            out[name] = cdc_typed(f.get('value'))
+            if len(out) == len(wanted):
+                break
+    return out
+
+
+def iter_deposits(events, event_type, to_address, names=('id', 'to')):
+    """Yield ``(event, fields)`` for ``event_type`` events deposited to ``to_address``.
+
+    ``events`` are Flow REST event dicts (``type``, ``payload``, ...); pass
+    ``event_type=None`` when the source already filtered by type.  Events
+    of other types, payloads that fail the address prefilter and
+    undecodable payloads are skipped.  ``'to'`` is always decoded.
+    """
+    target = normalize_address(to_address)
+    names = tuple(dict.fromkeys((*names, 'to')))
+    for ev in events:
+        if event_type and ev.get('type') != event_type:
+            continue
+        payload = ev.get('payload')
+        if not payload or not payload_may_mention(payload, target):
+            continue
+        try:
+            fields = decode_fields(payload, names)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        if fields.get('to') == target:
+            yield ev, fields
@@ -0,0 +1,191 @@
+"""Final standings for FastBreak prediction contests.
+
+Once a contest is CLOSED and its FastBreak has FINISHED, ranks can no longer
+change, so the leaderboard is computed one last time and frozen into
+``fastbreak_contest_standings``.  Views of that contest then read the
+snapshot instead of querying TopShot once per predicted username.
+"""
+
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.helpers import (
+    prepare_query, get_rank_and_lineup_for_user, extract_fastbreak_runs,
+)
+
+FB_FINISHED = 'FAST_BREAK_FINISHED'
+
+
+def is_fastbreak_finished(cursor, fastbreak_id, remote=True):
+    """True once TopShot reports the FastBreak as finished.
+
+    Checks the local ``fastbreaks`` table first (filled by
+    ``update_fastbreaks_table``) and, unless ``remote`` is False, falls back
+    to one runs query.  Request handlers pass ``remote=False``.
+    """
+    cursor.execute(prepare_query("SELECT status FROM fastbreaks WHERE id = ?"), (fastbreak_id,))
+    row = cursor.fetchone()
+    if row and row[0] == FB_FINISHED:
+        return True
+    if not remote:
+        return False
+
+    try:
+        for run in extract_fastbreak_runs():
+            for fb in (run.get('fastBreaks') or []):
+                if fb and fb.get('id') == fastbreak_id:
+                    return fb.get('status') == FB_FINISHED
+    except Exception as e:
+        print(f"⚠️  FastBreak status lookup failed for {fastbreak_id}: {e}")
+    return False
+
+
+def _to_epoch_seconds(dt_val) -> int:
+    if dt_val is None:
+        return 2_147_483_647
+    if isinstance(dt_val, (int, float)):
+        return int(dt_val)
+    if isinstance(dt_val, datetime.datetime):
+        if dt_val.tzinfo is None:
+            dt_val = dt_val.replace(tzinfo=datetime.UTC)
+        return int(dt_val.timestamp())
+    if isinstance(dt_val, str):
+        try:
+            dt = datetime.datetime.fromisoformat(dt_val)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=datetime.UTC)
+            return int(dt.timestamp())
+        except Exception:
+            return 2_147_483_647
+    return 2_147_483_647
+
+
+def _created_at_str(created_at):
+    if isinstance(created_at, str):
+        return created_at
+    if isinstance(created_at, datetime.datetime):
+        return created_at.isoformat()
+    return None
+
+
+def build_contest_standings(entries, fastbreak_id, max_workers=8):
+    """Rank ``(wallet, prediction, created_at)`` entries by live FastBreak results.
+
+    Each unique prediction is looked up once.  Returns a list of dicts with
+    ``wallet, prediction, rank, points, lineup, createdAt, position`` ordered
+    by rank, ties broken by earliest entry.
+    """
+    unique_predictions = list({e[1] for e in entries if e[1]})
+
+    stats_map = {}
+
+    def _fetch(pred):
+        return pred, get_rank_and_lineup_for_user(pred, fastbreak_id)
+
+    if unique_predictions:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_fetch, pred): pred for pred in unique_predictions}
+            for fut in as_completed(futures):
+                pred, data = fut.result()
+                stats_map[pred] = data
+
+    standings = []
+    for wallet_addr, prediction, created_at in entries:
+        stats = stats_map.get(prediction, {})
+        standings.append({
+            "wallet": (wallet_addr or "").lower(),
+            "prediction": prediction,
+            "rank": stats.get("rank"),
+            "points": stats.get("points"),
+            "lineup": stats.get("players"),
+            "createdAt": _created_at_str(created_at),
+            "_createdEpoch": _to_epoch_seconds(created_at),
+        })
+
+    def _sort_key(x):
+        r = x["rank"]
+        rank_key = r if isinstance(r, int) and r is not None else 1_000_000_000
+        return (rank_key, x["_createdEpoch"])
+
+    standings.sort(key=_sort_key)
+    for i, item in enumerate(standings):
+        item["position"] = i + 1
+        item.pop("_createdEpoch", None)
+    return standings
+
+
+def load_contest_standings(cursor, contest_id):
+    """Return the frozen standings for a contest, or None if not snapshotted."""
+    cursor.execute(prepare_query('''
+        SELECT position, wallet, prediction, rank, points, lineup, created_at
+        FROM fastbreak_contest_standings
+        WHERE contest_id = ?
+        ORDER BY position
+    '''), (contest_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    return [{
+        "wallet": r[1],
+        "prediction": r[2],
+        "rank": r[3],
+        "points": r[4],
+        "lineup": json.loads(r[5]) if r[5] else None,
+        "createdAt": r[6],
+        "position": r[0],
+    } for r in rows]
+
+
+def save_contest_standings(conn, contest_id, standings):
+    """Replace the snapshot for ``contest_id`` with ``standings`` and commit."""
+    cursor = conn.cursor()
+    frozen_at = int(time.time())
+    cursor.execute(prepare_query(
+        "DELETE FROM fastbreak_contest_standings WHERE contest_id = ?"
+    ), (contest_id,))
+    cursor.executemany(prepare_query('''
+        INSERT INTO fastbreak_contest_standings
+            (contest_id, position, wallet, prediction, rank, points, lineup, created_at, frozen_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''), [
+        (contest_id, s["position"], s["wallet"], s["prediction"], s["rank"], s["points"],
+         json.dumps(s["lineup"]) if s["lineup"] is not None else None,
+         s["createdAt"], frozen_at)
+        for s in standings
+    ])
+    conn.commit()
+
+
+def freeze_contest_standings(conn, contest_id, fastbreak_finished=None):
+    """Compute and store final standings for a CLOSED, FINISHED contest.
+
+    ``fastbreak_finished`` skips the status lookup when the caller already
+    knows it (e.g. the poller's status map).  Returns the number of entries
+    frozen.  Raises ``ValueError`` if the contest does not exist, is not
+    CLOSED, or its FastBreak is not finished.
+    """
+    cursor = conn.cursor()
+    cursor.execute(prepare_query('''
+        SELECT status, fastbreak_id FROM fastbreakContests WHERE id = ?
+    '''), (contest_id,))
+    row = cursor.fetchone()
+    if not row:
+        raise ValueError(f"Contest {contest_id} not found")
+    status, fastbreak_id = row
+    if status != 'CLOSED':
+        raise ValueError(f"Contest {contest_id} is not closed (status: {status})")
+    if fastbreak_finished is None:
+        fastbreak_finished = is_fastbreak_finished(cursor, fastbreak_id)
+    if not fastbreak_finished:
+        raise ValueError(f"FastBreak {fastbreak_id} has not finished yet")
+
+    cursor.execute(prepare_query('''
+        SELECT userWalletAddress, topshotUsernamePrediction, created_at
+        FROM fastbreakContestEntries
+        WHERE contest_id = ?
+    '''), (contest_id,))
+    standings = build_contest_standings(cursor.fetchall(), fastbreak_id)
+    save_contest_standings(conn, contest_id, standings)
+    return len(standings)
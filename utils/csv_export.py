@@ -0,0 +1,103 @@
+"""Streaming CSV exports (gifts, predictions).
+
+Rows are read in chunks -- a named server-side cursor on PostgreSQL,
+``fetchmany`` on SQLite -- and written out incrementally, so exporting a
+whole season uses constant memory.  The same row stream feeds both the
+Discord upload (``spool_csv``: a spooled temp file, optionally gzipped) and
+the HTTP download (``iter_csv`` / ``iter_gzip`` inside a streamed Flask
+response).
+"""
+
+import csv
+import gzip
+import io
+import tempfile
+import uuid
+import zlib
+
+from utils.helpers import prepare_query, map_wallet_to_username
+
+EXPORT_CHUNK_ROWS = 1000           # rows fetched per round trip
+CSV_FLUSH_BYTES = 64 * 1024        # emit a chunk once this much CSV is buffered
+SPOOL_MAX_MEMORY = 1024 * 1024     # spooled files spill to disk past 1 MB
+
+GIFTS_CSV_HEADER = ["txn_id", "moment_id", "from_address", "points", "timestamp"]
+PREDICTIONS_CSV_HEADER = ["Username", "Stats", "Outcome", "Timestamp"]
+
+
+def gifts_export_query(from_address=None):
+    """Return ``(query, params)`` for every gift, newest first."""
+    if from_address:
+        return ('''
+            SELECT txn_id, moment_id, from_address, points, timestamp
+            FROM gifts
+            WHERE from_address = ?
+            ORDER BY timestamp DESC
+        ''', (from_address,))
+    return ('''
+        SELECT txn_id, moment_id, from_address, points, timestamp
+        FROM gifts
+        ORDER BY timestamp DESC
+    ''', ())
+
+
+def gift_csv_row(row):
+    """Gift row with the sender shown by known username where possible."""
+    txn_id, moment_id, from_address, points, timestamp = row
+    return [txn_id, moment_id, map_wallet_to_username(from_address), points, timestamp]
+
+
+def iter_rows(conn, db_type, query, params=(), chunk_size=EXPORT_CHUNK_ROWS):
+    """Yield result rows ``chunk_size`` at a time without loading them all."""
+    if db_type == 'postgresql':
+        # Named cursor → rows stay on the server until fetched
+        cur = conn.cursor(name=f"csv_export_{uuid.uuid4().hex[:12]}")
+        cur.itersize = chunk_size
+    else:
+        cur = conn.cursor()
+    try:
+        cur.execute(prepare_query(query), params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
+
+
+def iter_csv(rows, header, row_fn=None):
+    """Yield CSV text in ~``CSV_FLUSH_BYTES`` chunks."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row_fn(row) if row_fn else row)
+        if buf.tell() >= CSV_FLUSH_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def iter_gzip(chunks):
+    """Gzip a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(wbits=31)  # 31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def spool_csv(rows, header, row_fn=None, compress=False):
+    """Write rows to a spooled binary temp file and return it rewound."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+    out = gzip.GzipFile(fileobj=spool, mode="wb") if compress else spool
+    for chunk in iter_csv(rows, header, row_fn):
+        out.write(chunk.encode("utf-8"))
+    if compress:
+        out.close()  # writes the gzip trailer; leaves ``spool`` open
+    spool.seek(0)
+    return spool
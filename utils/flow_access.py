@@ -0,0 +1,174 @@
+"""Shared Flow access-node client.
+
+Every Cadence script used to open (and tear down) its own ``flow_client``
+gRPC channel, and callers serialised them behind ``_grpc_lock`` with a fixed
+sleep.  This module keeps one long-lived channel on a dedicated event-loop
+thread and bounds in-flight scripts with a semaphore instead, so any thread
+(Flask workers, the bot, pollers) can execute scripts concurrently.
+"""
+
+import asyncio
+import threading
+
+from flow_py_sdk import flow_client, Script
+from flow_py_sdk.cadence import Address, Array
+
+from utils.metrics import grpc_client
+from config import (
+    FLOW_ACCESS_NODE_HOST, FLOW_ACCESS_NODE_PORT, FLOW_ACCESS_MAX_CONCURRENCY,
+)
+
+_SCRIPT_TIMEOUT = 30  # seconds to wait for a single script result
+
+# Max addresses resolved per script execution (keeps well under the
+# access node's script computation limit)
+LINKED_ACCOUNTS_CHUNK = 100
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_client = None
+_semaphore: asyncio.Semaphore | None = None
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    """Start the background event loop that owns the gRPC channel (once)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            t = threading.Thread(target=loop.run_forever, daemon=True, name="flow-access")
+            t.start()
+            _loop = loop
+        return _loop
+
+
+def _reset_client():
+    """Drop the shared channel so the next script reconnects."""
+    global _client
+    if _client is not None:
+        try:
+            _client.channel.close()
+        except Exception:
+            pass
+    _client = None
+
+
+async def _execute(script: Script):
+    global _client, _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(FLOW_ACCESS_MAX_CONCURRENCY)
+    async with _semaphore:
+        if _client is None:
+            _client = grpc_client(flow_client(host=FLOW_ACCESS_NODE_HOST, port=FLOW_ACCESS_NODE_PORT))
+        try:
+            return await _client.execute_script(script)
+        except Exception:
+            _reset_client()
+            raise
+
+
+def execute_script(script: Script, timeout: float = _SCRIPT_TIMEOUT):
+    """Run a Cadence script on the shared client from synchronous code."""
+    future = asyncio.run_coroutine_threadsafe(_execute(script), _ensure_loop())
+    return future.result(timeout)
+
+
+async def execute_script_async(script: Script):
+    """Run a Cadence script on the shared client from any event loop."""
+    future = asyncio.run_coroutine_threadsafe(_execute(script), _ensure_loop())
+    return await asyncio.wait_for(asyncio.wrap_future(future), _SCRIPT_TIMEOUT)
+
+
+# ── Batched HybridCustody resolution ──────────────────────────────────
+
+LINKED_ACCOUNTS_SCRIPT = """
+import HybridCustody from 0xd8a7e05a7ac670c0
+import TopShot from 0x0b2a3299cc857e29
+
+access(all) fun main(addresses: [Address]): {Address: {String: Address}} {
+    let result: {Address: {String: Address}} = {}
+
+    for addr in addresses {
+        let links: {String: Address} = {}
+
+        // Child: first HybridCustody child holding a TopShot collection
+        if let manager = getAuthAccount<auth(Storage) &Account>(addr)
+            .storage
+            .borrow<auth(HybridCustody.Manage) &HybridCustody.Manager>(
+                from: HybridCustody.ManagerStoragePath
+            ) {
+            for child in manager.getChildAddresses() {
+                let collectionRef = getAccount(child)
+                    .capabilities
+                    .get<&TopShot.Collection>(/public/MomentCollection)
+                    .borrow()
+                if collectionRef != nil {
+                    links["child"] = child
+                    break
+                }
+            }
+        }
+
+        // Parent: first redeemed parent of this account's OwnedAccount
+        if let owned = getAccount(addr)
+            .capabilities
+            .get<&{HybridCustody.OwnedAccountPublic}>(HybridCustody.OwnedAccountPublicPath)
+            .borrow() {
+            let statuses = owned.getParentStatuses()
+            for parent in statuses.keys {
+                if statuses[parent]! {
+                    links["parent"] = parent
+                    break
+                }
+            }
+        }
+
+        result[addr] = links
+    }
+
+    return result
+}
+"""
+
+
+def _normalize_address(address: str) -> str:
+    addr = address.strip().lower()
+    return addr if addr.startswith("0x") else f"0x{addr}"
+
+
+def _decode_linked_accounts(value) -> dict:
+    """Turn the script's ``{Address: {String: Address}}`` into plain dicts."""
+    out = {}
+    for pair in value.value or []:
+        links = {}
+        for inner in pair.value.value or []:
+            links[inner.key.value] = str(inner.value)
+        out[str(pair.key)] = links
+    return out
+
+
+def get_linked_accounts_bulk(addresses) -> dict:
+    """Resolve HybridCustody child and parent accounts for many addresses.
+
+    Returns ``{address: {"child": "0x..." | "", "parent": "0x..." | ""}}``
+    for every input address.  Chunks that fail are logged and left empty so
+    callers can treat them like an unlinked wallet.
+    """
+    wanted = list(dict.fromkeys(_normalize_address(a) for a in addresses if a))
+    result = {a: {"child": "", "parent": ""} for a in wanted}
+
+    for i in range(0, len(wanted), LINKED_ACCOUNTS_CHUNK):
+        chunk = wanted[i:i + LINKED_ACCOUNTS_CHUNK]
+        args = Array([Address.from_hex(a) for a in chunk])
+        try:
+            resp = execute_script(Script(code=LINKED_ACCOUNTS_SCRIPT, arguments=[args]))
+            decoded = _decode_linked_accounts(resp)
+        except Exception as exc:
+            print(f"⚠️  get_linked_accounts_bulk chunk {i // LINKED_ACCOUNTS_CHUNK} failed: {type(exc).__name__}: {exc}")
+            continue
+        for addr, links in decoded.items():
+            if addr in result:
+                result[addr]["child"] = links.get("child", "")
+                result[addr]["parent"] = links.get("parent", "")
+
+    return result
@@ -0,0 +1,122 @@
+"""Thin helpers around the Flow Access REST API.
+
+Used by the background indexers that follow on-chain events (treasury
+inventory, Swapboost holders) instead of re-scanning whole collections.
+"""
+
+import base64
+import json
+
+import requests
+
+from config import FLOW_REST_URL
+from utils.cdc_events import decode_fields
+
+# The REST events endpoint rejects height ranges wider than this
+EVENTS_MAX_RANGE = 250
+
+
+def encode_arg(cdc_type: str, value) -> str:
+    """Base64-encode a single JSON-CDC script argument."""
+    return base64.b64encode(json.dumps({"type": cdc_type, "value": value}).encode()).decode()
+
+
+def execute_script(cadence: str, arguments=(), timeout=30) -> dict:
+    """Execute a Cadence script and return the decoded JSON-CDC result.
+
+    ``arguments`` are already-encoded values from ``encode_arg``.
+    Raises ``RuntimeError`` on a non-200 response.
+    """
+    resp = requests.post(
+        f"{FLOW_REST_URL}/scripts",
+        json={
+            "script": base64.b64encode(cadence.encode()).decode(),
+            "arguments": list(arguments),
+        },
+        timeout=timeout,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"Flow script failed (HTTP {resp.status_code}): {resp.text[:200]}")
+    result_b64 = resp.text.strip().strip('"')
+    return json.loads(base64.b64decode(result_b64).decode())
+
+
+def get_sealed_height(timeout=10) -> int:
+    """Return the latest sealed block height."""
+    resp = requests.get(f"{FLOW_REST_URL}/blocks", params={"height": "sealed"}, timeout=timeout)
+    resp.raise_for_status()
+    return int(resp.json()[0]["header"]["height"])
+
+
+def get_transaction_result(tx_id: str, timeout=15) -> dict:
+    """Return ``transaction_results/<tx_id>`` (status, error_message, events).
+
+    Raises ``requests.HTTPError`` on a non-200 response — including the 404
+    served for a transaction the access node has not seen yet.
+    """
+    resp = requests.get(f"{FLOW_REST_URL}/transaction_results/{tx_id}", timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def get_transaction(tx_id: str, timeout=10) -> dict:
+    """Return the ``transactions/<tx_id>`` body (proposer, payer, ...)."""
+    resp = requests.get(f"{FLOW_REST_URL}/transactions/{tx_id}", timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def get_key_sequence(address: str, key_index: int, timeout=10) -> int:
+    """Current sequence number of one account key (the next usable proposal seq)."""
+    resp = requests.get(
+        f"{FLOW_REST_URL}/accounts/{address.removeprefix('0x')}",
+        params={"expand": "keys"},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    for key in resp.json().get("keys") or []:
+        if int(key.get("index", -1)) == key_index:
+            return int(key["sequence_number"])
+    raise RuntimeError(f"Key {key_index} not found on account {address}")
+
+
+def get_events(event_type: str, start_height: int, end_height: int, timeout=20) -> list:
+    """Fetch and decode events of ``event_type`` in ``[start_height, end_height]``.
+
+    The range is split into ``EVENTS_MAX_RANGE`` windows.  Each returned item
+    is ``{"type", "block_height", "block_timestamp", "transaction_id",
+    "transaction_index", "event_index", "fields"}``, ordered as they
+    occurred on chain; ``fields`` are decoded by ``utils.cdc_events.decode_fields``
+    (typed ints, ``0x``-prefixed lowercase addresses).
+    """
+    out = []
+    height = start_height
+    while height <= end_height:
+        window_end = min(height + EVENTS_MAX_RANGE - 1, end_height)
+        resp = requests.get(
+            f"{FLOW_REST_URL}/events",
+            params={"type": event_type, "start_height": height, "end_height": window_end},
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        for block in resp.json() or []:
+            block_height = int(block.get("block_height", 0))
+            block_timestamp = block.get("block_timestamp")
+            for ev in block.get("events") or []:
+                try:
+                    fields = decode_fields(ev["payload"])
+                except Exception:
+                    continue
+                out.append({
+                    "type": ev.get("type") or event_type,
+                    "block_height": block_height,
+                    "block_timestamp": block_timestamp,
+                    "transaction_id": ev.get("transaction_id"),
+                    "transaction_index": int(ev.get("transaction_index", 0)),
+                    "event_index": int(ev.get("event_index", 0)),
+                    "fields": fields,
+                })
+        height = window_end + 1
+
+    out.sort(key=lambda e: (e["block_height"], e["transaction_index"], e["event_index"]))
+    return out
@@ -0,0 +1,186 @@
+"""Data-driven Swapfest gift scoring.
+
+Scoring rules live in ``gift_scoring_rules`` as ``(set_flow_id, tier,
+player_name) → points`` rows, where a NULL column matches anything.  The
+most specific rule wins: a matching set beats a matching player, which
+beats a matching tier; among identical keys the newest row wins.  Moments
+no rule matches score 0.
+
+``load_scoring_rules`` builds a dict keyed by that triple, so scoring a
+moment is a fixed handful of dict probes.  ``rescore_gifts`` expresses the
+same precedence in SQL, joining ``gifts`` with ``moment_metadata`` so a rule
+change re-scores a whole event in one UPDATE without calling TopShot.
+"""
+
+import time
+
+from utils.helpers import prepare_query
+
+JOKIC = "Nikola Jokić"
+
+# (set_flow_id, tier, player_name, points, note) — seeded when the table is empty
+DEFAULT_SCORING_RULES = [
+    (2, None, None, 250, "Special set: 250 for any player"),
+    (227, None, JOKIC, 150, "Equinox: 3x"),
+    (218, None, JOKIC, 3, "S25/26 base set"),
+    (None, "COMMON", JOKIC, 1, None),
+    (None, "FANDOM", JOKIC, 1, None),
+    (None, "RARE", JOKIC, 50, None),
+    (None, "LEGENDARY", JOKIC, 1000, None),
+    (None, "ULTIMATE", JOKIC, 1000, None),
+    (None, "ANTHOLOGY", JOKIC, 1000, None),
+]
+
+# GraphQL selection for getMintedMoment that fills a moment_metadata row
+MOMENT_METADATA_FIELDS = (
+    "{ data {"
+    " id tier"
+    " set { flowId flowName flowSeriesNumber }"
+    " play { stats { playerName teamAtMoment nbaSeason playCategory } }"
+    " assetPathPrefix"
+    " } }"
+)
+
+# Probe order, most specific first: (use_set, use_tier, use_player)
+_PRECEDENCE = [
+    (use_set, use_tier, use_player)
+    for use_set in (True, False)
+    for use_player in (True, False)
+    for use_tier in (True, False)
+]
+
+
+def normalize_tier(tier):
+    """``MOMENT_TIER_RARE`` / ``rare`` → ``RARE`` (the form moment_metadata stores)."""
+    if not tier:
+        return None
+    return tier.upper().replace("MOMENT_TIER_", "")
+
+
+def load_scoring_rules(cursor):
+    """Return ``{(set_flow_id, tier, player_name): points}`` from the rules table."""
+    cursor.execute(prepare_query('''
+        SELECT set_flow_id, tier, player_name, points
+        FROM gift_scoring_rules
+        ORDER BY id
+    '''))
+    return {
+        (int(set_flow_id) if set_flow_id is not None else None, normalize_tier(tier), player_name): points
+        for set_flow_id, tier, player_name, points in cursor.fetchall()
+    }
+
+
+def seed_default_scoring_rules(cursor):
+    """Insert ``DEFAULT_SCORING_RULES`` if the table is empty.  Returns rows added."""
+    cursor.execute(prepare_query("SELECT COUNT(*) FROM gift_scoring_rules"))
+    row = cursor.fetchone()
+    if row and row[0]:
+        return 0
+    cursor.executemany(prepare_query('''
+        INSERT INTO gift_scoring_rules (set_flow_id, tier, player_name, points, note)
+        VALUES (?, ?, ?, ?, ?)
+    '''), DEFAULT_SCORING_RULES)
+    return len(DEFAULT_SCORING_RULES)
+
+
+def score_moment(rules, set_flow_id, tier, player_name):
+    """Points for one moment under ``rules`` (see ``load_scoring_rules``)."""
+    tier = normalize_tier(tier)
+    for use_set, use_tier, use_player in _PRECEDENCE:
+        points = rules.get((
+            set_flow_id if use_set else None,
+            tier if use_tier else None,
+            player_name if use_player else None,
+        ))
+        if points is not None:
+            return points
+    return 0
+
+
+def _set_flow_id(data):
+    flow_id = (data.get("set") or {}).get("flowId")
+    return int(flow_id) if flow_id is not None else None
+
+
+def score_metadata(rules, data):
+    """Points for a moment given its getMintedMoment ``data`` object."""
+    stats = (data.get("play") or {}).get("stats") or {}
+    return score_moment(rules, _set_flow_id(data), data.get("tier"), stats.get("playerName"))
+
+
+def moment_metadata_row(moment_id, data):
+    """getMintedMoment ``data`` → tuple matching ``save_moment_metadata``'s columns."""
+    set_info = data.get("set") or {}
+    stats = (data.get("play") or {}).get("stats") or {}
+    asset_prefix = data.get("assetPathPrefix") or ""
+    return (
+        int(moment_id),
+        stats.get("playerName") or "",
+        normalize_tier(data.get("tier")),        # NULL when unknown: matches no tier rule
+        set_info.get("flowName") or "",
+        set_info.get("flowSeriesNumber"),
+        f"{asset_prefix}Hero_2880_2880_Black.jpg" if asset_prefix else "",
+        stats.get("teamAtMoment") or "",
+        stats.get("nbaSeason") or "",
+        stats.get("playCategory") or "",
+        _set_flow_id(data),
+        int(time.time()),
+    )
+
+
+def save_moment_metadata(cursor, rows):
+    """Upsert ``moment_metadata_row`` tuples into the metadata cache."""
+    cursor.executemany(prepare_query('''
+        INSERT INTO moment_metadata
+            (moment_id, player_name, tier, set_name, series_number, image_url,
+             team_name, nba_season, play_category, set_flow_id, cached_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (moment_id) DO UPDATE SET
+            player_name = excluded.player_name,
+            tier = excluded.tier,
+            set_name = excluded.set_name,
+            series_number = excluded.series_number,
+            image_url = excluded.image_url,
+            team_name = excluded.team_name,
+            nba_season = excluded.nba_season,
+            play_category = excluded.play_category,
+            set_flow_id = excluded.set_flow_id,
+            cached_at = excluded.cached_at
+    '''), rows)
+
+
+def rescore_gifts(cursor, since=None, until=None, only_zero=False):
+    """Re-score gifts from cached metadata and the rules table in one UPDATE.
+
+    Only gifts whose moment has cached metadata (with its set flowId) are
+    touched.  ``since``/``until`` bound the gift timestamp (inclusive) and
+    ``only_zero`` limits the update to gifts currently worth 0.  Returns
+    the number of gifts updated.
+    """
+    conditions = ["moment_id IN (SELECT moment_id FROM moment_metadata WHERE set_flow_id IS NOT NULL)"]
+    params = []
+    if since is not None:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("timestamp <= ?")
+        params.append(until)
+    if only_zero:
+        conditions.append("COALESCE(points, 0) = 0")
+
+    cursor.execute(prepare_query(f'''
+        UPDATE gifts
+        SET points = COALESCE((
+            SELECT r.points
+            FROM moment_metadata mm
+            JOIN gift_scoring_rules r
+              ON (r.set_flow_id IS NULL OR r.set_flow_id = mm.set_flow_id)
+             AND (r.tier IS NULL OR r.tier = mm.tier)
+             AND (r.player_name IS NULL OR r.player_name = mm.player_name)
+            WHERE mm.moment_id = gifts.moment_id
+            ORDER BY (r.set_flow_id IS NULL), (r.player_name IS NULL), (r.tier IS NULL), r.id DESC
+            LIMIT 1
+        ), 0)
+        WHERE {" AND ".join(conditions)}
+    '''), params)
+    return cursor.rowcount
@@ -1,29 +1,30 @@
 from enum import Enum
-import csv
-import io
 import os
 import sqlite3
 import psycopg2
 import random
 import json
 import time
-import threading
 import requests
-from flow_py_sdk import flow_client, Script
+from concurrent.futures import ThreadPoolExecutor
+from flow_py_sdk import Script
 from flow_py_sdk.cadence import Address
 import asyncio
+from utils.flow_access import execute_script_async, get_linked_accounts_bulk, _normalize_address
+from config import TOPSHOT_GRAPHQL_URL, DAPPER_PROFILE_URL
+from db.instrumented import sqlite_connect_kwargs, postgres_connect_kwargs
 
 # Detect if running on Heroku by checking if DATABASE_URL is set
 DATABASE_URL = os.getenv('DATABASE_URL')  # Heroku PostgreSQL URL
 
 if DATABASE_URL:
     # On Heroku, use PostgreSQL
-    conn = psycopg2.connect(DATABASE_URL, sslmode='require')
+    conn = psycopg2.connect(DATABASE_URL, sslmode='require', **postgres_connect_kwargs())
     cursor = conn.cursor()
     db_type = 'postgresql'
 else:
     # Locally, use SQLite
-    conn = sqlite3.connect('local.db')
+    conn = sqlite3.connect('local.db', **sqlite_connect_kwargs())
     cursor = conn.cursor()
     db_type = 'sqlite'
 
@@ -32,56 +33,37 @@ class Outcome(Enum):
     WIN = "Win"
     LOSS = "Loss"
 
-async def create_predictions_csv(predictions):
-    output = io.StringIO()
-    writer = csv.writer(output)
+async def create_predictions_csv(predictions, usernames=None, compress=False):
+    """Write predictions to a spooled CSV temp file (gzipped if ``compress``).
 
-    # Write CSV headers
-    writer.writerow(['Username', 'Stats', 'Outcome', 'Timestamp'])
-
-    # Write each prediction as a row
-    for user_id, stats, outcome, timestamp in predictions:
-        # Check the local database for the username
-        cursor.execute(prepare_query('SELECT username FROM user_mapping WHERE user_id = ?'), (user_id,))
-        result = cursor.fetchone()
-
-        if result:
-            username = result[0]
-        else:
-            try:
-                # If username is not in the database, attempt to fetch from Discord
-                user_obj = await bot.fetch_user(user_id)
-                username = user_obj.name
-
-                # Save the username to the database for future use
-                cursor.execute(prepare_query('INSERT OR REPLACE INTO user_mapping (user_id, username) VALUES (?, ?)'),
-                               (user_id, username))
-                conn.commit()
-            except Exception as e:
-                # In case fetching from Discord fails, fallback to user_id
-                username = f"User {user_id}"
+    ``usernames`` is the ``{user_id: name}`` map from
+    ``bot.usernames.resolve_usernames``; unknown IDs are written as "User <id>".
+    """
+    from utils.csv_export import spool_csv, PREDICTIONS_CSV_HEADER
 
-        # Write the row with the username, stats, outcome, and timestamp
-        writer.writerow([username, stats, outcome, timestamp])
+    usernames = usernames or {}
 
-    # Move back to the beginning of the file-like object
-    output.seek(0)
+    def _row(prediction):
+        user_id, stats, outcome, timestamp = prediction
+        return [usernames.get(int(user_id), f"User {user_id}"), stats, outcome, timestamp]
 
-    return output
+    return spool_csv(predictions, PREDICTIONS_CSV_HEADER, _row, compress=compress)
 
 # Function to insert a prediction
-def save_prediction(user_id, contest_name, stats, outcome, timestamp):
-    cursor.execute(prepare_query('''
+def save_prediction(user_id, contest_name, stats, outcome, timestamp, cur=None):
+    (cur or cursor).execute(prepare_query('''
         INSERT INTO predictions (user_id, contest_name, stats, outcome, timestamp)
         VALUES (?, ?, ?, ?, ?)
     '''), (user_id, contest_name, stats, outcome.value, timestamp))  # Use outcome.value for storage
-    conn.commit()
+    if cur is None:
+        conn.commit()
 
 # Function to start a contest in a specific channel
-def start_contest(channel_id, contest_name, start_time, creator_id):
+def start_contest(channel_id, contest_name, start_time, creator_id, cur=None):
+    c = cur or cursor
     if db_type == 'postgresql':
         # For PostgreSQL, we use ON CONFLICT to handle upserts
-        cursor.execute(prepare_query('''
+        c.execute(prepare_query('''
             INSERT INTO contests (channel_id, contest_name, start_time, creator_id)
             VALUES (?, ?, ?, ?)
             ON CONFLICT (channel_id)
@@ -89,31 +71,34 @@ def start_contest(channel_id, contest_name, start_time, creator_id):
         '''), (channel_id, contest_name, start_time, creator_id))
     else:
         # For SQLite, we can continue using INSERT OR REPLACE
-        cursor.execute(prepare_query('''
+        c.execute(prepare_query('''
             INSERT OR REPLACE INTO contests (channel_id, contest_name, start_time, creator_id)
             VALUES (?, ?, ?, ?)
         '''), (channel_id, contest_name, start_time, creator_id))
 
-    conn.commit()
+    if cur is None:
+        conn.commit()
 
 # Function to get all predictions for the active contest
-def get_predictions_for_contest(channel_id):
-    cursor.execute(prepare_query('''
+def get_predictions_for_contest(channel_id, cur=None):
+    c = cur or cursor
+    c.execute(prepare_query('''
         SELECT user_id, stats, outcome, timestamp FROM predictions
         WHERE contest_name = (SELECT contest_name FROM contests WHERE channel_id = ?)
     '''), (channel_id,))
-    return cursor.fetchall()
+    return c.fetchall()
 
 # Function to get user predictions for the current contest in a specific channel
-def get_user_predictions_for_contest(user_id, channel_id):
-    cursor.execute(prepare_query('''
+def get_user_predictions_for_contest(user_id, channel_id, cur=None):
+    c = cur or cursor
+    c.execute(prepare_query('''
         SELECT contest_name, stats, outcome, timestamp FROM predictions
         WHERE user_id = ? AND contest_name = (SELECT contest_name FROM contests WHERE channel_id = ?)
     '''), (user_id, channel_id))
-    return cursor.fetchall()
+    return c.fetchall()
 
 # Function to count total predictions for a specific contest channel
-def count_total_predictions(channel_id):
+def count_total_predictions(channel_id, cur=None):
     query = '''
         SELECT COUNT(*) 
         FROM predictions 
@@ -124,14 +109,24 @@ def count_total_predictions(channel_id):
         )
     '''
     # Prepare the query using the channel_id as a parameter
-    cursor.execute(prepare_query(query), (channel_id,))
-    return cursor.fetchone()[0]  # Return the count
+    c = cur or cursor
+    c.execute(prepare_query(query), (channel_id,))
+    return c.fetchone()[0]  # Return the count
 
 # Helper function to adjust query placeholders
+_PREPARED_QUERIES_MAX = 2048  # rewritten statements remembered (dynamic SQL beyond this is not cached)
+_prepared_queries = {}
+
+
 def prepare_query(query):
     if db_type == 'postgresql':
-        # Replace SQLite-style `?` with PostgreSQL-style `%s`
-        return query.replace('?', '%s')
+        # Replace SQLite-style `?` with PostgreSQL-style `%s`, once per statement text
+        rewritten = _prepared_queries.get(query)
+        if rewritten is None:
+            rewritten = query.replace('?', '%s')
+            if len(_prepared_queries) < _PREPARED_QUERIES_MAX:
+                _prepared_queries[query] = rewritten
+        return rewritten
     return query  # SQLite uses `?`, so no replacement needed
 
 def is_admin(interaction):
@@ -294,9 +289,10 @@ def get_basic_pet_response(amount):
     ]
     return random.choice(responses)
 
-def get_last_processed_block():
-    cursor.execute(prepare_query("SELECT value FROM scraper_state WHERE key = ?"), ('last_block',))
-    row = cursor.fetchone()
+def get_last_processed_block(cur=None):
+    c = cur or cursor
+    c.execute(prepare_query("SELECT value FROM scraper_state WHERE key = ?"), ('last_block',))
+    row = c.fetchone()
     if row:
         return int(row[0])
     else:
@@ -341,19 +337,44 @@ def reset_last_processed_block(block_height):
     conn.commit()
 
 
-def save_gift(txn_id, moment_id, from_address, points, timestamp):
+def get_state_value(cur, key, default=None):
+    """Read a ``scraper_state`` value using the caller's cursor."""
+    cur.execute(prepare_query("SELECT value FROM scraper_state WHERE key = ?"), (key,))
+    row = cur.fetchone()
+    return row[0] if row else default
+
+
+def set_state_value(cur, db_type, key, value):
+    """Upsert a ``scraper_state`` value using the caller's cursor (no commit)."""
     if db_type == 'postgresql':
-        cursor.execute(prepare_query('''
+        cur.execute(prepare_query('''
+            INSERT INTO scraper_state (key, value)
+            VALUES (?, ?)
+            ON CONFLICT (key)
+            DO UPDATE SET value = EXCLUDED.value
+        '''), (key, str(value)))
+    else:
+        cur.execute(prepare_query('''
+            INSERT OR REPLACE INTO scraper_state (key, value)
+            VALUES (?, ?)
+        '''), (key, str(value)))
+
+
+def save_gift(txn_id, moment_id, from_address, points, timestamp, cur=None):
+    c = cur or cursor
+    if db_type == 'postgresql':
+        c.execute(prepare_query('''
             INSERT INTO gifts (txn_id, moment_id, from_address, points, timestamp)
             VALUES (?, ?, ?, ?, ?)
             ON CONFLICT (txn_id) DO NOTHING
         '''), (txn_id, moment_id, from_address, points, timestamp))
     else:
-        cursor.execute(prepare_query('''
+        c.execute(prepare_query('''
             INSERT OR IGNORE INTO gifts (txn_id, moment_id, from_address, points, timestamp)
             VALUES (?, ?, ?, ?, ?)
         '''), (txn_id, moment_id, from_address, points, timestamp))
-    conn.commit()
+    if cur is None:
+        conn.commit()
 
 
 DAPPER_WALLET_USERNAME_MAP = {
@@ -442,7 +463,7 @@ def ordinal(n):
 
 def get_rank_and_lineup_for_user(username, fastbreak_id):
     # ✅ Official NBA Top Shot public GraphQL endpoint
-    url = "https://public-api.nbatopshot.com/graphql"
+    url = TOPSHOT_GRAPHQL_URL
     # ✅ GraphQL query with fragment
     query = """
     query GetFastBreakLeadersByFastBreakId($input: GetFastBreakLeadersRequestV2!) {
@@ -527,7 +548,7 @@ def get_rank_and_lineup_for_user(username, fastbreak_id):
     return out
 
 def extract_fastbreak_runs():
-    url = "https://public-api.nbatopshot.com/graphql"
+    url = TOPSHOT_GRAPHQL_URL
 
     query = """
     query SearchFastBreakRuns($input: SearchFastBreakRunsRequest!) {
@@ -586,7 +607,7 @@ def extract_fastbreak_runs():
 def pull_rankings_for_fb(fastbreak_id):
     import requests
 
-    url = "https://public-api.nbatopshot.com/graphql"
+    url = TOPSHOT_GRAPHQL_URL
 
     query = """
     query GetFastBreakLeadersByFastBreakId($input: GetFastBreakLeadersRequestV2!) {
@@ -731,15 +752,11 @@ async def get_linked_child_account(address_hex: str):
     addr = Address.from_hex(address_hex.removeprefix("0x"))
     script = Script(code=cadence, arguments=[addr])
     try:
-        async with flow_client(
-            host="access.mainnet.nodes.onflow.org",
-            port=9000
-        ) as client:
-            result = await client.execute_script(script)
-            if result.value:
-                return (str(result.value[0]))
-            else:
-                return ""
+        result = await execute_script_async(script)
+        if result.value:
+            return (str(result.value[0]))
+        else:
+            return ""
     except Exception as exc:
         print(f"⚠️  get_linked_child_account({address_hex}) failed: {type(exc).__name__}: {exc}")
         return ""
@@ -779,20 +796,16 @@ async def get_linked_parent_account(address_hex: str):
     addr = Address.from_hex(address_hex.removeprefix("0x"))
     script = Script(code=cadence, arguments=[addr])
     try:
-        async with flow_client(
-            host="access.mainnet.nodes.onflow.org",
-            port=9000
-        ) as client:
-            result = await client.execute_script(script)
-            for kv_pair in result.value.__dict__['value']:
-                if kv_pair.__dict__['value']:
-                    return str(kv_pair.__dict__['key'])
+        result = await execute_script_async(script)
+        for kv_pair in result.value.__dict__['value']:
+            if kv_pair.__dict__['value']:
+                return str(kv_pair.__dict__['key'])
     except Exception:
         return ""
 
 
 def get_flow_address_by_username(username: str):
-    url = "https://public-api.nbatopshot.com/graphql"
+    url = TOPSHOT_GRAPHQL_URL
 
     query = """
     query GetUserProfileByUsername($input: getUserProfileByUsernameInput!) {
@@ -837,7 +850,7 @@ def get_username_from_dapper_wallet_flow(dapper_address: str) -> str:
     Returns the displayName string or None if not found.
     """
     addr = dapper_address if dapper_address.startswith('0x') else f'0x{dapper_address}'
-    url = f"https://open.meetdapper.com/profile?address={addr}"
+    url = f"{DAPPER_PROFILE_URL}?address={addr}"
 
     headers = {
         "User-Agent": "PetJokicsHorses",
@@ -856,10 +869,6 @@ _KNOWN_WALLET_USERNAMES = {
 _username_cache: dict[str, tuple[str, float]] = {}   # flow_addr → (username, expiry)
 _USERNAME_CACHE_TTL = 86400  # 24 hours – parent→child mapping is very stable
 
-# ── gRPC throttle: limit concurrency to avoid Flow RESOURCE_EXHAUSTED ──
-_grpc_lock = threading.Lock()
-_GRPC_DELAY = 0.35  # seconds between successive Cadence calls
-
 
 def get_ts_username_from_flow_wallet(flow_address):
     if flow_address in _KNOWN_WALLET_USERNAMES:
@@ -874,10 +883,8 @@ def get_ts_username_from_flow_wallet(flow_address):
             return value
 
     try:
-        # Throttle gRPC calls to avoid RESOURCE_EXHAUSTED on the Flow access node
-        with _grpc_lock:
-            child_addr = asyncio.run(get_linked_child_account(flow_address))
-            time.sleep(_GRPC_DELAY)
+        # Concurrency is bounded by the shared access-node client (utils.flow_access)
+        child_addr = asyncio.run(get_linked_child_account(flow_address))
         print(f"🔍 [{flow_address}] child_addr={repr(child_addr)}")
         # Always use the GraphQL API for username resolution
         username = get_username_from_dapper_wallet_flow(child_addr) if child_addr else None
@@ -892,10 +899,90 @@ def get_ts_username_from_flow_wallet(flow_address):
 
     return username
 
+def get_ts_usernames_bulk(flow_addresses) -> dict:
+    """Resolve many Flow wallets to TopShot usernames in one pass.
+
+    Child Dapper wallets for every uncached address come from a single
+    batched Cadence script (``get_linked_accounts_bulk``); the Dapper profile
+    lookups then run in parallel.  Returns ``{address: username_or_None}``
+    keyed by ``0x``-prefixed lower-case address, as ``get_linked_accounts_bulk``
+    keys its result.
+    """
+    result = {}
+    pending = []
+    now = time.time()
+    for addr in dict.fromkeys(_normalize_address(a) for a in flow_addresses if a and a.strip()):
+        if addr in _KNOWN_WALLET_USERNAMES:
+            result[addr] = _KNOWN_WALLET_USERNAMES[addr]
+            continue
+        cached = _username_cache.get(addr)
+        if cached is not None and now < cached[1]:
+            result[addr] = cached[0]
+            continue
+        pending.append(addr)
+
+    if not pending:
+        return result
+
+    links = get_linked_accounts_bulk(pending)
+
+    def _lookup(addr):
+        child_addr = links.get(addr, {}).get("child")
+        if not child_addr:
+            return addr, None
+        try:
+            return addr, get_username_from_dapper_wallet_flow(child_addr)
+        except Exception as exc:
+            print(f"⚠️  [{addr}] username lookup failed: {type(exc).__name__}: {exc}")
+            return addr, None
+
+    with ThreadPoolExecutor(max_workers=min(len(pending), 10)) as pool:
+        for addr, username in pool.map(_lookup, pending):
+            result[addr] = username
+            if username:
+                _username_cache[addr] = (username, now + _USERNAME_CACHE_TTL)
+
+    return result
+
 def get_flow_wallet_from_ts_username(username):
     return asyncio.run(get_linked_parent_account(get_flow_address_by_username(username)))
 
 
+def fetch_minted_moments(moment_ids, fields, operation="BatchMintedMoments", headers=None, timeout=30) -> dict:
+    """Look up many moments in ONE aliased ``getMintedMoment`` GraphQL request.
+
+    Each moment ID travels as a ``$mN: ID!`` variable, never in the query
+    text.  ``fields`` is the selection set applied to every alias.  Returns
+    ``{moment_id: data}`` (keys as passed in) for the moments TopShot
+    resolved; HTTP and decoding errors propagate to the caller.
+    """
+    moment_ids = list(moment_ids)
+    if not moment_ids:
+        return {}
+    params = ", ".join(f"$m{i}: ID!" for i in range(len(moment_ids)))
+    aliases = " ".join(
+        f"m{i}: getMintedMoment(momentId: $m{i}) {fields}" for i in range(len(moment_ids))
+    )
+    payload = {
+        "query": f"query {operation}({params}) {{ {aliases} }}",
+        "variables": {f"m{i}": str(mid) for i, mid in enumerate(moment_ids)},
+    }
+    response = requests.post(
+        TOPSHOT_GRAPHQL_URL,
+        json=payload,
+        headers={"Content-Type": "application/json", **(headers or {})},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    data = response.json().get("data") or {}
+    found = {}
+    for i, mid in enumerate(moment_ids):
+        entry = data.get(f"m{i}")
+        if entry and entry.get("data"):
+            found[mid] = entry["data"]
+    return found
+
+
 def get_jokic_editions(cursor="", limit=100, dapper_id="") -> dict:
     """
     Fetches all Nikola Jokic editions from the TopShot marketplace.
@@ -904,7 +991,7 @@ def get_jokic_editions(cursor="", limit=100, dapper_id="") -> dict:
     Returns dict with editions list and summary stats.
     Paginates automatically to fetch all editions.
     """
-    url = "https://public-api.nbatopshot.com/graphql"
+    url = TOPSHOT_GRAPHQL_URL
 
     # Build userID clause — must be hardcoded in query string (not a variable)
     user_id_clause = f', userID: "{dapper_id}"' if dapper_id else ''
@@ -1148,7 +1235,7 @@ def get_dapper_id_from_flow_wallet(flow_address: str) -> str:
         if not ts_username:
             return ""
 
-        url = "https://public-api.nbatopshot.com/graphql"
+        url = TOPSHOT_GRAPHQL_URL
         query = """
         query GetUserProfileByUsername($input: getUserProfileByUsernameInput!) {
           getUserProfileByUsername(input: $input) {
@@ -0,0 +1,364 @@
+"""In-process latency metrics, exposed in the Prometheus text format.
+
+Histograms are kept per Flask route, per SQL statement label, per upstream
+operation (TopShot GraphQL ``operationName``, Flow REST / FlowScan path,
+Flow gRPC method) and per background job tick, and rendered on
+``/metrics``.  Recording an observation is a bucket bisect and a couple of
+additions under a lock, so it is cheap enough to leave on for every
+request; ``METRICS_ENABLED=0`` turns the hooks off entirely.
+
+No ``prometheus_client`` dependency: the app runs as a single process, so
+a small registry rendered on demand is all the scrape endpoint needs.
+"""
+
+import bisect
+import functools
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from config import (
+    METRICS_ENABLED, TOPSHOT_GRAPHQL_URL, FLOW_REST_URL, FLOW_SCAN_API_URL, DAPPER_PROFILE_URL,
+)
+
+# Upper bounds (seconds) shared by every latency histogram
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Latency histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, seconds, *labels):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def snapshot(self):
+        """``{labels: (cumulative bucket counts, sum, count)}``."""
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        out = {}
+        for labels, counts, total, count in items:
+            running, cumulative = 0, []
+            for c in counts:
+                running += c
+                cumulative.append(running)
+            out[labels] = (cumulative, total, count)
+        return out
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float("inf"),)
+        for labels, (cumulative, total, count) in sorted(self.snapshot().items()):
+            for bound, value in zip(bounds, cumulative):
+                le = 'le="%s"' % _format_number(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {value}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_number(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Monotonic counter keyed by a fixed tuple of label values."""
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "jokic_http_request_duration_seconds", "Flask request latency by route template.",
+    ("route", "method", "status"))
+DB_QUERY_SECONDS = Histogram(
+    "jokic_db_query_duration_seconds", "SQL statement latency by statement label.",
+    ("query",))
+UPSTREAM_SECONDS = Histogram(
+    "jokic_upstream_request_duration_seconds", "Outbound call latency by upstream and operation.",
+    ("upstream", "operation", "outcome"))
+JOB_TICK_SECONDS = Histogram(
+    "jokic_job_tick_duration_seconds", "Background job tick duration.",
+    ("job",))
+JOB_ERRORS = Counter(
+    "jokic_job_errors_total", "Background job ticks that logged an error.",
+    ("job",))
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop every recorded series (tests, benchmarks)."""
+    for metric in _registry:
+        metric.clear()
+
+
+# ── SQL statement labels ─────────────────────────────────────────────
+
+_LABEL_CACHE_MAX = 4096
+_label_cache = {}
+_TABLE_PATTERNS = (
+    ("INSERT", re.compile(r'\bINTO\s+"?(\w+)', re.I)),
+    ("UPDATE", re.compile(r'^\s*UPDATE\s+"?(\w+)', re.I)),
+    ("DELETE", re.compile(r'\bFROM\s+"?(\w+)', re.I)),
+    ("SELECT", re.compile(r'\bFROM\s+"?(\w+)', re.I)),
+    ("WITH", re.compile(r'\bFROM\s+"?(\w+)', re.I)),
+    ("EXECUTE", re.compile(r'^\s*EXECUTE\s+(\w+)', re.I)),   # registered statements (db.statements)
+    ("PREPARE", re.compile(r'^\s*PREPARE\s+(\w+)', re.I)),
+)
+
+
+def query_label(sql):
+    """Low-cardinality label for a statement: its verb and first table.
+
+    ``SELECT ... FROM gifts ...`` -> ``"SELECT gifts"``.  Labels are cached
+    per statement text, which the hot paths reuse verbatim.
+    """
+    label = _label_cache.get(sql)
+    if label is not None:
+        return label
+    text = sql.decode("utf-8", "replace") if isinstance(sql, (bytes, bytearray)) else str(sql)
+    words = text.split(None, 1)
+    verb = words[0].upper() if words else "EMPTY"
+    label = verb
+    for prefix, pattern in _TABLE_PATTERNS:
+        if verb == prefix:
+            match = pattern.search(text)
+            if match:
+                label = f"{verb} {match.group(1)}"
+            break
+    if len(_label_cache) < _LABEL_CACHE_MAX and isinstance(sql, str):
+        _label_cache[sql] = label
+    return label
+
+
+def observe_query(sql, seconds):
+    DB_QUERY_SECONDS.observe(seconds, query_label(sql))
+
+
+# ── Flask ────────────────────────────────────────────────────────────
+
+def instrument_app(app):
+    """Time every request by its route template (``/api/bracket/tournament/<int:tid>``)."""
+    from flask import g, request
+
+    if not METRICS_ENABLED or app.extensions.get("jokic_metrics"):
+        return
+    app.extensions["jokic_metrics"] = True
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, rule, request.method, str(response.status_code))
+        return response
+
+    instrument_requests()
+
+
+# ── Outbound HTTP (requests) ─────────────────────────────────────────
+
+_OPERATION_NAME_RE = re.compile(rb'"operationName"\s*:\s*"(\w+)"')
+_NAMED_QUERY_RE = re.compile(rb'"query"\s*:\s*"\s*(?:query|mutation)\s+(\w+)')
+_FIRST_FIELD_RE = re.compile(rb'"query"\s*:\s*"[^{]*\{\s*(\w+)')
+_ID_SEGMENT_RE = re.compile(r'(0x)?[0-9a-fA-F]{16,}|\d+')
+
+
+def _graphql_operation(body):
+    if not body:
+        return "unknown"
+    if isinstance(body, str):
+        body = body.encode()
+    for pattern in (_OPERATION_NAME_RE, _NAMED_QUERY_RE, _FIRST_FIELD_RE):
+        match = pattern.search(body)
+        if match:
+            return match.group(1).decode()
+    return "unknown"
+
+
+def _path_template(path, base_path=""):
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    segments = ["{id}" if _ID_SEGMENT_RE.fullmatch(s) else s for s in path.strip("/").split("/")]
+    return "/" + "/".join(segments)
+
+
+def upstream_operation(method, url, body=None):
+    """``(upstream, operation)`` labels for an outbound HTTP request."""
+    if TOPSHOT_GRAPHQL_URL and url.startswith(TOPSHOT_GRAPHQL_URL):
+        return "topshot", _graphql_operation(body)
+    path = urlsplit(url).path
+    if FLOW_REST_URL and url.startswith(FLOW_REST_URL):
+        return "flow_rest", f"{method} {_path_template(path, urlsplit(FLOW_REST_URL).path)}"
+    if FLOW_SCAN_API_URL and url.startswith(FLOW_SCAN_API_URL):
+        return "flowscan", f"{method} {_path_template(path, urlsplit(FLOW_SCAN_API_URL).path)}"
+    if DAPPER_PROFILE_URL and url.startswith(DAPPER_PROFILE_URL):
+        return "dapper", "profile"
+    return "other", urlsplit(url).hostname or "unknown"
+
+
+_original_send = None
+_patch_lock = threading.Lock()
+
+
+def instrument_requests():
+    """Time every ``requests`` call (``requests.get``/``post`` and sessions).
+
+    Patches ``requests.Session.send`` once, which every module-level
+    ``requests`` helper goes through.
+    """
+    global _original_send
+    import requests
+
+    with _patch_lock:
+        if not METRICS_ENABLED or _original_send is not None:
+            return
+        original = _original_send = requests.Session.send
+
+        @functools.wraps(original)
+        def send(session, request, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                response = original(session, request, **kwargs)
+                outcome = str(response.status_code)
+                return response
+            finally:
+                upstream, operation = upstream_operation(request.method, request.url or "", request.body)
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, upstream, operation, outcome)
+
+        requests.Session.send = send
+
+
+# ── Flow gRPC ────────────────────────────────────────────────────────
+
+class _GrpcClientProxy:
+    """Wraps a ``flow_py_sdk`` access client, timing each awaited RPC."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await attr(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, "flow_grpc", name, outcome)
+
+        return timed
+
+
+def grpc_client(client):
+    """Time the RPCs made through a ``flow_client`` access API object."""
+    return _GrpcClientProxy(client) if METRICS_ENABLED else client
+
+
+# ── Background jobs ──────────────────────────────────────────────────
+
+def timed_job(job):
+    """Decorator recording the duration of one background job tick."""
+
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                JOB_TICK_SECONDS.observe(time.perf_counter() - start, job)
+
+        return wrapper
+
+    return decorator
+
+
+def job_error(job):
+    """Count a tick that failed (called from the tick's own error handler)."""
+    JOB_ERRORS.inc(job)
@@ -0,0 +1,257 @@
+"""Weighted sweepstakes draws over the points tables.
+
+Entries are never expanded: each wallet's entry count comes from one SQL
+aggregate (boosted Swapfest gift points, or ``completed_swaps.points``) and
+the draw works on the cumulative weights:
+ - with replacement, every winner is a ``bisect`` over the prefix-sum array
+ - without replacement, the weights live in a Fenwick tree so a winner's
+   weight can be zeroed and the next pick is still a binary descent over
+   prefix sums — O(log n) per winner either way
+
+Draws are driven by ``random.Random(seed)``.  ``record_draw`` stores the
+seed, the settings and a digest of the entry list, so ``replay_draw`` can
+reproduce (and audit) any recorded draw from the same tables.
+"""
+
+import bisect
+import hashlib
+import json
+import random
+import secrets
+import time
+from itertools import accumulate
+
+from config import (
+    SWAPFEST_START_TIME, SWAPFEST_END_TIME,
+    SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF,
+)
+from utils.helpers import prepare_query
+
+SOURCES = ("swapfest", "swaps")
+
+
+def _swapfest_query(boost1_cutoff, boost2_cutoff, start_time, end_time):
+    """Boosted gift points per wallet — the same weights as ``/api/leaderboard``."""
+    return ('''
+        SELECT
+            from_address,
+            SUM(points * CASE
+                WHEN "timestamp" < ? THEN 1.4
+                WHEN "timestamp" < ? THEN 1.2
+                ELSE 1.0
+            END) AS total_points
+        FROM gifts
+        WHERE "timestamp" BETWEEN ? AND ?
+          AND from_address IS NOT NULL
+        GROUP BY from_address
+        ORDER BY from_address
+    ''', (boost1_cutoff, boost2_cutoff, start_time, end_time))
+
+
+def _swaps_query(since=None, until=None):
+    """Swap points per wallet, optionally bounded by ``completed_at`` (unix seconds)."""
+    conditions, params = ["points > 0"], []
+    if since is not None:
+        conditions.append("completed_at >= ?")
+        params.append(int(since))
+    if until is not None:
+        conditions.append("completed_at <= ?")
+        params.append(int(until))
+    return (f'''
+        SELECT user_addr, SUM(points) AS total_points
+        FROM completed_swaps
+        WHERE {" AND ".join(conditions)}
+        GROUP BY user_addr
+        ORDER BY user_addr
+    ''', tuple(params))
+
+
+def resolve_window(source, since=None, until=None):
+    """Fill in the default window: the configured Swapfest for ``swapfest``, all time for ``swaps``."""
+    if source == "swapfest":
+        return since or SWAPFEST_START_TIME, until or SWAPFEST_END_TIME
+    if source not in SOURCES:
+        raise ValueError(f"Unknown sweepstakes source: {source!r} (expected one of {', '.join(SOURCES)})")
+    return since, until
+
+
+def load_entries(cursor, source, since=None, until=None):
+    """Return ``[(wallet, entries)]`` sorted by wallet, wallets with no entries dropped.
+
+    ``swapfest`` counts one entry per whole boosted point between ``since``
+    and ``until`` (gift timestamps, default: the configured Swapfest);
+    ``swaps`` counts ``completed_swaps.points`` (``completed_at`` bounds).
+    """
+    since, until = resolve_window(source, since, until)
+    if source == "swapfest":
+        query, params = _swapfest_query(SWAPFEST_BOOST1_CUTOFF, SWAPFEST_BOOST2_CUTOFF, since, until)
+    else:
+        query, params = _swaps_query(since, until)
+
+    cursor.execute(prepare_query(query), params)
+    entries = []
+    for wallet, total in cursor.fetchall():
+        count = int(float(total or 0))
+        if wallet and count > 0:
+            entries.append((wallet, count))
+    return entries
+
+
+def entries_digest(entries):
+    """SHA-256 over the ``wallet:entries`` list — identifies the exact pool drawn from."""
+    h = hashlib.sha256()
+    for wallet, count in entries:
+        h.update(f"{wallet}:{count}\n".encode())
+    return h.hexdigest()
+
+
+def _draw_with_replacement(weights, n, rng):
+    prefix = list(accumulate(weights))
+    total = prefix[-1]
+    return [bisect.bisect_right(prefix, rng.randrange(total)) for _ in range(n)]
+
+
+def _draw_without_replacement(weights, n, rng):
+    size = len(weights)
+    tree = [0] * (size + 1)
+    for i, w in enumerate(weights, start=1):       # O(n) Fenwick build
+        tree[i] += w
+        parent = i + (i & -i)
+        if parent <= size:
+            tree[parent] += tree[i]
+    top = 1 << (size.bit_length() - 1)
+
+    total = sum(weights)
+    winners = []
+    for _ in range(n):
+        # Descend to the first index whose prefix sum exceeds r
+        r = rng.randrange(total)
+        pos, step = 0, top
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= r:
+                pos = nxt
+                r -= tree[nxt]
+            step >>= 1
+        winners.append(pos)
+        w = weights[pos]
+        total -= w
+        i = pos + 1
+        while i <= size:
+            tree[i] -= w
+            i += i & -i
+    return winners
+
+
+def draw_winners(entries, num_winners, seed, with_replacement=False):
+    """Draw wallets from ``[(wallet, entries)]``, each entry equally likely.
+
+    Without replacement a wallet wins at most once, so at most
+    ``len(entries)`` winners are returned.  Same entries + seed → same winners.
+    """
+    if num_winners < 1:
+        raise ValueError("num_winners must be at least 1")
+    if not entries:
+        return []
+    weights = [count for _, count in entries]
+    rng = random.Random(str(seed))
+    if with_replacement:
+        picks = _draw_with_replacement(weights, num_winners, rng)
+    else:
+        picks = _draw_without_replacement(weights, min(num_winners, len(weights)), rng)
+    return [entries[i][0] for i in picks]
+
+
+def new_seed():
+    return secrets.token_hex(16)
+
+
+def run_draw(entries, num_winners, seed=None, with_replacement=False):
+    """Draw and describe the result (not stored; see ``record_draw``)."""
+    seed = seed or new_seed()
+    started = time.perf_counter()
+    winners = draw_winners(entries, num_winners, seed, with_replacement)
+    return {
+        "seed": seed,
+        "num_winners": num_winners,
+        "with_replacement": with_replacement,
+        "num_wallets": len(entries),
+        "total_entries": sum(count for _, count in entries),
+        "entries_digest": entries_digest(entries),
+        "winners": winners,
+        "draw_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def record_draw(cursor, db_type, source, since, until, draw, created_by=None):
+    """Store a ``run_draw`` result in ``sweepstakes_draws`` (no commit); returns its id."""
+    cursor.execute(prepare_query('''
+        INSERT INTO sweepstakes_draws
+            (source, since, until, seed, num_winners, with_replacement,
+             num_wallets, total_entries, entries_digest, winners, created_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''), (
+        source,
+        str(since) if since is not None else None,
+        str(until) if until is not None else None,
+        draw["seed"], draw["num_winners"], int(draw["with_replacement"]),
+        draw["num_wallets"], draw["total_entries"], draw["entries_digest"],
+        json.dumps(draw["winners"]), created_by, int(time.time()),
+    ))
+    if db_type == 'postgresql':
+        cursor.execute("SELECT lastval()")
+    else:
+        cursor.execute("SELECT last_insert_rowid()")
+    return cursor.fetchone()[0]
+
+
+_DRAW_COLUMNS = ("id, source, since, until, seed, num_winners, with_replacement, "
+                 "num_wallets, total_entries, entries_digest, winners, created_by, created_at")
+
+
+def _draw_from_row(row):
+    return {
+        "id": row[0],
+        "source": row[1],
+        "since": row[2],
+        "until": row[3],
+        "seed": row[4],
+        "num_winners": int(row[5]),
+        "with_replacement": bool(row[6]),
+        "num_wallets": int(row[7]),
+        "total_entries": int(row[8]),
+        "entries_digest": row[9],
+        "winners": json.loads(row[10]),
+        "created_by": row[11],
+        "created_at": int(row[12]),
+    }
+
+
+def load_draw(cursor, draw_id):
+    cursor.execute(prepare_query(
+        f"SELECT {_DRAW_COLUMNS} FROM sweepstakes_draws WHERE id = ?"
+    ), (draw_id,))
+    row = cursor.fetchone()
+    return _draw_from_row(row) if row else None
+
+
+def list_draws(cursor, limit=50):
+    cursor.execute(prepare_query(
+        f"SELECT {_DRAW_COLUMNS} FROM sweepstakes_draws ORDER BY id DESC LIMIT ?"
+    ), (limit,))
+    return [_draw_from_row(r) for r in cursor.fetchall()]
+
+
+def replay_draw(cursor, draw):
+    """Re-run a recorded draw against the current tables.
+
+    Returns ``{"entries_match", "winners_match", "winners"}``: if the points
+    tables changed since the draw, ``entries_match`` is False.
+    """
+    entries = load_entries(cursor, draw["source"], draw["since"], draw["until"])
+    winners = draw_winners(entries, draw["num_winners"], draw["seed"], draw["with_replacement"])
+    return {
+        "entries_match": entries_digest(entries) == draw["entries_digest"],
+        "winners_match": winners == draw["winners"],
+        "winners": winners,
+    }